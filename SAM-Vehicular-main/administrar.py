@@ -0,0 +1,303 @@
+"""
+Herramientas de administración por línea de comandos.
+
+Uso (desde la carpeta del proyecto):
+
+    python -m administrar importar vehiculos padron_vehiculos.csv
+    python -m administrar importar propietarios padron.jsonl --bloque 10000
+    python -m administrar importar infracciones multas.csv --desde-cero
+    python -m administrar resumenes verificar
+    python -m administrar resumenes reconstruir
+    python -m administrar exportar 2 multas_2025.csv.gz --desde 2025-01-01 --hasta 2025-12-31
+    python -m administrar catalogos listar
+    python -m administrar catalogos modelo BYD Dolphin Hatchback
+    python -m administrar auditoria historial vehiculo 3N1BC1CP5CK123456
+    python -m administrar auditoria archivar --antes-de 2024-01-01
+    python -m administrar conciliar pagos_tesoreria.csv
+    python -m administrar historico archivar --antes-de 2024-01-01
+    python -m administrar historico compactar
+    python -m administrar historico listar
+"""
+
+import argparse
+import os
+import sys
+
+# Aseguramos que Python encuentre los módulos del proyecto
+ruta_raiz = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(ruta_raiz)
+
+from database import conexion as db
+from database.inicializar_db import crear_tablas
+import logic.catalogos as cat
+
+
+def comando_importar(args):
+    from logic.importador import Importador
+
+    def mostrar_avance(resumen):
+        print(f"  registro {resumen['ultimo_registro']:>10}  "
+              f"aceptados {resumen['aceptados']:>10}  rechazados {resumen['rechazados']:>8}", flush=True)
+
+    importador = Importador(args.entidad, args.archivo, tamano_bloque=args.bloque,
+                            reanudar=not args.desde_cero, al_avanzar=mostrar_avance)
+    resumen = importador.ejecutar()
+
+    print(f"Importación de {args.entidad} terminada.")
+    if resumen["omitidos"]:
+        print(f"  Reanudada: se omitieron {resumen['omitidos']} registros ya importados.")
+    print(f"  Aceptados: {resumen['aceptados']}  Rechazados: {resumen['rechazados']}")
+    if resumen["rechazados"]:
+        print(f"  Detalle de rechazos en: {importador.ruta_rechazos}")
+    return 0
+
+
+def comando_resumenes(args):
+    from database.resumenes import reconstruir_resumenes, verificar_resumenes
+
+    with db.conexion_db() as conexion:
+        if args.accion == "reconstruir":
+            for tabla, filas in reconstruir_resumenes(conexion).items():
+                print(f"  {tabla:<34} {filas:>8} filas")
+            print("Resúmenes reconstruidos.")
+            return 0
+
+        diferencias = verificar_resumenes(conexion)
+
+    if not diferencias:
+        print("OK: los resúmenes coinciden con las tablas base.")
+        return 0
+    for tabla, clave, esperado, guardado in diferencias:
+        print(f"  {tabla} [{clave}]: esperado {esperado}, guardado {guardado}")
+    print(f"{len(diferencias)} diferencias. Ejecute 'python -m administrar resumenes reconstruir'.")
+    return 1
+
+
+def comando_exportar(args):
+    from logic.exportador import Exportador, formatear_celda
+
+    parametros = ()
+    if args.reporte == 2:
+        if not args.desde or not args.hasta:
+            print("El reporte 2 necesita --desde y --hasta (AAAA-MM-DD).")
+            return 2
+        parametros = (args.desde, args.hasta)
+
+    def mostrar_avance(resumen):
+        print(f"  {resumen['filas']:>12,} de {resumen['total']:,} filas", flush=True)
+
+    try:
+        exportador = Exportador(args.reporte, args.archivo, parametros, formatear=formatear_celda,
+                                tamano_bloque=args.bloque, al_avanzar=mostrar_avance)
+    except ValueError as e:
+        print(e)
+        return 2
+    resumen = exportador.ejecutar()
+    print(f"Exportadas {resumen['filas']:,} filas a {resumen['ruta']} en {resumen['segundos']:.1f} s.")
+    return 0
+
+
+def comando_catalogos(args):
+    from logic import almacen_catalogos
+
+    if args.accion == "listar":
+        vigentes = almacen_catalogos.catalogos()
+        for marca, modelos in vigentes.marcas_modelos.items():
+            print(marca)
+            for modelo, clases in modelos.items():
+                print(f"    {modelo:<20} {', '.join(clases)}")
+        print(f"Clases: {', '.join(vigentes.clases)}")
+        print(f"Colores: {', '.join(vigentes.colores)}")
+        print(f"Tipos de infracción: {', '.join(vigentes.tipos_infraccion)}")
+        print(f"Versión de los catálogos: {vigentes.version}")
+        return 0
+
+    if args.accion == "modelo":
+        if len(args.valores) < 3:
+            print("Uso: catalogos modelo MARCA MODELO CLASE [CLASE ...]")
+            return 2
+        marca, modelo, *clases = args.valores
+        exito, mensaje = almacen_catalogos.agregar_modelo(marca, modelo, clases)
+    else:
+        if len(args.valores) != 1:
+            print(f"Uso: catalogos {args.accion} NOMBRE  (use comillas si el nombre lleva espacios)")
+            return 2
+        agregar = {
+            "marca": almacen_catalogos.agregar_marca,
+            "clase": almacen_catalogos.agregar_clase,
+            "color": almacen_catalogos.agregar_color,
+            "tipo-infraccion": almacen_catalogos.agregar_tipo_infraccion,
+        }[args.accion]
+        exito, mensaje = agregar(args.valores[0])
+    print(mensaje)
+    return 0 if exito else 1
+
+
+def comando_auditoria(args):
+    from logic.gestor_auditoria import GestorAuditoria
+
+    if args.accion == "archivar":
+        if not args.antes_de:
+            print("Uso: auditoria archivar --antes-de AAAA-MM-DD [--archivo RUTA]")
+            return 2
+        exito, resumen = GestorAuditoria.archivar(args.antes_de, args.archivo)
+        if not exito:
+            print(resumen)
+            return 1
+        print(f"Archivados {resumen['eventos']:,} eventos en {resumen['bloques']:,} bloques "
+              f"({resumen['bytes_json']:,} bytes -> {resumen['bytes_comprimidos']:,} comprimidos).")
+        print(f"  Borrados de la bitácora: {resumen['borrados']:,}  Archivo: {resumen['ruta']}")
+        return 0
+
+    if not args.entidad or not args.id_entidad:
+        print("Uso: auditoria historial {vehiculo,propietario,infraccion} ID [--archivo RUTA]")
+        return 2
+    exito, eventos, siguiente = GestorAuditoria.historial(args.entidad, args.id_entidad, tamano_pagina=args.limite)
+    if not exito:
+        print(eventos)
+        return 1
+    if siguiente is None:
+        exito, archivados = GestorAuditoria.historial_archivado(args.entidad, args.id_entidad, args.archivo)
+        if exito:
+            eventos += archivados[:args.limite - len(eventos)]
+    for evento in eventos:
+        print(f"  {evento['momento']}  {evento['accion']:<13} {evento['cambios']}")
+    print(f"{len(eventos)} eventos" + (" (hay más; aumente --limite)" if siguiente is not None else "."))
+    return 0
+
+
+def comando_conciliar(args):
+    import csv
+    from logic.gestor_infracciones import GestorInfracciones
+    from logic.importador import leer_registros
+
+    pares = ((fila.get("folio"), fila.get(args.columna_estado) or args.estado)
+             for _, fila in leer_registros(args.archivo))
+    exito, resumen = GestorInfracciones.cambiar_estado_lote(pares)
+    if not exito:
+        print(resumen)
+        return 1
+
+    print(f"Conciliación terminada: {resumen['recibidos']:,} folios, {resumen['aplicados']:,} aplicados, "
+          f"{resumen['rechazados']:,} rechazados.")
+    if resumen["rechazos"]:
+        ruta_rechazos = args.archivo + ".rechazos.csv"
+        with open(ruta_rechazos, "w", newline="", encoding="utf-8") as archivo:
+            escritor = csv.writer(archivo)
+            escritor.writerow(["registro", "folio", "estado", "motivo"])
+            escritor.writerows(resumen["rechazos"])
+        print(f"  Detalle de rechazos en: {ruta_rechazos}")
+    return 0
+
+
+def comando_historico(args):
+    from logic.gestor_historico import GestorHistorico, fecha_de_corte
+
+    if args.accion == "archivar":
+        antes_de = args.antes_de or fecha_de_corte(*([args.dias] if args.dias else []))
+        exito, resumen = GestorHistorico.archivar(antes_de)
+        if not exito:
+            print(resumen)
+            return 1
+        print(f"Archivadas {resumen['total']:,} multas cerradas con fecha anterior a {antes_de}.")
+        for anio, multas in resumen["archivadas"].items():
+            print(f"  {anio}: {multas:>10,} multas")
+        if resumen["total"]:
+            print("  Ejecute 'python -m administrar historico compactar' para reducir la base de datos.")
+        return 0
+
+    if args.accion == "compactar":
+        exito, resumen = GestorHistorico.compactar()
+        if not exito:
+            print(resumen)
+            return 1
+        print(f"Base de datos compactada: {resumen['bytes_antes']:,} -> {resumen['bytes_despues']:,} bytes.")
+        return 0
+
+    exito, archivos = GestorHistorico.listar()
+    if not exito:
+        print(archivos)
+        return 1
+    for archivo in archivos:
+        print(f"  {archivo['anio']}  {archivo['multas']:>10,} multas  {archivo['desde'] or '-'} a "
+              f"{archivo['hasta'] or '-'}  {archivo['bytes']:>14,} bytes  {archivo['ruta']}")
+    print(f"{len(archivos)} archivos históricos.")
+    return 0
+
+
+def construir_parser():
+    parser = argparse.ArgumentParser(prog="administrar", description="Herramientas de administración de SAM-Vehicular.")
+    parser.add_argument("--db", help="ruta alternativa a la base de datos (por defecto database/infracciones.db)")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+
+    importar = subcomandos.add_parser("importar", aliases=["import"],
+                                      help="importa propietarios, vehículos o infracciones desde CSV/JSONL")
+    importar.add_argument("entidad", choices=["propietarios", "vehiculos", "infracciones"])
+    importar.add_argument("archivo", help="archivo .csv, .jsonl o .ndjson")
+    importar.add_argument("--bloque", type=int, default=5000, help="registros por transacción (5000 por defecto)")
+    importar.add_argument("--desde-cero", action="store_true",
+                          help="ignora el punto de control y empieza desde el primer registro")
+    importar.set_defaults(funcion=comando_importar)
+
+    resumenes = subcomandos.add_parser("resumenes", help="verifica o reconstruye las tablas de resumen de reportes")
+    resumenes.add_argument("accion", choices=["verificar", "reconstruir"])
+    resumenes.set_defaults(funcion=comando_resumenes)
+
+    exportar = subcomandos.add_parser("exportar", aliases=["export"],
+                                      help="exporta un reporte completo a .csv, .csv.gz, .parquet o .xlsx")
+    exportar.add_argument("reporte", type=int, choices=range(1, 7), help="número de reporte (1 a 6)")
+    exportar.add_argument("archivo", help="archivo de salida; el formato se toma de la extensión")
+    exportar.add_argument("--desde", help="fecha inicial del reporte 2 (AAAA-MM-DD)")
+    exportar.add_argument("--hasta", help="fecha final del reporte 2 (AAAA-MM-DD)")
+    exportar.add_argument("--bloque", type=int, default=5000, help="filas leídas por bloque (5000 por defecto)")
+    exportar.set_defaults(funcion=comando_exportar)
+
+    catalogos = subcomandos.add_parser("catalogos", help="lista o agrega marcas, modelos, clases, colores "
+                                                         "y tipos de infracción")
+    catalogos.add_argument("accion", choices=["listar", "marca", "modelo", "clase", "color", "tipo-infraccion"])
+    catalogos.add_argument("valores", nargs="*", help="nombre a agregar; para 'modelo': MARCA MODELO CLASE [CLASE ...]")
+    catalogos.set_defaults(funcion=comando_catalogos)
+
+    auditoria = subcomandos.add_parser("auditoria", help="muestra el historial de un registro o archiva "
+                                                         "los eventos antiguos de la bitácora")
+    auditoria.add_argument("accion", choices=["historial", "archivar"])
+    auditoria.add_argument("entidad", nargs="?", choices=["vehiculo", "propietario", "infraccion"])
+    auditoria.add_argument("id_entidad", nargs="?", help="VIN, id de propietario o folio")
+    auditoria.add_argument("--antes-de", help="archiva los eventos anteriores a esta fecha (AAAA-MM-DD)")
+    auditoria.add_argument("--archivo", help="base de datos del archivo (por defecto junto a la principal)")
+    auditoria.add_argument("--limite", type=int, default=50, help="eventos a mostrar (50 por defecto)")
+    auditoria.set_defaults(funcion=comando_auditoria)
+
+    conciliar = subcomandos.add_parser("conciliar", help="aplica en una transacción los cambios de estado de un "
+                                                         "archivo de folios (conciliación de pagos)")
+    conciliar.add_argument("archivo", help="archivo .csv, .jsonl o .ndjson con la columna 'folio'")
+    conciliar.add_argument("--estado", default="Pagada", choices=cat.ESTADOS_INFRACCION,
+                           help="estado para los registros sin columna de estado ('Pagada' por defecto)")
+    conciliar.add_argument("--columna-estado", default="estado", help="columna con el nuevo estado ('estado' por defecto)")
+    conciliar.set_defaults(funcion=comando_conciliar)
+
+    historico = subcomandos.add_parser("historico", help="mueve las multas cerradas antiguas a archivos anuales "
+                                                         "o compacta la base de datos")
+    historico.add_argument("accion", choices=["archivar", "compactar", "listar"])
+    historico.add_argument("--antes-de", help="archiva las cerradas con fecha anterior a esta (AAAA-MM-DD)")
+    historico.add_argument("--dias", type=int,
+                           help="sin --antes-de, archiva las cerradas con más de estos días (730 por defecto)")
+    historico.set_defaults(funcion=comando_historico)
+
+    return parser
+
+
+def main(argv=None):
+    args = construir_parser().parse_args(argv)
+    if args.db:
+        db.configurar_pool(ruta_db=os.path.abspath(args.db))
+
+    try:
+        crear_tablas()
+        return args.funcion(args)
+    finally:
+        db.cerrar_pool()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
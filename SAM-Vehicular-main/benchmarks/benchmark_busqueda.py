@@ -0,0 +1,182 @@
+"""
+Benchmark: latencia de GestorBusqueda (índices FTS5 trigram de la migración 005).
+
+Llena una base de datos temporal con N vehículos y sus propietarios (los mismos
+generadores de benchmarks/generador_datos.py, sin infracciones) y mide la
+latencia p50/p95/máxima de cada tipo de búsqueda que hace ventanilla: placa
+completa o parcial, con o sin guiones, fragmentos de VIN y CURP, apellidos,
+nombre y apellido, y nombres con un error de escritura. También reporta cuánto
+tarda la carga con los triggers del índice activos.
+
+La meta es < 20 ms por búsqueda con 1M de vehículos. Uso (desde la raíz del proyecto):
+
+    python -m benchmarks.benchmark_busqueda --vehiculos 1000000
+    python -m benchmarks.benchmark_busqueda --db /tmp/sam_100k.db    # base ya generada
+"""
+
+import argparse
+import itertools
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+ruta_raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ruta_raiz)
+
+import logic.catalogos as cat
+from benchmarks import generador_datos as gen
+from database import conexion as db
+from database.inicializar_db import crear_tablas
+from logic.gestor_busqueda import GestorBusqueda
+
+META_MS = 20
+# Vehículos por propietario en generador_datos (≈2 con flotillas incluidas)
+VEHICULOS_POR_PROPIETARIO = 2
+
+
+# ==========================================
+# DATOS
+# ==========================================
+def llenar(total_vehiculos, semilla):
+    """Inserta propietarios y vehículos en la base de datos del pool. Retorna los segundos de carga."""
+    rng = random.Random(semilla)
+    catalogo_modelos = [(marca, modelo, clase)
+                        for marca, modelos in cat.MARCAS_MODELOS_VEHICULO.items()
+                        for modelo, clases in modelos.items()
+                        for clase in clases]
+    total_propietarios = total_vehiculos // VEHICULOS_POR_PROPIETARIO + 1
+
+    inicio = time.perf_counter()
+    with db.conexion_db() as conexion:
+        gen._insertar_en_bloques(conexion, '''
+            INSERT INTO propietarios (nombre_completo, curp, direccion, telefono, correo_electronico,
+                                      estado_licencia, estado) VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', gen._filas_propietarios(rng, total_propietarios), gen.TAMANO_BLOQUE)
+        # Los propietarios del final pueden quedar sin vehículos; no afecta la búsqueda
+        gen._insertar_en_bloques(conexion, '''
+            INSERT INTO vehiculos (vin, placa, marca, modelo, anio, color, clase, estado_legal,
+                                   procedencia, id_propietario) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', itertools.islice(gen._filas_vehiculos(rng, total_propietarios, catalogo_modelos), total_vehiculos),
+            gen.TAMANO_BLOQUE)
+        conexion.execute("INSERT INTO busqueda_vehiculos (busqueda_vehiculos) VALUES ('optimize')")
+        conexion.execute("INSERT INTO busqueda_propietarios (busqueda_propietarios) VALUES ('optimize')")
+        conexion.execute("ANALYZE")
+        conexion.commit()
+    return time.perf_counter() - inicio
+
+
+def _con_error(palabra, rng):
+    """La palabra con una letra cambiada (fuera de la primera, como suele pasar)."""
+    posicion = rng.randrange(1, len(palabra))
+    letra = rng.choice([c for c in "aeioubcdfglmnrstxz" if c != palabra[posicion].lower()])
+    return palabra[:posicion] + letra + palabra[posicion + 1:]
+
+
+def construir_casos(muestras, semilla):
+    """{descripción: (función de búsqueda, [textos])} con textos tomados de la base de datos."""
+    rng = random.Random(semilla)
+    with db.conexion_db() as conexion:
+        vehiculos = conexion.execute(
+            "SELECT placa, vin FROM vehiculos ORDER BY random() LIMIT ?", (muestras,)).fetchall()
+        propietarios = conexion.execute(
+            "SELECT nombre_completo, curp FROM propietarios ORDER BY random() LIMIT ?", (muestras,)).fetchall()
+
+    def apellido(nombre):
+        return nombre.split()[rng.choice((1, 2))]
+
+    buscar_vehiculos = GestorBusqueda.buscar_vehiculos
+    buscar_propietarios = GestorBusqueda.buscar_propietarios
+    return {
+        "placa completa": (buscar_vehiculos, [placa for placa, _ in vehiculos]),
+        "placa parcial ('ABC-12')": (buscar_vehiculos, [placa[:6] for placa, _ in vehiculos]),
+        "placa sin guion ('ABC12')": (buscar_vehiculos, [placa.replace("-", "")[:5] for placa, _ in vehiculos]),
+        "placa con un error": (buscar_vehiculos, [placa[:-1] + rng.choice("0123456789") for placa, _ in vehiculos]),
+        "VIN completo": (buscar_vehiculos, [vin for _, vin in vehiculos]),
+        "VIN, últimos 8": (buscar_vehiculos, [vin[-8:] for _, vin in vehiculos]),
+        "CURP completa": (buscar_propietarios, [curp for _, curp in propietarios]),
+        "CURP, primeros 10": (buscar_propietarios, [curp[:10] for _, curp in propietarios]),
+        "apellido": (buscar_propietarios, [apellido(nombre) for nombre, _ in propietarios]),
+        "nombre y apellido": (buscar_propietarios,
+                              [f"{nombre.split()[0]} {apellido(nombre)}" for nombre, _ in propietarios]),
+        "nombre completo": (buscar_propietarios, [nombre for nombre, _ in propietarios]),
+        "apellido con un error": (buscar_propietarios,
+                                  [_con_error(apellido(nombre), rng) for nombre, _ in propietarios]),
+        "nombre y apellido con un error": (buscar_propietarios,
+                                           [f"{nombre.split()[0]} {_con_error(apellido(nombre), rng)}"
+                                            for nombre, _ in propietarios]),
+    }
+
+
+# ==========================================
+# MEDICIÓN
+# ==========================================
+def medir(buscar, textos):
+    """Retorna (latencias en ms, búsquedas sin resultados)."""
+    latencias = []
+    sin_resultados = 0
+    for texto in textos:
+        inicio = time.perf_counter()
+        exito, respuesta = buscar(texto)
+        latencias.append((time.perf_counter() - inicio) * 1000)
+        if not exito or not respuesta["resultados"]:
+            sin_resultados += 1
+    return latencias, sin_resultados
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+def ejecutar(muestras, semilla):
+    casos = construir_casos(muestras, semilla)
+    # Una búsqueda de calentamiento: carga las páginas del índice y el pool de conexiones
+    GestorBusqueda.buscar_vehiculos("AAA")
+    print(f"{'búsqueda':<32} {'p50':>7} {'p95':>7} {'máx':>7}   sin resultados")
+    sobre_meta = []
+    for descripcion, (buscar, textos) in casos.items():
+        latencias, sin_resultados = medir(buscar, textos)
+        p95 = percentil(latencias, 0.95)
+        print(f"{descripcion:<32} {statistics.median(latencias):6.2f}  {p95:6.2f}  {max(latencias):6.2f}"
+              f"   {sin_resultados:>5}/{len(textos)}")
+        if p95 >= META_MS:
+            sobre_meta.append(descripcion)
+    if sobre_meta:
+        print(f"\nADVERTENCIA: p95 >= {META_MS} ms en: {', '.join(sobre_meta)}")
+        return 1
+    print(f"\nOK: todas las búsquedas con p95 < {META_MS} ms.")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vehiculos", type=int, default=1_000_000, help="vehículos de la base de datos temporal")
+    parser.add_argument("--db", help="base de datos ya generada (se le aplican las migraciones pendientes)")
+    parser.add_argument("--muestras", type=int, default=200, help="búsquedas por tipo")
+    parser.add_argument("--semilla", type=int, default=gen.SEMILLA)
+    args = parser.parse_args()
+
+    if args.db:
+        db.configurar_pool(ruta_db=args.db)
+        try:
+            crear_tablas()
+            return ejecutar(args.muestras, args.semilla)
+        finally:
+            db.cerrar_pool()
+
+    with tempfile.TemporaryDirectory(prefix="sam_busqueda_") as carpeta:
+        db.configurar_pool(ruta_db=os.path.join(carpeta, "busqueda.db"))
+        try:
+            crear_tablas()
+            segundos = llenar(args.vehiculos, args.semilla)
+            print(f"{args.vehiculos:,} vehículos cargados en {segundos:.1f} s (con los triggers de búsqueda)\n")
+            return ejecutar(args.muestras, args.semilla)
+        finally:
+            db.cerrar_pool()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""
+Benchmark: cambiar_estado_infraccion folio por folio vs. cambiar_estado_lote.
+
+Genera una base de datos con generador_datos y arma un archivo de conciliación
+como el que envía tesorería: casi todo son pagos de multas pendientes, con
+algunas cancelaciones, folios inexistentes, multas ya pagadas, folios repetidos
+y folios con el dígito verificador mal capturado.
+
+1. Aplica los primeros --individuales pares con los dos caminos, cada uno sobre
+   su propia copia de la base de datos, y revisa que terminen con los mismos
+   estados y los mismos rechazos.
+2. Aplica el archivo completo con cambiar_estado_lote.
+
+Uso (desde la raíz del proyecto):
+
+    python -m benchmarks.benchmark_cambio_estado
+    python -m benchmarks.benchmark_cambio_estado --infracciones 500000 --conciliacion 100000
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+ruta_raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ruta_raiz)
+
+from benchmarks.generador_datos import generar_datos, SEMILLA
+from database import conexion as db
+from database.inicializar_db import crear_tablas
+from logic.folios import formatear_folio
+from logic.gestor_infracciones import GestorInfracciones, MSJ_FOLIO_REPETIDO
+
+
+def armar_conciliacion(ruta, total, semilla):
+    """[(folio, nuevo_estado)] con la mezcla descrita en el docstring del módulo."""
+    rng = random.Random(semilla)
+    db.configurar_pool(ruta_db=ruta)
+    try:
+        with db.conexion_db() as conexion:
+            pendientes = [fila[0] for fila in conexion.execute(
+                "SELECT folio FROM infracciones WHERE estado = 'Pendiente'")]
+            pagadas = [fila[0] for fila in conexion.execute(
+                "SELECT folio FROM infracciones WHERE estado = 'Pagada' LIMIT 10000")]
+    finally:
+        db.cerrar_pool()
+
+    rng.shuffle(pendientes)
+    pares = []
+    for numero in range(total):
+        azar = rng.random()
+        if azar < 0.01 and pares:
+            pares.append(rng.choice(pares))
+        elif azar < 0.02:
+            pares.append((f"INF-20250101-{numero:08X}", "Pagada"))
+        elif azar < 0.03 and pagadas:
+            pares.append((rng.choice(pagadas), "Pagada"))
+        elif azar < 0.035:
+            # Un folio nuevo con un dígito cambiado
+            folio = formatear_folio("20250101", numero + 1)
+            pares.append((folio[:-1] + str((int(folio[-1]) + 1) % 10), "Pagada"))
+        elif pendientes:
+            pares.append((pendientes.pop(), "Cancelada" if azar < 0.06 else "Pagada"))
+    return pares
+
+
+def estados(ruta, folios):
+    db.configurar_pool(ruta_db=ruta)
+    try:
+        with db.conexion_db() as conexion:
+            return {folio: conexion.execute("SELECT estado FROM infracciones WHERE folio = ?", (folio,)).fetchone()
+                    for folio in folios}
+    finally:
+        db.cerrar_pool()
+
+
+def folio_por_folio(ruta, pares):
+    db.configurar_pool(ruta_db=ruta)
+    try:
+        inicio = time.perf_counter()
+        rechazos = [(linea, folio, estado, msj) for linea, (folio, estado) in enumerate(pares, start=1)
+                    for exito, msj in [GestorInfracciones.cambiar_estado_infraccion(folio, estado)] if not exito]
+        return time.perf_counter() - inicio, rechazos
+    finally:
+        db.cerrar_pool()
+
+
+def por_lote(ruta, pares):
+    db.configurar_pool(ruta_db=ruta)
+    try:
+        inicio = time.perf_counter()
+        exito, resumen = GestorInfracciones.cambiar_estado_lote(iter(pares))
+        if not exito:
+            raise RuntimeError(resumen)
+        return time.perf_counter() - inicio, resumen
+    finally:
+        db.cerrar_pool()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--infracciones", type=int, default=500_000, help="escala de la base de datos generada")
+    parser.add_argument("--conciliacion", type=int, default=100_000, help="pares del archivo de conciliación")
+    parser.add_argument("--individuales", type=int, default=5000, help="pares aplicados con los dos caminos")
+    parser.add_argument("--semilla", type=int, default=SEMILLA)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="sam_cambio_estado_") as carpeta:
+        original = os.path.join(carpeta, "original.db")
+        db.configurar_pool(ruta_db=original)
+        try:
+            crear_tablas()
+            generar_datos(args.infracciones, semilla=args.semilla)
+        finally:
+            db.cerrar_pool()
+        pares = armar_conciliacion(original, args.conciliacion, args.semilla)
+        muestra = pares[:args.individuales]
+
+        copias = {nombre: os.path.join(carpeta, f"{nombre}.db") for nombre in ("folio", "lote", "completo")}
+        for ruta in copias.values():
+            shutil.copyfile(original, ruta)
+
+        segundos_folio, rechazos_folio = folio_por_folio(copias["folio"], muestra)
+        segundos_lote, resumen_lote = por_lote(copias["lote"], muestra)
+        print(f"{len(muestra):,} pares ({len(rechazos_folio):,} rechazados)")
+        print(f"  {'folio por folio':<16} {segundos_folio:8.2f} s  {len(muestra) / segundos_folio:>10,.0f} pares/s")
+        print(f"  {'por lote':<16} {segundos_lote:8.2f} s  {len(muestra) / segundos_lote:>10,.0f} pares/s")
+
+        folios = {folio for folio, _ in muestra}
+        # Un folio repetido se rechaza en los dos caminos, pero folio por folio el motivo es el
+        # estado que dejó la primera aparición y en el lote es MSJ_FOLIO_REPETIDO
+        iguales = (estados(copias["folio"], folios) == estados(copias["lote"], folios)
+                   and [rechazo[:3] for rechazo in rechazos_folio] == [rechazo[:3] for rechazo in resumen_lote["rechazos"]]
+                   and all(uno[3] == otro[3] or otro[3] == MSJ_FOLIO_REPETIDO
+                           for uno, otro in zip(rechazos_folio, resumen_lote["rechazos"])))
+
+        segundos, resumen = por_lote(copias["completo"], pares)
+        print(f"\nArchivo completo por lote: {resumen['recibidos']:,} pares en {segundos:.2f} s "
+              f"({resumen['recibidos'] / segundos:,.0f}/s), {resumen['aplicados']:,} aplicados, "
+              f"{resumen['rechazados']:,} rechazados")
+        motivos = {}
+        for _, _, _, motivo in resumen["rechazos"]:
+            motivos[motivo] = motivos.get(motivo, 0) + 1
+        for motivo, cantidad in sorted(motivos.items(), key=lambda par: -par[1]):
+            print(f"  {cantidad:>8,}  {motivo}")
+
+    if not iguales:
+        print("\nFALLA: los dos caminos terminaron con estados o rechazos distintos.")
+        return 1
+    print("\nOK: los dos caminos dejan los mismos estados y reportan los mismos rechazos.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""
+Benchmark: folios aleatorios (uuid4) vs. secuencia diaria de logic/folios.py.
+
+1. Inserción en el índice de la llave primaria: sobre una tabla con el mismo
+   tipo de llave que infracciones (folio TEXT PRIMARY KEY) y un historial ya
+   cargado, inserta folios nuevos con cada formato y mide filas por segundo y
+   cuántas páginas crece el archivo. Los aleatorios caen en hojas al azar y las
+   parten; los secuenciales se agregan al final del índice.
+2. Asignación concurrente: varios procesos, cada uno con varios hilos, piden
+   folios a la misma base de datos. Revisa que no se repita ninguno, que en cada
+   proceso salgan en orden y que todos tengan un dígito verificador válido.
+
+Uso (desde la raíz del proyecto):
+
+    python -m benchmarks.benchmark_folios
+    python -m benchmarks.benchmark_folios --historial 500000 --nuevos 100000 --procesos 4 --hilos 4
+"""
+
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import date
+
+ruta_raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ruta_raiz)
+
+from database import conexion as db
+from database.inicializar_db import crear_tablas
+from logic import folios
+
+FILAS_POR_TRANSACCION = 1000
+CACHE_KB = 2000                 # Caché chica, como la de un archivo mucho más grande que la memoria
+
+
+# ==========================================
+# 1. INSERCIÓN EN EL ÍNDICE
+# ==========================================
+def folio_uuid(dia, _):
+    return f"INF-{dia}-{str(uuid.uuid4())[:8].upper()}"
+
+
+def insertar(ruta, generar, dia, inicio, total):
+    conexion = sqlite3.connect(ruta)
+    conexion.execute(f"PRAGMA cache_size = -{CACHE_KB}")
+    try:
+        paginas_antes = conexion.execute("PRAGMA page_count").fetchone()[0]
+        comienzo = time.perf_counter()
+        for bloque in range(inicio, inicio + total, FILAS_POR_TRANSACCION):
+            with conexion:
+                # OR IGNORE: un uuid repetido no detiene la medición (se cuentan aparte)
+                conexion.executemany("INSERT OR IGNORE INTO folios_prueba (folio, datos) VALUES (?, ?)",
+                                     ((generar(dia, n), "x" * 150)
+                                      for n in range(bloque, min(bloque + FILAS_POR_TRANSACCION, inicio + total))))
+        segundos = time.perf_counter() - comienzo
+        paginas = conexion.execute("PRAGMA page_count").fetchone()[0] - paginas_antes
+        filas = conexion.execute("SELECT COUNT(*) FROM folios_prueba").fetchone()[0]
+    finally:
+        conexion.close()
+    return segundos, paginas, filas
+
+
+def comparar_insercion(carpeta, historial, nuevos):
+    print(f"Inserción de {nuevos:,} folios sobre un historial de {historial:,} "
+          f"(transacciones de {FILAS_POR_TRANSACCION}, caché de {CACHE_KB} KB)")
+    for nombre, generar in (("uuid4 (anterior)", folio_uuid), ("secuencia diaria", folios.formatear_folio)):
+        ruta = os.path.join(carpeta, f"insercion_{generar.__name__}.db")
+        with sqlite3.connect(ruta) as conexion:
+            conexion.execute("CREATE TABLE folios_prueba (folio TEXT PRIMARY KEY, datos TEXT)")
+        insertar(ruta, generar, "20250101", 1, historial)
+        segundos, paginas, filas = insertar(ruta, generar, "20260101", 1, nuevos)
+        perdidos = historial + nuevos - filas
+        print(f"  {nombre:<18} {nuevos / segundos:>10,.0f} filas/s  +{paginas:,} páginas"
+              f"{f'  ({perdidos} folios repetidos)' if perdidos else ''}")
+    print()
+
+
+# ==========================================
+# 2. ASIGNACIÓN CONCURRENTE
+# ==========================================
+def pedir_folios(ruta, hilos, por_hilo, tamano_bloque, salida):
+    """Se ejecuta en un proceso aparte: su propio pool y su propio asignador."""
+    db.configurar_pool(ruta_db=ruta)
+    asignador = folios.AsignadorFolios(tamano_bloque=tamano_bloque)
+    resultados = [[] for _ in range(hilos)]
+
+    def pedir(numero):
+        for _ in range(por_hilo):
+            resultados[numero].append(asignador.siguiente())
+
+    trabajadores = [threading.Thread(target=pedir, args=(n,)) for n in range(hilos)]
+    for trabajador in trabajadores:
+        trabajador.start()
+    for trabajador in trabajadores:
+        trabajador.join()
+    db.cerrar_pool()
+    salida.put(resultados)
+
+
+def asignacion_concurrente(carpeta, procesos, hilos, por_hilo, tamano_bloque):
+    ruta = os.path.join(carpeta, "asignacion.db")
+    db.configurar_pool(ruta_db=ruta)
+    crear_tablas()
+    db.cerrar_pool()
+
+    salida = multiprocessing.Queue()
+    inicio = time.perf_counter()
+    trabajos = [multiprocessing.Process(target=pedir_folios, args=(ruta, hilos, por_hilo, tamano_bloque, salida))
+                for _ in range(procesos)]
+    for trabajo in trabajos:
+        trabajo.start()
+    por_proceso = [salida.get() for _ in trabajos]
+    for trabajo in trabajos:
+        trabajo.join()
+    segundos = time.perf_counter() - inicio
+
+    todos = [folio for resultados in por_proceso for lista in resultados for folio in lista]
+    en_orden = all(lista == sorted(lista) for resultados in por_proceso for lista in resultados)
+    verificados = all(folios.validar_folio(folio)[0] for folio in todos)
+    with sqlite3.connect(ruta) as conexion:
+        ultimo = conexion.execute("SELECT ultimo FROM secuencias_folio WHERE dia = ?",
+                                  (date.today().strftime('%Y%m%d'),)).fetchone()[0]
+    print(f"Asignación: {procesos} procesos x {hilos} hilos x {por_hilo:,} folios, bloques de {tamano_bloque}")
+    print(f"  {len(todos):,} folios en {segundos:.2f} s ({len(todos) / segundos:,.0f}/s), "
+          f"{ultimo // tamano_bloque:,} bloques apartados, último consecutivo {ultimo:,}")
+    print(f"  primero {min(todos)}  último {max(todos)}")
+    return len(set(todos)) == len(todos) and en_orden and verificados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--historial", type=int, default=300_000, help="folios ya existentes en la tabla")
+    parser.add_argument("--nuevos", type=int, default=100_000, help="folios insertados y medidos")
+    parser.add_argument("--procesos", type=int, default=4)
+    parser.add_argument("--hilos", type=int, default=4, help="hilos por proceso")
+    parser.add_argument("--por-hilo", type=int, default=5000, help="folios que pide cada hilo")
+    parser.add_argument("--tamano-bloque", type=int, default=folios.TAMANO_BLOQUE)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="sam_folios_") as carpeta:
+        comparar_insercion(carpeta, args.historial, args.nuevos)
+        correcto = asignacion_concurrente(carpeta, args.procesos, args.hilos, args.por_hilo, args.tamano_bloque)
+
+    if not correcto:
+        print("\nFALLA: hay folios repetidos, fuera de orden o con verificador inválido.")
+        return 1
+    print("\nOK: ningún folio repetido, en orden dentro de cada proceso y con verificador válido.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
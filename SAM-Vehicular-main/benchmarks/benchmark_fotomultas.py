@@ -0,0 +1,198 @@
+"""
+Benchmark: registro de fotomultas una por una vs. IngestaFotomultas.
+
+Crea una base de datos temporal con vehículos y agentes y mide:
+1. GestorInfracciones.registrar_infraccion, una multa por llamada.
+2. IngestaFotomultas con varios hilos "cámara" enviando eventos. Una parte son
+   reenvíos de eventos ya enviados, VIN inexistentes o agentes inactivos.
+3. La misma corrida reenviada completa (todo debe salir como duplicado).
+
+Al final revisa que cada evento válido haya generado exactamente una multa, y
+que con un caché de VIN diminuto (se vacía casi en cada lote) ningún vehículo
+existente se rechace como inexistente.
+Uso (desde la raíz del proyecto):
+
+    python -m benchmarks.benchmark_fotomultas --eventos 100000 --camaras 4
+    python -m benchmarks.benchmark_fotomultas --tamano-lote 1000 --espera-maxima 0.5
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+ruta_raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ruta_raiz)
+
+from benchmarks import generador_datos as gen
+from database import conexion as db
+from database.inicializar_db import crear_tablas
+from logic.gestor_infracciones import GestorInfracciones
+from logic import ingesta_fotomultas
+from logic.ingesta_fotomultas import IngestaFotomultas, RECHAZADA
+from models.infraccion import Infraccion
+
+AGENTES_ACTIVOS = 10
+PROPORCION_REENVIOS = 0.05
+PROPORCION_VIN_INEXISTENTE = 0.02
+PROPORCION_AGENTE_INACTIVO = 0.01
+EVENTOS_CACHE_VINS = 2000       # Eventos de la revisión con caché de VIN diminuto
+
+
+def preparar_base(total_vehiculos):
+    with db.conexion_db() as conexion:
+        conexion.execute('''
+            INSERT INTO propietarios (nombre_completo, curp, estado_licencia, estado)
+            VALUES ('Propietario de Prueba', ?, 'Vigente', 'Activo')
+        ''', (gen.curp_desde_numero(0),))
+        conexion.executemany('''
+            INSERT INTO vehiculos (vin, placa, marca, modelo, anio, color, clase, estado_legal, procedencia,
+                                   id_propietario)
+            VALUES (?, ?, 'Nissan', 'Versa', 2020, 'Blanco', 'Sedán', 'Activo', 'Nacional', 1)
+        ''', ((gen.vin_desde_numero(n), gen.placa_desde_numero(n)) for n in range(total_vehiculos)))
+        # Agentes 1..AGENTES_ACTIVOS activos; el siguiente, inactivo
+        conexion.executemany('''
+            INSERT INTO agentes (numero_placa, nombre_completo, cargo, estado) VALUES (?, ?, 'Patrullero', ?)
+        ''', ((gen.placa_agente(n), f"Oficial {n}", "Activo" if n < AGENTES_ACTIVOS else "Inactivo")
+              for n in range(AGENTES_ACTIVOS + 1)))
+        conexion.commit()
+
+
+def _multa(rng, vin, id_agente):
+    ayer = (date.today() - timedelta(days=1)).isoformat()
+    return Infraccion(vin, id_agente, ayer, f"{rng.randrange(24):02d}:{rng.randrange(60):02d}",
+                      f"Periférico km {rng.randrange(1, 60)}", "Exceso de velocidad",
+                      "Radar fijo: exceso de velocidad", 1500.0)
+
+
+def generar_eventos(total, total_vehiculos, semilla):
+    """[(id_evento, infraccion, es_valido)] con reenvíos intercalados."""
+    rng = random.Random(semilla)
+    eventos = []
+    for n in range(total):
+        if eventos and rng.random() < PROPORCION_REENVIOS:
+            eventos.append(rng.choice(eventos))
+            continue
+        azar = rng.random()
+        vin = gen.vin_desde_numero(rng.randrange(total_vehiculos))
+        id_agente = rng.randint(1, AGENTES_ACTIVOS)
+        if azar < PROPORCION_VIN_INEXISTENTE:
+            vin = gen.vin_desde_numero(total_vehiculos + n)
+        elif azar < PROPORCION_VIN_INEXISTENTE + PROPORCION_AGENTE_INACTIVO:
+            id_agente = AGENTES_ACTIVOS + 1
+        eventos.append((f"CAM{n % 40:02d}-{n:09d}", _multa(rng, vin, id_agente),
+                        azar >= PROPORCION_VIN_INEXISTENTE + PROPORCION_AGENTE_INACTIVO))
+    return eventos
+
+
+def uno_por_uno(eventos):
+    inicio = time.perf_counter()
+    for _, multa, _ in eventos:
+        GestorInfracciones.registrar_infraccion(multa, "Fotomulta")
+    return len(eventos) / (time.perf_counter() - inicio)
+
+
+def con_ingesta(eventos, camaras, tamano_lote, espera_maxima):
+    ingesta = IngestaFotomultas(tamano_lote=tamano_lote, espera_maxima=espera_maxima)
+    ingesta.iniciar()
+
+    def camara(numero):
+        for id_evento, multa, _ in eventos[numero::camaras]:
+            ingesta.enviar(id_evento, multa)
+
+    inicio = time.perf_counter()
+    hilos = [threading.Thread(target=camara, args=(n,)) for n in range(camaras)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    ingesta.detener()
+    segundos = time.perf_counter() - inicio
+    return ingesta.estadisticas(), segundos
+
+
+def con_cache_de_vins_pequeno(semilla):
+    """
+    Lotes de 2 eventos sobre 5 vehículos existentes con MAXIMO_VINS = 3: el caché
+    se vacía casi en cada lote y los VIN que ya tenía deben volver a consultarse.
+    Retorna los eventos rechazados (deben ser 0).
+    """
+    rng = random.Random(semilla)
+    rechazados = []
+    original = ingesta_fotomultas.MAXIMO_VINS
+    ingesta_fotomultas.MAXIMO_VINS = 3
+    try:
+        ingesta = IngestaFotomultas(tamano_lote=2, espera_maxima=0.5, al_procesar=lambda resultados: rechazados.extend(
+            resultado for resultado in resultados if resultado[1] == RECHAZADA))
+        ingesta.iniciar()
+        for n in range(EVENTOS_CACHE_VINS):
+            multa = _multa(rng, gen.vin_desde_numero(rng.randrange(5)), rng.randint(1, AGENTES_ACTIVOS))
+            ingesta.enviar(f"CACHE-{n:09d}", multa)
+        ingesta.detener()
+    finally:
+        ingesta_fotomultas.MAXIMO_VINS = original
+    return rechazados
+
+
+def imprimir(descripcion, estadisticas, segundos):
+    print(f"{descripcion}: {estadisticas['recibidos']:,} eventos en {segundos:.2f} s "
+          f"({estadisticas['recibidos'] / segundos:,.0f}/s), {estadisticas['lotes']:,} lotes "
+          f"de {estadisticas['eventos_por_lote']:.0f} en promedio")
+    print(f"    registrados {estadisticas['registrados']:,}  duplicados {estadisticas['duplicados']:,}  "
+          f"rechazados {estadisticas['rechazados']:,}  cola llena {estadisticas['cola_llena']:,}")
+    print(f"    latencia (envío -> commit): p50 {estadisticas['latencia_ms_p50']:.1f} ms  "
+          f"p95 {estadisticas['latencia_ms_p95']:.1f} ms  máx {estadisticas['latencia_ms_max']:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--eventos", type=int, default=100_000, help="eventos enviados a la ingesta")
+    parser.add_argument("--individuales", type=int, default=2000, help="multas para el camino de una en una")
+    parser.add_argument("--vehiculos", type=int, default=50_000)
+    parser.add_argument("--camaras", type=int, default=4, help="hilos que envían eventos")
+    parser.add_argument("--tamano-lote", type=int, default=500)
+    parser.add_argument("--espera-maxima", type=float, default=0.2, help="segundos")
+    parser.add_argument("--semilla", type=int, default=gen.SEMILLA)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="sam_fotomultas_") as carpeta:
+        db.configurar_pool(ruta_db=os.path.join(carpeta, "fotomultas.db"))
+        try:
+            crear_tablas()
+            preparar_base(args.vehiculos)
+            individuales = generar_eventos(args.individuales, args.vehiculos, args.semilla + 1)
+            print(f"registrar_infraccion (una por una): {uno_por_uno(individuales):,.0f} eventos/s\n")
+
+            eventos = generar_eventos(args.eventos, args.vehiculos, args.semilla)
+            imprimir("IngestaFotomultas", *con_ingesta(eventos, args.camaras, args.tamano_lote, args.espera_maxima))
+            estadisticas, segundos = con_ingesta(eventos, args.camaras, args.tamano_lote, args.espera_maxima)
+            imprimir("Reenvío completo", estadisticas, segundos)
+
+            validos = {id_evento for id_evento, _, es_valido in eventos if es_valido}
+            with db.conexion_db() as conexion:
+                registrados = conexion.execute("SELECT COUNT(*) FROM eventos_camara").fetchone()[0]
+                multas = conexion.execute('''
+                    SELECT COUNT(*) FROM infracciones i JOIN eventos_camara e ON e.folio = i.folio
+                ''').fetchone()[0]
+            rechazados_cache = con_cache_de_vins_pequeno(args.semilla + 2)
+        finally:
+            db.cerrar_pool()
+
+    if registrados != len(validos) or multas != len(validos) or estadisticas["registrados"]:
+        print(f"\nFALLA: {len(validos):,} eventos válidos, {registrados:,} registrados, {multas:,} multas.")
+        return 1
+    if rechazados_cache:
+        print(f"\nFALLA: con el caché de VIN lleno se rechazaron {len(rechazados_cache):,} eventos válidos "
+              f"(primero: {rechazados_cache[0]}).")
+        return 1
+    print(f"\nOK: {len(validos):,} eventos válidos, cada uno con exactamente una multa; "
+          f"{EVENTOS_CACHE_VINS:,} eventos sin rechazos con el caché de VIN lleno.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
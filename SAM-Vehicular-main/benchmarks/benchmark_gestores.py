@@ -0,0 +1,313 @@
+"""
+Benchmark de carga: mide cada método de los gestores y cada reporte.
+
+Para cada escala crea una base de datos temporal, la llena con
+benchmarks.generador_datos y cronometra las operaciones que usa la interfaz.
+Los resultados se guardan en JSON para comparar entre versiones:
+
+    python -m benchmarks.benchmark_gestores
+    python -m benchmarks.benchmark_gestores --escalas 10000 100000 --comparar benchmarks/resultados/anterior.json
+
+Cada operación se ejecuta una vez de calentamiento y luego 'repeticiones'
+veces; se reportan media, mediana, p95, mínimo y máximo en milisegundos, y
+cuántas llamadas devolvieron (False, mensaje) para no medir por error un
+camino de falla.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ruta_raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ruta_raiz not in sys.path:
+    sys.path.append(ruta_raiz)
+
+from benchmarks.generador_datos import (SEMILLA, FECHA_FIN, generar_datos, curp_desde_numero,
+                                        placa_desde_numero, vin_desde_numero)
+from database import conexion as db
+from database.inicializar_db import crear_tablas
+from logic import cache_vehiculos
+from logic.auth import Auth
+from logic.gestor_agentes import GestorAgentes
+from logic.gestor_infracciones import GestorInfracciones
+from logic.gestor_propietarios import GestorPropietarios
+from logic.gestor_reportes import GestorReportes
+from logic.gestor_usuarios import GestorUsuarios
+from logic.gestor_vehiculos import GestorVehiculos
+from models.agente import Agente
+from models.infraccion import Infraccion
+from models.propietario import Propietario
+from models.usuario import Usuario
+from models.vehiculo import Vehiculo
+
+ESCALAS = (10_000, 100_000, 1_000_000)
+REPETICIONES = 200
+REPETICIONES_REPORTES = 5
+TAMANO_LOTE = 1000
+VEHICULOS_FRECUENTES = 20
+CARPETA_RESULTADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resultados")
+
+
+def _fue_exitoso(resultado):
+    """Los gestores devuelven (bool, ...); los reportes (exito, encabezados, filas)."""
+    if isinstance(resultado, tuple) and resultado and isinstance(resultado[0], bool):
+        return resultado[0]
+    if isinstance(resultado, list):
+        return all(_fue_exitoso(r) for r in resultado)
+    return True
+
+
+def _consultar_ids(consulta):
+    with db.conexion_db() as conexion:
+        return [fila[0] for fila in conexion.execute(consulta).fetchall()]
+
+
+def _consultar_usuarios():
+    exito, usuarios = GestorUsuarios.obtener_todos_los_usuarios()
+    return [(u[0], u[1]) for u in usuarios] if exito else []
+
+
+def construir_casos(filas, repeticiones, repeticiones_reportes, semilla):
+    """
+    Retorna [(nombre, repeticiones, llamada)] en el orden en que deben medirse.
+    llamada(i) hace la i-ésima invocación; las escrituras usan claves nuevas
+    derivadas de i para no chocar con los datos generados ni entre sí.
+    """
+    rng = random.Random(semilla)
+    total_vehiculos = filas["vehiculos"]
+    total_propietarios = filas["propietarios"]
+
+    def vin_existente(_):
+        return vin_desde_numero(rng.randrange(total_vehiculos))
+
+    def placa_existente(_):
+        return placa_desde_numero(rng.randrange(total_vehiculos))
+
+    propietarios_activos = _consultar_ids("SELECT id_propietario FROM propietarios WHERE estado = 'Activo' LIMIT 5000")
+    agentes_activos = _consultar_ids("SELECT id_agente FROM agentes WHERE estado = 'Activo'")
+    folios_pendientes = _consultar_ids(
+        f"SELECT folio FROM infracciones WHERE estado = 'Pendiente' LIMIT {repeticiones + 1}")
+    usuarios = {fila[0]: fila[1] for fila in _consultar_usuarios()}
+    id_agente_usuario = next(i for i, nombre in usuarios.items() if nombre == "agente_001")
+
+    # Vehículos creados durante el benchmark: sin multas, sirven para los trámites
+    def numero_nuevo(i, desplazamiento=0):
+        return total_vehiculos + desplazamiento + i
+
+    def vehiculo_nuevo(numero):
+        return Vehiculo(vin=vin_desde_numero(numero), placa=placa_desde_numero(numero), marca="Nissan",
+                        modelo="Versa", anio=2020, color="Blanco", clase="Sedán", procedencia="Nacional",
+                        id_propietario=rng.choice(propietarios_activos))
+
+    fecha_fin = FECHA_FIN.isoformat()
+    hace_30_dias = (FECHA_FIN - timedelta(days=30)).isoformat()
+    hace_un_anio = (FECHA_FIN - timedelta(days=365)).isoformat()
+
+    return [
+        # --- Lecturas puntuales ---
+        # Sin caché: se vacía antes de cada búsqueda para medir la consulta a la base de datos
+        ("GestorVehiculos.buscar_vehiculo_universal (VIN)", repeticiones,
+         lambda i: (cache_vehiculos.vehiculos.limpiar(), GestorVehiculos.buscar_vehiculo_universal(vin_existente(i)))[1]),
+        ("GestorVehiculos.buscar_vehiculo_universal (placa)", repeticiones,
+         lambda i: (cache_vehiculos.vehiculos.limpiar(), GestorVehiculos.buscar_vehiculo_universal(placa_existente(i)))[1]),
+        # Un turno de captura consulta una y otra vez los mismos vehículos
+        ("GestorVehiculos.buscar_vehiculo_universal (VIN, en caché)", repeticiones,
+         lambda i: GestorVehiculos.buscar_vehiculo_universal(vin_desde_numero(i % VEHICULOS_FRECUENTES))),
+        ("GestorVehiculos.buscar_vehiculo_universal (inexistente)", repeticiones,
+         lambda i: (not GestorVehiculos.buscar_vehiculo_universal(f"ZZZ-{i:04d}")[0], None)),
+        ("GestorVehiculos.tiene_multas_pendientes", repeticiones,
+         lambda i: GestorVehiculos.tiene_multas_pendientes(vin_existente(i))),
+        ("GestorPropietarios.buscar_propietario_por_curp", repeticiones,
+         lambda i: GestorPropietarios.buscar_propietario_por_curp(curp_desde_numero(rng.randrange(total_propietarios)))),
+        ("GestorAgentes.obtener_agentes_para_combo", repeticiones,
+         lambda i: GestorAgentes.obtener_agentes_para_combo()),
+        ("GestorUsuarios.obtener_todos_los_usuarios", repeticiones,
+         lambda i: GestorUsuarios.obtener_todos_los_usuarios()),
+        ("Auth.autenticar_usuario", repeticiones,
+         lambda i: Auth.autenticar_usuario("supervisor_000", "supervisor123")),
+
+        # --- Escrituras ---
+        ("GestorPropietarios.registrar_propietario", repeticiones,
+         lambda i: GestorPropietarios.registrar_propietario(Propietario(
+             "Propietario de Prueba", curp_desde_numero(total_propietarios + i), "Calle 60 #100, Mérida",
+             "9990000000", "prueba@correo.mx", "Vigente"))),
+        ("GestorPropietarios.modificar_propietario", repeticiones,
+         lambda i: GestorPropietarios.modificar_propietario(
+             rng.choice(propietarios_activos), "Calle 59 #200, Mérida", "9991111111", "nuevo@correo.mx",
+             "Vigente", "Activo")),
+        ("GestorVehiculos.registrar_vehiculo", repeticiones,
+         lambda i: GestorVehiculos.registrar_vehiculo(vehiculo_nuevo(numero_nuevo(i)))),
+        ("GestorVehiculos.actualizar_vehiculo", repeticiones,
+         lambda i: GestorVehiculos.actualizar_vehiculo(vin_desde_numero(numero_nuevo(i)), "Rojo", "Activo")),
+        ("GestorVehiculos.modificar_vehiculo", repeticiones,
+         lambda i: GestorVehiculos.modificar_vehiculo(
+             vin_desde_numero(numero_nuevo(i)), placa_desde_numero(numero_nuevo(i, 1_000_000)), "Azul", "Activo")),
+        ("GestorVehiculos.realizar_reemplacamiento", repeticiones,
+         lambda i: GestorVehiculos.realizar_reemplacamiento(
+             vin_desde_numero(numero_nuevo(i)), placa_desde_numero(numero_nuevo(i, 2_000_000)))),
+        ("GestorVehiculos.transferir_propiedad", repeticiones,
+         lambda i: GestorVehiculos.transferir_propiedad(
+             vin_desde_numero(numero_nuevo(i)), rng.choice(propietarios_activos))),
+        (f"GestorVehiculos.registrar_vehiculos_lote ({TAMANO_LOTE})", repeticiones_reportes,
+         lambda i: GestorVehiculos.registrar_vehiculos_lote(
+             vehiculo_nuevo(numero_nuevo(i * TAMANO_LOTE + j, 3_000_000)) for j in range(TAMANO_LOTE))),
+        ("GestorInfracciones.registrar_infraccion", repeticiones,
+         lambda i: GestorInfracciones.registrar_infraccion(Infraccion(
+             vin_existente(i), rng.choice(agentes_activos), fecha_fin, "12:00", "Centro Histórico",
+             "Exceso de velocidad", "Art. 45 del Reglamento", 1500.0, "LIC12345678"), "En sitio")),
+        ("GestorInfracciones.cambiar_estado_infraccion", repeticiones,
+         lambda i: GestorInfracciones.cambiar_estado_infraccion(folios_pendientes[i % len(folios_pendientes)], "Pagada")),
+        ("GestorAgentes.registrar_agente", repeticiones,
+         lambda i: GestorAgentes.registrar_agente(Agente(f"BEN-{i:05d}", "Oficial de Prueba", "Vialidad"))),
+        ("GestorAgentes.modificar_agente", repeticiones,
+         lambda i: GestorAgentes.modificar_agente(rng.choice(agentes_activos), "Vialidad", "Activo")),
+        ("GestorUsuarios.actualizar_usuario", repeticiones,
+         lambda i: GestorUsuarios.actualizar_usuario(id_agente_usuario, "Agente de Tránsito", "Activo")),
+        ("Auth.registrar_usuario", repeticiones,
+         lambda i: Auth.registrar_usuario(Usuario(f"benchmark_{i:05d}", "clave123", "Supervisor"))),
+        ("Auth.cambiar_password_obligatorio", repeticiones,
+         lambda i: Auth.cambiar_password_obligatorio(id_agente_usuario, "agente123")),
+
+        # --- Reportes ---
+        ("GestorReportes.reporte_vehiculos_infracciones_pendientes", repeticiones_reportes,
+         lambda i: GestorReportes.reporte_vehiculos_infracciones_pendientes()),
+        ("GestorReportes.reporte_infracciones_por_fecha (30 días)", repeticiones_reportes,
+         lambda i: GestorReportes.reporte_infracciones_por_fecha(hace_30_dias, fecha_fin)),
+        ("GestorReportes.reporte_infracciones_por_fecha (1 año)", repeticiones_reportes,
+         lambda i: GestorReportes.reporte_infracciones_por_fecha(hace_un_anio, fecha_fin)),
+        ("GestorReportes.reporte_infracciones_por_agente", repeticiones_reportes,
+         lambda i: GestorReportes.reporte_infracciones_por_agente()),
+        ("GestorReportes.reporte_vehiculos_estado_legal", repeticiones_reportes,
+         lambda i: GestorReportes.reporte_vehiculos_estado_legal()),
+        ("GestorReportes.reporte_propietarios_multiples_vehiculos", repeticiones_reportes,
+         lambda i: GestorReportes.reporte_propietarios_multiples_vehiculos()),
+        ("GestorReportes.reporte_resumen_infracciones", repeticiones_reportes,
+         lambda i: GestorReportes.reporte_resumen_infracciones()),
+    ]
+
+
+def medir(llamada, repeticiones):
+    """Cronometra 'repeticiones' llamadas (más una de calentamiento). Retorna las estadísticas en ms."""
+    tiempos = []
+    fallas = 0
+    ultimo_error = None
+    for i in range(repeticiones + 1):
+        inicio = time.perf_counter()
+        resultado = llamada(i)
+        duracion = (time.perf_counter() - inicio) * 1000
+        if i == 0:
+            continue
+        tiempos.append(duracion)
+        if not _fue_exitoso(resultado):
+            fallas += 1
+            ultimo_error = str(resultado[1]) if isinstance(resultado, tuple) and len(resultado) > 1 else repr(resultado)
+
+    tiempos.sort()
+    return {
+        "repeticiones": repeticiones,
+        "media_ms": round(statistics.fmean(tiempos), 4),
+        "mediana_ms": round(statistics.median(tiempos), 4),
+        "p95_ms": round(tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))], 4),
+        "min_ms": round(tiempos[0], 4),
+        "max_ms": round(tiempos[-1], 4),
+        "fallas": fallas,
+        "error": ultimo_error,
+    }
+
+
+def ejecutar_escala(total_infracciones, repeticiones, repeticiones_reportes, semilla):
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta_db = os.path.join(carpeta, "benchmark.db")
+        db.configurar_pool(ruta_db=ruta_db)
+        cache_vehiculos.vehiculos.limpiar()
+        cache_vehiculos.vehiculos.reiniciar_estadisticas()
+        try:
+            crear_tablas()
+            inicio = time.perf_counter()
+            filas = generar_datos(total_infracciones, semilla=semilla)
+            generacion = time.perf_counter() - inicio
+            print(f"\n=== {total_infracciones} infracciones ({filas['vehiculos']} vehículos, "
+                  f"{filas['propietarios']} propietarios) generadas en {generacion:.1f} s ===")
+
+            operaciones = {}
+            for nombre, veces, llamada in construir_casos(filas, repeticiones, repeticiones_reportes, semilla):
+                operaciones[nombre] = estadisticas = medir(llamada, veces)
+                aviso = f"  ({estadisticas['fallas']} fallas: {estadisticas['error']})" if estadisticas["fallas"] else ""
+                print(f"{nombre:<62} mediana {estadisticas['mediana_ms']:>10.3f} ms  "
+                      f"p95 {estadisticas['p95_ms']:>10.3f} ms{aviso}")
+            tamano_db = os.path.getsize(ruta_db)
+            uso_cache = cache_vehiculos.vehiculos.estadisticas()
+            print(f"Caché de vehículos: {uso_cache['aciertos']} aciertos, {uso_cache['fallos']} fallos "
+                  f"({uso_cache['tasa_aciertos']:.1%}), {uso_cache['invalidaciones']} invalidaciones")
+        finally:
+            db.cerrar_pool()
+
+    return {
+        "infracciones": total_infracciones,
+        "filas": filas,
+        "generacion_s": round(generacion, 2),
+        "tamano_db_bytes": tamano_db,
+        "cache_vehiculos": uso_cache,
+        "operaciones": operaciones,
+    }
+
+
+def comparar(resultado, ruta_anterior):
+    """Imprime la variación de la mediana respecto a un archivo de resultados anterior."""
+    with open(ruta_anterior, encoding="utf-8") as archivo:
+        anterior = {escala["infracciones"]: escala for escala in json.load(archivo)["escalas"]}
+
+    print(f"\nComparación contra {ruta_anterior} (mediana; negativo = más rápido):")
+    for escala in resultado["escalas"]:
+        previa = anterior.get(escala["infracciones"])
+        if not previa:
+            continue
+        print(f"--- {escala['infracciones']} infracciones ---")
+        for nombre, actual in escala["operaciones"].items():
+            antes = previa["operaciones"].get(nombre)
+            if not antes or not antes["mediana_ms"]:
+                continue
+            cambio = (actual["mediana_ms"] - antes["mediana_ms"]) / antes["mediana_ms"] * 100
+            print(f"{nombre:<62} {antes['mediana_ms']:>10.3f} -> {actual['mediana_ms']:>10.3f} ms  {cambio:+7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escalas", type=int, nargs="+", default=list(ESCALAS), help="totales de infracciones")
+    parser.add_argument("--repeticiones", type=int, default=REPETICIONES)
+    parser.add_argument("--repeticiones-reportes", type=int, default=REPETICIONES_REPORTES)
+    parser.add_argument("--semilla", type=int, default=SEMILLA)
+    parser.add_argument("--salida", help="archivo JSON de resultados (por defecto benchmarks/resultados/gestores_<fecha>.json)")
+    parser.add_argument("--comparar", help="archivo JSON de una corrida anterior")
+    args = parser.parse_args()
+
+    resultado = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "semilla": args.semilla,
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "plataforma": platform.platform(),
+        "escalas": [ejecutar_escala(escala, args.repeticiones, args.repeticiones_reportes, args.semilla)
+                    for escala in args.escalas],
+    }
+
+    salida = args.salida or os.path.join(CARPETA_RESULTADOS, f"gestores_{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+    with open(salida, "w", encoding="utf-8") as archivo:
+        json.dump(resultado, archivo, ensure_ascii=False, indent=2)
+    print(f"\nResultados guardados en {salida}")
+
+    if args.comparar:
+        comparar(resultado, args.comparar)
+
+
+if __name__ == "__main__":
+    main()
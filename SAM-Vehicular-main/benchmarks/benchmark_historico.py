@@ -0,0 +1,123 @@
+"""
+Benchmark: infracciones en una sola tabla vs. archivos históricos anuales.
+
+Genera una base de datos con generador_datos y mide el reporte 2 (infracciones
+por rango de fechas) y el tamaño de la base de datos principal:
+1. Antes de archivar.
+2. Después de GestorHistorico.archivar (cerradas anteriores a --antes-de) y
+   GestorHistorico.compactar.
+
+Revisa que el reporte entregue las mismas filas en el mismo orden, que el
+resumen general (reporte 6) no cambie y que los resúmenes sigan cuadrando.
+
+Uso (desde la raíz del proyecto):
+
+    python -m benchmarks.benchmark_historico
+    python -m benchmarks.benchmark_historico --infracciones 1000000 --antes-de 2025-07-01
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ruta_raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ruta_raiz)
+
+from benchmarks.generador_datos import generar_datos, SEMILLA
+from database import conexion as db
+from database.inicializar_db import crear_tablas
+from database.resumenes import verificar_resumenes
+from logic.gestor_historico import GestorHistorico
+from logic.gestor_reportes import GestorReportes
+
+# (nombre, fecha inicial, fecha final) del reporte 2
+RANGOS = [
+    ("último mes", "2025-12-01", "2025-12-31"),
+    ("último año", "2025-01-01", "2025-12-31"),
+    ("todo", "2000-01-01", "2025-12-31"),
+]
+
+
+def medir_reporte():
+    """{rango: (segundos primera página, segundos reporte completo, filas)}."""
+    medidas = {}
+    for nombre, desde, hasta in RANGOS:
+        inicio = time.perf_counter()
+        GestorReportes.obtener_pagina(2, (desde, hasta))
+        pagina = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        exito, _, filas = GestorReportes.reporte_infracciones_por_fecha(desde, hasta)
+        if not exito:
+            raise RuntimeError(filas[0][0])
+        medidas[nombre] = (pagina, time.perf_counter() - inicio, [tuple(fila) for fila in filas])
+    return medidas
+
+
+def tamano_principal():
+    with db.conexion_db() as conexion:
+        conexion.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+    return os.path.getsize(db.DB_PATH)
+
+
+def imprimir(titulo, medidas, tamano):
+    print(f"{titulo}: infracciones.db de {tamano / 1e6:,.1f} MB")
+    for nombre, (pagina, completo, filas) in medidas.items():
+        print(f"  {nombre:<12} {len(filas):>10,} filas  primera página {pagina * 1000:8.2f} ms  "
+              f"completo {completo:7.2f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--infracciones", type=int, default=300_000, help="escala de la base de datos generada")
+    parser.add_argument("--antes-de", default="2025-01-01", help="fecha de corte del archivado (AAAA-MM-DD)")
+    parser.add_argument("--semilla", type=int, default=SEMILLA)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="sam_historico_") as carpeta:
+        db.configurar_pool(ruta_db=os.path.join(carpeta, "infracciones.db"))
+        try:
+            crear_tablas()
+            generar_datos(args.infracciones, semilla=args.semilla)
+
+            antes = medir_reporte()
+            resumen_antes = [tuple(fila) for fila in GestorReportes.reporte_resumen_infracciones()[2]]
+            imprimir("Antes de archivar", antes, tamano_principal())
+
+            inicio = time.perf_counter()
+            exito, resumen = GestorHistorico.archivar(args.antes_de)
+            if not exito:
+                raise RuntimeError(resumen)
+            segundos_archivar = time.perf_counter() - inicio
+            inicio = time.perf_counter()
+            exito, compactado = GestorHistorico.compactar()
+            if not exito:
+                raise RuntimeError(compactado)
+            print(f"\nArchivadas {resumen['total']:,} multas en {segundos_archivar:.2f} s "
+                  f"({', '.join(f'{anio}: {multas:,}' for anio, multas in resumen['archivadas'].items())}); "
+                  f"compactada en {time.perf_counter() - inicio:.2f} s\n")
+
+            despues = medir_reporte()
+            imprimir("Después de archivar y compactar", despues, tamano_principal())
+            for archivo in GestorHistorico.listar()[1]:
+                print(f"  {os.path.basename(archivo['ruta'])}: {archivo['multas']:,} multas, "
+                      f"{archivo['bytes'] / 1e6:,.1f} MB")
+
+            iguales = all(antes[nombre][2] == despues[nombre][2] for nombre in antes)
+            iguales = iguales and resumen_antes == [tuple(fila) for fila in
+                                                    GestorReportes.reporte_resumen_infracciones()[2]]
+            with db.conexion_db() as conexion:
+                diferencias = verificar_resumenes(conexion)
+        finally:
+            db.cerrar_pool()
+
+    if not iguales or diferencias:
+        print(f"\nFALLA: los reportes cambiaron al archivar o {len(diferencias)} resúmenes no cuadran.")
+        return 1
+    print("\nOK: el reporte 2 y el resumen general son los mismos antes y después de archivar.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
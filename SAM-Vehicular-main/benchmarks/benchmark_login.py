@@ -0,0 +1,122 @@
+"""
+Benchmark: latencia de Auth.autenticar_usuario según el costo de scrypt.
+
+Crea una base de datos temporal y, para cada costo n (r = 8, p = 1), registra un
+usuario y mide la latencia p50/p95 de:
+- inicio de sesión correcto,
+- contraseña incorrecta y usuario inexistente (deben tardar lo mismo que el
+  correcto, para no revelar qué cuentas existen),
+- inicio de sesión de una cuenta con el hash SHA-256 anterior (la primera vez
+  incluye el rehash a scrypt; las siguientes ya no),
+- intentos sobre una cuenta bloqueada por intentos fallidos (no calcula el hash).
+
+Uso (desde la raíz del proyecto):
+
+    python -m benchmarks.benchmark_login
+    python -m benchmarks.benchmark_login --costos 14 15 16 --muestras 30
+"""
+
+import argparse
+import hashlib
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ruta_raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ruta_raiz)
+
+from database import conexion as db
+from database.inicializar_db import crear_tablas
+from logic import auth
+from logic.auth import Auth
+from models.usuario import Usuario
+
+PASSWORD = "clave_de_prueba"
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+def medir(muestras, llamada):
+    """Retorna las latencias en ms de 'muestras' llamadas."""
+    latencias = []
+    for i in range(muestras):
+        inicio = time.perf_counter()
+        llamada(i)
+        latencias.append((time.perf_counter() - inicio) * 1000)
+    return latencias
+
+
+def imprimir(descripcion, latencias):
+    print(f"  {descripcion:<38} {statistics.median(latencias):8.1f} {percentil(latencias, 0.95):8.1f}")
+
+
+def cuenta_anterior(nombre):
+    """Usuario con el hash SHA-256 sin sal que guardaba la versión anterior."""
+    with db.conexion_db() as conexion:
+        conexion.execute('''
+            INSERT INTO usuarios (nombre_usuario, password, rol, estado, debe_cambiar_password)
+            VALUES (?, ?, 'Supervisor', 'Activo', 0)
+        ''', (nombre, hashlib.sha256(PASSWORD.encode('utf-8')).hexdigest()))
+        conexion.commit()
+
+
+def ejecutar_costo(exponente, muestras):
+    n = 2 ** exponente
+    auth.configurar_hash(n=n)
+    auth._HASH_SIN_USUARIO = None
+    auth.intentos_fallidos.limpiar()
+    nombre = f"usuario_n{exponente}"
+    Auth.registrar_usuario(Usuario(nombre_usuario=nombre, password=PASSWORD, rol="Supervisor"))
+
+    print(f"n = 2**{exponente} ({n:,}), r = 8, p = 1: {128 * n * 8 / 2 ** 20:.0f} MB por hash"
+          f"{'':>4}{'p50 ms':>8} {'p95 ms':>8}")
+    imprimir("hash de una contraseña", medir(muestras, lambda i: Auth._hashear_password(PASSWORD)))
+    imprimir("inicio de sesión correcto", medir(muestras, lambda i: Auth.autenticar_usuario(nombre, PASSWORD)))
+    # Nombres distintos en cada intento para que ninguno llegue al bloqueo
+    imprimir("contraseña incorrecta",
+             medir(muestras, lambda i: (auth.intentos_fallidos.limpiar(), Auth.autenticar_usuario(nombre, "otra"))))
+    imprimir("usuario inexistente", medir(muestras, lambda i: Auth.autenticar_usuario(f"nadie_{exponente}_{i}", PASSWORD)))
+
+    anteriores = [f"anterior_n{exponente}_{i}" for i in range(muestras)]
+    for anterior in anteriores:
+        cuenta_anterior(anterior)
+    imprimir("cuenta SHA-256, 1er inicio (rehash)",
+             medir(muestras, lambda i: Auth.autenticar_usuario(anteriores[i], PASSWORD)))
+    imprimir("cuenta SHA-256, 2o inicio (ya scrypt)",
+             medir(muestras, lambda i: Auth.autenticar_usuario(anteriores[i], PASSWORD)))
+
+    for _ in range(auth.MAXIMO_INTENTOS):
+        Auth.autenticar_usuario(nombre, "otra")
+    imprimir("cuenta bloqueada", medir(muestras, lambda i: Auth.autenticar_usuario(nombre, PASSWORD)))
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--costos", type=int, nargs="+", default=[12, 13, 14, 15, 16],
+                        help="exponentes de n (n = 2**exponente)")
+    parser.add_argument("--muestras", type=int, default=20, help="llamadas por medición")
+    args = parser.parse_args()
+
+    costo_original = dict(auth.COSTO_SCRYPT)
+    with tempfile.TemporaryDirectory(prefix="sam_login_") as carpeta:
+        db.configurar_pool(ruta_db=os.path.join(carpeta, "login.db"))
+        try:
+            crear_tablas()
+            for exponente in args.costos:
+                ejecutar_costo(exponente, args.muestras)
+        finally:
+            db.cerrar_pool()
+            auth.configurar_hash(**costo_original)
+    print(f"Costo configurado en logic/auth.py: n = 2**{costo_original['n'].bit_length() - 1}, "
+          f"r = {costo_original['r']}, p = {costo_original['p']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
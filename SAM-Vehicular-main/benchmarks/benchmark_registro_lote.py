@@ -0,0 +1,83 @@
+"""
+Benchmark: registro de vehículos uno por uno vs. registrar_vehiculos_lote.
+
+Crea una base de datos temporal, registra propietarios y mide cuántos
+vehículos por segundo acepta cada camino. Uso (desde la raíz del proyecto):
+
+    python -m benchmarks.benchmark_registro_lote --individuales 2000 --lote 50000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ruta_raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ruta_raiz)
+
+from benchmarks.generador_datos import placa_desde_numero
+from database import conexion as db
+from database.inicializar_db import crear_tablas
+from logic.gestor_vehiculos import GestorVehiculos
+from models.vehiculo import Vehiculo
+
+
+def vehiculo_de_prueba(numero, total_propietarios):
+    return Vehiculo(
+        vin=f"BEN{numero:014d}", placa=placa_desde_numero(numero),
+        marca="Nissan", modelo="Versa", anio=2020, color="Blanco", clase="Sedán",
+        procedencia="Nacional", id_propietario=numero % total_propietarios + 1,
+    )
+
+
+def preparar_propietarios(total):
+    with db.conexion_db() as conexion:
+        conexion.executemany('''
+            INSERT INTO propietarios (nombre_completo, curp, direccion, telefono, correo_electronico, estado_licencia)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', ((f"Propietario {i}", f"BENC{i:014d}", "Calle de prueba 123", "9990000000", "p@mail.com", "Vigente")
+              for i in range(total)))
+        conexion.commit()
+
+
+def medir(descripcion, total, funcion):
+    inicio = time.perf_counter()
+    funcion()
+    duracion = time.perf_counter() - inicio
+    print(f"{descripcion:<32} {total:>8} vehículos  {duracion:8.2f} s  {total / duracion:>10.0f} veh/s")
+    return total / duracion
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--individuales", type=int, default=2000, help="vehículos para el camino de uno en uno")
+    parser.add_argument("--lote", type=int, default=50000, help="vehículos para el camino por lote")
+    parser.add_argument("--tamano-bloque", type=int, default=5000, help="vehículos por llamada al lote")
+    parser.add_argument("--propietarios", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        db.configurar_pool(ruta_db=os.path.join(carpeta, "benchmark.db"))
+        crear_tablas()
+        preparar_propietarios(args.propietarios)
+
+        def uno_por_uno():
+            for numero in range(args.individuales):
+                GestorVehiculos.registrar_vehiculo(vehiculo_de_prueba(numero, args.propietarios))
+
+        def por_lote():
+            inicio = args.individuales
+            for desde in range(inicio, inicio + args.lote, args.tamano_bloque):
+                hasta = min(desde + args.tamano_bloque, inicio + args.lote)
+                GestorVehiculos.registrar_vehiculos_lote(
+                    vehiculo_de_prueba(numero, args.propietarios) for numero in range(desde, hasta))
+
+        individual = medir("registrar_vehiculo", args.individuales, uno_por_uno)
+        lote = medir("registrar_vehiculos_lote", args.lote, por_lote)
+        print(f"Aceleración: {lote / individual:.1f}x")
+        db.cerrar_pool()
+
+
+if __name__ == "__main__":
+    main()
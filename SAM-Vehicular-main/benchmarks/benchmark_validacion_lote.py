@@ -0,0 +1,225 @@
+"""
+Benchmark: throughput de validación para archivos de importación de 100k registros.
+
+Genera un CSV temporal de propietarios y otro de vehículos (con una proporción de
+registros inválidos) y mide registros por segundo de:
+- "anterior": campo por campo, con re.match sobre el patrón en texto en cada llamada
+  y deteniéndose en el primer error (como era el Validador).
+- "motor, primer error": ReglasValidacion.primer_error (patrones precompilados).
+- "motor, todos los errores": ReglasValidacion.validar_lote sobre el lote completo.
+- "importador": lectura del archivo + limpieza + validación, tal como lo hace
+  logic/importador.py (sin escribir en la base de datos).
+Uso (desde la raíz del proyecto):
+
+    python -m benchmarks.benchmark_validacion_lote --registros 100000
+"""
+
+import argparse
+import csv
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from functools import lru_cache
+
+ruta_raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ruta_raiz)
+
+import logic.catalogos as cat
+from benchmarks.generador_datos import placa_desde_numero
+from database import conexion as db
+from database.inicializar_db import crear_tablas
+from logic import importador
+from logic.almacen_catalogos import catalogos
+from logic.validador import Validador, REGLAS_PROPIETARIO, REGLAS_VEHICULO
+from models.propietario import Propietario
+from models.vehiculo import Vehiculo
+
+
+# ==========================================
+# VALIDACIÓN ANTERIOR (referencia)
+# ==========================================
+def _placa_anterior(placa):
+    if not placa or placa.strip() == "":
+        return False, "La placa no puede quedar vacía."
+    patron_placa = r"^[A-Z]{3}-\d{3}-[A-Z]$|^[A-Z]{3}-\d{2}-\d{2}$|^[A-Z]{3}-\d{4}$"
+    if not re.match(patron_placa, placa.strip().upper()):
+        return False, "Formato inválido. Use guiones (Ej. YAA-123-A, YAB-12-34 o ABC-1234)."
+    return True, ""
+
+
+def _curp_anterior(curp):
+    if not curp or curp.strip() == "":
+        return False, "La CURP no puede quedar vacía."
+    patron_curp = r"^[A-Z]{4}\d{6}[HMX][A-Z]{2}[A-Z]{3}[A-Z0-9]\d$"
+    if not re.match(patron_curp, curp.strip().upper()):
+        return False, "Formato de CURP inválido. Verifique las letras, fecha de nacimiento y homoclave."
+    return True, ""
+
+
+def _correo_anterior(correo):
+    patron_correo = r'^[\w\.-]+@[\w\.-]+\.\w+$'
+    if not re.match(patron_correo, correo):
+        return False, "El correo electrónico no cumple con el formato estándar."
+    return True, ""
+
+
+def _nombre_anterior(nombre):
+    if not nombre or len(nombre.strip()) < 5:
+        return False, "El nombre completo debe tener al menos 5 caracteres."
+    patron_nombre = r'^[a-zA-ZáéíóúÁÉÍÓÚñÑüÜ\s]+$'
+    if not re.match(patron_nombre, nombre.strip()):
+        return False, "El nombre solo debe contener letras y espacios (sin números ni símbolos especiales)."
+    return True, ""
+
+
+def _primer_error(validaciones):
+    for validar in validaciones:
+        valido, msj = validar()
+        if not valido:
+            return False, msj
+    return True, ""
+
+
+def propietario_anterior(p):
+    return _primer_error((
+        lambda: _nombre_anterior(p.nombre_completo),
+        lambda: Validador.validar_direccion(p.direccion),
+        lambda: _curp_anterior(p.curp),
+        lambda: Validador.validar_telefono(p.telefono),
+        lambda: Validador.validar_estado_licencia(p.estado_licencia),
+        lambda: _correo_anterior(p.correo_electronico),
+        lambda: Validador.validar_estado_propietario(p.estado),
+    ))
+
+
+def vehiculo_anterior(v):
+    return _primer_error((
+        lambda: Validador.validar_vin(v.vin),
+        lambda: _placa_anterior(v.placa),
+        lambda: Validador.validar_anio_vehiculo(v.anio),
+        lambda: Validador.validar_estado_vehiculo(v.estado_legal),
+        lambda: Validador.validar_procedencia_vehiculo(v.procedencia),
+        lambda: Validador.validar_marca_modelo_clase(v.marca, v.modelo, v.clase),
+        lambda: Validador.validar_color_vehiculo(v.color),
+        lambda: Validador.validar_id_propietario(v.id_propietario),
+    ))
+
+
+# ==========================================
+# ARCHIVOS DE PRUEBA
+# ==========================================
+LETRAS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def fila_propietario(numero, aleatorio, invalido):
+    curp = (f"{''.join(aleatorio.choices(LETRAS, k=4))}{aleatorio.randrange(10**6):06d}"
+            f"{aleatorio.choice('HM')}{''.join(aleatorio.choices(LETRAS, k=5))}{aleatorio.randrange(10)}{numero % 10}")
+    fila = {
+        "nombre_completo": f"Propietario Número {''.join(aleatorio.choices(LETRAS, k=6))}",
+        "curp": curp, "direccion": f"Calle {numero % 120} por {numero % 37}, Centro",
+        "telefono": f"999{numero:07d}"[-10:], "correo_electronico": f"persona{numero}@correo.mx",
+        "estado_licencia": aleatorio.choice(cat.ESTADOS_LICENCIA), "estado": "Activo",
+    }
+    if invalido:
+        # Registros con más de un error, como llegan en un volcado con problemas
+        fila["curp"] = curp[:-3]
+        fila["correo_electronico"] = "sin-arroba.mx"
+    return fila
+
+
+@lru_cache(maxsize=None)
+def combinaciones_validas():
+    return sorted(catalogos().marca_modelo_clase)
+
+
+def fila_vehiculo(numero, aleatorio, invalido):
+    marca, modelo, clase = aleatorio.choice(combinaciones_validas())
+    fila = {
+        "vin": f"IMP{numero:014d}", "placa": placa_desde_numero(numero), "marca": marca, "modelo": modelo,
+        "anio": str(aleatorio.randint(1995, 2024)), "color": aleatorio.choice(cat.COLORES_VEHICULO), "clase": clase,
+        "procedencia": aleatorio.choice(cat.PROCEDENCIAS_VEHICULO), "id_propietario": str(numero % 5000 + 1),
+        "estado_legal": "Activo",
+    }
+    if invalido:
+        fila["placa"] = "YA-12"
+        fila["color"] = "Tornasol"
+    return fila
+
+
+ENTIDADES = {
+    "propietarios": (fila_propietario, Propietario, propietario_anterior, REGLAS_PROPIETARIO,
+                     importador._preparar_propietario),
+    "vehiculos": (fila_vehiculo, Vehiculo, vehiculo_anterior, REGLAS_VEHICULO, importador._preparar_vehiculo),
+}
+
+
+def escribir_csv(ruta, filas):
+    with open(ruta, "w", newline="", encoding="utf-8") as archivo:
+        escritor = csv.DictWriter(archivo, fieldnames=list(filas[0]))
+        escritor.writeheader()
+        escritor.writerows(filas)
+
+
+def modelo_desde_fila(clase_modelo, fila):
+    datos = dict(fila)
+    if clase_modelo is Vehiculo:
+        datos["anio"] = int(datos["anio"])
+        datos["id_propietario"] = int(datos["id_propietario"])
+    return clase_modelo(**datos)
+
+
+# ==========================================
+# MEDICIÓN
+# ==========================================
+def medir(descripcion, funcion, total, base=None):
+    inicio = time.perf_counter()
+    rechazados = funcion()
+    duracion = time.perf_counter() - inicio
+    por_segundo = total / duracion
+    comparacion = f"  {por_segundo / base:5.2f}x" if base else ""
+    print(f"  {descripcion:<28} {duracion:7.2f} s  {por_segundo:>11,.0f} registros/s  "
+          f"rechazados {rechazados:>7}{comparacion}")
+    return por_segundo
+
+
+def probar_entidad(entidad, total, proporcion_invalidos, semilla, carpeta):
+    generar_fila, clase_modelo, validar_anterior, reglas, preparar = ENTIDADES[entidad]
+    aleatorio = random.Random(semilla)
+    filas = [generar_fila(numero, aleatorio, aleatorio.random() < proporcion_invalidos) for numero in range(total)]
+    ruta = os.path.join(carpeta, f"{entidad}.csv")
+    escribir_csv(ruta, filas)
+    registros = [modelo_desde_fila(clase_modelo, fila) for fila in filas]
+
+    print(f"{entidad}: {total:,} registros ({os.path.getsize(ruta) / 1e6:.1f} MB)")
+    base = medir("anterior", lambda: sum(1 for r in registros if not validar_anterior(r)[0]), total)
+    medir("motor, primer error", lambda: sum(1 for r in registros if not reglas.primer_error(r)[0]), total, base)
+    medir("motor, todos los errores", lambda: sum(1 for e in reglas.validar_lote(registros) if e), total, base)
+    medir("importador (archivo)",
+          lambda: sum(1 for _, fila in importador.leer_registros(ruta) if not preparar(fila)[0]), total)
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--registros", type=int, default=100_000, help="registros por archivo")
+    parser.add_argument("--invalidos", type=float, default=0.05, help="proporción de registros inválidos")
+    parser.add_argument("--entidad", choices=list(ENTIDADES), help="solo una entidad (por defecto ambas)")
+    parser.add_argument("--semilla", type=int, default=2026)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="sam_validacion_") as carpeta:
+        # Base de datos temporal solo para leer los catálogos administrables
+        db.configurar_pool(ruta_db=os.path.join(carpeta, "benchmark.db"))
+        try:
+            crear_tablas()
+            for entidad in [args.entidad] if args.entidad else ENTIDADES:
+                probar_entidad(entidad, args.registros, args.invalidos, args.semilla, carpeta)
+        finally:
+            db.cerrar_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Benchmark: validación de catálogos con listas vs. con el índice en memoria.
+
+Mide el costo por registro de las validaciones de catálogo de un vehículo
+(marca/modelo/clase, color, estado legal, procedencia) repetidas N veces:
+- "listas": la forma anterior, con 'in' sobre las listas y diccionarios de catalogos.py.
+- "índice": Validador actual, sobre los catálogos compilados (los administrables
+  se cargan una vez de una base de datos temporal y quedan en la caché).
+- "normalizada": búsqueda sin mayúsculas/acentos (la que usa el importador).
+Uso (desde la raíz del proyecto):
+
+    python -m benchmarks.benchmark_validador --validaciones 1000000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+ruta_raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ruta_raiz)
+
+from database import conexion as db
+from database.inicializar_db import crear_tablas
+import logic.catalogos as cat
+import logic.indice_catalogos as idx
+from logic.almacen_catalogos import catalogos
+from logic.validador import Validador
+
+
+# ==========================================
+# VALIDACIÓN ANTERIOR (referencia)
+# ==========================================
+class ValidadorConListas:
+    """Copia de las validaciones de catálogo del Validador antes del índice ('in' sobre listas)."""
+
+    @staticmethod
+    def validar_marca_modelo_clase(marca, modelo, clase):
+        if marca not in cat.MARCAS_MODELOS_VEHICULO:
+            return False, f"La marca '{marca}' no está registrada en el sistema."
+        modelos_de_la_marca = cat.MARCAS_MODELOS_VEHICULO[marca]
+        if modelo not in modelos_de_la_marca:
+            return False, f"El modelo '{modelo}' no es válido para la marca '{marca}'."
+        clases_permitidas_del_modelo = modelos_de_la_marca[modelo]
+        if clase not in clases_permitidas_del_modelo:
+            return False, (f"Un '{modelo}' no puede ser clasificado como '{clase}'. "
+                           f"Opciones válidas: {', '.join(clases_permitidas_del_modelo)}.")
+        return True, ""
+
+    @staticmethod
+    def validar_color_vehiculo(color):
+        if color not in cat.COLORES_VEHICULO:
+            return False, "El color ingresado no es válido. Seleccione uno de la lista."
+        return True, ""
+
+    @staticmethod
+    def validar_estado_vehiculo(estado):
+        if estado not in cat.ESTADOS_VEHICULO:
+            return False, "El estado legal del vehículo seleccionado no es válido."
+        return True, ""
+
+    @staticmethod
+    def validar_procedencia_vehiculo(clase):
+        if clase not in cat.PROCEDENCIAS_VEHICULO:
+            return False, "La procedencia de vehículo seleccionada no es válida."
+        return True, ""
+
+
+def validador_de_vehiculo(validador):
+    """Las mismas cuatro validaciones que hace el registro de un vehículo, con el validador dado."""
+    def validar(marca, modelo, clase, color, estado, procedencia):
+        for valido, msj in (validador.validar_marca_modelo_clase(marca, modelo, clase),
+                            validador.validar_color_vehiculo(color),
+                            validador.validar_estado_vehiculo(estado),
+                            validador.validar_procedencia_vehiculo(procedencia)):
+            if not valido:
+                return False, msj
+        return True, ""
+    return validar
+
+
+def validar_normalizado(marca, modelo, clase, color, estado, procedencia):
+    vigentes = catalogos()
+    combinacion = vigentes.combinacion_canonica(marca, modelo, clase)
+    if combinacion is None:
+        return False, "Combinación de marca, modelo y clase no válida."
+    if vigentes.colores.canonico(color) is None:
+        return False, "El color ingresado no es válido."
+    if idx.ESTADOS_VEHICULO.canonico(estado) is None:
+        return False, "El estado legal del vehículo seleccionado no es válido."
+    if idx.PROCEDENCIAS_VEHICULO.canonico(procedencia) is None:
+        return False, "La procedencia de vehículo seleccionada no es válida."
+    return True, ""
+
+
+# ==========================================
+# DATOS DE PRUEBA
+# ==========================================
+def generar_registros(total, proporcion_invalidos, semilla):
+    """
+    Registros (marca, modelo, clase, color, estado, procedencia) con los valores
+    repartidos por todo el catálogo (los del final de cada lista son el peor caso
+    de la búsqueda lineal) y una proporción de registros con algún valor inválido.
+    """
+    aleatorio = random.Random(semilla)
+    combinaciones = sorted(catalogos().marca_modelo_clase)
+    registros = []
+    for _ in range(total):
+        marca, modelo, clase = aleatorio.choice(combinaciones)
+        registro = [marca, modelo, clase, aleatorio.choice(cat.COLORES_VEHICULO),
+                    aleatorio.choice(cat.ESTADOS_VEHICULO), aleatorio.choice(cat.PROCEDENCIAS_VEHICULO)]
+        if aleatorio.random() < proporcion_invalidos:
+            registro[aleatorio.randrange(len(registro))] = "Inexistente"
+        registros.append(tuple(registro))
+    return registros
+
+
+def en_minusculas_sin_acentos(registros):
+    return [tuple(idx.normalizar(valor) for valor in registro) for registro in registros]
+
+
+def medir(descripcion, validar, registros, base=None):
+    inicio = time.perf_counter()
+    aceptados = sum(1 for registro in registros if validar(*registro)[0])
+    duracion = time.perf_counter() - inicio
+    nanosegundos = duracion / len(registros) * 1e9
+    comparacion = f"  {base / nanosegundos:5.2f}x" if base else ""
+    print(f"{descripcion:<34} {duracion:7.2f} s  {nanosegundos:8.0f} ns/registro  "
+          f"aceptados {aceptados:>9}{comparacion}")
+    return nanosegundos, aceptados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--validaciones", type=int, default=1_000_000, help="registros a validar por camino")
+    parser.add_argument("--invalidos", type=float, default=0.05, help="proporción de registros con un valor inválido")
+    parser.add_argument("--semilla", type=int, default=2026)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="sam_validador_") as carpeta:
+        db.configurar_pool(ruta_db=os.path.join(carpeta, "benchmark.db"))
+        try:
+            crear_tablas()
+            registros = generar_registros(args.validaciones, args.invalidos, args.semilla)
+            print(f"{args.validaciones:,} registros, {args.invalidos:.0%} con algún valor inválido\n")
+
+            base, aceptados_listas = medir("listas (anterior)", validador_de_vehiculo(ValidadorConListas), registros)
+            _, aceptados_indice = medir("Validador con índice", validador_de_vehiculo(Validador), registros, base)
+            medir("normalizada (valores exactos)", validar_normalizado, registros, base)
+            medir("normalizada (minúsculas/sin acento)", validar_normalizado,
+                  en_minusculas_sin_acentos(registros), base)
+        finally:
+            db.cerrar_pool()
+
+    if aceptados_listas != aceptados_indice:
+        print("\nADVERTENCIA: los dos caminos no aceptaron los mismos registros.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
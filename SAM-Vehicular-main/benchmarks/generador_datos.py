@@ -0,0 +1,275 @@
+"""
+Generador determinista de datos sintéticos a gran escala.
+
+A diferencia de semilla_datos.py (2 propietarios, 2 vehículos, 1 multa), llena
+la base de datos con volúmenes parecidos a los de producción para poder medir
+reportes y búsquedas. Con la misma semilla y la misma escala produce
+exactamente los mismos registros.
+
+Distribuciones usadas:
+- Vehículos por propietario: la mayoría tiene 1, pocos tienen 2-5 y unos
+  cuantos son flotillas de 10 a 40 unidades.
+- Marca/modelo/clase: tomados de catalogos.MARCAS_MODELOS_VEHICULO.
+- Infracciones: fechas cargadas hacia los meses recientes, horas con picos
+  de tráfico, tipos de catalogos.TIPOS_INFRACCION con distinto peso y
+  reincidentes (unos pocos vehículos acumulan muchas multas).
+- Estado de la multa según su antigüedad: las recientes siguen pendientes,
+  las viejas en su mayoría ya se pagaron.
+
+Uso (desde la raíz del proyecto):
+
+    python -m benchmarks.generador_datos --infracciones 100000 --db /tmp/sam_100k.db
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+ruta_raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ruta_raiz not in sys.path:
+    sys.path.append(ruta_raiz)
+
+import logic.catalogos as cat
+from database import conexion as db
+
+SEMILLA = 2026
+FECHA_FIN = date(2025, 12, 31)     # Fija para que el resultado no dependa del día en que se corre
+DIAS_HISTORIA = 3 * 365
+TAMANO_BLOQUE = 50000
+
+LETRAS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+CARACTERES_VIN = "ABCDEFGHJKLMNPRSTUVWXYZ0123456789"  # El VIN no usa I, O ni Q
+
+NOMBRES = ["José", "María", "Juan", "Guadalupe", "Luis", "Ana", "Carlos", "Sofía", "Miguel", "Fernanda",
+           "Jorge", "Valeria", "Ricardo", "Daniela", "Raúl", "Lucía", "Andrés", "Paola", "Héctor", "Renata"]
+APELLIDOS = ["Pérez", "García", "López", "Martínez", "Hernández", "González", "Sosa", "Canul", "Pech", "Chan",
+             "May", "Euán", "Rodríguez", "Sánchez", "Ramírez", "Cetina", "Torres", "Flores", "Cruz", "Núñez"]
+CALLES = ["Calle 60", "Calle 59", "Av. Itzaes", "Av. Colón", "Calle 21", "Prolongación Montejo",
+          "Periférico Norte", "Calle 50", "Av. Cupules", "Calle 33"]
+LUGARES = ["Centro Histórico", "Paseo de Montejo", "Periférico Poniente", "Av. Itzaes y Calle 59",
+           "Glorieta de la Paz", "Circuito Colonias", "Calle 60 Norte", "Av. Canek", "Francisco de Montejo",
+           "Av. García Lavín"]
+
+# Pesos relativos: las multas de estacionamiento son mucho más comunes que las de ebriedad
+PESOS_TIPO_INFRACCION = {
+    "Exceso de velocidad": 25, "Estacionamiento prohibido": 30, "No portar cinturón": 12,
+    "Uso de celular": 12, "Conducir en estado de ebriedad": 4, "Falta de documentos": 10, "Otro": 7,
+}
+MONTOS_TIPO_INFRACCION = {
+    "Exceso de velocidad": (900, 3500), "Estacionamiento prohibido": (400, 1200), "No portar cinturón": (500, 900),
+    "Uso de celular": (800, 1800), "Conducir en estado de ebriedad": (5000, 15000),
+    "Falta de documentos": (600, 1500), "Otro": (300, 2500),
+}
+PESOS_ESTADO_VEHICULO = {"Activo": 90, "Baja temporal": 4, "Reporte de robo": 2, "Recuperado": 1, "En corralón": 3}
+PESOS_VEHICULOS_POR_PROPIETARIO = {1: 55, 2: 25, 3: 11, 4: 5, 5: 3, "flotilla": 1}
+PESOS_ESTADO_LICENCIA = {"Vigente": 80, "Vencida": 12, "Suspendida": 5, "Cancelada": 3}
+PESOS_HORA = [1, 1, 1, 1, 1, 2, 4, 9, 10, 7, 6, 6, 7, 9, 9, 7, 6, 7, 9, 8, 5, 4, 3, 2]
+
+
+# ==========================================
+# IDENTIFICADORES ÚNICOS DERIVADOS DEL NÚMERO
+# ==========================================
+def _base(numero, alfabeto, longitud):
+    texto = ""
+    for _ in range(longitud):
+        numero, indice = divmod(numero, len(alfabeto))
+        texto = alfabeto[indice] + texto
+    return texto
+
+
+def placa_desde_numero(numero):
+    """Convierte un entero en una placa única con formato ABC-1234."""
+    letras, digitos = divmod(numero, 10000)
+    return f"{_base(letras, LETRAS, 3)}-{digitos:04d}"
+
+
+def vin_desde_numero(numero):
+    """VIN único de 17 caracteres: 9 de fabricante/año fijos por número y 8 que codifican el número."""
+    fabricante = _base(numero * 7919 % len(CARACTERES_VIN) ** 9, CARACTERES_VIN, 9)
+    return fabricante + _base(numero, CARACTERES_VIN, 8)
+
+
+def curp_desde_numero(numero):
+    """CURP única con el formato oficial; las letras codifican el número."""
+    nacimiento = date(1950, 1, 1) + timedelta(days=numero * 104729 % 20000)
+    sexo = "HM"[numero % 2]
+    return (f"{_base(numero, LETRAS, 4)}{nacimiento:%y%m%d}{sexo}YN"
+            f"{_base(numero // 26 ** 4, LETRAS, 3)}{numero % 10}{numero * 7 % 10}")
+
+
+def placa_agente(numero):
+    return f"AG-{numero + 1:05d}"
+
+
+def escala_por_infracciones(total_infracciones):
+    """Tamaños de cada tabla para un total de infracciones dado (≈5 multas por propietario)."""
+    return {
+        "propietarios": max(10, total_infracciones // 5),
+        "agentes": max(5, total_infracciones // 2000),
+        "infracciones": total_infracciones,
+    }
+
+
+# ==========================================
+# GENERADORES DE FILAS
+# ==========================================
+def _elegir(rng, pesos):
+    return rng.choices(list(pesos), weights=list(pesos.values()))[0]
+
+
+def _filas_propietarios(rng, total):
+    for numero in range(total):
+        nombre = f"{rng.choice(NOMBRES)} {rng.choice(APELLIDOS)} {rng.choice(APELLIDOS)}"
+        yield (nombre, curp_desde_numero(numero), f"{rng.choice(CALLES)} #{rng.randint(1, 999)}, Mérida",
+               f"999{rng.randint(0, 9999999):07d}", f"propietario{numero}@correo.mx",
+               _elegir(rng, PESOS_ESTADO_LICENCIA), "Activo" if rng.random() < 0.97 else "Inactivo")
+
+
+def _filas_vehiculos(rng, total_propietarios, catalogo_modelos):
+    """Genera los vehículos de cada propietario; el VIN y la placa salen del número consecutivo."""
+    numero = 0
+    for id_propietario in range(1, total_propietarios + 1):
+        cantidad = _elegir(rng, PESOS_VEHICULOS_POR_PROPIETARIO)
+        if cantidad == "flotilla":
+            cantidad = rng.randint(10, 40)
+        for _ in range(cantidad):
+            marca, modelo, clase = rng.choice(catalogo_modelos)
+            anio = min(FECHA_FIN.year, int(rng.triangular(1995, FECHA_FIN.year + 1, FECHA_FIN.year - 4)))
+            yield (vin_desde_numero(numero), placa_desde_numero(numero), marca, modelo, anio,
+                   rng.choice(cat.COLORES_VEHICULO), clase, _elegir(rng, PESOS_ESTADO_VEHICULO),
+                   "Nacional" if rng.random() < 0.85 else "Importado", id_propietario)
+            numero += 1
+
+
+def _estado_por_antiguedad(rng, dias):
+    """Mientras más vieja la multa, más probable que ya esté pagada."""
+    if rng.random() < 0.04:
+        return "Cancelada"
+    probabilidad_pendiente = 0.12 + 0.8 * math.exp(-dias / 45)
+    return "Pendiente" if rng.random() < probabilidad_pendiente else "Pagada"
+
+
+def _filas_infracciones(rng, total, total_vehiculos, total_agentes):
+    tipos = list(PESOS_TIPO_INFRACCION)
+    pesos_tipo = list(PESOS_TIPO_INFRACCION.values())
+    for numero in range(total):
+        # Exponencial: la mitad de las multas caen en los últimos ~5 meses
+        dias = min(int(rng.expovariate(1 / 220)), DIAS_HISTORIA)
+        fecha = FECHA_FIN - timedelta(days=dias)
+        hora = rng.choices(range(24), weights=PESOS_HORA)[0]
+        tipo = rng.choices(tipos, weights=pesos_tipo)[0]
+        minimo, maximo = MONTOS_TIPO_INFRACCION[tipo]
+        # rng.random() ** 2 concentra las multas en los primeros vehículos: reincidentes
+        indice_vehiculo = min(int(total_vehiculos * rng.random() ** 2), total_vehiculos - 1)
+        en_sitio = rng.random() < 0.6
+        yield (f"INF-{fecha:%Y%m%d}-{numero:08X}", vin_desde_numero(indice_vehiculo),
+               rng.randint(1, total_agentes), fecha.isoformat(), f"{hora:02d}:{rng.randint(0, 59):02d}",
+               rng.choice(LUGARES), tipo, f"Art. {rng.randint(10, 120)} del Reglamento de Tránsito",
+               float(round(rng.uniform(minimo, maximo), -1)),
+               f"LIC{rng.randint(0, 99999999):08d}" if en_sitio else None,
+               _estado_por_antiguedad(rng, dias))
+
+
+def _insertar_en_bloques(conexion, consulta, filas, tamano_bloque):
+    total = 0
+    bloque = []
+    for fila in filas:
+        bloque.append(fila)
+        if len(bloque) >= tamano_bloque:
+            conexion.executemany(consulta, bloque)
+            conexion.commit()
+            total += len(bloque)
+            bloque.clear()
+    if bloque:
+        conexion.executemany(consulta, bloque)
+        conexion.commit()
+        total += len(bloque)
+    return total
+
+
+# ==========================================
+# PUNTO DE ENTRADA
+# ==========================================
+def generar_datos(total_infracciones, semilla=SEMILLA, tamano_bloque=TAMANO_BLOQUE, usuarios_por_rol=5):
+    """
+    Llena la base de datos configurada en el pool (debe tener el esquema creado).
+    Retorna un diccionario con la cantidad de filas de cada tabla.
+    """
+    from logic.auth import Auth
+    from models.usuario import Usuario
+
+    rng = random.Random(semilla)
+    escala = escala_por_infracciones(total_infracciones)
+    catalogo_modelos = [(marca, modelo, clase)
+                        for marca, modelos in cat.MARCAS_MODELOS_VEHICULO.items()
+                        for modelo, clases in modelos.items()
+                        for clase in clases]
+
+    # Los usuarios pasan por Auth para que la contraseña se guarde igual que en producción
+    for rol in cat.ROLES_USUARIO:
+        for numero in range(usuarios_por_rol):
+            prefijo = rol.split()[0].lower()
+            Auth.registrar_usuario(Usuario(nombre_usuario=f"{prefijo}_{numero:03d}", password=f"{prefijo}123", rol=rol))
+
+    with db.conexion_db() as conexion:
+        resumen = {"usuarios": usuarios_por_rol * len(cat.ROLES_USUARIO)}
+        resumen["agentes"] = _insertar_en_bloques(conexion, '''
+            INSERT INTO agentes (numero_placa, nombre_completo, cargo, estado) VALUES (?, ?, ?, ?)
+        ''', ((placa_agente(n), f"Oficial {rng.choice(NOMBRES)} {rng.choice(APELLIDOS)}",
+               rng.choice(["Patrullero", "Vialidad", "Motociclista"]), "Activo" if rng.random() < 0.9 else "Inactivo")
+              for n in range(escala["agentes"])), tamano_bloque)
+
+        resumen["propietarios"] = _insertar_en_bloques(conexion, '''
+            INSERT INTO propietarios (nombre_completo, curp, direccion, telefono, correo_electronico,
+                                      estado_licencia, estado) VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', _filas_propietarios(rng, escala["propietarios"]), tamano_bloque)
+
+        resumen["vehiculos"] = _insertar_en_bloques(conexion, '''
+            INSERT INTO vehiculos (vin, placa, marca, modelo, anio, color, clase, estado_legal,
+                                   procedencia, id_propietario) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', _filas_vehiculos(rng, escala["propietarios"], catalogo_modelos), tamano_bloque)
+
+        resumen["infracciones"] = _insertar_en_bloques(conexion, '''
+            INSERT INTO infracciones (folio, vin_infractor, id_agente, fecha, hora, lugar, tipo_infraccion,
+                                      motivo, monto, licencia_conductor, estado) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', _filas_infracciones(rng, escala["infracciones"], resumen["vehiculos"], escala["agentes"]), tamano_bloque)
+
+        # Estadísticas frescas para que el planificador elija índices como lo haría en producción
+        conexion.execute("ANALYZE")
+        conexion.commit()
+
+    return resumen
+
+
+def main():
+    from database.inicializar_db import crear_tablas
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--infracciones", type=int, default=100000, help="total de infracciones (define la escala)")
+    parser.add_argument("--semilla", type=int, default=SEMILLA)
+    parser.add_argument("--db", required=True, help="archivo de base de datos a crear (no debe existir)")
+    args = parser.parse_args()
+
+    if os.path.exists(args.db):
+        parser.error(f"'{args.db}' ya existe; el generador solo llena bases de datos nuevas.")
+
+    db.configurar_pool(ruta_db=os.path.abspath(args.db))
+    try:
+        crear_tablas()
+        inicio = time.perf_counter()
+        resumen = generar_datos(args.infracciones, semilla=args.semilla)
+        duracion = time.perf_counter() - inicio
+    finally:
+        db.cerrar_pool()
+
+    for tabla, filas in resumen.items():
+        print(f"{tabla:<14} {filas:>10}")
+    print(f"Generado en {duracion:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
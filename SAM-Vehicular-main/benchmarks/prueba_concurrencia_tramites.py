@@ -0,0 +1,238 @@
+"""
+Prueba de concurrencia: transferencias y reemplacamientos contra multas nuevas.
+
+Varios hilos hacen trámites (transferir_propiedad, realizar_reemplacamiento)
+sobre pocos vehículos mientras otros registran multas pendientes sobre esos
+mismos vehículos y las pagan poco después. Un trigger de prueba anota en la
+tabla 'violaciones' cada trámite que quedó aplicado sobre un vehículo que en
+ese momento tenía una multa pendiente: la regla [4.2.vii] se rompió.
+
+Se corre con dos implementaciones:
+- "anterior": tiene_multas_pendientes en una conexión y el UPDATE en otra (una
+  multa registrada entre las dos se cuela).
+- "actual": GestorVehiculos, un BEGIN IMMEDIATE con UPDATE condicionado.
+
+Uso (desde la raíz del proyecto):
+
+    python -m benchmarks.prueba_concurrencia_tramites --segundos 10 --hilos-tramites 6 --hilos-multas 4
+
+Termina con código 1 si la implementación actual deja alguna violación o
+responde algo distinto de los mensajes esperados.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+ruta_raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ruta_raiz)
+
+from benchmarks import generador_datos as gen
+from database import conexion as db
+from database.conexion import obtener_conexion
+from database.inicializar_db import crear_tablas
+from database.reintentos import reintentar_si_ocupada
+from logic import cache_vehiculos
+from logic.gestor_infracciones import GestorInfracciones
+from logic.gestor_vehiculos import GestorVehiculos
+from models.infraccion import Infraccion
+
+MENSAJES_ESPERADOS = {
+    "Transferencia de propiedad realizada correctamente.",
+    "Trámite Bloqueado: No se puede transferir un vehículo con multas pendientes.",
+    "Error: El propietario destino no existe o está inactivo.",
+    "Reemplacamiento exitoso.",
+    "Trámite Bloqueado: El vehículo tiene infracciones pendientes de pago.",
+}
+
+# Anota los trámites aplicados sobre un vehículo con multas pendientes
+TRIGGERS_PRUEBA = [
+    '''CREATE TABLE violaciones (vin TEXT, tramite TEXT)''',
+    '''CREATE TRIGGER prueba_transferencia AFTER UPDATE OF id_propietario ON vehiculos
+       WHEN EXISTS (SELECT 1 FROM infracciones WHERE vin_infractor = NEW.vin AND estado = 'Pendiente')
+       BEGIN INSERT INTO violaciones VALUES (NEW.vin, 'transferencia'); END''',
+    '''CREATE TRIGGER prueba_reemplacamiento AFTER UPDATE OF placa ON vehiculos
+       WHEN EXISTS (SELECT 1 FROM infracciones WHERE vin_infractor = NEW.vin AND estado = 'Pendiente')
+       BEGIN INSERT INTO violaciones VALUES (NEW.vin, 'reemplacamiento'); END''',
+]
+
+
+# ==========================================
+# IMPLEMENTACIÓN ANTERIOR (referencia)
+# ==========================================
+class TramitesAnteriores:
+    """Copia de los trámites antes de la transacción única (verificación y UPDATE en conexiones distintas)."""
+
+    @staticmethod
+    @reintentar_si_ocupada
+    def realizar_reemplacamiento(vin, nueva_placa):
+        if GestorVehiculos.tiene_multas_pendientes(vin):
+            return False, "Trámite Bloqueado: El vehículo tiene infracciones pendientes de pago."
+        conexion = obtener_conexion()
+        try:
+            conexion.execute("UPDATE vehiculos SET placa = ? WHERE vin = ?", (nueva_placa, vin))
+            conexion.commit()
+            return True, "Reemplacamiento exitoso."
+        finally:
+            conexion.close()
+            cache_vehiculos.vehiculos.invalidar(vin)
+
+    @staticmethod
+    @reintentar_si_ocupada
+    def transferir_propiedad(vin, id_nuevo_propietario):
+        if GestorVehiculos.tiene_multas_pendientes(vin):
+            return False, "Trámite Bloqueado: No se puede transferir un vehículo con multas pendientes."
+        conexion = obtener_conexion()
+        try:
+            propietario = conexion.execute("SELECT estado FROM propietarios WHERE id_propietario = ?",
+                                           (id_nuevo_propietario,)).fetchone()
+            if not propietario or propietario[0] != "Activo":
+                return False, "Error: El propietario destino no existe o está inactivo."
+            conexion.execute("UPDATE vehiculos SET id_propietario = ? WHERE vin = ?", (id_nuevo_propietario, vin))
+            conexion.commit()
+            return True, "Transferencia de propiedad realizada correctamente."
+        finally:
+            conexion.close()
+            cache_vehiculos.vehiculos.invalidar(vin)
+
+
+# ==========================================
+# DATOS
+# ==========================================
+def preparar_base(total_vehiculos, total_propietarios):
+    """Propietarios (uno de cada diez inactivo), vehículos y un agente activo. Retorna (vins, ids)."""
+    with db.conexion_db() as conexion:
+        conexion.executemany('''
+            INSERT INTO propietarios (nombre_completo, curp, estado_licencia, estado) VALUES (?, ?, 'Vigente', ?)
+        ''', ((f"Propietario {n}", gen.curp_desde_numero(n), "Inactivo" if n % 10 == 9 else "Activo")
+              for n in range(total_propietarios)))
+        vins = [gen.vin_desde_numero(n) for n in range(total_vehiculos)]
+        conexion.executemany('''
+            INSERT INTO vehiculos (vin, placa, marca, modelo, anio, color, clase, estado_legal, procedencia,
+                                   id_propietario)
+            VALUES (?, ?, 'Nissan', 'Versa', 2020, 'Blanco', 'Sedán', 'Activo', 'Nacional', ?)
+        ''', ((vin, gen.placa_desde_numero(n), n % total_propietarios + 1) for n, vin in enumerate(vins)))
+        conexion.execute('''
+            INSERT INTO agentes (numero_placa, nombre_completo, cargo, estado)
+            VALUES ('AG-00001', 'Oficial de Prueba', 'Patrullero', 'Activo')
+        ''')
+        for sentencia in TRIGGERS_PRUEBA:
+            conexion.execute(sentencia)
+        conexion.commit()
+    return vins, list(range(1, total_propietarios + 1))
+
+
+# ==========================================
+# HILOS
+# ==========================================
+def hilo_tramites(tramites, numero_hilo, vins, ids, hasta, conteo, inesperados, candado):
+    rng = random.Random(numero_hilo)
+    siguiente_placa = 5_000_000 + numero_hilo * 1_000_000
+    local = Counter()
+    while time.monotonic() < hasta:
+        vin = rng.choice(vins)
+        if rng.random() < 0.7:
+            exito, msj = tramites.transferir_propiedad(vin, rng.choice(ids))
+        else:
+            siguiente_placa += 1
+            exito, msj = tramites.realizar_reemplacamiento(vin, gen.placa_desde_numero(siguiente_placa))
+        local[msj] += 1
+        if msj not in MENSAJES_ESPERADOS:
+            with candado:
+                inesperados.append(msj)
+    with candado:
+        conteo.update(local)
+
+
+def hilo_multas(numero_hilo, vins, hasta, multas, candado):
+    """Registra una multa pendiente, la deja vigente un momento y la paga."""
+    rng = random.Random(1000 + numero_hilo)
+    ayer = (date.today() - timedelta(days=1)).isoformat()
+    registradas = pagadas = rechazadas = 0
+    while time.monotonic() < hasta:
+        multa = Infraccion(rng.choice(vins), 1, ayer, "12:00", "Calle 60", "Exceso de velocidad",
+                           "Prueba de concurrencia", 500.0)
+        exito, msj = GestorInfracciones.registrar_infraccion(multa, "Fotomulta")
+        if not exito:
+            rechazadas += 1
+            continue
+        registradas += 1
+        time.sleep(rng.uniform(0, 0.005))
+        folio = msj.rsplit(" ", 1)[-1]
+        if GestorInfracciones.cambiar_estado_infraccion(folio, "Pagada")[0]:
+            pagadas += 1
+    with candado:
+        multas["registradas"] += registradas
+        multas["pagadas"] += pagadas
+        multas["rechazadas"] += rechazadas
+
+
+def ejecutar(nombre, tramites, args, carpeta):
+    # Una conexión por hilo: la prueba es de choques en SQLite, no de espera por el pool
+    db.configurar_pool(ruta_db=os.path.join(carpeta, f"{nombre}.db"),
+                       tamano_maximo=args.hilos_tramites + args.hilos_multas + 1)
+    try:
+        crear_tablas()
+        vins, ids = preparar_base(args.vehiculos, args.propietarios)
+        cache_vehiculos.vehiculos.limpiar()
+        conteo, multas, inesperados, candado = Counter(), Counter(), [], threading.Lock()
+        hasta = time.monotonic() + args.segundos
+        hilos = [threading.Thread(target=hilo_tramites,
+                                  args=(tramites, n, vins, ids, hasta, conteo, inesperados, candado))
+                 for n in range(args.hilos_tramites)]
+        hilos += [threading.Thread(target=hilo_multas, args=(n, vins, hasta, multas, candado))
+                  for n in range(args.hilos_multas)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        with db.conexion_db() as conexion:
+            violaciones = Counter(dict(conexion.execute(
+                "SELECT tramite, COUNT(*) FROM violaciones GROUP BY tramite").fetchall()))
+    finally:
+        db.cerrar_pool()
+
+    tramites_hechos = sum(conteo.values())
+    print(f"{nombre}: {tramites_hechos:,} trámites ({tramites_hechos / args.segundos:,.0f}/s), "
+          f"{multas['registradas']:,} multas registradas, {multas['pagadas']:,} pagadas, "
+          f"{multas['rechazadas']:,} rechazadas (base de datos ocupada)")
+    for msj in sorted(MENSAJES_ESPERADOS):
+        print(f"    {conteo[msj]:>8,}  {msj}")
+    print(f"    violaciones: {sum(violaciones.values())} {dict(violaciones) or ''}")
+    if inesperados:
+        print(f"    respuestas inesperadas: {len(inesperados)} (ej. {inesperados[0]!r})")
+    print()
+    return sum(violaciones.values()), len(inesperados)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--segundos", type=float, default=10, help="duración de cada corrida")
+    parser.add_argument("--hilos-tramites", type=int, default=6)
+    parser.add_argument("--hilos-multas", type=int, default=4)
+    parser.add_argument("--vehiculos", type=int, default=20, help="pocos vehículos: más choques")
+    parser.add_argument("--propietarios", type=int, default=50)
+    parser.add_argument("--solo-actual", action="store_true", help="no correr la implementación anterior")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="sam_concurrencia_") as carpeta:
+        if not args.solo_actual:
+            ejecutar("anterior", TramitesAnteriores, args, carpeta)
+        violaciones, inesperados = ejecutar("actual", GestorVehiculos, args, carpeta)
+
+    if violaciones or inesperados:
+        print("FALLA: la implementación actual aplicó trámites con multas pendientes o respondió algo inesperado.")
+        return 1
+    print("OK: ningún trámite se aplicó sobre un vehículo con multas pendientes.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+"""
+Prueba de concurrencia: vehiculos.multas_pendientes y monto_pendiente (migración 009).
+
+Varios procesos, cada uno con varios hilos, escriben al mismo tiempo sobre
+multas de pocos vehículos (para que choquen):
+- registrar_infraccion, con montos con centavos;
+- cambiar_estado_infraccion (pagar, cancelar y volver a Pendiente una cancelada);
+- cambiar_estado_lote con folios al azar, en cualquier estado;
+- SQL directo como el de un script de mantenimiento: cambiar el monto, pasar
+  la multa a otro vehículo o borrarla.
+
+Al final compara los contadores con el cálculo directo sobre infracciones
+(database/resumenes.verificar_resumenes, que también revisa las tablas de
+resumen de reportes). Uso (desde la raíz del proyecto):
+
+    python -m benchmarks.prueba_contadores_pendientes --segundos 10 --procesos 3 --hilos 4
+
+Termina con código 1 si algún contador no cuadra.
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+ruta_raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ruta_raiz)
+
+from benchmarks import generador_datos as gen
+from database import conexion as db
+from database.inicializar_db import crear_tablas
+from database.reintentos import reintentar_si_ocupada
+from database.resumenes import verificar_resumenes
+from logic.gestor_infracciones import GestorInfracciones
+from models.infraccion import Infraccion
+
+
+def preparar_base(total_vehiculos):
+    with db.conexion_db() as conexion:
+        conexion.execute('''
+            INSERT INTO propietarios (nombre_completo, curp, estado_licencia, estado)
+            VALUES ('Propietario de Prueba', ?, 'Vigente', 'Activo')
+        ''', (gen.curp_desde_numero(0),))
+        conexion.executemany('''
+            INSERT INTO vehiculos (vin, placa, marca, modelo, anio, color, clase, estado_legal, procedencia,
+                                   id_propietario)
+            VALUES (?, ?, 'Nissan', 'Versa', 2020, 'Blanco', 'Sedán', 'Activo', 'Nacional', 1)
+        ''', ((gen.vin_desde_numero(n), gen.placa_desde_numero(n)) for n in range(total_vehiculos)))
+        conexion.execute('''
+            INSERT INTO agentes (numero_placa, nombre_completo, cargo, estado)
+            VALUES ('AG-00001', 'Oficial de Prueba', 'Patrullero', 'Activo')
+        ''')
+        conexion.commit()
+
+
+@reintentar_si_ocupada
+def sql_directo(consulta, parametros):
+    with db.conexion_db() as conexion:
+        conexion.execute(consulta, parametros)
+        conexion.commit()
+    return True, ""
+
+
+def folio_al_azar(rng, vin, estado=None):
+    with db.conexion_db() as conexion:
+        filtro = "AND estado = ?" if estado else ""
+        filas = conexion.execute(f"SELECT folio FROM infracciones WHERE vin_infractor = ? {filtro} LIMIT 20",
+                                 (vin, estado) if estado else (vin,)).fetchall()
+    return rng.choice(filas)[0] if filas else None
+
+
+def hilo_escritor(semilla, vins, hasta, conteo, candado):
+    rng = random.Random(semilla)
+    ayer = (date.today() - timedelta(days=1)).isoformat()
+    local = Counter()
+    while time.monotonic() < hasta:
+        vin = rng.choice(vins)
+        azar = rng.random()
+        if azar < 0.35:
+            multa = Infraccion(vin, 1, ayer, "12:00", "Calle 60", "Exceso de velocidad", "Prueba de contadores",
+                               round(rng.uniform(100, 5000), 2))
+            operacion, (exito, _) = "registrar", GestorInfracciones.registrar_infraccion(multa, "Fotomulta")
+        elif azar < 0.60:
+            folio = folio_al_azar(rng, vin, "Pendiente")
+            if folio is None:
+                continue
+            operacion, (exito, _) = "pagar o cancelar", GestorInfracciones.cambiar_estado_infraccion(
+                folio, rng.choice(["Pagada", "Cancelada"]))
+        elif azar < 0.70:
+            folio = folio_al_azar(rng, vin, "Cancelada")
+            if folio is None:
+                continue
+            operacion, (exito, _) = "reactivar", GestorInfracciones.cambiar_estado_infraccion(folio, "Pendiente")
+        elif azar < 0.80:
+            folios = [folio for folio in (folio_al_azar(rng, rng.choice(vins)) for _ in range(20)) if folio]
+            operacion, (exito, _) = "lote", GestorInfracciones.cambiar_estado_lote(
+                (folio, rng.choice(["Pagada", "Cancelada", "Pendiente"])) for folio in folios)
+        else:
+            folio = folio_al_azar(rng, vin)
+            if folio is None:
+                continue
+            if azar < 0.90:
+                operacion, (exito, _) = "cambiar monto", sql_directo(
+                    "UPDATE infracciones SET monto = round(monto + ?, 2) WHERE folio = ?",
+                    (rng.choice([-0.01, 0.1, 0.33, 12.5]), folio))
+            elif azar < 0.95:
+                operacion, (exito, _) = "cambiar vehículo", sql_directo(
+                    "UPDATE infracciones SET vin_infractor = ? WHERE folio = ?", (rng.choice(vins), folio))
+            else:
+                operacion, (exito, _) = "borrar", sql_directo("DELETE FROM infracciones WHERE folio = ?", (folio,))
+        local[(operacion, exito)] += 1
+    with candado:
+        conteo.update(local)
+
+
+def proceso_escritor(ruta, numero, hilos, vins, segundos, salida):
+    """Cada proceso tiene su propio pool: escritores realmente independientes para SQLite."""
+    db.configurar_pool(ruta_db=ruta, tamano_maximo=hilos + 1)
+    conteo, candado = Counter(), threading.Lock()
+    hasta = time.monotonic() + segundos
+    trabajadores = [threading.Thread(target=hilo_escritor, args=(numero * 100 + n, vins, hasta, conteo, candado))
+                    for n in range(hilos)]
+    for trabajador in trabajadores:
+        trabajador.start()
+    for trabajador in trabajadores:
+        trabajador.join()
+    db.cerrar_pool()
+    salida.put(conteo)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--segundos", type=float, default=10)
+    parser.add_argument("--procesos", type=int, default=3)
+    parser.add_argument("--hilos", type=int, default=4, help="hilos por proceso")
+    parser.add_argument("--vehiculos", type=int, default=15, help="pocos vehículos: más choques")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="sam_pendientes_") as carpeta:
+        ruta = os.path.join(carpeta, "pendientes.db")
+        db.configurar_pool(ruta_db=ruta)
+        try:
+            crear_tablas()
+            preparar_base(args.vehiculos)
+        finally:
+            db.cerrar_pool()
+        vins = [gen.vin_desde_numero(n) for n in range(args.vehiculos)]
+
+        salida = multiprocessing.Queue()
+        procesos = [multiprocessing.Process(target=proceso_escritor,
+                                            args=(ruta, n, args.hilos, vins, args.segundos, salida))
+                    for n in range(args.procesos)]
+        for proceso in procesos:
+            proceso.start()
+        conteo = Counter()
+        for _ in procesos:
+            conteo.update(salida.get())
+        for proceso in procesos:
+            proceso.join()
+
+        db.configurar_pool(ruta_db=ruta)
+        try:
+            with db.conexion_db() as conexion:
+                diferencias = verificar_resumenes(conexion)
+                pendientes, monto, negativos = conexion.execute('''
+                    SELECT SUM(multas_pendientes), SUM(monto_pendiente), SUM(multas_pendientes < 0) FROM vehiculos
+                ''').fetchone()
+        finally:
+            db.cerrar_pool()
+
+    print(f"{args.procesos} procesos x {args.hilos} hilos, {args.vehiculos} vehículos, {args.segundos:.0f} s")
+    for operacion in sorted({operacion for operacion, _ in conteo}):
+        print(f"  {operacion:<18} {conteo[(operacion, True)]:>8,} aplicadas  {conteo[(operacion, False)]:>6,} rechazadas")
+    print(f"  Al final: {pendientes:,} multas pendientes por ${monto:,.2f}")
+
+    if diferencias or negativos:
+        print(f"\nFALLA: {len(diferencias)} contadores no cuadran, {negativos} vehículos con conteo negativo.")
+        for tabla, clave, esperado, guardado in diferencias[:10]:
+            print(f"  {tabla} [{clave}]: esperado {esperado}, guardado {guardado}")
+        return 1
+    print("\nOK: los contadores de cada vehículo y los resúmenes cuadran con infracciones.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,120 @@
-import sqlite3
 import os
+import threading
+from contextlib import contextmanager
+
+from database.historico import adjuntar_archivos
+from database.pool import PoolConexiones
+from database.perfil_almacenamiento import PerfilAlmacenamiento
 
 # Buscamos la carpeta donde está este archivo (database)
 DIRECTORIO_ACTUAL = os.path.dirname(os.path.abspath(__file__))
 # Unimos la ruta para que siempre apunte a database/infracciones.db
 DB_PATH = os.path.join(DIRECTORIO_ACTUAL, "infracciones.db")
 
+# Configuración del pool de conexiones (se puede cambiar con configurar_pool)
+TAMANO_POOL = 5                  # Conexiones abiertas como máximo
+TIEMPO_ESPERA_POOL = 10.0        # Segundos que se espera una conexión libre
+INTERVALO_VERIFICACION = 30.0    # Segundos de inactividad antes de revisar la salud de una conexión
+
+# PRAGMA de rendimiento (WAL, synchronous, caché...) aplicados a cada conexión del pool
+_perfil = PerfilAlmacenamiento()
+
+_pool = None
+_candado_pool = threading.Lock()
+
+
+def _preparar_conexion(conexion):
+    """Perfil de almacenamiento y archivos históricos de infracciones (database/historico.py)."""
+    _perfil.aplicar(conexion)
+    adjuntar_archivos(conexion)
+
+
+def obtener_pool():
+    """Retorna el pool global, creándolo la primera vez que se necesita."""
+    global _pool
+    if _pool is None:
+        with _candado_pool:
+            if _pool is None:
+                _pool = PoolConexiones(
+                    DB_PATH,
+                    tamano_maximo=TAMANO_POOL,
+                    tiempo_espera=TIEMPO_ESPERA_POOL,
+                    intervalo_verificacion=INTERVALO_VERIFICACION,
+                    configurar_conexion=_preparar_conexion,
+                    al_devolver=_perfil.despues_de_devolver,
+                )
+    return _pool
+
+
+def configurar_pool(ruta_db=None, tamano_maximo=None, tiempo_espera=None, intervalo_verificacion=None):
+    """
+    Cambia la configuración del pool (por ejemplo, para apuntar a otra base de datos).
+    El pool anterior se cierra y el siguiente préstamo crea uno nuevo.
+    """
+    global DB_PATH, TAMANO_POOL, TIEMPO_ESPERA_POOL, INTERVALO_VERIFICACION
+    if ruta_db is not None:
+        DB_PATH = ruta_db
+    if tamano_maximo is not None:
+        TAMANO_POOL = tamano_maximo
+    if tiempo_espera is not None:
+        TIEMPO_ESPERA_POOL = tiempo_espera
+    if intervalo_verificacion is not None:
+        INTERVALO_VERIFICACION = intervalo_verificacion
+    cerrar_pool()
+
+
+def configurar_perfil(pragmas=None, intervalo_checkpoint=None):
+    """
+    Ajusta el perfil de almacenamiento. Ejemplo:
+        configurar_perfil({"synchronous": "FULL", "mmap_size": 0})
+    Se cierra el pool para que las conexiones nuevas usen el perfil actualizado.
+    """
+    global _perfil
+    nuevos_pragmas = dict(_perfil.pragmas)
+    if pragmas:
+        nuevos_pragmas.update(pragmas)
+    _perfil = PerfilAlmacenamiento(
+        nuevos_pragmas,
+        _perfil.intervalo_checkpoint if intervalo_checkpoint is None else intervalo_checkpoint,
+    )
+    cerrar_pool()
+
+
+def cerrar_pool():
+    """Cierra todas las conexiones del pool (al salir de la aplicación)."""
+    global _pool
+    with _candado_pool:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.cerrar()
+
+
 def obtener_conexion():
-    """Crea y retorna una conexión absoluta a la base de datos."""
-    # Verificamos si la ruta es correcta en consola para estar seguros
-    # print(f"Conectando a: {DB_PATH}")
-    conexion = sqlite3.connect(DB_PATH)
-    conexion.row_factory = sqlite3.Row 
-    conexion.execute("PRAGMA foreign_keys = 1")
-    return conexion
\ No newline at end of file
+    """
+    Presta una conexión del pool a la base de datos.
+    Se usa igual que antes: al llamar conexion.close() regresa al pool.
+    """
+    return obtener_pool().obtener()
+
+
+@contextmanager
+def conexion_db():
+    """
+    Versión como administrador de contexto:
+
+        with conexion_db() as conexion:
+            ...
+            conexion.commit()
+
+    Lo que no se confirme con commit() se descarta al salir del bloque.
+    """
+    conexion = obtener_conexion()
+    try:
+        yield conexion
+    finally:
+        conexion.close()
+
+
+def metricas_pool():
+    """Contadores de uso del pool: espera promedio/máxima, saturación, conexiones en uso..."""
+    return obtener_pool().metricas()
@@ -0,0 +1,161 @@
+"""
+Archivos históricos anuales de infracciones.
+
+Las multas cerradas (Pagada o Cancelada) más antiguas que el horizonte de
+archivado se mueven de infracciones.db a un archivo SQLite por año, junto a la
+base de datos principal:
+
+    infracciones.db                    multas vivas
+    infracciones_historico_2023.db     multas cerradas de 2023
+    infracciones_historico_2024.db     ...
+
+Cada conexión del pool adjunta (ATTACH) los archivos que existan como
+historico_AAAA y crea la vista temporal infracciones_historico: las multas
+vivas más las de cada archivo. Los reportes leen de la vista y no necesitan
+saber en qué archivo está cada multa. Si un folio está en los dos lados (una
+corrida de archivado a medias), la vista entrega solo la fila viva.
+
+El archivado y la compactación están en logic/gestor_historico.py. Este módulo
+no usa el pool: lo llama el propio pool al crear cada conexión.
+"""
+
+import glob
+import os
+import re
+
+PREFIJO_ESQUEMA = "historico_"
+VISTA = "infracciones_historico"
+
+# SQLite adjunta como máximo 10 bases de datos (SQLITE_MAX_ATTACHED); una queda
+# libre para el archivo de auditoría que adjunta GestorAuditoria
+MAXIMO_ARCHIVOS = 9
+
+COLUMNAS = ("folio", "vin_infractor", "id_agente", "fecha", "hora", "lugar", "tipo_infraccion",
+            "motivo", "monto", "licencia_conductor", "estado")
+
+# Mismas columnas que infracciones, más la corrida que trajo cada fila
+_ESQUEMA_ARCHIVO = [
+    '''CREATE TABLE IF NOT EXISTS {esquema}.infracciones (
+           folio TEXT PRIMARY KEY,
+           vin_infractor TEXT NOT NULL,
+           id_agente INTEGER NOT NULL,
+           fecha TEXT NOT NULL,
+           hora TEXT NOT NULL,
+           lugar TEXT NOT NULL,
+           tipo_infraccion TEXT NOT NULL,
+           motivo TEXT,
+           monto REAL NOT NULL,
+           licencia_conductor TEXT,
+           estado TEXT,
+           id_corrida INTEGER NOT NULL
+       )''',
+    # Los mismos índices que usan los reportes sobre las multas vivas
+    "CREATE INDEX IF NOT EXISTS {esquema}.idx_infracciones_fecha_folio ON infracciones (fecha, folio)",
+    "CREATE INDEX IF NOT EXISTS {esquema}.idx_infracciones_vin ON infracciones (vin_infractor)",
+    "CREATE INDEX IF NOT EXISTS {esquema}.idx_infracciones_corrida ON infracciones (id_corrida)",
+]
+
+
+def esquema_anio(anio):
+    """Nombre con el que se adjunta el archivo de un año (ej. historico_2023)."""
+    return f"{PREFIJO_ESQUEMA}{int(anio):04d}"
+
+
+def ruta_archivo(ruta_db, anio):
+    """Archivo de un año junto a la base de datos principal (ej. infracciones_historico_2023.db)."""
+    return f"{os.path.splitext(ruta_db)[0]}_historico_{int(anio):04d}.db"
+
+
+def archivos_anuales(ruta_db):
+    """{año: ruta} de los archivos históricos que existen para 'ruta_db', ordenados por año."""
+    base = os.path.splitext(ruta_db)[0]
+    patron = re.compile(re.escape(base) + r"_historico_(\d{4})\.db$")
+    archivos = {}
+    for ruta in glob.glob(glob.escape(base) + "_historico_[0-9][0-9][0-9][0-9].db"):
+        coincidencia = patron.match(ruta)
+        if coincidencia:
+            archivos[coincidencia.group(1)] = ruta
+    return dict(sorted(archivos.items()))
+
+
+def _bases_adjuntas(conexion):
+    """{nombre del esquema: ruta} de lo que ya está adjunto a la conexión."""
+    return {fila[1]: fila[2] for fila in conexion.execute("PRAGMA database_list")}
+
+
+def ruta_principal(conexion):
+    """Ruta del archivo principal de la conexión ('' si está en memoria)."""
+    return _bases_adjuntas(conexion).get("main", "")
+
+
+def _cantidad_adjuntas(adjuntas):
+    return sum(1 for nombre in adjuntas if nombre not in ("main", "temp"))
+
+
+def _tiene_tabla(conexion, esquema):
+    return conexion.execute(
+        f"SELECT 1 FROM {esquema}.sqlite_master WHERE type = 'table' AND name = 'infracciones'").fetchone() is not None
+
+
+def abrir_archivo(conexion, anio):
+    """
+    Adjunta el archivo del año (creándolo si no existe) con su esquema y en modo
+    WAL, igual que la base principal. Retorna el nombre del esquema.
+    Debe llamarse fuera de una transacción.
+    """
+    esquema = esquema_anio(anio)
+    adjuntas = _bases_adjuntas(conexion)
+    if esquema not in adjuntas:
+        if _cantidad_adjuntas(adjuntas) >= MAXIMO_ARCHIVOS:
+            raise RuntimeError(f"No se pueden adjuntar más de {MAXIMO_ARCHIVOS} archivos históricos; "
+                               f"junte los años más antiguos en otro archivo antes de archivar {anio}.")
+        conexion.execute(f"ATTACH DATABASE ? AS {esquema}", (ruta_archivo(adjuntas["main"], anio),))
+    conexion.execute(f"PRAGMA {esquema}.journal_mode = WAL").fetchone()
+    for sentencia in _ESQUEMA_ARCHIVO:
+        conexion.execute(sentencia.format(esquema=esquema))
+    conexion.commit()
+    return esquema
+
+
+def _consulta_vista(esquemas):
+    columnas = ", ".join(COLUMNAS)
+    ramas = [f"SELECT {columnas} FROM main.infracciones"]
+    for esquema in esquemas:
+        ramas.append(f'''SELECT {", ".join(f"a.{columna}" for columna in COLUMNAS)} FROM {esquema}.infracciones a
+                         WHERE NOT EXISTS (SELECT 1 FROM main.infracciones i WHERE i.folio = a.folio)''')
+    return "\nUNION ALL\n".join(ramas)
+
+
+def adjuntar_archivos(conexion):
+    """
+    Adjunta los archivos históricos que falten y, si cambió algo, vuelve a crear
+    la vista temporal infracciones_historico. Se puede llamar tantas veces como
+    se quiera: si no hay archivos nuevos solo cuesta un PRAGMA y un glob.
+    Dentro de una transacción no hace nada (SQLite no permite ATTACH ahí).
+    Retorna los años que incluye la vista.
+    """
+    adjuntas = _bases_adjuntas(conexion)
+    ruta_db = adjuntas.get("main", "")
+    if conexion.in_transaction:
+        return sorted(nombre[len(PREFIJO_ESQUEMA):] for nombre in adjuntas if nombre.startswith(PREFIJO_ESQUEMA))
+
+    anios = []
+    for anio, ruta in (archivos_anuales(ruta_db) if ruta_db else {}).items():
+        esquema = esquema_anio(anio)
+        if esquema not in adjuntas:
+            if _cantidad_adjuntas(adjuntas) >= MAXIMO_ARCHIVOS:
+                break
+            conexion.execute(f"ATTACH DATABASE ? AS {esquema}", (ruta,))
+            adjuntas[esquema] = ruta
+        # Un archivo recién creado por otro proceso puede no tener la tabla todavía
+        if _tiene_tabla(conexion, esquema):
+            anios.append(anio)
+
+    esquemas = [esquema_anio(anio) for anio in anios]
+    actual = conexion.execute("SELECT sql FROM temp.sqlite_master WHERE type = 'view' AND name = ?",
+                              (VISTA,)).fetchone()
+    consulta = _consulta_vista(esquemas)
+    if actual is None or not actual[0].endswith(consulta):
+        conexion.execute(f"DROP VIEW IF EXISTS temp.{VISTA}")
+        conexion.execute(f"CREATE TEMP VIEW {VISTA} AS {consulta}")
+    return anios
@@ -6,6 +6,8 @@ ruta_raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(ruta_raiz)
 
 from database.conexion import obtener_conexion
+from database.migraciones import aplicar_migraciones
+
 def crear_tablas():
     conexion = obtener_conexion()
     cursor = conexion.cursor()
@@ -85,6 +87,10 @@ def crear_tablas():
     ''')
 
     conexion.commit()
+
+    # 6. Cambios posteriores al esquema (índices, tablas nuevas...) en orden de versión
+    aplicar_migraciones(conexion)
+
     conexion.close()
     print("Base de datos y tablas creadas exitosamente.")
 
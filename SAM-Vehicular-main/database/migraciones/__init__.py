@@ -0,0 +1,107 @@
+"""
+Migraciones versionadas del esquema de infracciones.db.
+
+Cada cambio al esquema vive en un módulo mNNN_descripcion.py de esta carpeta
+con dos funciones:
+
+    def subir(cursor): ...   # aplica el cambio
+    def bajar(cursor): ...   # lo revierte
+
+El número NNN es la versión. La tabla version_esquema guarda qué versiones ya
+se aplicaron, de modo que aplicar_migraciones() solo ejecuta las pendientes y
+en orden. Cada migración corre dentro de su propia transacción.
+"""
+
+import importlib
+import pkgutil
+import re
+from datetime import datetime
+
+_PATRON_MODULO = re.compile(r"^m(\d{3})_\w+$")
+
+
+def listar_migraciones():
+    """Retorna [(version, modulo)] ordenado por versión."""
+    migraciones = []
+    for info in pkgutil.iter_modules(__path__):
+        coincidencia = _PATRON_MODULO.match(info.name)
+        if coincidencia:
+            modulo = importlib.import_module(f"{__name__}.{info.name}")
+            migraciones.append((int(coincidencia.group(1)), modulo))
+    migraciones.sort(key=lambda par: par[0])
+    return migraciones
+
+
+def _asegurar_tabla_version(conexion):
+    conexion.execute('''
+        CREATE TABLE IF NOT EXISTS version_esquema (
+            version INTEGER PRIMARY KEY,
+            descripcion TEXT NOT NULL,
+            aplicada_en TEXT NOT NULL
+        )
+    ''')
+
+
+def version_actual(conexion):
+    """Última versión aplicada (0 si la base de datos no tiene migraciones)."""
+    _asegurar_tabla_version(conexion)
+    fila = conexion.execute("SELECT MAX(version) FROM version_esquema").fetchone()
+    return fila[0] or 0
+
+
+def aplicar_migraciones(conexion, hasta=None):
+    """
+    Aplica en orden las migraciones pendientes (hasta la versión indicada, o todas).
+    Retorna la lista de versiones aplicadas.
+    """
+    actual = version_actual(conexion)
+    aplicadas = []
+
+    for version, modulo in listar_migraciones():
+        if version <= actual or (hasta is not None and version > hasta):
+            continue
+
+        cursor = conexion.cursor()
+        try:
+            cursor.execute("BEGIN")
+            modulo.subir(cursor)
+            cursor.execute(
+                "INSERT INTO version_esquema (version, descripcion, aplicada_en) VALUES (?, ?, ?)",
+                (version, modulo.DESCRIPCION, datetime.now().isoformat(timespec="seconds")),
+            )
+            conexion.commit()
+        except Exception:
+            conexion.rollback()
+            raise
+        aplicadas.append(version)
+
+    if aplicadas:
+        # Actualiza las estadísticas del planificador para los índices nuevos
+        conexion.execute("PRAGMA optimize")
+    return aplicadas
+
+
+def revertir_migraciones(conexion, hasta):
+    """
+    Revierte, de la más reciente a la más antigua, las migraciones con versión
+    mayor a 'hasta'. Retorna la lista de versiones revertidas.
+    """
+    actual = version_actual(conexion)
+    revertidas = []
+
+    for version, modulo in reversed(listar_migraciones()):
+        if version <= hasta or version > actual:
+            continue
+
+        cursor = conexion.cursor()
+        try:
+            cursor.execute("BEGIN")
+            modulo.bajar(cursor)
+            cursor.execute("DELETE FROM version_esquema WHERE version = ?", (version,))
+            conexion.commit()
+        except Exception:
+            conexion.rollback()
+            raise
+        revertidas.append(version)
+
+    return revertidas
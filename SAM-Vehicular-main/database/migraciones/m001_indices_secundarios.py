@@ -0,0 +1,37 @@
+"""
+Índices secundarios para las columnas por las que filtran los gestores y reportes.
+Sin ellos, cada búsqueda por VIN, estado, fecha, agente o propietario recorría
+la tabla completa.
+"""
+
+DESCRIPCION = "Índices secundarios de infracciones y vehículos"
+
+INDICES = [
+    # tiene_multas_pendientes / modificar_vehiculo / reporte 1: solo las pendientes
+    '''CREATE INDEX IF NOT EXISTS idx_infracciones_vin_pendientes
+       ON infracciones (vin_infractor, estado) WHERE estado = 'Pendiente' ''',
+    # Llave foránea hacia vehículos y búsquedas por VIN en cualquier estado
+    "CREATE INDEX IF NOT EXISTS idx_infracciones_vin ON infracciones (vin_infractor)",
+    # reporte_infracciones_por_fecha
+    "CREATE INDEX IF NOT EXISTS idx_infracciones_fecha ON infracciones (fecha)",
+    # reporte_infracciones_por_agente y llave foránea hacia agentes
+    "CREATE INDEX IF NOT EXISTS idx_infracciones_agente ON infracciones (id_agente)",
+    # reporte_resumen_infracciones: cubre GROUP BY estado + SUM(monto) sin tocar la tabla
+    "CREATE INDEX IF NOT EXISTS idx_infracciones_estado_monto ON infracciones (estado, monto)",
+    # Llave foránea hacia propietarios, reporte 5 y la regla de inactivación de propietarios
+    "CREATE INDEX IF NOT EXISTS idx_vehiculos_propietario ON vehiculos (id_propietario, estado_legal)",
+    # reporte_vehiculos_estado_legal
+    "CREATE INDEX IF NOT EXISTS idx_vehiculos_estado_legal ON vehiculos (estado_legal)",
+]
+
+
+def subir(cursor):
+    for sentencia in INDICES:
+        cursor.execute(sentencia)
+
+
+def bajar(cursor):
+    for nombre in ("idx_infracciones_vin_pendientes", "idx_infracciones_vin", "idx_infracciones_fecha",
+                   "idx_infracciones_agente", "idx_infracciones_estado_monto",
+                   "idx_vehiculos_propietario", "idx_vehiculos_estado_legal"):
+        cursor.execute(f"DROP INDEX IF EXISTS {nombre}")
@@ -0,0 +1,99 @@
+"""
+Tablas de resumen para los reportes 3, 4, 5 y 6.
+
+Cada reporte hacía un GROUP BY sobre la tabla completa en cada clic de
+"Generar Reporte". Ahora los conteos viven en tablas pequeñas (una fila por
+grupo) que los triggers mantienen al día en cada INSERT, UPDATE o DELETE, sin
+importar si la escritura viene de un gestor, del importador o de un script.
+database/resumenes.py permite reconstruirlas y verificar su consistencia.
+"""
+
+DESCRIPCION = "Tablas de resumen de reportes mantenidas por triggers"
+
+TABLAS = [
+    '''CREATE TABLE IF NOT EXISTS resumen_infracciones_estado (
+           estado TEXT PRIMARY KEY,
+           total INTEGER NOT NULL DEFAULT 0,
+           monto REAL NOT NULL DEFAULT 0
+       )''',
+    '''CREATE TABLE IF NOT EXISTS resumen_infracciones_agente (
+           id_agente INTEGER PRIMARY KEY,
+           total INTEGER NOT NULL DEFAULT 0
+       )''',
+    '''CREATE TABLE IF NOT EXISTS resumen_vehiculos_estado_legal (
+           estado_legal TEXT PRIMARY KEY,
+           total INTEGER NOT NULL DEFAULT 0
+       )''',
+    '''CREATE TABLE IF NOT EXISTS resumen_vehiculos_propietario (
+           id_propietario INTEGER PRIMARY KEY,
+           total INTEGER NOT NULL DEFAULT 0
+       )''',
+    # Reporte 5: solo los que tienen más de un vehículo, ya ordenados por cantidad
+    '''CREATE INDEX IF NOT EXISTS idx_resumen_vehiculos_propietario_total
+       ON resumen_vehiculos_propietario (total)''',
+]
+
+# Fragmentos reutilizados por los triggers: sumar o restar una fila a cada resumen
+_SUMAR_ESTADO = '''INSERT INTO resumen_infracciones_estado (estado, total, monto) VALUES (NEW.estado, 1, NEW.monto)
+                   ON CONFLICT (estado) DO UPDATE SET total = total + 1, monto = monto + excluded.monto;'''
+_RESTAR_ESTADO = '''UPDATE resumen_infracciones_estado SET total = total - 1, monto = monto - OLD.monto
+                    WHERE estado = OLD.estado;'''
+_SUMAR_AGENTE = '''INSERT INTO resumen_infracciones_agente (id_agente, total) VALUES (NEW.id_agente, 1)
+                   ON CONFLICT (id_agente) DO UPDATE SET total = total + 1;'''
+_RESTAR_AGENTE = "UPDATE resumen_infracciones_agente SET total = total - 1 WHERE id_agente = OLD.id_agente;"
+_SUMAR_ESTADO_LEGAL = '''INSERT INTO resumen_vehiculos_estado_legal (estado_legal, total) VALUES (NEW.estado_legal, 1)
+                         ON CONFLICT (estado_legal) DO UPDATE SET total = total + 1;'''
+_RESTAR_ESTADO_LEGAL = "UPDATE resumen_vehiculos_estado_legal SET total = total - 1 WHERE estado_legal = OLD.estado_legal;"
+_SUMAR_PROPIETARIO = '''INSERT INTO resumen_vehiculos_propietario (id_propietario, total) VALUES (NEW.id_propietario, 1)
+                        ON CONFLICT (id_propietario) DO UPDATE SET total = total + 1;'''
+_RESTAR_PROPIETARIO = "UPDATE resumen_vehiculos_propietario SET total = total - 1 WHERE id_propietario = OLD.id_propietario;"
+
+TRIGGERS = {
+    "trg_resumen_infracciones_insert":
+        f"AFTER INSERT ON infracciones BEGIN {_SUMAR_ESTADO} {_SUMAR_AGENTE} END",
+    "trg_resumen_infracciones_delete":
+        f"AFTER DELETE ON infracciones BEGIN {_RESTAR_ESTADO} {_RESTAR_AGENTE} END",
+    # Solo se dispara si cambia alguna columna que afecte a los resúmenes
+    "trg_resumen_infracciones_update":
+        f'''AFTER UPDATE OF estado, monto, id_agente ON infracciones
+            BEGIN {_RESTAR_ESTADO} {_SUMAR_ESTADO} {_RESTAR_AGENTE} {_SUMAR_AGENTE} END''',
+    "trg_resumen_vehiculos_insert":
+        f"AFTER INSERT ON vehiculos BEGIN {_SUMAR_ESTADO_LEGAL} {_SUMAR_PROPIETARIO} END",
+    "trg_resumen_vehiculos_delete":
+        f"AFTER DELETE ON vehiculos BEGIN {_RESTAR_ESTADO_LEGAL} {_RESTAR_PROPIETARIO} END",
+    "trg_resumen_vehiculos_estado_legal":
+        f'''AFTER UPDATE OF estado_legal ON vehiculos WHEN OLD.estado_legal IS NOT NEW.estado_legal
+            BEGIN {_RESTAR_ESTADO_LEGAL} {_SUMAR_ESTADO_LEGAL} END''',
+    "trg_resumen_vehiculos_propietario":
+        f'''AFTER UPDATE OF id_propietario ON vehiculos WHEN OLD.id_propietario IS NOT NEW.id_propietario
+            BEGIN {_RESTAR_PROPIETARIO} {_SUMAR_PROPIETARIO} END''',
+}
+
+# Carga inicial a partir de los datos que ya existen
+CARGA_INICIAL = [
+    '''INSERT INTO resumen_infracciones_estado (estado, total, monto)
+       SELECT estado, COUNT(*), COALESCE(SUM(monto), 0) FROM infracciones GROUP BY estado''',
+    '''INSERT INTO resumen_infracciones_agente (id_agente, total)
+       SELECT id_agente, COUNT(*) FROM infracciones GROUP BY id_agente''',
+    '''INSERT INTO resumen_vehiculos_estado_legal (estado_legal, total)
+       SELECT estado_legal, COUNT(*) FROM vehiculos GROUP BY estado_legal''',
+    '''INSERT INTO resumen_vehiculos_propietario (id_propietario, total)
+       SELECT id_propietario, COUNT(*) FROM vehiculos GROUP BY id_propietario''',
+]
+
+
+def subir(cursor):
+    for sentencia in TABLAS:
+        cursor.execute(sentencia)
+    for sentencia in CARGA_INICIAL:
+        cursor.execute(sentencia)
+    for nombre, cuerpo in TRIGGERS.items():
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {nombre} {cuerpo}")
+
+
+def bajar(cursor):
+    for nombre in TRIGGERS:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {nombre}")
+    for tabla in ("resumen_infracciones_estado", "resumen_infracciones_agente",
+                  "resumen_vehiculos_estado_legal", "resumen_vehiculos_propietario"):
+        cursor.execute(f"DROP TABLE IF EXISTS {tabla}")
@@ -0,0 +1,20 @@
+"""
+Índice (fecha, folio) para paginar el reporte de infracciones por fecha.
+
+El reporte ahora se pide por páginas ordenadas por fecha y folio; con el folio
+dentro del índice, cada página es un recorrido corto del índice que empieza
+justo después de la última fila de la página anterior. Sustituye al índice
+solo sobre fecha de la migración 001.
+"""
+
+DESCRIPCION = "Índice (fecha, folio) de infracciones para paginación"
+
+
+def subir(cursor):
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_infracciones_fecha_folio ON infracciones (fecha, folio)")
+    cursor.execute("DROP INDEX IF EXISTS idx_infracciones_fecha")
+
+
+def bajar(cursor):
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_infracciones_fecha ON infracciones (fecha)")
+    cursor.execute("DROP INDEX IF EXISTS idx_infracciones_fecha_folio")
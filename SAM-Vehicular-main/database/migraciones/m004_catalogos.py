@@ -0,0 +1,99 @@
+"""
+Catálogos administrables en la base de datos.
+
+Marcas, modelos (con las clases en que se fabrica cada uno), clases, colores y
+tipos de infracción pasan de logic/catalogos.py a tablas, para poder agregar
+valores sin volver a instalar el sistema. Los valores de catalogos.py se usan
+como carga inicial.
+
+catalogo_version guarda un sello que los triggers incrementan con cualquier
+INSERT, UPDATE o DELETE en estas tablas (venga de la aplicación, de otro equipo
+o de un script); logic/almacen_catalogos.py lo consulta para saber si su caché
+sigue vigente.
+"""
+
+DESCRIPCION = "Catálogos de marcas, modelos, clases, colores y tipos de infracción con sello de versión"
+
+TABLAS = [
+    '''CREATE TABLE IF NOT EXISTS catalogo_marcas (
+           id_marca INTEGER PRIMARY KEY,
+           nombre TEXT UNIQUE NOT NULL
+       )''',
+    '''CREATE TABLE IF NOT EXISTS catalogo_modelos (
+           id_modelo INTEGER PRIMARY KEY,
+           id_marca INTEGER NOT NULL REFERENCES catalogo_marcas (id_marca) ON DELETE CASCADE,
+           nombre TEXT NOT NULL,
+           UNIQUE (id_marca, nombre)
+       )''',
+    '''CREATE TABLE IF NOT EXISTS catalogo_clases (
+           id_clase INTEGER PRIMARY KEY,
+           nombre TEXT UNIQUE NOT NULL
+       )''',
+    # Clases en las que se fabrica cada modelo (ej. Aveo -> Sedán y Hatchback)
+    '''CREATE TABLE IF NOT EXISTS catalogo_modelo_clase (
+           id_modelo INTEGER NOT NULL REFERENCES catalogo_modelos (id_modelo) ON DELETE CASCADE,
+           id_clase INTEGER NOT NULL REFERENCES catalogo_clases (id_clase) ON DELETE CASCADE,
+           PRIMARY KEY (id_modelo, id_clase)
+       ) WITHOUT ROWID''',
+    '''CREATE TABLE IF NOT EXISTS catalogo_colores (
+           id_color INTEGER PRIMARY KEY,
+           nombre TEXT UNIQUE NOT NULL
+       )''',
+    '''CREATE TABLE IF NOT EXISTS catalogo_tipos_infraccion (
+           id_tipo INTEGER PRIMARY KEY,
+           nombre TEXT UNIQUE NOT NULL
+       )''',
+    # Una sola fila: el sello de versión de todos los catálogos
+    '''CREATE TABLE IF NOT EXISTS catalogo_version (
+           id INTEGER PRIMARY KEY CHECK (id = 1),
+           version INTEGER NOT NULL
+       )''',
+]
+
+TABLAS_CATALOGO = ("catalogo_marcas", "catalogo_modelos", "catalogo_clases", "catalogo_modelo_clase",
+                   "catalogo_colores", "catalogo_tipos_infraccion")
+
+_INCREMENTAR_VERSION = "UPDATE catalogo_version SET version = version + 1 WHERE id = 1;"
+
+TRIGGERS = {
+    f"trg_{tabla}_{evento.lower()}": f"AFTER {evento} ON {tabla} BEGIN {_INCREMENTAR_VERSION} END"
+    for tabla in TABLAS_CATALOGO
+    for evento in ("INSERT", "UPDATE", "DELETE")
+}
+
+
+def _carga_inicial(cursor):
+    import logic.catalogos as cat
+
+    cursor.executemany("INSERT INTO catalogo_clases (nombre) VALUES (?)",
+                       ((clase,) for clase in cat.CLASES_VEHICULO))
+    cursor.executemany("INSERT INTO catalogo_colores (nombre) VALUES (?)",
+                       ((color,) for color in cat.COLORES_VEHICULO))
+    cursor.executemany("INSERT INTO catalogo_tipos_infraccion (nombre) VALUES (?)",
+                       ((tipo,) for tipo in cat.TIPOS_INFRACCION))
+    for marca, modelos in cat.MARCAS_MODELOS_VEHICULO.items():
+        cursor.execute("INSERT INTO catalogo_marcas (nombre) VALUES (?)", (marca,))
+        id_marca = cursor.lastrowid
+        for modelo, clases in modelos.items():
+            cursor.execute("INSERT INTO catalogo_modelos (id_marca, nombre) VALUES (?, ?)", (id_marca, modelo))
+            id_modelo = cursor.lastrowid
+            cursor.executemany('''
+                INSERT INTO catalogo_modelo_clase (id_modelo, id_clase)
+                SELECT ?, id_clase FROM catalogo_clases WHERE nombre = ?
+            ''', ((id_modelo, clase) for clase in clases))
+    cursor.execute("INSERT INTO catalogo_version (id, version) VALUES (1, 1)")
+
+
+def subir(cursor):
+    for sentencia in TABLAS:
+        cursor.execute(sentencia)
+    _carga_inicial(cursor)
+    for nombre, cuerpo in TRIGGERS.items():
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {nombre} {cuerpo}")
+
+
+def bajar(cursor):
+    for nombre in TRIGGERS:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {nombre}")
+    for tabla in ("catalogo_version",) + tuple(reversed(TABLAS_CATALOGO)):
+        cursor.execute(f"DROP TABLE IF EXISTS {tabla}")
@@ -0,0 +1,83 @@
+"""
+Índices FTS5 para la búsqueda parcial y aproximada de vehículos y propietarios.
+
+- busqueda_vehiculos (placa, VIN) usa el tokenizador trigram: cualquier fragmento
+  de 3 caracteres o más se busca con el índice ("YUC-12", "3N1BC", los últimos
+  dígitos del VIN), sin LIKE '%...%' sobre la tabla completa. La placa se guarda
+  con y sin guiones ("YUC-123-A YUC123A") para encontrarla se escriba como se escriba.
+- busqueda_propietarios (nombre, CURP) indexa palabras (unicode61, sin acentos)
+  con índice de prefijos: "gonz" encuentra "González". Con nombres los trigramas
+  son mucho más lentos, porque cada fragmento de un apellido común aparece en
+  decenas de miles de filas. Es un índice de contenido externo: lee el texto de
+  propietarios (rowid = id_propietario) en lugar de guardar otra copia.
+
+Los triggers mantienen ambos índices al día en cada INSERT, UPDATE o DELETE,
+venga de un gestor, del importador o de un script. En vehiculos la llave es el
+VIN (la tabla no tiene INTEGER PRIMARY KEY y VACUUM puede renumerar su rowid),
+así que los triggers localizan la fila del índice por la columna vin.
+"""
+
+DESCRIPCION = "Índices FTS5 de placa/VIN (trigram) y nombre/CURP (prefijos) para búsqueda parcial"
+
+TABLAS = [
+    '''CREATE VIRTUAL TABLE IF NOT EXISTS busqueda_vehiculos
+       USING fts5 (placa, vin, tokenize = 'trigram')''',
+    '''CREATE VIRTUAL TABLE IF NOT EXISTS busqueda_propietarios
+       USING fts5 (nombre_completo, curp, content = 'propietarios', content_rowid = 'id_propietario',
+                   tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')''',
+]
+
+
+def texto_placa(columna):
+    """Expresión SQL con la placa tal cual y sin guiones."""
+    return f"{columna} || ' ' || replace({columna}, '-', '')"
+
+
+# La fila del vehículo en el índice se localiza por su VIN (ver el docstring del módulo)
+_QUITAR_VEHICULO = '''DELETE FROM busqueda_vehiculos
+                      WHERE busqueda_vehiculos MATCH 'vin:"' || replace(OLD.vin, '"', '""') || '"'
+                        AND vin = OLD.vin;'''
+_AGREGAR_VEHICULO = f'''INSERT INTO busqueda_vehiculos (placa, vin)
+                        VALUES ({texto_placa("NEW.placa")}, NEW.vin);'''
+# En un índice de contenido externo se borra pasando los valores anteriores
+_QUITAR_PROPIETARIO = '''INSERT INTO busqueda_propietarios (busqueda_propietarios, rowid, nombre_completo, curp)
+                         VALUES ('delete', OLD.id_propietario, OLD.nombre_completo, OLD.curp);'''
+_AGREGAR_PROPIETARIO = '''INSERT INTO busqueda_propietarios (rowid, nombre_completo, curp)
+                          VALUES (NEW.id_propietario, NEW.nombre_completo, NEW.curp);'''
+
+TRIGGERS = {
+    "trg_busqueda_vehiculos_insert": f"AFTER INSERT ON vehiculos BEGIN {_AGREGAR_VEHICULO} END",
+    "trg_busqueda_vehiculos_delete": f"AFTER DELETE ON vehiculos BEGIN {_QUITAR_VEHICULO} END",
+    # Solo las columnas indexadas: los cambios de color o estado legal no tocan el índice
+    "trg_busqueda_vehiculos_update":
+        f"AFTER UPDATE OF placa, vin ON vehiculos BEGIN {_QUITAR_VEHICULO} {_AGREGAR_VEHICULO} END",
+    "trg_busqueda_propietarios_insert": f"AFTER INSERT ON propietarios BEGIN {_AGREGAR_PROPIETARIO} END",
+    "trg_busqueda_propietarios_delete": f"AFTER DELETE ON propietarios BEGIN {_QUITAR_PROPIETARIO} END",
+    "trg_busqueda_propietarios_update":
+        f'''AFTER UPDATE OF id_propietario, nombre_completo, curp ON propietarios
+            BEGIN {_QUITAR_PROPIETARIO} {_AGREGAR_PROPIETARIO} END''',
+}
+
+
+def reconstruir(cursor):
+    """Vuelve a llenar ambos índices desde las tablas (carga inicial o reparación)."""
+    cursor.execute("DELETE FROM busqueda_vehiculos")
+    cursor.execute(f"INSERT INTO busqueda_vehiculos (placa, vin) SELECT {texto_placa('placa')}, vin FROM vehiculos")
+    cursor.execute("INSERT INTO busqueda_propietarios (busqueda_propietarios) VALUES ('rebuild')")
+    cursor.execute("INSERT INTO busqueda_vehiculos (busqueda_vehiculos) VALUES ('optimize')")
+    cursor.execute("INSERT INTO busqueda_propietarios (busqueda_propietarios) VALUES ('optimize')")
+
+
+def subir(cursor):
+    for sentencia in TABLAS:
+        cursor.execute(sentencia)
+    reconstruir(cursor)
+    for nombre, cuerpo in TRIGGERS.items():
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {nombre} {cuerpo}")
+
+
+def bajar(cursor):
+    for nombre in TRIGGERS:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {nombre}")
+    cursor.execute("DROP TABLE IF EXISTS busqueda_propietarios")
+    cursor.execute("DROP TABLE IF EXISTS busqueda_vehiculos")
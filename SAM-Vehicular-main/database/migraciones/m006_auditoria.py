@@ -0,0 +1,110 @@
+"""
+Bitácora de cambios (auditoría) de vehículos, propietarios e infracciones.
+
+Cada alta, modificación o baja agrega un evento a la tabla auditoria desde un
+trigger, así que queda escrito en la misma transacción que el cambio, venga de
+un gestor, del importador o de un script:
+
+- alta / baja: la fila completa en 'cambios' ({columna: valor}).
+- modificacion: solo las columnas que cambiaron ({columna: [antes, después]}).
+  En infracciones solo se audita el estado y el monto (lo demás es inmutable),
+  y sus altas no se registran: la infracción misma es el registro.
+
+La tabla es de solo agregar: los triggers trg_auditoria_solo_agregar_* rechazan
+cualquier UPDATE o DELETE. El único que borra es el archivado de
+logic/gestor_auditoria.py, que quita el trigger de DELETE dentro de su propia
+transacción y lo vuelve a crear antes de confirmar.
+
+El índice (entidad, id_entidad, momento) entrega la línea de tiempo de un
+registro ya ordenada, con paginación por llave (momento, id_evento).
+"""
+
+DESCRIPCION = "Bitácora de auditoría de solo agregar para vehículos, propietarios e infracciones"
+
+TABLAS = [
+    '''CREATE TABLE IF NOT EXISTS auditoria (
+           id_evento INTEGER PRIMARY KEY,
+           entidad TEXT NOT NULL,
+           id_entidad TEXT NOT NULL,
+           momento TEXT NOT NULL,
+           accion TEXT NOT NULL,
+           cambios TEXT
+       )''',
+    '''CREATE INDEX IF NOT EXISTS idx_auditoria_entidad_momento
+       ON auditoria (entidad, id_entidad, momento)''',
+]
+
+# Hora local con milisegundos, igual que fecha/hora de las infracciones (hora local)
+MOMENTO = "strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')"
+
+# entidad -> (tabla, llave, columnas auditadas en modificaciones, columnas de alta/baja o None si no se registran)
+ENTIDADES = {
+    "vehiculo": ("vehiculos", "vin",
+                 ("placa", "color", "estado_legal", "id_propietario"),
+                 ("placa", "marca", "modelo", "anio", "color", "clase", "estado_legal", "procedencia",
+                  "id_propietario")),
+    "propietario": ("propietarios", "id_propietario",
+                    ("nombre_completo", "curp", "direccion", "telefono", "correo_electronico",
+                     "estado_licencia", "estado"),
+                    ("nombre_completo", "curp", "direccion", "telefono", "correo_electronico",
+                     "estado_licencia", "estado")),
+    "infraccion": ("infracciones", "folio", ("estado", "monto"), None),
+}
+
+TRIGGER_SOLO_AGREGAR_UPDATE = ("trg_auditoria_solo_agregar_update",
+                               "BEFORE UPDATE ON auditoria "
+                               "BEGIN SELECT RAISE(ABORT, 'La auditoría no se puede modificar.'); END")
+TRIGGER_SOLO_AGREGAR_DELETE = ("trg_auditoria_solo_agregar_delete",
+                               "BEFORE DELETE ON auditoria "
+                               "BEGIN SELECT RAISE(ABORT, 'La auditoría no se puede borrar; use el archivado.'); END")
+
+
+def _fila_json(prefijo, columnas):
+    pares = ", ".join(f"'{columna}', {prefijo}.{columna}" for columna in columnas)
+    return f"json_object({pares})"
+
+
+def _triggers():
+    triggers = dict((TRIGGER_SOLO_AGREGAR_UPDATE, TRIGGER_SOLO_AGREGAR_DELETE))
+    for entidad, (tabla, llave, modificables, completas) in ENTIDADES.items():
+        evento = "INSERT INTO auditoria (entidad, id_entidad, momento, accion, cambios)"
+
+        # Solo se dispara si alguna columna auditada cambió de verdad; 'cambios' lleva solo esas
+        diferencias = " UNION ALL ".join(
+            f"SELECT '{columna}' AS campo, OLD.{columna} AS antes, NEW.{columna} AS despues"
+            for columna in modificables)
+        triggers[f"trg_auditoria_{tabla}_update"] = f'''
+            AFTER UPDATE OF {", ".join(modificables)} ON {tabla}
+            WHEN {" OR ".join(f"OLD.{columna} IS NOT NEW.{columna}" for columna in modificables)}
+            BEGIN
+                {evento}
+                SELECT '{entidad}', NEW.{llave}, {MOMENTO}, 'modificacion',
+                       json_group_object(campo, json_array(antes, despues))
+                FROM ({diferencias})
+                WHERE antes IS NOT despues;
+            END'''
+
+        if completas is not None:
+            triggers[f"trg_auditoria_{tabla}_insert"] = f'''
+                AFTER INSERT ON {tabla}
+                BEGIN {evento} VALUES ('{entidad}', NEW.{llave}, {MOMENTO}, 'alta', {_fila_json("NEW", completas)}); END'''
+            triggers[f"trg_auditoria_{tabla}_delete"] = f'''
+                AFTER DELETE ON {tabla}
+                BEGIN {evento} VALUES ('{entidad}', OLD.{llave}, {MOMENTO}, 'baja', {_fila_json("OLD", completas)}); END'''
+    return triggers
+
+
+TRIGGERS = _triggers()
+
+
+def subir(cursor):
+    for sentencia in TABLAS:
+        cursor.execute(sentencia)
+    for nombre, cuerpo in TRIGGERS.items():
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {nombre} {cuerpo}")
+
+
+def bajar(cursor):
+    for nombre in TRIGGERS:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {nombre}")
+    cursor.execute("DROP TABLE IF EXISTS auditoria")
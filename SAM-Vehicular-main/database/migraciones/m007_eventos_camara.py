@@ -0,0 +1,28 @@
+"""
+Eventos de cámara (fotomultas) ya registrados.
+
+Cada evento que envía una cámara trae su propio identificador. La ingesta de
+fotomultas (logic/ingesta_fotomultas.py) guarda aquí ese identificador junto
+con el folio que generó, en la misma transacción que la infracción. Si la
+cámara reenvía el evento (reconexión, reintento, reproceso de un día), ya
+existe y no se crea una segunda multa.
+"""
+
+DESCRIPCION = "Tabla eventos_camara para la ingesta idempotente de fotomultas"
+
+TABLAS = [
+    '''CREATE TABLE IF NOT EXISTS eventos_camara (
+           id_evento TEXT PRIMARY KEY,
+           folio TEXT NOT NULL,
+           registrado_en TEXT NOT NULL
+       ) WITHOUT ROWID''',
+]
+
+
+def subir(cursor):
+    for sentencia in TABLAS:
+        cursor.execute(sentencia)
+
+
+def bajar(cursor):
+    cursor.execute("DROP TABLE IF EXISTS eventos_camara")
@@ -0,0 +1,25 @@
+"""
+Secuencia diaria para los folios de infracciones (logic/folios.py).
+
+Una fila por día con el último número entregado. Cada proceso aparta un bloque
+de números con un solo UPSERT ... RETURNING y los va entregando desde memoria,
+así que la tabla se escribe una vez por bloque y no una vez por multa.
+"""
+
+DESCRIPCION = "Tabla secuencias_folio (último número de folio entregado por día)"
+
+TABLAS = [
+    '''CREATE TABLE IF NOT EXISTS secuencias_folio (
+           dia TEXT PRIMARY KEY,
+           ultimo INTEGER NOT NULL
+       ) WITHOUT ROWID''',
+]
+
+
+def subir(cursor):
+    for sentencia in TABLAS:
+        cursor.execute(sentencia)
+
+
+def bajar(cursor):
+    cursor.execute("DROP TABLE IF EXISTS secuencias_folio")
@@ -0,0 +1,69 @@
+"""
+Multas pendientes por vehículo, guardadas en la propia fila del vehículo.
+
+vehiculos.multas_pendientes y vehiculos.monto_pendiente los mantienen los
+triggers de infracciones (alta, baja y cambio de estado, monto o VIN), en la
+misma transacción que la multa. Así la regla [4.2.vii] de los trámites y el
+reporte 1 leen una fila en lugar de contar multas en cada consulta. Como los
+escritores de SQLite se ejecutan uno a la vez y cada trigger corre dentro de la
+escritura que lo dispara, dos escrituras concurrentes no pueden pisarse el conteo.
+
+El monto se redondea a centavos en cada suma y resta para que no acumule error
+de punto flotante. database/resumenes.py los verifica y reconstruye junto con
+las tablas de resumen (python -m administrar resumenes verificar|reconstruir).
+"""
+
+DESCRIPCION = "Contador y monto de multas pendientes en vehiculos, mantenidos por triggers"
+
+COLUMNAS = [
+    "ALTER TABLE vehiculos ADD COLUMN multas_pendientes INTEGER NOT NULL DEFAULT 0",
+    "ALTER TABLE vehiculos ADD COLUMN monto_pendiente REAL NOT NULL DEFAULT 0",
+]
+
+# Reporte 1: solo los vehículos con pendientes, ya ordenados por cantidad y VIN
+INDICE = '''CREATE INDEX IF NOT EXISTS idx_vehiculos_pendientes
+            ON vehiculos (multas_pendientes, vin) WHERE multas_pendientes > 0'''
+
+# Cálculo directo desde infracciones; lo usan la carga inicial y la reconstrucción
+CONSULTA_PENDIENTES = '''SELECT vin_infractor, COUNT(*) AS total, round(SUM(monto), 2) AS monto
+                         FROM infracciones WHERE estado = 'Pendiente' GROUP BY vin_infractor'''
+
+CARGA_INICIAL = f'''UPDATE vehiculos SET multas_pendientes = p.total, monto_pendiente = p.monto
+                    FROM ({CONSULTA_PENDIENTES}) AS p
+                    WHERE vehiculos.vin = p.vin_infractor'''
+
+_SUMAR = '''UPDATE vehiculos SET multas_pendientes = multas_pendientes + 1,
+                                 monto_pendiente = round(monto_pendiente + NEW.monto, 2)
+            WHERE vin = NEW.vin_infractor AND NEW.estado = 'Pendiente';'''
+_RESTAR = '''UPDATE vehiculos SET multas_pendientes = multas_pendientes - 1,
+                                  monto_pendiente = round(monto_pendiente - OLD.monto, 2)
+             WHERE vin = OLD.vin_infractor AND OLD.estado = 'Pendiente';'''
+
+TRIGGERS = {
+    "trg_pendientes_infracciones_insert":
+        f"AFTER INSERT ON infracciones WHEN NEW.estado = 'Pendiente' BEGIN {_SUMAR} END",
+    "trg_pendientes_infracciones_delete":
+        f"AFTER DELETE ON infracciones WHEN OLD.estado = 'Pendiente' BEGIN {_RESTAR} END",
+    # Pendiente -> Pagada/Cancelada resta, Cancelada -> Pendiente suma; monto o VIN cambiados hacen ambas
+    "trg_pendientes_infracciones_update":
+        f'''AFTER UPDATE OF estado, monto, vin_infractor ON infracciones
+            WHEN OLD.estado = 'Pendiente' OR NEW.estado = 'Pendiente'
+            BEGIN {_RESTAR} {_SUMAR} END''',
+}
+
+
+def subir(cursor):
+    for sentencia in COLUMNAS:
+        cursor.execute(sentencia)
+    cursor.execute(CARGA_INICIAL)
+    cursor.execute(INDICE)
+    for nombre, cuerpo in TRIGGERS.items():
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {nombre} {cuerpo}")
+
+
+def bajar(cursor):
+    for nombre in TRIGGERS:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {nombre}")
+    cursor.execute("DROP INDEX IF EXISTS idx_vehiculos_pendientes")
+    cursor.execute("ALTER TABLE vehiculos DROP COLUMN monto_pendiente")
+    cursor.execute("ALTER TABLE vehiculos DROP COLUMN multas_pendientes")
@@ -0,0 +1,32 @@
+"""
+Bitácora de las corridas que mueven infracciones cerradas a los archivos
+históricos anuales (database/historico.py y logic/gestor_historico.py).
+
+Una fila por corrida y año. Copiar al archivo del año y borrar de la base de
+datos principal son transacciones distintas (cada una en su archivo), así que
+'etapa' anota hasta dónde llegó cada año: si el proceso se interrumpe, la
+siguiente corrida continúa desde ahí sin perder ni duplicar multas.
+"""
+
+DESCRIPCION = "Tabla corridas_historico para el archivado anual de infracciones"
+
+TABLAS = [
+    '''CREATE TABLE IF NOT EXISTS corridas_historico (
+           id_corrida INTEGER NOT NULL,
+           anio TEXT NOT NULL,
+           antes_de TEXT NOT NULL,
+           etapa INTEGER NOT NULL DEFAULT 0,
+           filas INTEGER NOT NULL DEFAULT 0,
+           iniciada_en TEXT NOT NULL,
+           PRIMARY KEY (id_corrida, anio)
+       )''',
+]
+
+
+def subir(cursor):
+    for sentencia in TABLAS:
+        cursor.execute(sentencia)
+
+
+def bajar(cursor):
+    cursor.execute("DROP TABLE IF EXISTS corridas_historico")
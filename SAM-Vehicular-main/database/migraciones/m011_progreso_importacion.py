@@ -0,0 +1,32 @@
+"""
+Punto de control de las importaciones masivas (logic/importador.py).
+
+Una fila por archivo en importación. Se actualiza en la misma transacción que
+inserta cada bloque, así que el avance guardado nunca queda atrás ni adelante
+de lo que realmente se confirmó: si el proceso se interrumpe, la siguiente
+ejecución continúa después del último bloque confirmado sin volver a insertar
+ninguno. bytes_rechazos es hasta dónde es válido el archivo de rechazos.
+"""
+
+DESCRIPCION = "Tabla progreso_importacion para reanudar importaciones sin repetir bloques"
+
+TABLAS = [
+    '''CREATE TABLE IF NOT EXISTS progreso_importacion (
+           archivo TEXT PRIMARY KEY,
+           entidad TEXT NOT NULL,
+           ultimo_registro INTEGER NOT NULL,
+           aceptados INTEGER NOT NULL,
+           rechazados INTEGER NOT NULL,
+           bytes_rechazos INTEGER NOT NULL,
+           actualizado_en TEXT NOT NULL
+       )''',
+]
+
+
+def subir(cursor):
+    for sentencia in TABLAS:
+        cursor.execute(sentencia)
+
+
+def bajar(cursor):
+    cursor.execute("DROP TABLE IF EXISTS progreso_importacion")
@@ -0,0 +1,68 @@
+"""
+Perfil de almacenamiento de infracciones.db.
+
+Se aplica una sola vez a cada conexión que crea el pool. El modo WAL permite
+que un reporte largo siga leyendo mientras los agentes registran multas; el
+resto de los PRAGMA reducen las escrituras a disco y el trabajo de SQLite.
+"""
+
+import threading
+import time
+import sqlite3
+
+# Valores por defecto (se pueden ajustar con configurar_perfil en conexion.py)
+PERFIL_POR_DEFECTO = {
+    "journal_mode": "WAL",        # Lectores y escritor ya no se bloquean entre sí
+    "synchronous": "NORMAL",      # Seguro en WAL; evita un fsync por cada commit
+    "busy_timeout": 5000,         # Milisegundos que se espera un candado antes de fallar
+    "cache_size": -20000,         # Negativo = KiB (≈20 MB de caché por conexión)
+    "mmap_size": 268435456,       # 256 MB de lectura por memoria mapeada
+    "temp_store": "MEMORY",       # Tablas temporales e índices de ORDER BY en RAM
+}
+
+INTERVALO_CHECKPOINT = 60.0  # Segundos entre checkpoints pasivos del WAL
+
+
+class PerfilAlmacenamiento:
+    """
+    Agrupa los PRAGMA de rendimiento y el checkpoint periódico del WAL.
+    El pool llama a aplicar() al crear cada conexión y a despues_de_devolver()
+    cada vez que una conexión regresa.
+    """
+
+    def __init__(self, pragmas=None, intervalo_checkpoint=INTERVALO_CHECKPOINT):
+        self.pragmas = dict(PERFIL_POR_DEFECTO)
+        if pragmas:
+            self.pragmas.update(pragmas)
+        self.intervalo_checkpoint = intervalo_checkpoint
+
+        self._candado = threading.Lock()
+        self._ultimo_checkpoint = time.monotonic()
+        self.checkpoints_realizados = 0
+
+    def aplicar(self, conexion):
+        """Ejecuta los PRAGMA del perfil sobre una conexión recién abierta."""
+        for nombre, valor in self.pragmas.items():
+            if valor is None:
+                continue
+            conexion.execute(f"PRAGMA {nombre} = {valor}")
+
+    def despues_de_devolver(self, conexion):
+        """
+        Si ya pasó el intervalo, ejecuta un checkpoint PASSIVE: copia al archivo
+        principal lo que pueda del WAL sin esperar a lectores ni escritores.
+        """
+        if self.pragmas.get("journal_mode", "").upper() != "WAL" or not self.intervalo_checkpoint:
+            return
+
+        with self._candado:
+            if time.monotonic() - self._ultimo_checkpoint < self.intervalo_checkpoint:
+                return
+            self._ultimo_checkpoint = time.monotonic()
+
+        try:
+            conexion.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
+            self.checkpoints_realizados += 1
+        except sqlite3.Error:
+            # Un checkpoint fallido no es grave: el siguiente lo intentará de nuevo
+            pass
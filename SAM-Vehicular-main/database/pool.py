@@ -0,0 +1,242 @@
+"""
+Pool de conexiones SQLite reutilizables.
+
+Abrir una conexión nueva, configurar row_factory y ejecutar los PRAGMA en cada
+consulta cuesta más que la consulta misma en las búsquedas cortas. El pool
+mantiene un número acotado de conexiones abiertas y las presta a cada hilo
+que las solicita; al "cerrarlas" regresan al pool en lugar de destruirse.
+"""
+
+import sqlite3
+import threading
+import time
+from collections import deque
+
+
+class PoolAgotadoError(Exception):
+    """Se lanza cuando no se libera ninguna conexión dentro del tiempo de espera."""
+
+
+class ConexionPrestada:
+    """
+    Envoltura de una conexión del pool.
+    Se usa igual que una sqlite3.Connection (cursor, execute, commit...), pero
+    close() la devuelve al pool en vez de cerrarla.
+    """
+
+    def __init__(self, pool, conexion):
+        self._pool = pool
+        self._conexion = conexion
+
+    def __getattr__(self, nombre):
+        conexion = self.__dict__.get("_conexion")
+        if conexion is None:
+            raise sqlite3.ProgrammingError("La conexión ya fue devuelta al pool.")
+        return getattr(conexion, nombre)
+
+    def close(self):
+        """Devuelve la conexión al pool. Llamarlo más de una vez no tiene efecto."""
+        if self._conexion is not None:
+            conexion, self._conexion = self._conexion, None
+            self._pool.devolver(conexion)
+
+    def __del__(self):
+        # Red de seguridad: si alguien olvidó cerrarla, no perdemos el lugar en el pool
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo_error, error, traza):
+        # Todo lo que no se haya confirmado con commit() se descarta al devolverla
+        self.close()
+        return False
+
+
+class PoolConexiones:
+    """
+    Pool acotado de conexiones a un mismo archivo SQLite.
+
+    - tamano_maximo: conexiones abiertas como máximo al mismo tiempo.
+    - tiempo_espera: segundos que un hilo espera una conexión libre antes de fallar.
+    - intervalo_verificacion: segundos de inactividad tras los cuales se comprueba
+      que la conexión siga sana antes de prestarla.
+    - configurar_conexion: función que se aplica una sola vez a cada conexión nueva.
+    - al_devolver: función que se llama con cada conexión que regresa al pool.
+    """
+
+    def __init__(self, ruta_db, tamano_maximo=5, tiempo_espera=10.0,
+                 intervalo_verificacion=30.0, configurar_conexion=None, al_devolver=None):
+        if tamano_maximo < 1:
+            raise ValueError("El pool necesita al menos una conexión.")
+
+        self.ruta_db = ruta_db
+        self.tamano_maximo = tamano_maximo
+        self.tiempo_espera = tiempo_espera
+        self.intervalo_verificacion = intervalo_verificacion
+        self._configurar_conexion = configurar_conexion
+        self._al_devolver = al_devolver
+
+        self._candado = threading.Condition()
+        self._libres = deque()  # (conexion, momento_en_que_se_devolvio)
+        self._abiertas = 0
+        self._cerrado = False
+
+        self._metricas = {
+            "prestamos": 0,
+            "prestamos_con_espera": 0,
+            "tiempo_espera_total": 0.0,
+            "tiempo_espera_maximo": 0.0,
+            "tiempos_agotados": 0,
+            "en_uso": 0,
+            "pico_en_uso": 0,
+            "conexiones_creadas": 0,
+            "conexiones_descartadas": 0,
+        }
+
+    # ==========================================
+    # CICLO DE VIDA DE LAS CONEXIONES
+    # ==========================================
+    def _crear_conexion(self):
+        # check_same_thread=False: la conexión puede pasar de un hilo a otro,
+        # pero el pool garantiza que solo un hilo la use a la vez.
+        conexion = sqlite3.connect(self.ruta_db, check_same_thread=False)
+        conexion.row_factory = sqlite3.Row
+        conexion.execute("PRAGMA foreign_keys = 1")
+        if self._configurar_conexion:
+            self._configurar_conexion(conexion)
+        return conexion
+
+    def _esta_sana(self, conexion):
+        try:
+            conexion.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _descartar(self, conexion):
+        try:
+            conexion.close()
+        except sqlite3.Error:
+            pass
+        with self._candado:
+            self._abiertas -= 1
+            self._metricas["conexiones_descartadas"] += 1
+            self._candado.notify()
+
+    def obtener(self, tiempo_espera=None):
+        """Presta una conexión al hilo que la solicita. Bloquea si el pool está saturado."""
+        limite = self.tiempo_espera if tiempo_espera is None else tiempo_espera
+        inicio = time.perf_counter()
+        tuvo_que_esperar = False
+
+        with self._candado:
+            while True:
+                if self._cerrado:
+                    raise PoolAgotadoError("El pool de conexiones está cerrado.")
+                if self._libres:
+                    conexion, devuelta_en = self._libres.pop()  # LIFO: la más reciente está "caliente"
+                    break
+                if self._abiertas < self.tamano_maximo:
+                    conexion, devuelta_en = None, None
+                    self._abiertas += 1
+                    break
+
+                tuvo_que_esperar = True
+                restante = limite - (time.perf_counter() - inicio)
+                if restante <= 0:
+                    self._metricas["tiempos_agotados"] += 1
+                    raise PoolAgotadoError(
+                        f"No hubo conexiones libres en {limite:.1f} s (máximo {self.tamano_maximo})."
+                    )
+                self._candado.wait(restante)
+
+            espera = time.perf_counter() - inicio
+            self._metricas["prestamos"] += 1
+            self._metricas["tiempo_espera_total"] += espera
+            self._metricas["tiempo_espera_maximo"] = max(self._metricas["tiempo_espera_maximo"], espera)
+            if tuvo_que_esperar:
+                self._metricas["prestamos_con_espera"] += 1
+            self._metricas["en_uso"] += 1
+            self._metricas["pico_en_uso"] = max(self._metricas["pico_en_uso"], self._metricas["en_uso"])
+
+        try:
+            if conexion is None:
+                conexion = self._crear_conexion()
+                with self._candado:
+                    self._metricas["conexiones_creadas"] += 1
+            elif time.monotonic() - devuelta_en > self.intervalo_verificacion and not self._esta_sana(conexion):
+                # La conexión quedó inservible (archivo movido, disco lleno...);
+                # la reemplazamos conservando su lugar en el pool
+                try:
+                    conexion.close()
+                except sqlite3.Error:
+                    pass
+                conexion = self._crear_conexion()
+                with self._candado:
+                    self._metricas["conexiones_descartadas"] += 1
+                    self._metricas["conexiones_creadas"] += 1
+        except Exception:
+            with self._candado:
+                self._abiertas -= 1
+                self._metricas["en_uso"] -= 1
+                self._candado.notify()
+            raise
+
+        return ConexionPrestada(self, conexion)
+
+    def devolver(self, conexion):
+        """Recibe una conexión prestada, descarta lo no confirmado y la deja disponible."""
+        try:
+            if conexion.in_transaction:
+                conexion.rollback()
+            if self._al_devolver:
+                self._al_devolver(conexion)
+            sana = True
+        except sqlite3.Error:
+            sana = False
+
+        with self._candado:
+            self._metricas["en_uso"] -= 1
+
+        if not sana or self._cerrado:
+            self._descartar(conexion)
+            return
+
+        with self._candado:
+            self._libres.append((conexion, time.monotonic()))
+            self._candado.notify()
+
+    def cerrar(self):
+        """Cierra las conexiones libres; las prestadas se cierran al devolverse."""
+        with self._candado:
+            self._cerrado = True
+            libres = list(self._libres)
+            self._libres.clear()
+            self._candado.notify_all()
+
+        for conexion, _ in libres:
+            self._descartar(conexion)
+
+    # ==========================================
+    # MÉTRICAS
+    # ==========================================
+    def metricas(self):
+        """
+        Retorna una copia de los contadores del pool, más:
+        - tiempo_espera_promedio: segundos promedio que tardó un préstamo.
+        - saturacion: fracción de préstamos que tuvieron que esperar una conexión libre.
+        """
+        with self._candado:
+            datos = dict(self._metricas)
+            datos["abiertas"] = self._abiertas
+            datos["libres"] = len(self._libres)
+            datos["tamano_maximo"] = self.tamano_maximo
+
+        prestamos = datos["prestamos"]
+        datos["tiempo_espera_promedio"] = datos["tiempo_espera_total"] / prestamos if prestamos else 0.0
+        datos["saturacion"] = datos["prestamos_con_espera"] / prestamos if prestamos else 0.0
+        return datos
@@ -0,0 +1,75 @@
+"""
+Reintentos con espera exponencial cuando la base de datos está ocupada.
+
+Con busy_timeout SQLite ya espera por su cuenta, pero hay casos en los que
+devuelve SQLITE_BUSY de inmediato (por ejemplo, una transacción de lectura
+que intenta escribir después de que otro escritor confirmó en WAL). En esos
+casos lo correcto es repetir la operación completa.
+
+Un pool sin conexiones libres (PoolAgotadoError) también cuenta como base de
+datos ocupada, pero no se reintenta: obtener() ya esperó su tiempo_espera.
+"""
+
+import functools
+import random
+import sqlite3
+import time
+
+from database.pool import PoolAgotadoError
+
+INTENTOS_MAXIMOS = 4
+ESPERA_INICIAL = 0.05   # Segundos antes del primer reintento; se duplica en cada intento
+
+MENSAJE_BD_OCUPADA = "Error: La base de datos está ocupada por otra operación. Intente nuevamente en unos segundos."
+
+
+def es_error_de_bloqueo(error):
+    """True si la excepción corresponde a SQLITE_BUSY / SQLITE_LOCKED o a un pool agotado."""
+    if isinstance(error, PoolAgotadoError):
+        return True
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    texto = str(error).lower()
+    return "locked" in texto or "busy" in texto
+
+
+def propagar_si_ocupada(error):
+    """
+    Para usar dentro de un 'except Exception' de los gestores: deja pasar el
+    error de bloqueo hacia @reintentar_si_ocupada en lugar de convertirlo en mensaje.
+    """
+    if es_error_de_bloqueo(error):
+        raise error
+
+
+def reintentar_si_ocupada(funcion=None, *, resultado_ocupada=(False, MENSAJE_BD_OCUPADA)):
+    """
+    Decorador para los métodos de escritura de los gestores.
+    Repite la operación si la base de datos está ocupada y, si se agotan los
+    intentos o el pool no tiene conexiones libres, respeta el contrato de los
+    gestores devolviendo (False, mensaje).
+    Los métodos que retornan otra forma indican la suya:
+
+        @reintentar_si_ocupada(resultado_ocupada=(False, None, MENSAJE_BD_OCUPADA, False))
+    """
+    if funcion is None:
+        return functools.partial(reintentar_si_ocupada, resultado_ocupada=resultado_ocupada)
+
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        espera = ESPERA_INICIAL
+        for intento in range(1, INTENTOS_MAXIMOS + 1):
+            try:
+                return funcion(*args, **kwargs)
+            except PoolAgotadoError:
+                return resultado_ocupada
+            except sqlite3.OperationalError as e:
+                if not es_error_de_bloqueo(e):
+                    raise
+                if intento == INTENTOS_MAXIMOS:
+                    return resultado_ocupada
+                # Un poco de azar evita que dos escritores reintenten al mismo tiempo
+                time.sleep(espera * (1 + random.random()))
+                espera *= 2
+
+    return envoltura
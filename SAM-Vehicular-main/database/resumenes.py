@@ -0,0 +1,95 @@
+"""
+Mantenimiento de las tablas de resumen de reportes (migración 002) y de los
+contadores de multas pendientes de cada vehículo (migración 009).
+
+Los triggers mantienen los resúmenes al día en cada escritura; este módulo
+sirve para revisar que sigan cuadrando con las tablas base y para
+reconstruirlos si alguna vez se desalinean (por ejemplo, tras editar la base
+de datos con los triggers desactivados):
+
+    python -m administrar resumenes verificar
+    python -m administrar resumenes reconstruir
+
+Las multas que se movieron a los archivos históricos anuales siguen contando en
+los resúmenes de infracciones, así que esos se calculan sobre la vista
+infracciones_historico (database/historico.py).
+"""
+
+from database.historico import adjuntar_archivos
+from database.migraciones.m009_pendientes_vehiculo import CARGA_INICIAL as CARGA_PENDIENTES, CONSULTA_PENDIENTES
+
+# (tabla de resumen, columna llave, columnas de valor, consulta que calcula el valor real)
+RESUMENES = [
+    ("resumen_infracciones_estado", "estado", ("total", "monto"),
+     "SELECT estado, COUNT(*), COALESCE(SUM(monto), 0) FROM infracciones_historico GROUP BY estado"),
+    ("resumen_infracciones_agente", "id_agente", ("total",),
+     "SELECT id_agente, COUNT(*) FROM infracciones_historico GROUP BY id_agente"),
+    ("resumen_vehiculos_estado_legal", "estado_legal", ("total",),
+     "SELECT estado_legal, COUNT(*) FROM vehiculos GROUP BY estado_legal"),
+    ("resumen_vehiculos_propietario", "id_propietario", ("total",),
+     "SELECT id_propietario, COUNT(*) FROM vehiculos GROUP BY id_propietario"),
+]
+
+# Los montos se acumulan sumando y restando flotantes; se tolera el error de redondeo
+TOLERANCIA_MONTO = 0.005
+
+
+def reconstruir_resumenes(conexion):
+    """
+    Vuelve a calcular todos los resúmenes desde las tablas base en una sola transacción.
+    Retorna {tabla: filas escritas}.
+    """
+    filas = {}
+    adjuntar_archivos(conexion)
+    cursor = conexion.cursor()
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        for tabla, llave, valores, consulta in RESUMENES:
+            cursor.execute(f"DELETE FROM {tabla}")
+            cursor.execute(f"INSERT INTO {tabla} ({llave}, {', '.join(valores)}) {consulta}")
+            filas[tabla] = cursor.rowcount
+        cursor.execute("UPDATE vehiculos SET multas_pendientes = 0, monto_pendiente = 0 "
+                       "WHERE multas_pendientes != 0 OR monto_pendiente != 0")
+        cursor.execute(CARGA_PENDIENTES)
+        filas["vehiculos (multas pendientes)"] = cursor.rowcount
+        conexion.commit()
+    except Exception:
+        conexion.rollback()
+        raise
+    return filas
+
+
+def _iguales(esperado, actual):
+    return all(abs((e or 0) - (a or 0)) <= TOLERANCIA_MONTO for e, a in zip(esperado, actual))
+
+
+def verificar_resumenes(conexion):
+    """
+    Compara cada resumen con el cálculo directo sobre las tablas base.
+    Retorna [(tabla, llave, esperado, guardado)] con las diferencias; vacía si todo cuadra.
+    Los grupos que quedaron en cero se consideran equivalentes a no tener fila.
+    """
+    diferencias = []
+    adjuntar_archivos(conexion)
+    for tabla, llave, valores, consulta in RESUMENES:
+        esperados = {fila[0]: tuple(fila[1:]) for fila in conexion.execute(consulta)}
+        guardados = {fila[0]: tuple(fila[1:]) for fila in
+                     conexion.execute(f"SELECT {llave}, {', '.join(valores)} FROM {tabla} WHERE total != 0")}
+
+        for clave in esperados.keys() | guardados.keys():
+            esperado = esperados.get(clave, (0,) * len(valores))
+            guardado = guardados.get(clave, (0,) * len(valores))
+            if not _iguales(esperado, guardado):
+                diferencias.append((tabla, clave, esperado, guardado))
+    return diferencias + _verificar_pendientes(conexion)
+
+
+def _verificar_pendientes(conexion):
+    """Mismo formato que verificar_resumenes para vehiculos.multas_pendientes / monto_pendiente."""
+    esperados = {fila[0]: tuple(fila[1:]) for fila in conexion.execute(CONSULTA_PENDIENTES)}
+    guardados = {fila[0]: tuple(fila[1:]) for fila in conexion.execute(
+        "SELECT vin, multas_pendientes, monto_pendiente FROM vehiculos "
+        "WHERE multas_pendientes != 0 OR monto_pendiente != 0")}
+    return [("vehiculos (multas pendientes)", vin, esperados.get(vin, (0, 0)), guardados.get(vin, (0, 0)))
+            for vin in esperados.keys() | guardados.keys()
+            if not _iguales(esperados.get(vin, (0, 0)), guardados.get(vin, (0, 0)))]
@@ -0,0 +1,165 @@
+"""
+Verificación de planes de ejecución (EXPLAIN QUERY PLAN).
+
+Revisa que cada consulta de los gestores y reportes se resuelva con un índice
+y no recorriendo la tabla completa. Se ejecuta sobre una base de datos
+temporal creada con el esquema y las migraciones actuales:
+
+    python -m database.verificar_planes
+
+Termina con código 1 si alguna consulta hace un SCAN sin índice, para que
+sirva como prueba de regresión cuando se cambie una consulta o un índice.
+"""
+
+import os
+import re
+import sys
+import tempfile
+
+# Permite ejecutar el módulo desde la raíz del proyecto
+ruta_raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ruta_raiz not in sys.path:
+    sys.path.append(ruta_raiz)
+
+# (nombre, consulta, parámetros, alias a los que se les permite un SCAN completo)
+CONSULTAS = [
+    ("GestorVehiculos.registrar_vehiculo (propietario)",
+     "SELECT id_propietario FROM propietarios WHERE id_propietario = ?", (1,), ()),
+    ("GestorVehiculos.buscar_vehiculo_universal (VIN)",
+     "SELECT vin, placa, marca, modelo, anio, color, clase, estado_legal, procedencia, id_propietario "
+     "FROM vehiculos WHERE vin = ?", ("X",), ()),
+    ("GestorVehiculos.buscar_vehiculo_universal (placa)",
+     "SELECT vin, placa, marca, modelo, anio, color, clase, estado_legal, procedencia, id_propietario "
+     "FROM vehiculos WHERE placa = ?", ("X",), ()),
+    ("GestorVehiculos.modificar_vehiculo (pendientes)",
+     "SELECT multas_pendientes FROM vehiculos WHERE vin = ?", ("X",), ()),
+    ("GestorVehiculos.modificar_vehiculo (placa)",
+     "SELECT vin FROM vehiculos WHERE placa = ? AND vin != ? AND estado_legal = 'Activo'", ("X", "X"), ()),
+    ("GestorVehiculos.actualizar_vehiculo",
+     "UPDATE vehiculos SET color = ?, estado_legal = ? WHERE vin = ?", ("X", "X", "X"), ()),
+    ("GestorVehiculos.tiene_multas_pendientes",
+     "SELECT multas_pendientes FROM vehiculos WHERE vin = ?", ("X",), ()),
+    ("GestorVehiculos.realizar_reemplacamiento",
+     "UPDATE vehiculos SET placa = ? WHERE vin = ? AND multas_pendientes = 0", ("X", "X"), ()),
+    ("GestorVehiculos.transferir_propiedad",
+     "UPDATE vehiculos SET id_propietario = ? WHERE vin = ? AND multas_pendientes = 0 "
+     "AND EXISTS (SELECT 1 FROM propietarios WHERE id_propietario = ? AND estado = 'Activo')", (1, "X", 1), ()),
+    ("GestorPropietarios.modificar_propietario (vehículos activos)",
+     "SELECT COUNT(*) FROM vehiculos WHERE id_propietario = ? AND estado_legal = 'Activo'", (1,), ()),
+    ("GestorPropietarios.buscar_propietario_por_curp",
+     "SELECT id_propietario, nombre_completo, curp FROM propietarios WHERE curp = ?", ("X",), ()),
+    ("GestorInfracciones.registrar_infraccion (vehículo)",
+     "SELECT vin FROM vehiculos WHERE vin = ?", ("X",), ()),
+    ("GestorInfracciones.registrar_infraccion (agente)",
+     "SELECT estado FROM agentes WHERE id_agente = ?", (1,), ()),
+    ("GestorInfracciones.cambiar_estado_infraccion",
+     "SELECT estado FROM infracciones WHERE folio = ?", ("X",), ()),
+    ("GestorBusqueda.buscar_vehiculos (índice)",
+     "SELECT vin, placa, vin FROM busqueda_vehiculos WHERE busqueda_vehiculos MATCH ? LIMIT ?", ('"YUC-12"', 501), ()),
+    ("GestorBusqueda.buscar_vehiculos (vehículos)",
+     "SELECT v.vin, v.placa, v.marca, v.modelo, v.anio, v.color, v.estado_legal, v.id_propietario, p.nombre_completo "
+     "FROM vehiculos v JOIN propietarios p ON p.id_propietario = v.id_propietario WHERE v.vin IN (?, ?)",
+     ("X", "Y"), ()),
+    ("GestorBusqueda.buscar_propietarios (índice)",
+     "SELECT rowid, nombre_completo, curp FROM busqueda_propietarios WHERE busqueda_propietarios MATCH ? LIMIT ?",
+     ('"gonz"*', 501), ()),
+    ("GestorBusqueda.buscar_propietarios (propietarios)",
+     "SELECT id_propietario, nombre_completo, curp, estado_licencia, estado FROM propietarios "
+     "WHERE id_propietario IN (?, ?)", (1, 2), ()),
+    ("GestorAuditoria.historial (primera página)",
+     "SELECT id_evento, momento, accion, cambios FROM auditoria WHERE entidad = ? AND id_entidad = ? "
+     "ORDER BY momento DESC, id_evento DESC LIMIT ?", ("vehiculo", "X", 51), ()),
+    ("GestorAuditoria.historial (página siguiente)",
+     "SELECT id_evento, momento, accion, cambios FROM auditoria WHERE entidad = ? AND id_entidad = ? "
+     "AND momento <= ? AND (momento, id_evento) < (?, ?) ORDER BY momento DESC, id_evento DESC LIMIT ?",
+     ("vehiculo", "X", "2025-01-01", "2025-01-01", 1, 51), ()),
+    ("IngestaFotomultas (eventos ya registrados)",
+     "SELECT id_evento, folio FROM eventos_camara WHERE id_evento IN (?, ?)", ("X", "Y"), ()),
+    ("folios._apartar_bloque",
+     "INSERT INTO secuencias_folio (dia, ultimo) VALUES (?, ?) "
+     "ON CONFLICT (dia) DO UPDATE SET ultimo = ultimo + excluded.ultimo RETURNING ultimo", ("20260101", 100), ()),
+    ("Auth.autenticar_usuario",
+     "SELECT id_usuario, nombre_usuario, rol, estado, debe_cambiar_password, password FROM usuarios "
+     "WHERE nombre_usuario = ?", ("X",), ()),
+]
+
+# Los reportes se arman desde logic.gestor_reportes para revisar exactamente lo
+# que ejecuta la interfaz: el reporte completo y una página posterior a la primera.
+# Solo se permite el SCAN de tablas con una fila por grupo: agentes (pocas filas,
+# el JOIN hacia su resumen usa la llave primaria) y las tablas de resumen.
+_SCANS_REPORTES = {3: ("a",), 4: ("resumen_vehiculos_estado_legal",)}
+_PARAMETROS_REPORTES = {2: ("2026-01-01", "2026-12-31")}
+
+
+def consultas_reportes():
+    """Entradas con el mismo formato que CONSULTAS para cada reporte de GestorReportes."""
+    from logic.gestor_reportes import GestorReportes, REPORTES
+
+    consultas = []
+    for reporte_id, definicion in REPORTES.items():
+        parametros = _PARAMETROS_REPORTES.get(reporte_id, ())
+        permitidos = _SCANS_REPORTES.get(reporte_id, ())
+        cursor = tuple("X" for _ in definicion["orden"])
+        consultas.append((f"GestorReportes reporte {reporte_id}",
+                          GestorReportes.consulta_ordenada(reporte_id), parametros, permitidos))
+        consultas.append((f"GestorReportes reporte {reporte_id} (página siguiente)",
+                          GestorReportes.consulta_pagina(reporte_id, True),
+                          parametros + GestorReportes._parametros_cursor(cursor) + (200,), permitidos))
+    return consultas
+
+
+# "SCAN tabla" sin "USING ... INDEX" significa recorrer la tabla completa. En una
+# tabla FTS5, "VIRTUAL TABLE INDEX n:M..." es una consulta MATCH resuelta con el índice.
+_PATRON_SCAN = re.compile(r"^SCAN (\w+)(?!\w| USING| VIRTUAL TABLE INDEX \d+:M)")
+
+
+def revisar_consulta(conexion, consulta, parametros, scans_permitidos=()):
+    """Retorna la lista de tablas (alias) que la consulta recorre sin índice."""
+    plan = conexion.execute(f"EXPLAIN QUERY PLAN {consulta}", parametros).fetchall()
+    recorridos = []
+    for fila in plan:
+        coincidencia = _PATRON_SCAN.match(fila[3])
+        if coincidencia and coincidencia.group(1) not in scans_permitidos:
+            recorridos.append(fila[3])
+    return recorridos
+
+
+def verificar_planes(conexion):
+    """Revisa CONSULTAS y las de los reportes. Retorna [(nombre, [detalles del SCAN])] de las que fallan."""
+    fallas = []
+    for nombre, consulta, parametros, permitidos in CONSULTAS + consultas_reportes():
+        recorridos = revisar_consulta(conexion, consulta, parametros, permitidos)
+        if recorridos:
+            fallas.append((nombre, recorridos))
+    return fallas
+
+
+def main():
+    from database import conexion as db, historico
+    from database.inicializar_db import crear_tablas
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        db.configurar_pool(ruta_db=os.path.join(carpeta, "planes.db"))
+        try:
+            crear_tablas()
+            with db.conexion_db() as conexion:
+                # Un archivo histórico vacío para revisar el reporte 2 sobre la vista con archivos
+                historico.abrir_archivo(conexion, 2025)
+                historico.adjuntar_archivos(conexion)
+                fallas = verificar_planes(conexion)
+        finally:
+            db.cerrar_pool()
+
+    if not fallas:
+        print(f"OK: las {len(CONSULTAS) + len(consultas_reportes())} consultas usan índices.")
+        return 0
+
+    for nombre, recorridos in fallas:
+        print(f"FALLA {nombre}:")
+        for detalle in recorridos:
+            print(f"    {detalle}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
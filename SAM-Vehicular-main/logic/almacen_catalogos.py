@@ -0,0 +1,181 @@
+"""
+Catálogos administrables (marcas, modelos, clases, colores y tipos de infracción)
+leídos de la base de datos, con caché en memoria.
+
+    catalogos = almacen_catalogos.catalogos()
+    ("Nissan", "Versa", "Sedán") in catalogos.marca_modelo_clase
+
+- catalogos() entrega un CatalogosEditables ya compilado (ver logic/indice_catalogos.py),
+  así que validar sigue siendo una búsqueda en memoria, sin consultas.
+- La caché se usa tal cual durante TTL_SEGUNDOS. Al vencer, se lee solo el sello
+  de catalogo_version (una fila); si no cambió se sigue usando, y si cambió se
+  recargan los catálogos. Los triggers de la migración 004 incrementan el sello con
+  cualquier cambio, así que un valor agregado desde otro equipo se ve a más tardar
+  en TTL_SEGUNDOS, y uno agregado desde este proceso, de inmediato.
+- Si la base de datos todavía no tiene las tablas, se usan los valores de logic/catalogos.py.
+"""
+
+import sqlite3
+import threading
+import time
+
+from database.conexion import conexion_db, obtener_conexion
+from database.reintentos import reintentar_si_ocupada, propagar_si_ocupada
+from logic.indice_catalogos import CatalogosEditables
+
+TTL_SEGUNDOS = 30
+
+_candado = threading.Lock()
+_actuales = None            # CatalogosEditables en uso
+_verificado_en = 0.0        # time.monotonic() de la última verificación del sello
+
+
+def catalogos():
+    """Catálogos vigentes. Solo consulta la base de datos si venció la caché."""
+    actuales = _actuales
+    if actuales is not None and time.monotonic() - _verificado_en < TTL_SEGUNDOS:
+        return actuales
+    with _candado:
+        # Otro hilo pudo haberla refrescado mientras esperábamos el candado
+        if _actuales is None or time.monotonic() - _verificado_en >= TTL_SEGUNDOS:
+            _refrescar()
+        return _actuales
+
+
+def invalidar():
+    """Obliga a verificar el sello de versión en la siguiente llamada a catalogos()."""
+    global _verificado_en
+    _verificado_en = 0.0
+
+
+def _refrescar():
+    global _actuales, _verificado_en
+    try:
+        with conexion_db() as conexion:
+            version = conexion.execute("SELECT version FROM catalogo_version WHERE id = 1").fetchone()[0]
+            if _actuales is None or _actuales.version != version:
+                _actuales = _cargar(conexion, version)
+    except sqlite3.OperationalError as e:
+        if "no such table" not in str(e).lower() or _actuales is not None:
+            raise
+        # Base de datos sin la migración 004: los valores de catalogos.py
+        _actuales = CatalogosEditables.desde_catalogos()
+    _verificado_en = time.monotonic()
+
+
+def _cargar(conexion, version):
+    def nombres(tabla, llave):
+        return [fila[0] for fila in conexion.execute(f"SELECT nombre FROM {tabla} ORDER BY {llave}")]
+
+    marcas_modelos = {marca: {} for marca in nombres("catalogo_marcas", "id_marca")}
+    for marca, modelo, clase in conexion.execute('''
+        SELECT ma.nombre, mo.nombre, cl.nombre
+        FROM catalogo_modelos mo
+        JOIN catalogo_marcas ma ON ma.id_marca = mo.id_marca
+        LEFT JOIN catalogo_modelo_clase mc ON mc.id_modelo = mo.id_modelo
+        LEFT JOIN catalogo_clases cl ON cl.id_clase = mc.id_clase
+        ORDER BY ma.id_marca, mo.id_modelo, cl.id_clase
+    '''):
+        clases = marcas_modelos[marca].setdefault(modelo, [])
+        if clase is not None:
+            clases.append(clase)
+
+    return CatalogosEditables(marcas_modelos, nombres("catalogo_clases", "id_clase"),
+                              nombres("catalogo_colores", "id_color"),
+                              nombres("catalogo_tipos_infraccion", "id_tipo"), version=version)
+
+
+# ==========================================
+# ALTAS EN LOS CATÁLOGOS
+# ==========================================
+
+def _texto_valido(valor, descripcion):
+    if not isinstance(valor, str) or not valor.strip():
+        return False, f"El nombre de {descripcion} no puede quedar vacío."
+    return True, ""
+
+
+@reintentar_si_ocupada
+def _insertar_nombre(tabla, nombre, descripcion):
+    valido, msj = _texto_valido(nombre, descripcion)
+    if not valido:
+        return False, msj
+    nombre = nombre.strip()
+    conexion = obtener_conexion()
+    try:
+        conexion.execute(f"INSERT INTO {tabla} (nombre) VALUES (?)", (nombre,))
+        conexion.commit()
+        return True, f"Se agregó {descripcion} '{nombre}'."
+    except sqlite3.IntegrityError:
+        return False, f"Error: {descripcion.capitalize()} '{nombre}' ya existe en el catálogo."
+    except Exception as e:
+        propagar_si_ocupada(e)
+        return False, f"Error en la base de datos: {e}"
+    finally:
+        conexion.close()
+        invalidar()
+
+
+def agregar_marca(marca):
+    return _insertar_nombre("catalogo_marcas", marca, "la marca")
+
+
+def agregar_clase(clase):
+    return _insertar_nombre("catalogo_clases", clase, "la clase")
+
+
+def agregar_color(color):
+    return _insertar_nombre("catalogo_colores", color, "el color")
+
+
+def agregar_tipo_infraccion(tipo):
+    return _insertar_nombre("catalogo_tipos_infraccion", tipo, "el tipo de infracción")
+
+
+@reintentar_si_ocupada
+def agregar_modelo(marca, modelo, clases):
+    """
+    Agrega un modelo a una marca existente con las clases en que se fabrica
+    (todas deben existir en el catálogo de clases). Si el modelo ya existe,
+    solo le agrega las clases que le falten.
+    """
+    valido, msj = _texto_valido(modelo, "el modelo")
+    if not valido:
+        return False, msj
+    modelo = modelo.strip()
+    clases = [clase.strip() for clase in clases if isinstance(clase, str) and clase.strip()]
+    if not clases:
+        return False, "Indique al menos una clase para el modelo."
+
+    conexion = obtener_conexion()
+    cursor = conexion.cursor()
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        fila = cursor.execute("SELECT id_marca FROM catalogo_marcas WHERE nombre = ?", (marca,)).fetchone()
+        if not fila:
+            conexion.rollback()
+            return False, f"Error: La marca '{marca}' no está en el catálogo. Agréguela primero."
+        id_marca = fila[0]
+
+        ids_clases = dict(cursor.execute(
+            f"SELECT nombre, id_clase FROM catalogo_clases WHERE nombre IN ({', '.join('?' * len(clases))})",
+            clases).fetchall())
+        faltantes = [clase for clase in clases if clase not in ids_clases]
+        if faltantes:
+            conexion.rollback()
+            return False, f"Error: Las clases {', '.join(faltantes)} no están en el catálogo."
+
+        cursor.execute("INSERT OR IGNORE INTO catalogo_modelos (id_marca, nombre) VALUES (?, ?)", (id_marca, modelo))
+        id_modelo = cursor.execute("SELECT id_modelo FROM catalogo_modelos WHERE id_marca = ? AND nombre = ?",
+                                   (id_marca, modelo)).fetchone()[0]
+        cursor.executemany("INSERT OR IGNORE INTO catalogo_modelo_clase (id_modelo, id_clase) VALUES (?, ?)",
+                           ((id_modelo, ids_clases[clase]) for clase in clases))
+        conexion.commit()
+        return True, f"Modelo '{modelo}' de {marca} registrado como: {', '.join(clases)}."
+    except Exception as e:
+        conexion.rollback()
+        propagar_si_ocupada(e)
+        return False, f"Error en la base de datos: {e}"
+    finally:
+        conexion.close()
+        invalidar()
@@ -1,20 +1,154 @@
 import sqlite3
+import base64
 import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict
 from database.conexion import obtener_conexion
+from database.reintentos import reintentar_si_ocupada, propagar_si_ocupada, MENSAJE_BD_OCUPADA
+from logic.sesion import requiere_capacidad, ADMINISTRAR_USUARIOS
 from models.usuario import Usuario
 import logic.catalogos as cat
 
+# ==========================================
+# HASH DE CONTRASEÑAS (scrypt)
+# ==========================================
+# Formato guardado en usuarios.password: "scrypt$n$r$p$sal$hash" (sal y hash en base64).
+# Las cuentas anteriores tienen SHA-256 sin sal (64 caracteres hexadecimales); se
+# vuelven a hashear con scrypt la primera vez que el usuario inicia sesión.
+# Costo: n = 2**15, r = 8 usa 32 MB y tarda ~0.1 s por intento (ver
+# benchmarks/benchmark_login.py). Si se cambia con configurar_hash, las cuentas
+# con otro costo se actualizan también al iniciar sesión.
+COSTO_SCRYPT = {"n": 2 ** 15, "r": 8, "p": 1}
+BYTES_SAL = 16
+BYTES_HASH = 32
+
+# Intentos fallidos: tras MAXIMO_INTENTOS dentro de VENTANA_INTENTOS segundos, la
+# cuenta se rechaza sin calcular el hash durante SEGUNDOS_BLOQUEO. Se rastrean a lo
+# más MAXIMO_RASTREADOS nombres de usuario (los más antiguos se olvidan primero).
+MAXIMO_INTENTOS = 5
+VENTANA_INTENTOS = 15 * 60
+SEGUNDOS_BLOQUEO = 5 * 60
+MAXIMO_RASTREADOS = 1000
+
+
+def configurar_hash(n=None, r=None, p=None):
+    """Cambia el costo de scrypt de los hashes nuevos (n debe ser potencia de 2)."""
+    if n is not None:
+        if n < 2 or n & (n - 1):
+            raise ValueError("n debe ser una potencia de 2 mayor que 1.")
+        COSTO_SCRYPT["n"] = n
+    if r is not None:
+        COSTO_SCRYPT["r"] = r
+    if p is not None:
+        COSTO_SCRYPT["p"] = p
+
+
+def _scrypt(password, sal, n, r, p):
+    # maxmem: scrypt necesita 128 * n * r bytes; el límite de OpenSSL por defecto es 32 MB
+    return hashlib.scrypt(password.encode('utf-8'), salt=sal, n=n, r=r, p=p,
+                          maxmem=128 * n * r * (p + 1) + 1024 * 1024, dklen=BYTES_HASH)
+
+
+def _b64(datos):
+    return base64.b64encode(datos).decode('ascii')
+
+
+def _es_hash_anterior(guardado):
+    return len(guardado) == 64 and "$" not in guardado
+
+
+def _verificar_password(password, guardado):
+    """
+    Compara la contraseña con el hash guardado (scrypt o SHA-256 anterior) en tiempo
+    constante. Retorna (coincide, necesita_rehash).
+    """
+    if _es_hash_anterior(guardado):
+        calculado = hashlib.sha256(password.encode('utf-8')).hexdigest()
+        return hmac.compare_digest(calculado, guardado), True
+    try:
+        esquema, n, r, p, sal, esperado = guardado.split("$")
+        n, r, p = int(n), int(r), int(p)
+        sal, esperado = base64.b64decode(sal), base64.b64decode(esperado)
+    except ValueError:
+        return False, False
+    if esquema != "scrypt":
+        return False, False
+    coincide = hmac.compare_digest(_scrypt(password, sal, n, r, p), esperado)
+    return coincide, (n, r, p) != (COSTO_SCRYPT["n"], COSTO_SCRYPT["r"], COSTO_SCRYPT["p"])
+
+
+class RegistroIntentos:
+    """
+    Intentos fallidos recientes por nombre de usuario, en memoria y con tamaño
+    acotado (OrderedDict usado como LRU). Seguro entre hilos: el login corre
+    fuera del hilo de la interfaz.
+    """
+
+    def __init__(self, maximo_intentos=MAXIMO_INTENTOS, ventana=VENTANA_INTENTOS,
+                 segundos_bloqueo=SEGUNDOS_BLOQUEO, maximo_rastreados=MAXIMO_RASTREADOS, reloj=time.monotonic):
+        self.maximo_intentos = maximo_intentos
+        self.ventana = ventana
+        self.segundos_bloqueo = segundos_bloqueo
+        self.maximo_rastreados = maximo_rastreados
+        self._reloj = reloj
+        self._intentos = OrderedDict()     # usuario -> [primer_fallo, fallos, bloqueado_hasta]
+        self._candado = threading.Lock()
+
+    def segundos_restantes(self, nombre_usuario):
+        """Segundos que le quedan de bloqueo al usuario (0 si puede intentar)."""
+        with self._candado:
+            registro = self._intentos.get(nombre_usuario)
+            if registro is None:
+                return 0
+            return max(0, registro[2] - self._reloj())
+
+    def registrar_fallo(self, nombre_usuario):
+        ahora = self._reloj()
+        with self._candado:
+            registro = self._intentos.pop(nombre_usuario, None)
+            if registro is None or ahora - registro[0] > self.ventana:
+                registro = [ahora, 0, 0]
+            registro[1] += 1
+            if registro[1] >= self.maximo_intentos:
+                registro = [ahora, 0, ahora + self.segundos_bloqueo]
+            self._intentos[nombre_usuario] = registro
+            while len(self._intentos) > self.maximo_rastreados:
+                self._intentos.popitem(last=False)
+
+    def limpiar(self, nombre_usuario=None):
+        """Olvida los fallos de un usuario (al iniciar sesión con éxito) o de todos."""
+        with self._candado:
+            if nombre_usuario is None:
+                self._intentos.clear()
+            else:
+                self._intentos.pop(nombre_usuario, None)
+
+
+intentos_fallidos = RegistroIntentos()
+
+# Hash contra el que se compara cuando el usuario no existe, para que la respuesta
+# tarde lo mismo y no revele qué nombres de usuario están registrados
+_HASH_SIN_USUARIO = None
+
+
 class Auth:
     
     @staticmethod
     def _hashear_password(password: str) -> str:
         """
-        Método privado para encriptar la contraseña usando SHA-256.
+        Método privado para encriptar la contraseña con scrypt y una sal aleatoria.
         Garantiza que las contraseñas no se guarden en texto plano.
         """
-        return hashlib.sha256(password.encode('utf-8')).hexdigest()
+        n, r, p = COSTO_SCRYPT["n"], COSTO_SCRYPT["r"], COSTO_SCRYPT["p"]
+        sal = os.urandom(BYTES_SAL)
+        return f"scrypt${n}${r}${p}${_b64(sal)}${_b64(_scrypt(password, sal, n, r, p))}"
 
     @staticmethod
+    @requiere_capacidad(ADMINISTRAR_USUARIOS)
+    @reintentar_si_ocupada
     def registrar_usuario(usuario):
         """
         Registra un nuevo usuario en el sistema.
@@ -49,42 +183,70 @@ class Auth:
         except sqlite3.IntegrityError:
             return False, "Error: El nombre de usuario ya está en uso. Elija uno diferente."
         except Exception as e:
+            propagar_si_ocupada(e)
             return False, f"Error inesperado al registrar usuario: {str(e)}"
         finally:
             conexion.close()
 
     @staticmethod
+    @reintentar_si_ocupada(resultado_ocupada=(False, None, MENSAJE_BD_OCUPADA, False))
     def autenticar_usuario(nombre_usuario, password_plana):
         """
         Verifica las credenciales de inicio de sesión.
-        Retorna una tupla: (es_valido: bool, objeto_usuario: Usuario o None, mensaje: str)
+        Tarda lo que tarda scrypt (~0.1 s): desde la interfaz se llama en segundo plano.
+        Retorna una tupla: (es_valido: bool, objeto_usuario: Usuario o None, mensaje: str, debe_cambiar: bool)
         """
+        global _HASH_SIN_USUARIO
         if not nombre_usuario or not password_plana:
-            return False, None, "Error: Debe ingresar usuario y contraseña."
+            return False, None, "Error: Debe ingresar usuario y contraseña.", False
 
-        password_hash = Auth._hashear_password(password_plana)
+        restantes = intentos_fallidos.segundos_restantes(nombre_usuario)
+        if restantes:
+            minutos = int(restantes // 60) + 1
+            return False, None, f"Error: Demasiados intentos fallidos. Intente de nuevo en {minutos} min.", False
 
         conexion = obtener_conexion()
         cursor = conexion.cursor()
 
         try:
-            # Buscamos al usuario por nombre y contraseña encriptada
+            # Buscamos al usuario solo por nombre; la contraseña se verifica con su propia sal
             cursor.execute('''
-                SELECT id_usuario, nombre_usuario, rol, estado, debe_cambiar_password 
+                SELECT id_usuario, nombre_usuario, rol, estado, debe_cambiar_password, password
                 FROM usuarios 
-                WHERE nombre_usuario = ? AND password = ?
-            ''', (nombre_usuario, password_hash))
+                WHERE nombre_usuario = ?
+            ''', (nombre_usuario,))
             
             resultado = cursor.fetchone()
 
             if not resultado:
+                if _HASH_SIN_USUARIO is None:
+                    _HASH_SIN_USUARIO = Auth._hashear_password(os.urandom(8).hex())
+                _verificar_password(password_plana, _HASH_SIN_USUARIO)
+                intentos_fallidos.registrar_fallo(nombre_usuario)
                 return False, None, "Error: Credenciales incorrectas.", False
 
-            id_usuario, nombre_db, rol_db, estado_db, debe_cambiar = resultado
+            id_usuario, nombre_db, rol_db, estado_db, debe_cambiar, guardado = resultado
+
+            coincide, necesita_rehash = _verificar_password(password_plana, guardado)
+            if not coincide:
+                intentos_fallidos.registrar_fallo(nombre_usuario)
+                return False, None, "Error: Credenciales incorrectas.", False
+            intentos_fallidos.limpiar(nombre_usuario)
 
             if estado_db != "Activo":
                 return False, None, "Error: Su cuenta está inactiva.", False
 
+            if necesita_rehash:
+                # Hash anterior (SHA-256) o de otro costo: se reemplaza ahora que se conoce la contraseña.
+                # La condición sobre el hash viejo evita pisar un cambio de contraseña simultáneo.
+                try:
+                    cursor.execute("UPDATE usuarios SET password = ? WHERE id_usuario = ? AND password = ?",
+                                   (Auth._hashear_password(password_plana), id_usuario, guardado))
+                    conexion.commit()
+                except sqlite3.OperationalError:
+                    # Si la base de datos está ocupada se intentará en el siguiente inicio de sesión
+                    conexion.rollback()
+
             usuario_autenticado = Usuario(
                 id_usuario=id_usuario, nombre_usuario=nombre_db, 
                 password="***", rol=rol_db, estado=estado_db
@@ -94,11 +256,13 @@ class Auth:
             return True, usuario_autenticado, f"Bienvenido, {nombre_db}.", bool(debe_cambiar)
 
         except Exception as e:
-            return False, None, f"Error inesperado al intentar iniciar sesión: {str(e)}"
+            propagar_si_ocupada(e)
+            return False, None, f"Error inesperado al intentar iniciar sesión: {str(e)}", False
         finally:
             conexion.close()
             
     @staticmethod
+    @reintentar_si_ocupada
     def cambiar_password_obligatorio(id_usuario, nueva_password):
         """Sobrescribe la contraseña temporal y quita la bandera de cambio."""
         if len(nueva_password) < 6:
@@ -117,6 +281,7 @@ class Auth:
             conexion.commit()
             return True, "Contraseña actualizada exitosamente."
         except Exception as e:
+            propagar_si_ocupada(e)
             return False, f"Error al actualizar contraseña: {str(e)}"
         finally:
             conexion.close()
\ No newline at end of file
@@ -0,0 +1,108 @@
+"""
+Caché LRU de los vehículos consultados recientemente.
+
+buscar_vehiculo_universal se llama en cada captura de multa y en cada pantalla
+de modificación, casi siempre sobre los mismos pocos vehículos. Esta caché
+guarda el registro completo por VIN, con un índice placa -> VIN, para que la
+segunda búsqueda no llegue a la base de datos.
+
+- Los trámites de GestorVehiculos que modifican un vehículo lo invalidan.
+- Cada entrada vence a los TTL_SEGUNDOS, para acotar lo desactualizado que puede
+  estar un vehículo modificado desde otro equipo.
+- Solo se guardan vehículos encontrados; una búsqueda sin resultado siempre consulta.
+- estadisticas() da los contadores de aciertos/fallos para medir si la caché sirve.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+CAPACIDAD = 2048
+TTL_SEGUNDOS = 60
+
+
+class CacheVehiculos:
+    """LRU segura entre hilos (las consultas corren en el pool de tareas de la interfaz)."""
+
+    def __init__(self, capacidad=CAPACIDAD, ttl_segundos=TTL_SEGUNDOS):
+        self.capacidad = capacidad
+        self.ttl_segundos = ttl_segundos
+        self._candado = threading.Lock()
+        self._por_vin = OrderedDict()   # vin -> (guardado_en, datos); el más reciente al final
+        self._vin_por_placa = {}
+        # Cambia con cada invalidación: una consulta que empezó antes no guarda datos viejos
+        self._generacion = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.invalidaciones = 0
+
+    def generacion(self):
+        return self._generacion
+
+    def obtener(self, vin=None, placa=None):
+        """Copia del vehículo guardado (por VIN o por placa) o None. Cuenta acierto/fallo."""
+        with self._candado:
+            if vin is None:
+                vin = self._vin_por_placa.get(placa)
+            entrada = self._por_vin.get(vin) if vin is not None else None
+            if entrada is not None and time.monotonic() - entrada[0] >= self.ttl_segundos:
+                self._quitar(vin)
+                entrada = None
+            if entrada is None:
+                self.fallos += 1
+                return None
+            self._por_vin.move_to_end(vin)
+            self.aciertos += 1
+            return dict(entrada[1])
+
+    def guardar(self, datos, generacion):
+        """
+        Guarda el vehículo leído de la base de datos. 'generacion' es la de antes de
+        consultar: si hubo una invalidación mientras tanto, no se guarda.
+        """
+        with self._candado:
+            if generacion != self._generacion:
+                return
+            vin = datos["vin"]
+            self._quitar(vin)
+            self._por_vin[vin] = (time.monotonic(), dict(datos))
+            self._vin_por_placa[datos["placa"]] = vin
+            while len(self._por_vin) > self.capacidad:
+                self._quitar(next(iter(self._por_vin)))
+
+    def invalidar(self, vin):
+        with self._candado:
+            self._generacion += 1
+            self.invalidaciones += 1
+            self._quitar(vin)
+
+    def limpiar(self):
+        with self._candado:
+            self._generacion += 1
+            self._por_vin.clear()
+            self._vin_por_placa.clear()
+
+    def _quitar(self, vin):
+        entrada = self._por_vin.pop(vin, None)
+        if entrada is not None and self._vin_por_placa.get(entrada[1]["placa"]) == vin:
+            del self._vin_por_placa[entrada[1]["placa"]]
+
+    def estadisticas(self):
+        with self._candado:
+            consultas = self.aciertos + self.fallos
+            return {
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+                "invalidaciones": self.invalidaciones,
+                "en_cache": len(self._por_vin),
+                "capacidad": self.capacidad,
+            }
+
+    def reiniciar_estadisticas(self):
+        with self._candado:
+            self.aciertos = self.fallos = self.invalidaciones = 0
+
+
+# Instancia compartida por GestorVehiculos
+vehiculos = CacheVehiculos()
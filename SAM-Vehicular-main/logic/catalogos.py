@@ -4,6 +4,10 @@ Catálogos oficiales del sistema.
 Este módulo centraliza todos los valores predefinidos utilizados por el sistema
 para garantizar consistencia entre la interfaz, la validación y la lógica de negocio.
 
+Marcas/modelos/clases, colores y tipos de infracción se administran en la base de
+datos (migración 004, logic/almacen_catalogos.py); aquí quedan solo como su carga
+inicial. Para agregar valores use 'python -m administrar catalogos'.
+
 NO contiene lógica.
 NO realiza validaciones.
 NO accede a base de datos.
@@ -41,7 +45,8 @@ PROCEDENCIAS_VEHICULO = [
 # Diccionario donde la clave es la Marca y el valor es otro diccionario.
 # Cada Modelo contiene una LISTA con las clases en las que se fabrica.
 
-#TODO MEJORAR porque por ejemplo puedo poner un aveo hatchback que no existe realmente
+# Carga inicial de las tablas catalogo_marcas/modelos/clases; las combinaciones
+# que no existan realmente se corrigen en la base de datos, no aquí.
 MARCAS_MODELOS_VEHICULO = {
     "Nissan": {
         "Versa": ["Sedán"], "Sentra": ["Sedán"], "March": ["Hatchback"], 
@@ -126,8 +131,7 @@ COLORES_VEHICULO = [
 # Nota:
 # Marca y modelo se consideran atributos estructurales,
 # pero el documento indica que deben validarse contra valores válidos.
-# En una versión real, esto vendría de una BD o catálogo externo.
-# Aquí se deja abierto para crecimiento.
+# Esos valores viven en la base de datos (ver la nota al inicio del módulo).
 # =========================
 
 
@@ -0,0 +1,222 @@
+"""
+Exportación de reportes a archivo, leyendo directo de la base de datos.
+
+- Recorre el reporte con GestorReportes.iterar_reporte (fetchmany por bloques), así
+  que la memoria usada no depende del tamaño del reporte ni de lo que muestre la tabla.
+- Formatos según la extensión del archivo:
+    .csv      texto, los montos con formato de moneda (igual que en pantalla)
+    .csv.gz   lo mismo comprimido con gzip
+    .parquet  columnar, valores sin formato (requiere pyarrow)
+    .xlsx     Excel, valores sin formato (requiere openpyxl; máximo 1,048,575 filas)
+- Se escribe primero en <archivo>.parcial y se renombra al terminar; si la
+  exportación falla o se cancela no queda un archivo a medias.
+"""
+
+import csv
+import gzip
+import os
+import time
+
+from logic.gestor_reportes import GestorReportes, TAMANO_BLOQUE
+
+# Extensión -> nombre del formato (se revisan en este orden, la más larga primero)
+EXTENSIONES = {
+    ".csv.gz": "csv.gz",
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".xlsx": "xlsx",
+}
+MAXIMO_FILAS_XLSX = 1_048_575   # Límite de filas de una hoja de Excel, sin contar el encabezado
+
+
+def formatear_celda(encabezado, dato):
+    """Texto que se muestra (y se exporta a CSV) para un valor de un reporte."""
+    # Detectar si la columna es de dinero por su encabezado
+    nombre_columna = encabezado.lower()
+    if "monto" in nombre_columna or "dinero" in nombre_columna:
+        return f"${float(dato):,.2f}" if dato is not None else "$0.00"
+    return str(dato) if dato is not None else "N/A"
+
+
+def formato_de_ruta(ruta):
+    """Formato que corresponde a la extensión del archivo, o None si no se reconoce."""
+    ruta = ruta.lower()
+    for extension, formato in EXTENSIONES.items():
+        if ruta.endswith(extension):
+            return formato
+    return None
+
+
+def formatos_disponibles():
+    """Formatos que se pueden usar en esta instalación (parquet y xlsx dependen de paquetes opcionales)."""
+    formatos = ["csv", "csv.gz"]
+    try:
+        import pyarrow.parquet  # noqa: F401
+        formatos.append("parquet")
+    except ImportError:
+        pass
+    try:
+        import openpyxl  # noqa: F401
+        formatos.append("xlsx")
+    except ImportError:
+        pass
+    return formatos
+
+
+# ==========================================
+# ESCRITORES POR FORMATO
+# ==========================================
+# Todos reciben bloques de filas ya listos (listas de valores) y se cierran con cerrar().
+
+class _EscritorCSV:
+    def __init__(self, ruta, encabezados, comprimido=False):
+        if comprimido:
+            self.archivo = gzip.open(ruta, "wt", newline="", encoding="utf-8")
+        else:
+            self.archivo = open(ruta, "w", newline="", encoding="utf-8")
+        self.escritor = csv.writer(self.archivo)
+        self.escritor.writerow(encabezados)
+
+    def escribir(self, filas):
+        self.escritor.writerows(filas)
+
+    def cerrar(self):
+        self.archivo.close()
+
+
+class _EscritorParquet:
+    """Un grupo de filas (row group) de Parquet por cada bloque leído."""
+
+    def __init__(self, ruta, encabezados):
+        import pyarrow
+        import pyarrow.parquet
+        self.pyarrow = pyarrow
+        self.parquet = pyarrow.parquet
+        self.ruta = ruta
+        self.encabezados = encabezados
+        self.esquema = None
+        self.escritor = None
+
+    def escribir(self, filas):
+        pa = self.pyarrow
+        columnas = list(zip(*filas)) or [() for _ in self.encabezados]
+        if self.esquema is None:
+            # Los tipos se toman del primer bloque; una columna que ahí viene toda vacía se guarda como texto
+            campos = []
+            for nombre, columna in zip(self.encabezados, columnas):
+                tipo = pa.array(columna).type
+                campos.append(pa.field(nombre, pa.string() if pa.types.is_null(tipo) else tipo))
+            self.esquema = pa.schema(campos)
+            self.escritor = self.parquet.ParquetWriter(self.ruta, self.esquema)
+        arreglos = [pa.array(columna, type=campo.type) for columna, campo in zip(columnas, self.esquema)]
+        self.escritor.write_table(pa.Table.from_arrays(arreglos, schema=self.esquema))
+
+    def cerrar(self):
+        if self.escritor is None:
+            self.escribir([])
+        self.escritor.close()
+
+
+class _EscritorXLSX:
+    """Libro en modo write_only: openpyxl escribe las filas al disco sin guardarlas en memoria."""
+
+    def __init__(self, ruta, encabezados):
+        import openpyxl
+        self.ruta = ruta
+        self.libro = openpyxl.Workbook(write_only=True)
+        self.hoja = self.libro.create_sheet("Reporte")
+        self.hoja.append(encabezados)
+
+    def escribir(self, filas):
+        for fila in filas:
+            self.hoja.append(fila)
+
+    def cerrar(self):
+        self.libro.save(self.ruta)
+
+
+class Exportador:
+    """
+    Exporta un reporte completo a un archivo.
+
+        resumen = Exportador(2, "multas_2025.csv.gz", ("2025-01-01", "2025-12-31")).ejecutar()
+
+    'reporte', 'parametros' y 'orden' son los mismos de GestorReportes.obtener_pagina.
+    'formatear(encabezado, valor)' da el texto de cada celda en CSV (ej. montos con $).
+    'al_avanzar' recibe el resumen parcial después de cada bloque y 'cancelado' es una
+    función que, si retorna True, detiene la exportación entre bloques.
+    """
+
+    def __init__(self, reporte, ruta, parametros=(), orden=None, formato=None, formatear=None,
+                 tamano_bloque=TAMANO_BLOQUE, al_avanzar=None, cancelado=None):
+        self.formato = formato or formato_de_ruta(ruta)
+        if self.formato not in EXTENSIONES.values():
+            raise ValueError(f"Formato de exportación no reconocido para '{ruta}'. "
+                             f"Use una de estas extensiones: {', '.join(EXTENSIONES)}.")
+        if self.formato not in formatos_disponibles():
+            raise ValueError(f"El formato '{self.formato}' requiere un paquete que no está instalado "
+                             f"({'pyarrow' if self.formato == 'parquet' else 'openpyxl'}).")
+        self.reporte = reporte
+        self.ruta = ruta
+        self.parametros = tuple(parametros)
+        self.orden = orden
+        self.formatear = formatear
+        self.tamano_bloque = tamano_bloque
+        self.al_avanzar = al_avanzar
+        self.cancelado = cancelado
+
+        self.ruta_parcial = ruta + ".parcial"
+
+    def _abrir(self, encabezados):
+        if self.formato in ("csv", "csv.gz"):
+            return _EscritorCSV(self.ruta_parcial, encabezados, comprimido=self.formato == "csv.gz")
+        if self.formato == "parquet":
+            return _EscritorParquet(self.ruta_parcial, encabezados)
+        return _EscritorXLSX(self.ruta_parcial, encabezados)
+
+    def _preparar(self, encabezados, bloque):
+        # Solo el CSV lleva el texto formateado; parquet y xlsx conservan números y fechas como valores
+        if self.formatear is not None and self.formato in ("csv", "csv.gz"):
+            return [[self.formatear(encabezados[col], dato) for col, dato in enumerate(fila)] for fila in bloque]
+        return [tuple(fila) for fila in bloque]
+
+    def ejecutar(self):
+        """
+        Escribe el archivo. Retorna un diccionario con: ruta, formato, filas, total,
+        segundos y completa (False si se canceló; en ese caso no se deja el archivo).
+        """
+        inicio = time.perf_counter()
+        exito, total = GestorReportes.contar_filas(self.reporte, self.parametros)
+        if not exito:
+            raise RuntimeError("No se pudo contar las filas del reporte.")
+        if self.formato == "xlsx" and total > MAXIMO_FILAS_XLSX:
+            raise ValueError(f"El reporte tiene {total:,} filas y una hoja de Excel admite {MAXIMO_FILAS_XLSX:,}. "
+                             f"Exporte a CSV o acote el rango de fechas.")
+
+        resumen = {"ruta": self.ruta, "formato": self.formato, "filas": 0, "total": total,
+                   "segundos": 0.0, "completa": False}
+        escritor = None
+        bloques = GestorReportes.iterar_reporte(self.reporte, self.parametros, self.tamano_bloque, self.orden)
+        try:
+            for encabezados, bloque in bloques:
+                if self.cancelado and self.cancelado():
+                    break
+                if escritor is None:
+                    escritor = self._abrir(encabezados)
+                escritor.escribir(self._preparar(encabezados, bloque))
+                resumen["filas"] += len(bloque)
+                if self.al_avanzar:
+                    self.al_avanzar(dict(resumen))
+            else:
+                resumen["completa"] = True
+        finally:
+            bloques.close()     # Devuelve la conexión al pool aunque se haya cortado el recorrido
+            if escritor is not None:
+                escritor.cerrar()
+            if resumen["completa"]:
+                os.replace(self.ruta_parcial, self.ruta)
+            elif os.path.exists(self.ruta_parcial):
+                os.remove(self.ruta_parcial)
+
+        resumen["segundos"] = time.perf_counter() - inicio
+        return resumen
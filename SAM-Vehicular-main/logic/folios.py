@@ -0,0 +1,167 @@
+"""
+Folios de infracciones: secuencia diaria con dígito verificador (migración 008).
+
+Formato INF-AAAAMMDD-NNNNNNNNV:
+- NNNNNNNN es el consecutivo del día (hasta 99,999,999 folios por día).
+- V es el dígito verificador (algoritmo de Damm) calculado sobre la fecha y el
+  consecutivo. Detecta cualquier dígito mal capturado y cualquier par de dígitos
+  vecinos intercambiados.
+
+Los folios de un día se ordenan como texto en el orden en que se generaron, y
+cada inserción cae al final del índice de la llave primaria en lugar de en una
+hoja al azar. El consecutivo lo entrega la base de datos, así que no hay choques
+que reintentar. Los folios anteriores (INF-AAAAMMDD-XXXXXXXX, ocho caracteres
+hexadecimales) tienen un carácter menos y nunca coinciden con uno nuevo.
+
+Cada proceso aparta TAMANO_BLOQUE números con un solo UPSERT ... RETURNING y los
+entrega desde memoria:
+
+    siguiente_folio()           # un folio
+    reservar_folios(500)        # 500 folios consecutivos (ingesta por lotes)
+
+La secuencia puede tener huecos: los números apartados que un proceso no llegó
+a usar antes de cerrar, o los de una multa rechazada, no se vuelven a entregar.
+El bloque se aparta en su propia transacción. Quien ya tiene una conexión del
+pool la pasa (siguiente_folio(conexion)) para no pedir una segunda: con todos
+los hilos del pool haciendo lo mismo, cada uno esperaría una conexión que
+ningún otro suelta. Esa conexión no debe tener una transacción abierta, porque
+el bloque se confirma aparte aunque después se descarte la multa; por eso
+registrar_infraccion pide el folio antes de su INSERT y la ingesta por lotes
+reserva sus folios antes de abrir su BEGIN IMMEDIATE.
+"""
+
+import re
+import threading
+from datetime import date
+
+from database import conexion as db
+
+PREFIJO = "INF"
+DIGITOS_CONSECUTIVO = 8
+TAMANO_BLOQUE = 100
+
+_FORMATO_FOLIO = re.compile(rf"^{PREFIJO}-(\d{{8}})-(\d{{{DIGITOS_CONSECUTIVO + 1}}})$")
+
+# Tabla de Damm (cuasigrupo de orden 10 totalmente antisimétrico)
+_TABLA_DAMM = (
+    (0, 3, 1, 7, 5, 9, 8, 6, 4, 2),
+    (7, 0, 9, 2, 1, 5, 4, 8, 6, 3),
+    (4, 2, 0, 6, 8, 7, 1, 3, 5, 9),
+    (1, 7, 5, 0, 9, 8, 3, 4, 2, 6),
+    (6, 1, 2, 3, 0, 4, 5, 9, 7, 8),
+    (3, 6, 7, 4, 2, 0, 9, 5, 8, 1),
+    (5, 8, 6, 9, 7, 2, 0, 1, 3, 4),
+    (8, 9, 4, 5, 3, 6, 2, 0, 1, 7),
+    (9, 4, 3, 8, 6, 1, 7, 2, 0, 5),
+    (2, 5, 8, 1, 4, 3, 6, 7, 9, 0),
+)
+
+
+# ==========================================
+# FORMATO Y DÍGITO VERIFICADOR
+# ==========================================
+def _damm(digitos):
+    interino = 0
+    for digito in digitos:
+        interino = _TABLA_DAMM[interino][int(digito)]
+    return interino
+
+
+def formatear_folio(dia, consecutivo):
+    """dia en formato AAAAMMDD; agrega el dígito verificador."""
+    numero = f"{consecutivo:0{DIGITOS_CONSECUTIVO}d}"
+    if len(numero) > DIGITOS_CONSECUTIVO:
+        raise ValueError(f"Se agotaron los folios del día {dia}.")
+    return f"{PREFIJO}-{dia}-{numero}{_damm(dia + numero)}"
+
+
+def es_folio_nuevo(folio):
+    """True si el texto tiene la forma de un folio de esta secuencia (sin revisar el verificador)."""
+    return bool(_FORMATO_FOLIO.match(folio))
+
+
+def validar_folio(folio):
+    """
+    Revisa el dígito verificador de un folio capturado a mano. Retorna (True, "")
+    o (False, mensaje). Los folios con el formato anterior no tienen verificador
+    y se aceptan tal cual.
+    """
+    coincidencia = _FORMATO_FOLIO.match(folio)
+    if coincidencia and _damm(coincidencia.group(1) + coincidencia.group(2)) != 0:
+        return False, "Error: El folio no es válido (el dígito verificador no coincide). Revise la captura."
+    return True, ""
+
+
+# ==========================================
+# ASIGNACIÓN POR BLOQUES
+# ==========================================
+def _apartar_en(conexion, dia, cantidad):
+    if conexion.in_transaction:
+        raise RuntimeError("No se puede apartar un bloque de folios con una transacción abierta en la conexión.")
+    ultimo = conexion.execute('''
+        INSERT INTO secuencias_folio (dia, ultimo) VALUES (?, ?)
+        ON CONFLICT (dia) DO UPDATE SET ultimo = ultimo + excluded.ultimo
+        RETURNING ultimo
+    ''', (dia, cantidad)).fetchone()[0]
+    conexion.commit()
+    return ultimo - cantidad + 1
+
+
+def _apartar_bloque(dia, cantidad, conexion=None):
+    """
+    Aparta 'cantidad' números del día en la base de datos. Retorna el primero.
+    Usa 'conexion' si se da (sin transacción abierta); si no, una del pool.
+    """
+    if conexion is not None:
+        return _apartar_en(conexion, dia, cantidad)
+    with db.conexion_db() as propia:
+        return _apartar_en(propia, dia, cantidad)
+
+
+class AsignadorFolios:
+    """Entrega folios desde el bloque apartado por este proceso. Es seguro entre hilos."""
+
+    def __init__(self, tamano_bloque=TAMANO_BLOQUE, hoy=date.today):
+        self.tamano_bloque = tamano_bloque
+        self._hoy = hoy
+        self._candado = threading.Lock()
+        # El bloque pertenece a una base de datos y a un día; si cambia cualquiera, se descarta
+        self._origen = None
+        self._siguiente = 0
+        self._limite = 0
+
+    def reservar(self, cantidad, conexion=None):
+        """
+        Retorna 'cantidad' folios, en orden. Aparta un bloque nuevo solo si el
+        actual no alcanza, con 'conexion' si se da (ver el docstring del módulo).
+        """
+        if cantidad <= 0:
+            return []
+        dia = self._hoy().strftime('%Y%m%d')
+        with self._candado:
+            if self._origen != (db.DB_PATH, dia):
+                self._origen, self._siguiente, self._limite = (db.DB_PATH, dia), 0, 0
+            numeros = list(range(self._siguiente, min(self._limite, self._siguiente + cantidad)))
+            faltan = cantidad - len(numeros)
+            if faltan:
+                apartados = max(faltan, self.tamano_bloque)
+                inicio = _apartar_bloque(dia, apartados, conexion)
+                numeros.extend(range(inicio, inicio + faltan))
+                self._siguiente, self._limite = inicio + faltan, inicio + apartados
+            else:
+                self._siguiente += cantidad
+        return [formatear_folio(dia, numero) for numero in numeros]
+
+    def siguiente(self, conexion=None):
+        return self.reservar(1, conexion)[0]
+
+
+_asignador = AsignadorFolios()
+
+
+def siguiente_folio(conexion=None):
+    return _asignador.siguiente(conexion)
+
+
+def reservar_folios(cantidad, conexion=None):
+    return _asignador.reservar(cantidad, conexion)
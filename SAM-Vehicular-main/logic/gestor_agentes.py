@@ -1,11 +1,15 @@
 import sqlite3
 from database.conexion import obtener_conexion
+from database.reintentos import reintentar_si_ocupada, propagar_si_ocupada
+from logic.sesion import requiere_capacidad, ADMINISTRAR_AGENTES
 from logic.validador import Validador
-import logic.catalogos as cat
+import logic.indice_catalogos as idx
 
 class GestorAgentes:
     
     @staticmethod
+    @requiere_capacidad(ADMINISTRAR_AGENTES)
+    @reintentar_si_ocupada
     def registrar_agente(agente):
         """
         Registra un nuevo agente de tránsito. 
@@ -16,7 +20,7 @@ class GestorAgentes:
         if not valido: return False, msj
 
         # Validar que el estado inicial sea válido según el catálogo
-        if agente.estado not in cat.ESTADOS_AGENTE:
+        if agente.estado not in idx.ESTADOS_AGENTE:
             return False, "Error: El estado del agente no es válido."
 
         # Validar que el número de placa oficial no esté vacío
@@ -31,7 +35,7 @@ class GestorAgentes:
         try:
             # CAMBIO APLICADO AQUÍ: agente.numero_placa en la tupla de valores
             cursor.execute('''
-                INSERT INTO agentes (nombre_completo, numero_identificacion, cargo, estado)
+                INSERT INTO agentes (nombre_completo, numero_placa, cargo, estado)
                 VALUES (?, ?, ?, ?)
             ''', (agente.nombre_completo, agente.numero_placa, agente.cargo, agente.estado))
             
@@ -42,11 +46,14 @@ class GestorAgentes:
             # Capturamos la restricción UNIQUE del número de identificación [cite: 161, 166]
             return False, "Error: El número de placa ingresado ya está asignado a otro agente."
         except Exception as e:
+            propagar_si_ocupada(e)
             return False, f"Error inesperado al registrar el agente: {str(e)}"
         finally:
             conexion.close()
 
     @staticmethod
+    @requiere_capacidad(ADMINISTRAR_AGENTES)
+    @reintentar_si_ocupada
     def modificar_agente(id_agente, nuevo_cargo, nuevo_estado):
         """
         Modifica únicamente el cargo y el estado de un agente.
@@ -56,7 +63,7 @@ class GestorAgentes:
         valido, msj = Validador.validar_id_agente(id_agente)
         if not valido: return False, msj
 
-        if nuevo_estado not in cat.ESTADOS_AGENTE:
+        if nuevo_estado not in idx.ESTADOS_AGENTE:
             return False, "Error: El estado proporcionado no es válido."
 
         if not nuevo_cargo or len(nuevo_cargo.strip()) < 3:
@@ -80,6 +87,7 @@ class GestorAgentes:
             return True, "Datos del agente actualizados correctamente."
 
         except Exception as e:
+            propagar_si_ocupada(e)
             return False, f"Error inesperado al modificar el agente: {str(e)}"
         finally:
             conexion.close()
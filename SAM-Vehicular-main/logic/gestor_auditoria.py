@@ -0,0 +1,329 @@
+"""
+Consulta y archivado de la bitácora de auditoría (migración 006).
+
+Los eventos los escriben los triggers, en la misma transacción que cada cambio;
+aquí solo se leen y se archivan:
+
+    GestorAuditoria.historial_vehiculo("3N1BC1CP5CK123456")            # primera página
+    GestorAuditoria.historial_vehiculo(vin, despues_de=siguiente)       # la que sigue
+    GestorAuditoria.archivar("2024-01-01")                              # eventos anteriores a 2024
+
+La línea de tiempo va del evento más reciente al más antiguo y se pagina por
+llave (momento, id_evento), igual que los reportes: cada página cuesta lo mismo
+sin importar cuántos eventos tenga el registro.
+
+El archivado mueve los eventos anteriores a una fecha a otra base de datos
+(por defecto <base>_auditoria_archivo.db), en bloques de EVENTOS_POR_BLOQUE
+eventos ordenados por registro y comprimidos con zlib. Cada bloque guarda el
+primer y el último registro que contiene, así que el historial archivado de un
+registro se encuentra con el índice sin descomprimir los demás bloques.
+Corre en pasos, cada uno en su transacción y cada transacción de escritura en
+un solo archivo (en modo WAL, SQLite no confirma de forma atómica una
+transacción que cambia dos bases de datos adjuntas):
+1. Copia los bloques al archivo y anota la corrida (terminada = 0).
+2. Borra del archivo principal los eventos copiados.
+3. Marca la corrida terminada en el archivo.
+Si el proceso se interrumpe antes del paso 3, la siguiente llamada repite el
+borrado de la corrida (que ya no encuentra nada si el paso 2 se confirmó);
+ningún evento se pierde ni se archiva dos veces.
+"""
+
+import json
+import os
+import zlib
+from datetime import datetime
+
+from database import conexion as db
+from database.conexion import obtener_conexion
+from database.reintentos import reintentar_si_ocupada, propagar_si_ocupada, MENSAJE_BD_OCUPADA
+from database.migraciones.m006_auditoria import TRIGGER_SOLO_AGREGAR_DELETE
+
+TAMANO_PAGINA = 50
+EVENTOS_POR_BLOQUE = 1000
+NIVEL_COMPRESION = 9
+
+ENTIDADES = ("vehiculo", "propietario", "infraccion")
+
+_ESQUEMA_ARCHIVO = [
+    '''CREATE TABLE IF NOT EXISTS archivo.corridas_archivado (
+           id_corrida INTEGER PRIMARY KEY,
+           antes_de TEXT NOT NULL,
+           ultimo_evento INTEGER NOT NULL,
+           eventos INTEGER NOT NULL,
+           ejecutada_en TEXT NOT NULL,
+           terminada INTEGER NOT NULL DEFAULT 0
+       )''',
+    # datos: zlib de [[entidad, id_entidad, id_evento, momento, accion, cambios], ...]
+    '''CREATE TABLE IF NOT EXISTS archivo.bloques_auditoria (
+           id_bloque INTEGER PRIMARY KEY,
+           id_corrida INTEGER NOT NULL,
+           entidad_inicial TEXT NOT NULL,
+           id_inicial TEXT NOT NULL,
+           entidad_final TEXT NOT NULL,
+           id_final TEXT NOT NULL,
+           desde TEXT NOT NULL,
+           hasta TEXT NOT NULL,
+           eventos INTEGER NOT NULL,
+           datos BLOB NOT NULL
+       )''',
+    '''CREATE INDEX IF NOT EXISTS archivo.idx_bloques_auditoria_inicio
+       ON bloques_auditoria (entidad_inicial, id_inicial)''',
+]
+
+
+def ruta_archivo_predeterminada():
+    """Archivo de auditoría junto a la base de datos en uso (ej. infracciones_auditoria_archivo.db)."""
+    return os.path.splitext(db.DB_PATH)[0] + "_auditoria_archivo.db"
+
+
+def _evento(id_evento, momento, accion, cambios):
+    return {"id_evento": id_evento, "momento": momento, "accion": accion,
+            "cambios": json.loads(cambios) if cambios else {}}
+
+
+def _validar_entidad(entidad):
+    if entidad not in ENTIDADES:
+        return False, f"Error: Entidad de auditoría no válida: {entidad}. Use {', '.join(ENTIDADES)}."
+    return True, ""
+
+
+# ==========================================
+# ARCHIVADO
+# ==========================================
+def _guardar_bloque(cursor, id_corrida, eventos):
+    """
+    Inserta un bloque; 'eventos' viene ordenado por (entidad, id_entidad, momento).
+    Retorna (bytes del JSON, bytes comprimidos).
+    """
+    texto = json.dumps(eventos, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    datos = zlib.compress(texto, NIVEL_COMPRESION)
+    momentos = [evento[3] for evento in eventos]
+    cursor.execute('''
+        INSERT INTO archivo.bloques_auditoria (id_corrida, entidad_inicial, id_inicial, entidad_final, id_final,
+                                               desde, hasta, eventos, datos)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (id_corrida, eventos[0][0], eventos[0][1], eventos[-1][0], eventos[-1][1],
+          min(momentos), max(momentos), len(eventos), datos))
+    return len(texto), len(datos)
+
+
+def _copiar_al_archivo(conexion, antes_de):
+    """Paso 1. Retorna (id_corrida, eventos copiados, bloques, bytes sin comprimir, bytes comprimidos)."""
+    cursor = conexion.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        ultimo = cursor.execute("SELECT MAX(id_evento) FROM auditoria WHERE momento < ?", (antes_de,)).fetchone()[0]
+        if ultimo is None:
+            conexion.rollback()
+            return None, 0, 0, 0, 0
+        cursor.execute('''
+            INSERT INTO archivo.corridas_archivado (antes_de, ultimo_evento, eventos, ejecutada_en)
+            VALUES (?, ?, 0, ?)
+        ''', (antes_de, ultimo, datetime.now().isoformat(timespec="seconds")))
+        id_corrida = cursor.lastrowid
+
+        # Recorre el índice (entidad, id_entidad, momento): los eventos de cada registro quedan juntos
+        lectura = conexion.execute('''
+            SELECT entidad, id_entidad, id_evento, momento, accion, cambios
+            FROM auditoria INDEXED BY idx_auditoria_entidad_momento
+            WHERE momento < ? AND id_evento <= ?
+            ORDER BY entidad, id_entidad, momento
+        ''', (antes_de, ultimo))
+        total = bloques = crudo = comprimido = 0
+        while True:
+            eventos = [list(fila) for fila in lectura.fetchmany(EVENTOS_POR_BLOQUE)]
+            if not eventos:
+                break
+            bytes_json, bytes_comprimidos = _guardar_bloque(cursor, id_corrida, eventos)
+            total += len(eventos)
+            bloques += 1
+            crudo += bytes_json
+            comprimido += bytes_comprimidos
+
+        cursor.execute("UPDATE archivo.corridas_archivado SET eventos = ? WHERE id_corrida = ?", (total, id_corrida))
+        conexion.commit()
+        return id_corrida, total, bloques, crudo, comprimido
+    except Exception:
+        conexion.rollback()
+        raise
+
+
+def _borrar_archivados(conexion):
+    """
+    Pasos 2 y 3 de cada corrida que no se terminó: borra de la bitácora los
+    eventos ya copiados y, ya confirmado el borrado, marca la corrida terminada.
+    El trigger que impide borrar se quita y se vuelve a crear dentro de la
+    transacción del borrado, así que ningún otro proceso llega a verlo ausente.
+    Retorna los eventos borrados.
+    """
+    cursor = conexion.cursor()
+    pendientes = cursor.execute('''
+        SELECT id_corrida, antes_de, ultimo_evento FROM archivo.corridas_archivado WHERE terminada = 0
+    ''').fetchall()
+    if not pendientes:
+        return 0
+
+    nombre, cuerpo = TRIGGER_SOLO_AGREGAR_DELETE
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        cursor.execute(f"DROP TRIGGER IF EXISTS main.{nombre}")
+        borrados = 0
+        for id_corrida, antes_de, ultimo_evento in pendientes:
+            cursor.execute("DELETE FROM main.auditoria WHERE momento < ? AND id_evento <= ?",
+                           (antes_de, ultimo_evento))
+            borrados += cursor.rowcount
+        cursor.execute(f"CREATE TRIGGER main.{nombre} {cuerpo}")
+        conexion.commit()
+    except Exception:
+        conexion.rollback()
+        raise
+
+    # Aparte: el borrado tiene que estar confirmado antes de marcar la corrida terminada
+    try:
+        cursor.executemany("UPDATE archivo.corridas_archivado SET terminada = 1 WHERE id_corrida = ?",
+                           [(id_corrida,) for id_corrida, _, _ in pendientes])
+        conexion.commit()
+    except Exception:
+        conexion.rollback()
+        raise
+    return borrados
+
+
+class GestorAuditoria:
+
+    # ==========================================
+    # LÍNEA DE TIEMPO
+    # ==========================================
+    @staticmethod
+    @reintentar_si_ocupada(resultado_ocupada=(False, MENSAJE_BD_OCUPADA, None))
+    def historial(entidad, id_entidad, despues_de=None, tamano_pagina=TAMANO_PAGINA):
+        """
+        Eventos de un registro, del más reciente al más antiguo.
+        'despues_de' es el cursor que devolvió la página anterior (None para la primera).
+        Retorna (True, eventos, siguiente_cursor) con cada evento como
+        {"id_evento", "momento", "accion", "cambios"}; siguiente_cursor es None cuando
+        ya no hay más eventos. En error retorna (False, mensaje, None).
+        """
+        valido, msj = _validar_entidad(entidad)
+        if not valido:
+            return False, msj, None
+
+        condicion_cursor = ""
+        valores = [entidad, str(id_entidad)]
+        if despues_de is not None:
+            # momento <= ? acota la búsqueda en el índice; el par completo desempata
+            condicion_cursor = "AND momento <= ? AND (momento, id_evento) < (?, ?)"
+            valores += [despues_de[0], despues_de[0], despues_de[1]]
+
+        conexion = obtener_conexion()
+        try:
+            # Una fila de más para saber si hay otra página sin hacer un COUNT
+            filas = conexion.execute(f'''
+                SELECT id_evento, momento, accion, cambios
+                FROM auditoria
+                WHERE entidad = ? AND id_entidad = ? {condicion_cursor}
+                ORDER BY momento DESC, id_evento DESC
+                LIMIT ?
+            ''', valores + [tamano_pagina + 1]).fetchall()
+        except Exception as e:
+            propagar_si_ocupada(e)
+            return False, f"Error en la base de datos: {e}", None
+        finally:
+            conexion.close()
+
+        siguiente = None
+        if len(filas) > tamano_pagina:
+            filas = filas[:tamano_pagina]
+            siguiente = (filas[-1][1], filas[-1][0])
+        return True, [_evento(*fila) for fila in filas], siguiente
+
+    @staticmethod
+    def historial_vehiculo(vin, despues_de=None, tamano_pagina=TAMANO_PAGINA):
+        return GestorAuditoria.historial("vehiculo", vin, despues_de, tamano_pagina)
+
+    @staticmethod
+    def historial_propietario(id_propietario, despues_de=None, tamano_pagina=TAMANO_PAGINA):
+        return GestorAuditoria.historial("propietario", id_propietario, despues_de, tamano_pagina)
+
+    @staticmethod
+    def historial_infraccion(folio, despues_de=None, tamano_pagina=TAMANO_PAGINA):
+        return GestorAuditoria.historial("infraccion", folio, despues_de, tamano_pagina)
+
+    # ==========================================
+    # ARCHIVO
+    # ==========================================
+    @staticmethod
+    @reintentar_si_ocupada
+    def archivar(antes_de, ruta_archivo=None):
+        """
+        Mueve al archivo comprimido los eventos con momento anterior a 'antes_de'
+        (AAAA-MM-DD). Retorna (True, resumen) con las llaves eventos, bloques,
+        bytes_json, bytes_comprimidos, borrados y ruta; o (False, mensaje).
+        """
+        try:
+            datetime.strptime(antes_de, "%Y-%m-%d")
+        except (TypeError, ValueError):
+            return False, "Error: La fecha de corte debe tener el formato AAAA-MM-DD."
+        ruta_archivo = ruta_archivo or ruta_archivo_predeterminada()
+
+        conexion = obtener_conexion()
+        try:
+            conexion.execute("ATTACH DATABASE ? AS archivo", (ruta_archivo,))
+            try:
+                for sentencia in _ESQUEMA_ARCHIVO:
+                    conexion.execute(sentencia)
+                conexion.commit()
+                # Primero la corrida anterior, si quedó a medias; luego la nueva
+                borrados = _borrar_archivados(conexion)
+                _, eventos, bloques, crudo, comprimido = _copiar_al_archivo(conexion, antes_de)
+                borrados += _borrar_archivados(conexion)
+            finally:
+                conexion.execute("DETACH DATABASE archivo")
+            return True, {"eventos": eventos, "bloques": bloques, "bytes_json": crudo,
+                          "bytes_comprimidos": comprimido, "borrados": borrados, "ruta": ruta_archivo}
+        except Exception as e:
+            propagar_si_ocupada(e)
+            return False, f"Error al archivar la auditoría: {e}"
+        finally:
+            conexion.close()
+
+    @staticmethod
+    def historial_archivado(entidad, id_entidad, ruta_archivo=None):
+        """
+        Eventos archivados de un registro, del más reciente al más antiguo (mismo
+        formato que historial, sin paginar). Retorna (True, eventos) o (False, mensaje).
+        """
+        valido, msj = _validar_entidad(entidad)
+        if not valido:
+            return False, msj
+        ruta_archivo = ruta_archivo or ruta_archivo_predeterminada()
+        if not os.path.exists(ruta_archivo):
+            return True, []
+
+        llave = (entidad, str(id_entidad))
+        conexion = obtener_conexion()
+        try:
+            conexion.execute("ATTACH DATABASE ? AS archivo", (ruta_archivo,))
+            try:
+                if not conexion.execute('''
+                    SELECT 1 FROM archivo.sqlite_master WHERE name = 'bloques_auditoria'
+                ''').fetchone():
+                    return True, []
+                # Los bloques que empiezan en o antes del registro y terminan en o después de él
+                bloques = conexion.execute('''
+                    SELECT datos FROM archivo.bloques_auditoria
+                    WHERE (entidad_inicial, id_inicial) <= (?, ?) AND (entidad_final, id_final) >= (?, ?)
+                ''', llave + llave).fetchall()
+            finally:
+                conexion.execute("DETACH DATABASE archivo")
+        except Exception as e:
+            return False, f"Error al leer el archivo de auditoría: {e}"
+        finally:
+            conexion.close()
+
+        eventos = [_evento(id_evento, momento, accion, cambios)
+                   for (datos,) in bloques
+                   for ent, ident, id_evento, momento, accion, cambios in json.loads(zlib.decompress(datos))
+                   if (ent, ident) == llave]
+        eventos.sort(key=lambda evento: (evento["momento"], evento["id_evento"]), reverse=True)
+        return True, eventos
@@ -0,0 +1,241 @@
+"""
+Búsqueda parcial y aproximada de vehículos (placa, VIN) y propietarios (nombre, CURP).
+
+Usa los índices FTS5 de la migración 005:
+
+    GestorBusqueda.buscar_vehiculos("YUC-12")         # fragmento de placa o VIN
+    GestorBusqueda.buscar_propietarios("jose peres")  # inicio de palabras, con un error
+
+Cada búsqueda retorna (True, {"resultados": [...], "hay_mas": bool}):
+- Todas las palabras de 3 caracteres o más deben aparecer (AND): en vehículos como
+  fragmento en cualquier posición; en propietarios como inicio de una palabra.
+- Se leen a lo más TOPE_CANDIDATOS coincidencias y solo esas se ordenan (ver
+  _orden): primero la placa, VIN o CURP completos, luego las que empiezan con lo
+  buscado. Así el costo no crece con el tamaño de la tabla aunque el texto sea muy
+  común ("perez"); en ese caso hay_mas=True indica que conviene escribir más.
+  No se usa el rank (bm25) de FTS5: calcularlo cuesta más que la búsqueda misma.
+- Si hay menos de 'limite' resultados, se completan con coincidencias aproximadas
+  (tolerando un error en una palabra): se busca por un fragmento de la palabra que
+  el error no alcance y los candidatos se ordenan por similitud con difflib. Estos
+  llevan "coincidencia": "aproximada".
+"""
+
+import difflib
+
+from database.conexion import obtener_conexion
+from database.reintentos import reintentar_si_ocupada, propagar_si_ocupada
+from logic.indice_catalogos import normalizar
+
+LIMITE = 20
+TOPE_CANDIDATOS = 500
+# Candidatos por variante en la búsqueda aproximada, y similitud mínima para mostrarlos
+TOPE_APROXIMADOS = 50
+SIMILITUD_MINIMA = 0.75
+LONGITUD_MINIMA = 3
+# Palabras más cortas que esto no se buscan de forma aproximada
+LONGITUD_APROXIMADA = 4
+
+# Cómo se consulta cada índice:
+#   llave    -> columna que identifica la fila (VIN en vehículos, id en propietarios)
+#   exactas  -> posiciones de 'columnas' en que una coincidencia completa es "exacta"
+#   prefijos -> True si el índice es de palabras (se buscan inicios), False si es trigram
+_VEHICULOS = {"tabla": "busqueda_vehiculos", "llave": "vin", "columnas": ("placa", "vin"),
+              "exactas": (0, 1), "prefijos": False}
+_PROPIETARIOS = {"tabla": "busqueda_propietarios", "llave": "rowid", "columnas": ("nombre_completo", "curp"),
+                 "exactas": (1,), "prefijos": True}
+
+
+# ==========================================
+# PREPARACIÓN DE LA CONSULTA
+# ==========================================
+def _palabras(texto):
+    """Palabras normalizadas (sin acentos ni mayúsculas) que el índice puede buscar."""
+    normalizado = normalizar(texto) or ""
+    return [palabra for palabra in normalizado.split() if len(palabra) >= LONGITUD_MINIMA]
+
+
+def _frase(palabra, prefijos):
+    """
+    Palabra como frase FTS5: entre comillas, así '-' o '*' no se interpretan como
+    operadores; con '*' al final si se buscan inicios de palabra.
+    """
+    return '"' + palabra.replace('"', '""') + ('"*' if prefijos else '"')
+
+
+def _consulta(palabras, prefijos):
+    return " AND ".join(_frase(palabra, prefijos) for palabra in palabras)
+
+
+def _fragmentos(palabra, prefijos):
+    """
+    Fragmentos que sobreviven a un error en la palabra. En trigram, su inicio y su
+    final (el error cae en uno solo); en el índice de palabras solo se puede buscar
+    el inicio, así que se toma la primera mitad (no cubre errores en las primeras letras).
+    """
+    if prefijos:
+        return [palabra[:max(2, len(palabra) // 2)]]
+    largo = max(LONGITUD_MINIMA, len(palabra) // 2)
+    return [palabra[:largo], palabra[-largo:]]
+
+
+def _variantes_aproximadas(palabras, prefijos):
+    """Consultas en las que una palabra se sustituye por un fragmento y el resto se deja igual."""
+    variantes = []
+    for posicion, palabra in enumerate(palabras):
+        if len(palabra) < LONGITUD_APROXIMADA:
+            continue
+        for fragmento in _fragmentos(palabra, prefijos):
+            otras = [_frase(otra, prefijos) for otra in palabras[:posicion] + palabras[posicion + 1:]]
+            variantes.append(" AND ".join([_frase(fragmento, prefijos)] + otras))
+    return variantes
+
+
+# ==========================================
+# ORDEN DE LOS RESULTADOS
+# ==========================================
+def _orden(palabras, textos, exactas, consulta_completa):
+    """
+    Llave de orden de un candidato: primero la coincidencia exacta (placa, VIN o
+    CURP completos), luego si alguna palabra empieza con lo buscado, luego cuántas
+    palabras buscadas aparecen completas y al final el texto más corto (y alfabético).
+    """
+    palabras_por_columna = [(normalizar(texto) or "").split() for texto in textos]
+    palabras_texto = [p for columna in palabras_por_columna for p in columna]
+    exacta = any(consulta_completa in palabras_por_columna[i] for i in exactas)
+    prefijo = any(p.startswith(palabras[0]) for p in palabras_texto)
+    completas = sum(1 for palabra in palabras if palabra in palabras_texto)
+    return (not exacta, not prefijo, -completas, sum(map(len, palabras_texto)), palabras_texto)
+
+
+def _similitud(palabras, textos):
+    """Promedio, por palabra buscada, de su mejor parecido con una palabra del texto."""
+    palabras_texto = " ".join(normalizar(texto) or "" for texto in textos).split()
+    if not palabras_texto:
+        return 0.0
+    total = 0.0
+    for palabra in palabras:
+        comparador = difflib.SequenceMatcher(None, b=palabra)
+        mejor = 0.0
+        for candidata in palabras_texto:
+            comparador.set_seq1(candidata)
+            if comparador.real_quick_ratio() > mejor and comparador.quick_ratio() > mejor:
+                mejor = max(mejor, comparador.ratio())
+        total += mejor
+    return total / len(palabras)
+
+
+def _buscar_en_indice(cursor, indice, texto, limite):
+    """
+    Retorna ([(llave, coincidencia)], hay_mas) con las llaves del índice ordenadas:
+    rowid en propietarios, VIN en vehículos.
+    """
+    tabla, prefijos, exactas = indice["tabla"], indice["prefijos"], indice["exactas"]
+    palabras = _palabras(texto)
+    consulta_completa = normalizar(texto)
+    seleccion = f"SELECT {indice['llave']}, {', '.join(indice['columnas'])} FROM {tabla} WHERE {tabla} MATCH ?"
+
+    filas = cursor.execute(f"{seleccion} LIMIT ?", (_consulta(palabras, prefijos), TOPE_CANDIDATOS + 1)).fetchall()
+    hay_mas = len(filas) > TOPE_CANDIDATOS
+    ordenadas = sorted((_orden(palabras, fila[1:], exactas, consulta_completa), fila[0])
+                       for fila in filas[:TOPE_CANDIDATOS])
+    resultados = [(llave_fila, "exacta") for _, llave_fila in ordenadas[:limite]]
+
+    # Con la placa, el VIN o la CURP completos ya no hace falta buscar parecidos
+    identificador_completo = ordenadas and not ordenadas[0][0][0]
+    if len(resultados) < limite and not identificador_completo:
+        encontradas = {fila[0] for fila in filas}
+        candidatos = {}
+        for variante in _variantes_aproximadas(palabras, prefijos):
+            for fila in cursor.execute(f"{seleccion} LIMIT ?", (variante, TOPE_APROXIMADOS)):
+                if fila[0] not in encontradas and fila[0] not in candidatos:
+                    candidatos[fila[0]] = _similitud(palabras, fila[1:])
+        parecidos = sorted((similitud, llave_fila) for llave_fila, similitud in candidatos.items()
+                           if similitud >= SIMILITUD_MINIMA)
+        parecidos.reverse()
+        resultados += [(llave_fila, "aproximada") for _, llave_fila in parecidos[:limite - len(resultados)]]
+
+    return resultados, hay_mas
+
+
+def _en_orden(filas_por_llave, encontrados):
+    resultados = []
+    for llave, coincidencia in encontrados:
+        fila = filas_por_llave.get(llave)
+        if fila is not None:
+            fila["coincidencia"] = coincidencia
+            resultados.append(fila)
+    return resultados
+
+
+def _validar_texto(texto):
+    if not isinstance(texto, str) or not _palabras(texto):
+        return False, f"Escriba al menos {LONGITUD_MINIMA} caracteres para buscar."
+    return True, ""
+
+
+class GestorBusqueda:
+
+    @staticmethod
+    @reintentar_si_ocupada
+    def buscar_vehiculos(texto, limite=LIMITE):
+        """Vehículos cuya placa o VIN contiene lo buscado (ej. 'YUC-12', '3N1BC')."""
+        valido, msj = _validar_texto(texto)
+        if not valido:
+            return False, msj
+
+        conexion = obtener_conexion()
+        cursor = conexion.cursor()
+        try:
+            encontrados, hay_mas = _buscar_en_indice(cursor, _VEHICULOS, texto, limite)
+            vins = [vin for vin, _ in encontrados]
+            filas = cursor.execute(f'''
+                SELECT v.vin, v.placa, v.marca, v.modelo, v.anio, v.color, v.estado_legal,
+                       v.id_propietario, p.nombre_completo
+                FROM vehiculos v
+                JOIN propietarios p ON p.id_propietario = v.id_propietario
+                WHERE v.vin IN ({", ".join("?" * len(vins))})
+            ''', vins).fetchall() if vins else []
+
+            por_vin = {
+                fila[0]: {"vin": fila[0], "placa": fila[1], "marca": fila[2], "modelo": fila[3], "anio": fila[4],
+                          "color": fila[5], "estado_legal": fila[6], "id_propietario": fila[7],
+                          "propietario": fila[8]}
+                for fila in filas
+            }
+            return True, {"resultados": _en_orden(por_vin, encontrados), "hay_mas": hay_mas}
+        except Exception as e:
+            propagar_si_ocupada(e)
+            return False, f"Error en la base de datos: {e}"
+        finally:
+            conexion.close()
+
+    @staticmethod
+    @reintentar_si_ocupada
+    def buscar_propietarios(texto, limite=LIMITE):
+        """Propietarios con palabras del nombre o CURP que empiezan con lo buscado (sin importar acentos)."""
+        valido, msj = _validar_texto(texto)
+        if not valido:
+            return False, msj
+
+        conexion = obtener_conexion()
+        cursor = conexion.cursor()
+        try:
+            encontrados, hay_mas = _buscar_en_indice(cursor, _PROPIETARIOS, texto, limite)
+            ids = [id_propietario for id_propietario, _ in encontrados]
+            filas = cursor.execute(f'''
+                SELECT id_propietario, nombre_completo, curp, estado_licencia, estado
+                FROM propietarios
+                WHERE id_propietario IN ({", ".join("?" * len(ids))})
+            ''', ids).fetchall() if ids else []
+
+            por_id = {
+                fila[0]: {"id_propietario": fila[0], "nombre_completo": fila[1], "curp": fila[2],
+                          "estado_licencia": fila[3], "estado": fila[4]}
+                for fila in filas
+            }
+            return True, {"resultados": _en_orden(por_id, encontrados), "hay_mas": hay_mas}
+        except Exception as e:
+            propagar_si_ocupada(e)
+            return False, f"Error en la base de datos: {e}"
+        finally:
+            conexion.close()
@@ -0,0 +1,294 @@
+"""
+Archivado de infracciones cerradas en archivos anuales y compactación de la
+base de datos principal (migración 010 y database/historico.py).
+
+    GestorHistorico.archivar()                  # cerradas con más de HORIZONTE_DIAS días
+    GestorHistorico.archivar("2024-01-01")      # cerradas con fecha anterior a 2024
+    GestorHistorico.compactar()                 # después de archivar, para reducir el archivo
+    GestorHistorico.listar()
+
+Solo se archivan multas Pagada o Cancelada. Se copian al archivo de su año
+(infracciones_historico_AAAA.db) y se borran de infracciones. Los reportes
+siguen viéndolas por la vista infracciones_historico, y las tablas de resumen
+(reportes 3 y 6) las siguen contando: el borrado vuelve a sumar lo que restan
+los triggers. Una multa archivada ya no cambia de estado.
+
+En modo WAL SQLite no confirma de forma atómica una transacción que escribe en
+dos archivos, así que cada año pasa por etapas, cada una en su propia
+transacción, y corridas_historico anota hasta dónde llegó:
+    0 -> 1  copia las cerradas del año al archivo (INSERT OR REPLACE, repetible).
+    1 -> 2  borra de infracciones las que siguen igual a su copia y suma de vuelta
+            sus totales a los resúmenes.
+    2 -> 3  quita del archivo las copias cuya multa no se borró porque cambió
+            entre la copia y el borrado (ej. una cancelada que se reactivó).
+Si el proceso se interrumpe, la siguiente llamada termina primero las etapas
+pendientes; mientras tanto la vista entrega la fila viva y no la copia, así que
+ninguna multa se pierde ni aparece dos veces.
+"""
+
+from datetime import date, datetime, timedelta
+
+from database import historico
+from database.conexion import obtener_conexion
+from database.reintentos import reintentar_si_ocupada, propagar_si_ocupada
+
+HORIZONTE_DIAS = 2 * 365     # Por defecto se archivan las cerradas con más de dos años
+
+ESTADOS_CERRADOS = ("Pagada", "Cancelada")
+
+ETAPA_COPIADA = 1
+ETAPA_BORRADA = 2
+ETAPA_TERMINADA = 3
+
+
+def fecha_de_corte(dias=HORIZONTE_DIAS):
+    """Fecha (AAAA-MM-DD) que corresponde a un horizonte de 'dias' días antes de hoy."""
+    return (date.today() - timedelta(days=dias)).isoformat()
+
+
+# ==========================================
+# ETAPAS DE UNA CORRIDA
+# ==========================================
+def _rango_anio(anio, antes_de):
+    """[desde, hasta) del año, recortado a la fecha de corte."""
+    return f"{anio}-01-01", min(antes_de, f"{int(anio) + 1:04d}-01-01")
+
+
+def _marcar_etapa(conexion, id_corrida, anio, etapa, filas=None):
+    conexion.execute("BEGIN IMMEDIATE")
+    try:
+        conexion.execute('''
+            UPDATE corridas_historico SET etapa = ?, filas = COALESCE(?, filas)
+            WHERE id_corrida = ? AND anio = ?
+        ''', (etapa, filas, id_corrida, anio))
+        conexion.commit()
+    except Exception:
+        conexion.rollback()
+        raise
+
+
+def _copiar(conexion, esquema, id_corrida, anio, antes_de):
+    """Etapa 0 -> 1. Solo escribe en el archivo del año; infracciones solo se lee."""
+    desde, hasta = _rango_anio(anio, antes_de)
+    columnas = ", ".join(historico.COLUMNAS)
+    marcadores = ", ".join("?" for _ in ESTADOS_CERRADOS)
+    conexion.execute("BEGIN")
+    try:
+        copiadas = conexion.execute(f'''
+            INSERT OR REPLACE INTO {esquema}.infracciones ({columnas}, id_corrida)
+            SELECT {columnas}, ? FROM main.infracciones
+            WHERE fecha >= ? AND fecha < ? AND estado IN ({marcadores})
+        ''', (id_corrida, desde, hasta) + ESTADOS_CERRADOS).rowcount
+        conexion.commit()
+    except Exception:
+        conexion.rollback()
+        raise
+    _marcar_etapa(conexion, id_corrida, anio, ETAPA_COPIADA, copiadas)
+
+
+def _borrar(conexion, esquema, id_corrida, anio):
+    """
+    Etapa 1 -> 2. Borra de infracciones las multas copiadas que no cambiaron desde
+    la copia. Los triggers de resúmenes restan cada multa borrada; como siguen
+    existiendo en el archivo, se vuelven a sumar en la misma transacción.
+    Los contadores de pendientes de vehiculos no cambian: ninguna es Pendiente.
+    """
+    conexion.execute("BEGIN IMMEDIATE")
+    try:
+        borradas = conexion.execute(f'''
+            DELETE FROM main.infracciones
+            WHERE folio IN (SELECT folio FROM {esquema}.infracciones WHERE id_corrida = ?)
+              AND (estado, monto, id_agente, vin_infractor) IS
+                  (SELECT a.estado, a.monto, a.id_agente, a.vin_infractor
+                   FROM {esquema}.infracciones a WHERE a.folio = main.infracciones.folio)
+        ''', (id_corrida,)).rowcount
+
+        archivadas = f'''FROM {esquema}.infracciones a
+                         WHERE a.id_corrida = ?
+                           AND NOT EXISTS (SELECT 1 FROM main.infracciones i WHERE i.folio = a.folio)'''
+        conexion.execute(f'''
+            INSERT INTO main.resumen_infracciones_estado (estado, total, monto)
+            SELECT a.estado, COUNT(*), SUM(a.monto) {archivadas} GROUP BY a.estado
+            ON CONFLICT (estado) DO UPDATE SET total = total + excluded.total, monto = monto + excluded.monto
+        ''', (id_corrida,))
+        conexion.execute(f'''
+            INSERT INTO main.resumen_infracciones_agente (id_agente, total)
+            SELECT a.id_agente, COUNT(*) {archivadas} GROUP BY a.id_agente
+            ON CONFLICT (id_agente) DO UPDATE SET total = total + excluded.total
+        ''', (id_corrida,))
+        conexion.execute('''
+            UPDATE corridas_historico SET etapa = ?, filas = ? WHERE id_corrida = ? AND anio = ?
+        ''', (ETAPA_BORRADA, borradas, id_corrida, anio))
+        conexion.commit()
+    except Exception:
+        conexion.rollback()
+        raise
+
+
+def _limpiar(conexion, esquema, id_corrida, anio):
+    """Etapa 2 -> 3. Quita del archivo las copias de multas que siguen vivas."""
+    conexion.execute("BEGIN")
+    try:
+        conexion.execute(f'''
+            DELETE FROM {esquema}.infracciones
+            WHERE id_corrida = ?
+              AND EXISTS (SELECT 1 FROM main.infracciones i WHERE i.folio = {esquema}.infracciones.folio)
+        ''', (id_corrida,))
+        conexion.commit()
+    except Exception:
+        conexion.rollback()
+        raise
+    _marcar_etapa(conexion, id_corrida, anio, ETAPA_TERMINADA)
+
+
+def _continuar(conexion, id_corrida, anio, antes_de, etapa):
+    """Lleva un año de una corrida desde 'etapa' hasta terminada."""
+    esquema = historico.abrir_archivo(conexion, anio)
+    if etapa < ETAPA_COPIADA:
+        _copiar(conexion, esquema, id_corrida, anio, antes_de)
+    if etapa < ETAPA_BORRADA:
+        _borrar(conexion, esquema, id_corrida, anio)
+    if etapa < ETAPA_TERMINADA:
+        _limpiar(conexion, esquema, id_corrida, anio)
+
+
+def _terminar_pendientes(conexion):
+    """Corridas que quedaron a medias. Retorna {año: multas archivadas}."""
+    pendientes = conexion.execute('''
+        SELECT id_corrida, anio, antes_de, etapa FROM corridas_historico
+        WHERE etapa < ? ORDER BY id_corrida, anio
+    ''', (ETAPA_TERMINADA,)).fetchall()
+    archivadas = {}
+    for id_corrida, anio, antes_de, etapa in pendientes:
+        _continuar(conexion, id_corrida, anio, antes_de, etapa)
+        _sumar_archivadas(conexion, archivadas, id_corrida, anio)
+    return archivadas
+
+
+def _sumar_archivadas(conexion, archivadas, id_corrida, anio):
+    filas = conexion.execute("SELECT filas FROM corridas_historico WHERE id_corrida = ? AND anio = ?",
+                             (id_corrida, anio)).fetchone()[0]
+    archivadas[anio] = archivadas.get(anio, 0) + filas
+
+
+def _tamano(conexion, esquema="main"):
+    """Bytes del archivo según SQLite (páginas x tamaño de página, sin el WAL)."""
+    paginas = conexion.execute(f"PRAGMA {esquema}.page_count").fetchone()[0]
+    return paginas * conexion.execute(f"PRAGMA {esquema}.page_size").fetchone()[0]
+
+
+class GestorHistorico:
+
+    # ==========================================
+    # ARCHIVADO
+    # ==========================================
+    @staticmethod
+    @reintentar_si_ocupada
+    def archivar(antes_de=None):
+        """
+        Mueve a los archivos anuales las multas Pagada o Cancelada con fecha
+        anterior a 'antes_de' (AAAA-MM-DD; por defecto, hoy menos HORIZONTE_DIAS).
+        Retorna (True, resumen) con las llaves archivadas ({año: multas}), total y
+        archivos ([rutas]); o (False, mensaje).
+        """
+        antes_de = antes_de or fecha_de_corte()
+        try:
+            datetime.strptime(antes_de, "%Y-%m-%d")
+        except (TypeError, ValueError):
+            return False, "Error: La fecha de corte debe tener el formato AAAA-MM-DD."
+
+        conexion = obtener_conexion()
+        try:
+            # Primero lo que haya quedado a medias de una corrida anterior
+            archivadas = _terminar_pendientes(conexion)
+
+            marcadores = ", ".join("?" for _ in ESTADOS_CERRADOS)
+            anios = [fila[0] for fila in conexion.execute(f'''
+                SELECT DISTINCT substr(fecha, 1, 4) FROM infracciones
+                WHERE fecha < ? AND estado IN ({marcadores}) ORDER BY 1
+            ''', (antes_de,) + ESTADOS_CERRADOS)]
+            existentes = historico.archivos_anuales(historico.ruta_principal(conexion))
+            nuevos = set(anios) - set(existentes)
+            disponibles = historico.MAXIMO_ARCHIVOS - len(existentes)
+            if len(nuevos) > disponibles:
+                return False, (f"Error: Archivar antes de {antes_de} requiere {len(nuevos)} archivos anuales nuevos "
+                               f"y solo caben {disponibles} (máximo {historico.MAXIMO_ARCHIVOS}).")
+
+            if anios:
+                conexion.execute("BEGIN IMMEDIATE")
+                try:
+                    id_corrida = conexion.execute(
+                        "SELECT COALESCE(MAX(id_corrida), 0) + 1 FROM corridas_historico").fetchone()[0]
+                    iniciada = datetime.now().isoformat(timespec="seconds")
+                    conexion.executemany('''
+                        INSERT INTO corridas_historico (id_corrida, anio, antes_de, iniciada_en) VALUES (?, ?, ?, ?)
+                    ''', [(id_corrida, anio, antes_de, iniciada) for anio in anios])
+                    conexion.commit()
+                except Exception:
+                    conexion.rollback()
+                    raise
+                for anio in anios:
+                    _continuar(conexion, id_corrida, anio, antes_de, 0)
+                    _sumar_archivadas(conexion, archivadas, id_corrida, anio)
+
+            historico.adjuntar_archivos(conexion)
+            ruta_db = historico.ruta_principal(conexion)
+            return True, {"archivadas": dict(sorted(archivadas.items())), "total": sum(archivadas.values()),
+                          "archivos": [historico.ruta_archivo(ruta_db, anio) for anio in sorted(archivadas)]}
+        except Exception as e:
+            propagar_si_ocupada(e)
+            return False, f"Error al archivar infracciones: {e}"
+        finally:
+            conexion.close()
+
+    # ==========================================
+    # COMPACTACIÓN
+    # ==========================================
+    @staticmethod
+    @reintentar_si_ocupada
+    def compactar():
+        """
+        Reescribe la base de datos principal sin las páginas que dejó libres el
+        archivado (VACUUM) y actualiza las estadísticas del planificador.
+        Antes vacía el WAL al archivo principal. VACUUM necesita espacio libre en
+        disco del tamaño de la base y bloquea a los escritores mientras corre.
+        Retorna (True, resumen) con bytes_antes y bytes_despues; o (False, mensaje).
+        """
+        conexion = obtener_conexion()
+        try:
+            conexion.execute("PRAGMA main.wal_checkpoint(TRUNCATE)").fetchone()
+            antes = _tamano(conexion)
+            conexion.execute("VACUUM main")
+            conexion.execute("PRAGMA main.wal_checkpoint(TRUNCATE)").fetchone()
+            conexion.execute("PRAGMA optimize")
+            return True, {"bytes_antes": antes, "bytes_despues": _tamano(conexion)}
+        except Exception as e:
+            propagar_si_ocupada(e)
+            return False, f"Error al compactar la base de datos: {e}"
+        finally:
+            conexion.close()
+
+    # ==========================================
+    # CONSULTA
+    # ==========================================
+    @staticmethod
+    def listar():
+        """
+        Archivos históricos existentes. Retorna (True, [{"anio", "ruta", "multas",
+        "desde", "hasta", "bytes"}]) ordenados por año, o (False, mensaje).
+        """
+        conexion = obtener_conexion()
+        try:
+            rutas = historico.archivos_anuales(historico.ruta_principal(conexion))
+            archivos = []
+            for anio in historico.adjuntar_archivos(conexion):
+                ruta, esquema = rutas[anio], historico.esquema_anio(anio)
+                multas, desde, hasta = conexion.execute(
+                    f"SELECT COUNT(*), MIN(fecha), MAX(fecha) FROM {esquema}.infracciones").fetchone()
+                archivos.append({"anio": anio, "ruta": ruta, "multas": multas, "desde": desde, "hasta": hasta,
+                                 "bytes": _tamano(conexion, esquema)})
+            return True, archivos
+        except Exception as e:
+            return False, f"Error al leer los archivos históricos: {e}"
+        finally:
+            conexion.close()
@@ -1,40 +1,41 @@
 import sqlite3
-import uuid
-from datetime import datetime
 from database.conexion import obtener_conexion
+from database.pool import PoolAgotadoError
+from database.reintentos import reintentar_si_ocupada, propagar_si_ocupada, es_error_de_bloqueo, MENSAJE_BD_OCUPADA
+from logic.folios import siguiente_folio, validar_folio
+from logic.sesion import requiere_capacidad, COBRAR_INFRACCIONES, REGISTRAR_INFRACCIONES
 from logic.validador import Validador
 
+# Rechazos de cambiar_estado_infraccion y cambiar_estado_lote (mismo texto en ambos caminos)
+MSJ_FOLIO_NO_ENCONTRADO = "Error: No se encontró una infracción con el folio proporcionado."
+MSJ_CANCELADA_A_PAGADA = "Error: No se puede marcar como 'Pagada' una infracción que ya ha sido 'Cancelada'."
+MSJ_PAGADA_DEFINITIVA = "Error: La infracción ya se encuentra 'Pagada' y su estado es definitivo."
+MSJ_FOLIO_REPETIDO = "Error: El folio aparece más de una vez en el lote; solo se tomó en cuenta la primera."
+
+FILAS_POR_INSERCION = 5000      # Pares por executemany al llenar la tabla temporal del lote
+
 class GestorInfracciones:
     
     @staticmethod
+    def generar_folio(conexion=None):
+        """
+        Genera un folio único con el formato INF-AAAAMMDD-NNNNNNNNV (ver logic/folios.py).
+        Si el llamador ya tiene una conexión del pool, la pasa para no pedir otra.
+        """
+        return siguiente_folio(conexion)
+
+    @staticmethod
+    @requiere_capacidad(REGISTRAR_INFRACCIONES)
+    @reintentar_si_ocupada
     def registrar_infraccion(infraccion, tipo_captura):
         """
         Recibe un objeto Infraccion y el tipo de captura (ej. 'En sitio' o 'Fotomulta').
         Aplica reglas de negocio inter-entidades, genera el folio automático y guarda.
         """
         # 1. Validaciones de formato y catálogos usando la herramienta centralizada
-        valido, msj = Validador.validar_monto(infraccion.monto)
-        if not valido: return False, msj
-
-        valido, msj = Validador.validar_tipo_infraccion(infraccion.tipo_infraccion)
-        if not valido: return False, msj
-
-        valido, msj = Validador.validar_tipo_captura(tipo_captura)
+        valido, msj = Validador.validar_infraccion(infraccion, tipo_captura)
         if not valido: return False, msj
 
-        valido, msj = Validador.validar_fecha_hora_pasada(infraccion.fecha, infraccion.hora)
-        if not valido: return False, msj
-
-        valido, msj = Validador.validar_lugar_motivo(infraccion.lugar, infraccion.motivo)
-        if not valido: return False, msj
-
-        valido, msj = Validador.validar_id_agente(infraccion.id_agente)
-        if not valido: return False, msj
-
-        valido, msj = Validador.validar_licencia_conductor(infraccion.licencia_conductor)
-        if not valido: return False, msj
-
-        
         # TODO: Refactorizar 'En sitio' y 'Fotomulta' a constantes en catalogos.py 
         # para evitar el uso de cadenas de texto (hardcoding) en la lógica de negocio.
         # 2. Regla de negocio: Obligatoriedad de la licencia
@@ -62,8 +63,7 @@ class GestorInfracciones:
                 return False, "Error: Solo los agentes con estado 'Activo' pueden registrar nuevas infracciones."
 
             # 5. Generación automática del Folio Único
-            fecha_actual = datetime.now().strftime('%Y%m%d')
-            folio_generado = f"INF-{fecha_actual}-{str(uuid.uuid4())[:8].upper()}"
+            folio_generado = GestorInfracciones.generar_folio(conexion)
 
             # 6. Guardar en la base de datos
             estado_inicial = "Pendiente"
@@ -82,11 +82,14 @@ class GestorInfracciones:
         except sqlite3.IntegrityError as e:
             return False, f"Error de integridad en la base de datos: {str(e)}"
         except Exception as e:
+            propagar_si_ocupada(e)
             return False, f"Error inesperado al registrar la infracción: {str(e)}"
         finally:
             conexion.close()
             
     @staticmethod
+    @requiere_capacidad(COBRAR_INFRACCIONES)
+    @reintentar_si_ocupada
     def cambiar_estado_infraccion(folio, nuevo_estado):
         """
         Cambia el estado de una infracción asegurando que se respeten 
@@ -95,6 +98,8 @@ class GestorInfracciones:
         # 1. Validar que el nuevo estado sea válido según el catálogo
         valido, msj = Validador.validar_estado_infraccion(nuevo_estado)
         if not valido: return False, msj
+        valido, msj = validar_folio(folio)
+        if not valido: return False, msj
 
         conexion = obtener_conexion()
         cursor = conexion.cursor()
@@ -105,7 +110,7 @@ class GestorInfracciones:
             resultado = cursor.fetchone()
 
             if not resultado:
-                return False, "Error: No se encontró una infracción con el folio proporcionado."
+                return False, MSJ_FOLIO_NO_ENCONTRADO
 
             estado_actual = resultado[0]
 
@@ -115,12 +120,12 @@ class GestorInfracciones:
 
             # Regla explícita: No podrá marcarse como Pagada una infracción ya cancelada.
             if estado_actual == "Cancelada" and nuevo_estado == "Pagada":
-                return False, "Error: No se puede marcar como 'Pagada' una infracción que ya ha sido 'Cancelada'."
+                return False, MSJ_CANCELADA_A_PAGADA
 
             # Regla: El estado podrá cambiar de Pendiente a Pagada o Cancelada.
             # Bloqueamos cualquier cambio si la infracción ya fue Pagada.
             if estado_actual == "Pagada":
-                return False, "Error: La infracción ya se encuentra 'Pagada' y su estado es definitivo."
+                return False, MSJ_PAGADA_DEFINITIVA
 
             # 4. Ejecutar la actualización en la base de datos [cite: 198]
             cursor.execute('''
@@ -133,6 +138,108 @@ class GestorInfracciones:
             return True, f"El estado de la infracción {folio} se ha actualizado correctamente a '{nuevo_estado}'."
 
         except Exception as e:
+            propagar_si_ocupada(e)
             return False, f"Error inesperado al cambiar el estado de la infracción: {str(e)}"
         finally:
-            conexion.close()
\ No newline at end of file
+            conexion.close()
+
+    @staticmethod
+    @requiere_capacidad(COBRAR_INFRACCIONES)
+    def cambiar_estado_lote(pares):
+        """
+        Cambio de estado masivo (por ejemplo, la conciliación diaria de pagos de
+        tesorería). 'pares' es cualquier iterable de (folio, nuevo_estado); se
+        recorre una sola vez, así que puede ser un generador que lee un archivo.
+
+        Los pares se copian a una tabla temporal y las reglas de
+        cambiar_estado_infraccion se aplican con sentencias sobre el lote
+        completo, en una sola transacción: se aplica todo o nada. Si un folio
+        viene repetido, cuenta solo su primera aparición. La copia se hace antes
+        de abrir esa transacción (escribir en temp no bloquea la base principal),
+        así que leer un archivo grande no detiene a los demás procesos.
+
+        Retorna (True, resumen) con recibidos, aplicados, rechazados y 'rechazos':
+        [(linea, folio, nuevo_estado, motivo)] en el orden del lote (linea empieza
+        en 1), o (False, mensaje) si el lote no se pudo aplicar. No reintenta si la
+        base de datos está ocupada, porque los pares ya se consumieron.
+        """
+        try:
+            conexion = obtener_conexion()
+        except PoolAgotadoError:
+            return False, MENSAJE_BD_OCUPADA
+        cursor = conexion.cursor()
+        try:
+            cursor.execute('''
+                CREATE TEMP TABLE cambios_estado (
+                    linea INTEGER PRIMARY KEY,
+                    folio TEXT NOT NULL,
+                    nuevo_estado TEXT,
+                    estado_actual TEXT,
+                    motivo TEXT
+                )
+            ''')
+
+            # 1. Copiar el lote; lo que se valida sin la base de datos se marca desde aquí
+            insertar = "INSERT INTO cambios_estado (linea, folio, nuevo_estado, motivo) VALUES (?, ?, ?, ?)"
+            filas = []
+            for linea, (folio, nuevo_estado) in enumerate(pares, start=1):
+                folio = str(folio or "").strip().upper()
+                valido, motivo = Validador.validar_estado_infraccion(nuevo_estado)
+                if valido:
+                    valido, motivo = validar_folio(folio)
+                filas.append((linea, folio, nuevo_estado, None if valido else motivo))
+                if len(filas) == FILAS_POR_INSERCION:
+                    cursor.executemany(insertar, filas)
+                    filas = []
+            cursor.executemany(insertar, filas)
+            cursor.execute("CREATE INDEX temp.idx_cambios_estado_folio ON cambios_estado (folio, linea)")
+            conexion.commit()
+
+            # Desde aquí, y solo para los pasos 2 y 3, la base principal queda reservada
+            cursor.execute("BEGIN IMMEDIATE")
+
+            # 2. Estado actual de cada folio y reglas de transición, sobre todo el lote
+            cursor.execute('''
+                UPDATE cambios_estado
+                SET estado_actual = (SELECT i.estado FROM infracciones i WHERE i.folio = cambios_estado.folio)
+                WHERE motivo IS NULL
+            ''')
+            cursor.execute('''
+                UPDATE cambios_estado
+                SET motivo = CASE
+                    WHEN EXISTS (SELECT 1 FROM cambios_estado previo
+                                 WHERE previo.folio = cambios_estado.folio AND previo.linea < cambios_estado.linea)
+                        THEN :repetido
+                    WHEN estado_actual IS NULL THEN :no_encontrado
+                    WHEN estado_actual = nuevo_estado
+                        THEN 'La infracción ya se encuentra en estado ' || quote(estado_actual) || '.'
+                    WHEN estado_actual = 'Cancelada' AND nuevo_estado = 'Pagada' THEN :cancelada_a_pagada
+                    WHEN estado_actual = 'Pagada' THEN :pagada_definitiva
+                END
+                WHERE motivo IS NULL
+            ''', {"repetido": MSJ_FOLIO_REPETIDO, "no_encontrado": MSJ_FOLIO_NO_ENCONTRADO,
+                  "cancelada_a_pagada": MSJ_CANCELADA_A_PAGADA, "pagada_definitiva": MSJ_PAGADA_DEFINITIVA})
+
+            # 3. Aplicar los aceptados; los triggers de resúmenes y auditoría corren por cada fila
+            aplicados = cursor.execute('''
+                UPDATE infracciones SET estado = c.nuevo_estado
+                FROM cambios_estado c
+                WHERE c.folio = infracciones.folio AND c.motivo IS NULL
+            ''').rowcount
+            conexion.commit()
+
+            recibidos = cursor.execute("SELECT COUNT(*) FROM cambios_estado").fetchone()[0]
+            rechazos = [tuple(fila) for fila in cursor.execute(
+                "SELECT linea, folio, nuevo_estado, motivo FROM cambios_estado WHERE motivo IS NOT NULL ORDER BY linea")]
+            return True, {"recibidos": recibidos, "aplicados": aplicados,
+                          "rechazados": len(rechazos), "rechazos": rechazos}
+
+        except Exception as e:
+            conexion.rollback()
+            if es_error_de_bloqueo(e):
+                return False, MENSAJE_BD_OCUPADA
+            return False, f"Error inesperado al aplicar el lote de cambios de estado: {str(e)}"
+        finally:
+            # La tabla temporal ya no se descarta con el rollback: vive en la conexión del pool
+            conexion.execute("DROP TABLE IF EXISTS temp.cambios_estado")
+            conexion.close()
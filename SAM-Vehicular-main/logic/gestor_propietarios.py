@@ -5,36 +5,22 @@ TODO
 
 import sqlite3
 from database.conexion import obtener_conexion
+from database.reintentos import reintentar_si_ocupada, propagar_si_ocupada
+from logic.sesion import requiere_capacidad, MODIFICAR_PROPIETARIOS, REGISTRAR_PROPIETARIOS
 from logic.validador import Validador
 
 class GestorPropietarios:
     
     @staticmethod
+    @requiere_capacidad(REGISTRAR_PROPIETARIOS)
+    @reintentar_si_ocupada
     def registrar_propietario(propietario):
         """Recibe un objeto Propietario, lo valida y lo guarda en la base de datos."""
         
-        valido, msj = Validador.validar_nombre_completo(propietario.nombre_completo)
-        if not valido: return False, msj
-
-        valido, msj = Validador.validar_direccion(propietario.direccion)
-        if not valido: return False, msj
-
         # 1. Validar formatos usando nuestra herramienta centralizada
-        valido, msj = Validador.validar_curp(propietario.curp)
-        if not valido: return False, msj
-        
-        valido, msj = Validador.validar_telefono(propietario.telefono)
+        valido, msj = Validador.validar_propietario(propietario)
         if not valido: return False, msj
 
-        valido, msj = Validador.validar_estado_licencia(propietario.estado_licencia)
-        if not valido: return False, msj
-        
-        valido, msj = Validador.validar_correo(propietario.correo_electronico)
-        if not valido: return False, msj
-
-        valido, msj = Validador.validar_estado_propietario(propietario.estado)
-        if not valido: return False, msj
-        
         # 2. Guardar en la base de datos
         conexion = obtener_conexion()
         cursor = conexion.cursor()
@@ -54,11 +40,14 @@ class GestorPropietarios:
             # Si SQLite detecta que la CURP ya existe (restricción UNIQUE), lanza este error[cite: 119, 184].
             return False, "Error: La CURP ingresada ya se encuentra registrada en el sistema."
         except Exception as e:
+            propagar_si_ocupada(e)
             return False, f"Error inesperado al registrar propietario: {str(e)}"
         finally:
             conexion.close()
 
     @staticmethod
+    @requiere_capacidad(MODIFICAR_PROPIETARIOS)
+    @reintentar_si_ocupada
     def modificar_propietario(id_propietario, nueva_direccion, nuevo_telefono, nuevo_correo, nuevo_estado_licencia, nuevo_estado):
         """
         Actualiza la información de contacto y administrativa de un propietario.
@@ -117,6 +106,7 @@ class GestorPropietarios:
             return True, "Datos del propietario actualizados correctamente."
 
         except Exception as e:
+            propagar_si_ocupada(e)
             return False, f"Error inesperado al modificar propietario: {str(e)}"
         finally:
             conexion.close()
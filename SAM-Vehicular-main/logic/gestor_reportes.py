@@ -1,97 +1,290 @@
 import sqlite3
 from database.conexion import obtener_conexion
+from database.historico import adjuntar_archivos
+
+TAMANO_PAGINA = 200     # Filas que la interfaz pide cada vez que se llega al final de la tabla
+TAMANO_BLOQUE = 1000    # Filas por bloque al recorrer un reporte completo (exportaciones)
+
+# Definición de cada reporte:
+#   consulta: SELECT base sin ORDER BY
+#   orden:    columnas del resultado por las que se ordena; la última debe ser única
+#             para que la paginación por llave (keyset) no repita ni salte filas
+#   descendente: dirección del orden (la misma para todas las columnas)
+#   tope_parametro: (opcional) posición del parámetro que acota la primera columna de
+#             orden en la dirección del recorrido. Al paginar se recorta al valor del
+#             cursor, porque SQLite solo usa un límite por columna para buscar en el índice
+REPORTES = {
+    # 1. Vehículos con infracciones pendientes [cite: 350]
+    # Conteo y monto de vehiculos.multas_pendientes / monto_pendiente (mantenidos por triggers);
+    # el índice parcial idx_vehiculos_pendientes entrega solo esos vehículos, ya ordenados
+    1: {
+        "consulta": '''
+            SELECT placa, vin, marca, modelo, multas_pendientes as total_multas_pendientes,
+                   monto_pendiente
+            FROM vehiculos
+            WHERE multas_pendientes > 0
+        ''',
+        "orden": ("total_multas_pendientes", "vin"),
+        "descendente": True,
+    },
+    # 2. Infracciones por rango de fechas [cite: 351]
+    # El índice (fecha, folio) entrega las filas ya ordenadas y cada página empieza donde terminó la anterior.
+    # infracciones_historico incluye los archivos anuales (database/historico.py), cada uno con el mismo índice
+    2: {
+        "consulta": '''
+            SELECT folio, fecha, hora, lugar, tipo_infraccion, monto, estado
+            FROM infracciones_historico
+            WHERE fecha BETWEEN ? AND ?
+        ''',
+        "orden": ("fecha", "folio"),
+        "descendente": True,
+        "tope_parametro": 1,    # fecha_fin
+    },
+    # 3. Infracciones emitidas por agente [cite: 353]
+    # Los conteos vienen de resumen_infracciones_agente (mantenido por triggers)
+    3: {
+        "consulta": '''
+            SELECT a.numero_placa as ID_Oficial, a.nombre_completo, COALESCE(r.total, 0) as multas_emitidas
+            FROM agentes a
+            LEFT JOIN resumen_infracciones_agente r ON a.id_agente = r.id_agente
+        ''',
+        "orden": ("multas_emitidas", "ID_Oficial"),
+        "descendente": True,
+    },
+    # 4. Vehículos por estado legal [cite: 354]
+    4: {
+        "consulta": '''
+            SELECT estado_legal, total as cantidad_vehiculos
+            FROM resumen_vehiculos_estado_legal
+            WHERE total > 0
+        ''',
+        "orden": ("cantidad_vehiculos", "estado_legal"),
+        "descendente": True,
+    },
+    # 5. Propietarios con múltiples vehículos [cite: 356]
+    # El índice sobre resumen_vehiculos_propietario.total filtra a los que tienen más de 1
+    5: {
+        "consulta": '''
+            SELECT p.curp, p.nombre_completo, r.total as vehiculos_registrados
+            FROM resumen_vehiculos_propietario r
+            JOIN propietarios p ON p.id_propietario = r.id_propietario
+            WHERE r.total > 1
+        ''',
+        "orden": ("vehiculos_registrados", "curp"),
+        "descendente": True,
+    },
+    # 6. Resumen general de infracciones [cite: 357]
+    6: {
+        "consulta": '''
+            SELECT estado as Situacion, total as Total_Multas, monto as Dinero_Acumulado
+            FROM resumen_infracciones_estado
+            WHERE total > 0
+        ''',
+        "orden": ("Situacion",),
+        "descendente": False,
+    },
+}
+
 
 class GestorReportes:
 
+    @staticmethod
+    def _encabezados(cursor):
+        # Extraemos los nombres de las columnas directamente de la base de datos
+        return [descripcion[0].replace("_", " ").title() for descripcion in cursor.description]
+
+    @staticmethod
+    def _conexion():
+        # Adjunta los archivos históricos creados después de abrir la conexión del pool
+        conexion = obtener_conexion()
+        try:
+            adjuntar_archivos(conexion)
+        except Exception:
+            conexion.close()
+            raise
+        return conexion
+
     @staticmethod
     def ejecutar_consulta(query, parametros=()):
         """
         Función auxiliar para no repetir el código de conexión en cada reporte.
         Retorna: (exito: bool, encabezados: list, filas: list)
         """
-        conexion = obtener_conexion()
+        conexion = GestorReportes._conexion()
         cursor = conexion.cursor()
-        
+
         try:
             cursor.execute(query, parametros)
             filas = cursor.fetchall()
-            
-            # Extraemos los nombres de las columnas directamente de la base de datos
-            encabezados = [descripcion[0].replace("_", " ").title() for descripcion in cursor.description]
-            
-            return True, encabezados, filas
+            return True, GestorReportes._encabezados(cursor), filas
         except Exception as e:
             return False, ["Error"], [[str(e)]]
         finally:
             conexion.close()
 
+    @staticmethod
+    def iterar_consulta(query, parametros=(), tamano_bloque=TAMANO_BLOQUE):
+        """
+        Generador: ejecuta la consulta y entrega (encabezados, bloque_de_filas) de
+        'tamano_bloque' en 'tamano_bloque' con fetchmany, sin juntar todo el resultado
+        en memoria. Entrega al menos un bloque (vacío si no hay filas).
+        La conexión se devuelve al pool al terminar de recorrerlo o al cerrarlo.
+        """
+        conexion = GestorReportes._conexion()
+        try:
+            cursor = conexion.cursor()
+            cursor.execute(query, parametros)
+            encabezados = GestorReportes._encabezados(cursor)
+            bloque = cursor.fetchmany(tamano_bloque)
+            yield encabezados, bloque
+            while len(bloque) == tamano_bloque:
+                bloque = cursor.fetchmany(tamano_bloque)
+                if bloque:
+                    yield encabezados, bloque
+        finally:
+            conexion.close()
+
+    # ==========================================
+    # PAGINACIÓN Y RECORRIDO POR REPORTE
+    # ==========================================
+    # 'reporte' puede ser un id de REPORTES o una definición con el mismo formato
+    # (así otros gestores reutilizan la paginación, ej. la lista de usuarios).
+    # 'orden' opcional = (columna, descendente) para ordenar por otra columna del
+    # resultado; se desempata con la columna única de la definición.
+
+    @staticmethod
+    def _definicion(reporte, orden=None):
+        definicion = reporte if isinstance(reporte, dict) else REPORTES[reporte]
+        if orden is None:
+            return definicion
+
+        columna, descendente = orden
+        if not columna.isidentifier():
+            raise ValueError(f"Columna de orden inválida: '{columna}'.")
+        unica = definicion["orden"][-1]
+        personalizada = dict(definicion, orden=(columna, unica) if columna != unica else (unica,),
+                             descendente=descendente)
+        if columna != definicion["orden"][0] or descendente != definicion["descendente"]:
+            # El tope solo aplica a la primera columna del orden original
+            personalizada.pop("tope_parametro", None)
+        return personalizada
+
+    @staticmethod
+    def _orden(definicion):
+        direccion = "DESC" if definicion["descendente"] else "ASC"
+        return ", ".join(f"{columna} {direccion}" for columna in definicion["orden"])
+
+    @staticmethod
+    def consulta_ordenada(reporte, orden=None):
+        """SELECT completo del reporte con su ORDER BY."""
+        definicion = GestorReportes._definicion(reporte, orden)
+        return f"SELECT * FROM ({definicion['consulta']}) ORDER BY {GestorReportes._orden(definicion)}"
+
+    @staticmethod
+    def consulta_pagina(reporte, con_cursor, orden=None):
+        """
+        SELECT de una página. Con cursor, continúa después de la última fila de la
+        página anterior comparando las columnas de orden como tupla:
+            WHERE fecha <= ? AND (fecha, folio) < (?, ?)
+        La condición sobre la primera columna sola es redundante, pero es la que
+        SQLite sabe usar como límite del índice para saltar directo a la página.
+        Los parámetros van en el orden: los del reporte, los del cursor (ver
+        _parametros_cursor) y el LIMIT.
+        """
+        definicion = GestorReportes._definicion(reporte, orden)
+        condicion = ""
+        if con_cursor:
+            columnas = ", ".join(definicion["orden"])
+            marcadores = ", ".join("?" for _ in definicion["orden"])
+            comparador = "<" if definicion["descendente"] else ">"
+            condicion = f"WHERE {definicion['orden'][0]} {comparador}= ? AND ({columnas}) {comparador} ({marcadores})"
+        return f"SELECT * FROM ({definicion['consulta']}) {condicion} ORDER BY {GestorReportes._orden(definicion)} LIMIT ?"
+
+    @staticmethod
+    def _parametros_cursor(despues_de):
+        """Valores para la condición de consulta_pagina: la primera columna y luego la tupla completa."""
+        if despues_de is None:
+            return ()
+        return (despues_de[0],) + tuple(despues_de)
+
+    @staticmethod
+    def obtener_pagina(reporte, parametros=(), despues_de=None, tamano_pagina=TAMANO_PAGINA, orden=None):
+        """
+        Trae una página del reporte.
+        'despues_de' es el cursor que devolvió la página anterior (None para la primera).
+        Retorna: (exito, encabezados, filas, siguiente_cursor); siguiente_cursor es None
+        cuando ya no hay más filas.
+        """
+        try:
+            definicion = GestorReportes._definicion(reporte, orden)
+        except ValueError as e:
+            return False, ["Error"], [[str(e)]], None
+        query = GestorReportes.consulta_pagina(definicion, despues_de is not None)
+
+        parametros = list(parametros)
+        tope = definicion.get("tope_parametro")
+        if despues_de is not None and tope is not None:
+            # Ej. fecha BETWEEN inicio AND fin: la página siguiente empieza en la fecha del cursor
+            if definicion["descendente"]:
+                parametros[tope] = min(parametros[tope], despues_de[0])
+            else:
+                parametros[tope] = max(parametros[tope], despues_de[0])
+        # Pedimos una fila de más para saber si existe otra página sin hacer un COUNT
+        valores = tuple(parametros) + GestorReportes._parametros_cursor(despues_de) + (tamano_pagina + 1,)
+
+        exito, encabezados, filas = GestorReportes.ejecutar_consulta(query, valores)
+        if not exito:
+            return False, encabezados, filas, None
+
+        siguiente = None
+        if len(filas) > tamano_pagina:
+            filas = filas[:tamano_pagina]
+            siguiente = tuple(filas[-1][columna] for columna in definicion["orden"])
+        return True, encabezados, filas, siguiente
+
+    @staticmethod
+    def contar_filas(reporte, parametros=()):
+        """Total de filas del reporte (para mostrar 'X de N'). Retorna (exito, total)."""
+        query = f"SELECT COUNT(*) FROM ({GestorReportes._definicion(reporte)['consulta']})"
+        exito, _, filas = GestorReportes.ejecutar_consulta(query, tuple(parametros))
+        return (True, filas[0][0]) if exito else (False, 0)
+
+    @staticmethod
+    def iterar_reporte(reporte, parametros=(), tamano_bloque=TAMANO_BLOQUE, orden=None):
+        """Recorre el reporte completo por bloques. Ver iterar_consulta."""
+        query = GestorReportes.consulta_ordenada(reporte, orden)
+        return GestorReportes.iterar_consulta(query, tuple(parametros), tamano_bloque)
+
+    # ==========================================
+    # REPORTES COMPLETOS
+    # ==========================================
+
     # 1. Vehículos con infracciones pendientes [cite: 350]
     @staticmethod
     def reporte_vehiculos_infracciones_pendientes():
-        query = '''
-            SELECT v.placa, v.vin, v.marca, v.modelo, COUNT(i.folio) as total_multas_pendientes
-            FROM vehiculos v
-            JOIN infracciones i ON v.vin = i.vin_infractor
-            WHERE i.estado = 'Pendiente'
-            GROUP BY v.vin
-            ORDER BY total_multas_pendientes DESC
-        '''
-        return GestorReportes.ejecutar_consulta(query)
+        return GestorReportes.ejecutar_consulta(GestorReportes.consulta_ordenada(1))
 
     # 2. Infracciones por rango de fechas [cite: 351]
     @staticmethod
     def reporte_infracciones_por_fecha(fecha_inicio, fecha_fin):
-        query = '''
-            SELECT folio, fecha, hora, lugar, tipo_infraccion, monto, estado
-            FROM infracciones
-            WHERE fecha BETWEEN ? AND ?
-            ORDER BY fecha DESC
-        '''
-        return GestorReportes.ejecutar_consulta(query, (fecha_inicio, fecha_fin))
+        return GestorReportes.ejecutar_consulta(GestorReportes.consulta_ordenada(2), (fecha_inicio, fecha_fin))
 
     # 3. Infracciones emitidas por agente [cite: 353]
     @staticmethod
     def reporte_infracciones_por_agente():
-        query = '''
-            SELECT a.numero_placa as ID_Oficial, a.nombre_completo, COUNT(i.folio) as multas_emitidas
-            FROM agentes a
-            LEFT JOIN infracciones i ON a.id_agente = i.id_agente
-            GROUP BY a.id_agente
-            ORDER BY multas_emitidas DESC
-        '''
-        return GestorReportes.ejecutar_consulta(query)
+        return GestorReportes.ejecutar_consulta(GestorReportes.consulta_ordenada(3))
 
     # 4. Vehículos por estado legal [cite: 354]
     @staticmethod
     def reporte_vehiculos_estado_legal():
-        query = '''
-            SELECT estado_legal, COUNT(vin) as cantidad_vehiculos
-            FROM vehiculos
-            GROUP BY estado_legal
-            ORDER BY cantidad_vehiculos DESC
-        '''
-        return GestorReportes.ejecutar_consulta(query)
+        return GestorReportes.ejecutar_consulta(GestorReportes.consulta_ordenada(4))
 
     # 5. Propietarios con múltiples vehículos [cite: 356]
     @staticmethod
     def reporte_propietarios_multiples_vehiculos():
-        # Usamos HAVING para filtrar a los que tienen estrictamente más de 1
-        query = '''
-            SELECT p.curp, p.nombre_completo, COUNT(v.vin) as vehiculos_registrados
-            FROM propietarios p
-            JOIN vehiculos v ON p.id_propietario = v.id_propietario
-            GROUP BY p.id_propietario
-            HAVING COUNT(v.vin) > 1
-            ORDER BY vehiculos_registrados DESC
-        '''
-        return GestorReportes.ejecutar_consulta(query)
+        return GestorReportes.ejecutar_consulta(GestorReportes.consulta_ordenada(5))
 
     # 6. Resumen general de infracciones [cite: 357]
     @staticmethod
     def reporte_resumen_infracciones():
-        query = '''
-            SELECT estado as Situacion, COUNT(folio) as Total_Multas, SUM(monto) as Dinero_Acumulado
-            FROM infracciones
-            GROUP BY estado
-        '''
-        return GestorReportes.ejecutar_consulta(query)
\ No newline at end of file
+        return GestorReportes.ejecutar_consulta(GestorReportes.consulta_ordenada(6))
@@ -1,6 +1,16 @@
 import sqlite3
 from database.conexion import obtener_conexion
+from database.reintentos import reintentar_si_ocupada, propagar_si_ocupada
+from logic.sesion import requiere_capacidad, ADMINISTRAR_USUARIOS
 from logic.auth import Auth # Importamos Auth por si luego ocupamos hashear contraseñas nuevas
+from logic.gestor_reportes import GestorReportes, TAMANO_PAGINA
+
+# Listado para la tabla de Control de Accesos (misma forma que las definiciones de REPORTES)
+LISTADO_USUARIOS = {
+    "consulta": "SELECT id_usuario, nombre_usuario, rol, estado FROM usuarios",
+    "orden": ("id_usuario",),
+    "descendente": False,
+}
 
 class GestorUsuarios:
 
@@ -27,6 +37,21 @@ class GestorUsuarios:
             conexion.close()
 
     @staticmethod
+    def obtener_pagina_usuarios(despues_de=None, tamano_pagina=TAMANO_PAGINA, orden=None):
+        """
+        Página del listado de usuarios (sin contraseñas), para la tabla paginada.
+        Retorna: (exito, encabezados, filas, siguiente_cursor). Ver GestorReportes.obtener_pagina.
+        """
+        return GestorReportes.obtener_pagina(LISTADO_USUARIOS, (), despues_de, tamano_pagina, orden)
+
+    @staticmethod
+    def contar_usuarios():
+        """Retorna (exito, total de usuarios)."""
+        return GestorReportes.contar_filas(LISTADO_USUARIOS)
+
+    @staticmethod
+    @requiere_capacidad(ADMINISTRAR_USUARIOS)
+    @reintentar_si_ocupada
     def actualizar_usuario(id_usuario, nuevo_rol, nuevo_estado):
         """
         Permite al administrador cambiar el rol o el estado (Activo/Inactivo) de un empleado.
@@ -48,6 +73,7 @@ class GestorUsuarios:
             return True, "Los permisos del usuario han sido actualizados exitosamente."
             
         except Exception as e:
+            propagar_si_ocupada(e)
             return False, f"Error inesperado al actualizar usuario: {str(e)}"
         finally:
             conexion.close()
\ No newline at end of file
@@ -1,41 +1,43 @@
 import sqlite3
+import json
 from database.conexion import obtener_conexion
-from logic.validador import Validador
+from database.reintentos import reintentar_si_ocupada, propagar_si_ocupada
+from logic.sesion import requiere_capacidad, MODIFICAR_VEHICULOS, REGISTRAR_VEHICULOS
+from logic.validador import Validador, REGLAS_VEHICULO
+from logic import cache_vehiculos
+
+# Condición de los trámites bloqueados por multas [4.2.vii], evaluada dentro del mismo UPDATE.
+# multas_pendientes lo mantienen los triggers de infracciones (migración 009)
+_SIN_MULTAS_PENDIENTES = "multas_pendientes = 0"
+
+
+def _motivo_tramite_rechazado(cursor, vin, msj_multas, msj_otro=None):
+    """
+    Cuando el UPDATE condicionado no cambió ninguna fila, averigua por qué dentro de
+    la misma transacción (ve exactamente lo que vio el UPDATE): el vehículo no existe,
+    tiene multas pendientes o, si no fue ninguna de las dos, msj_otro.
+    """
+    vehiculo = cursor.execute("SELECT multas_pendientes FROM vehiculos WHERE vin = ?", (vin,)).fetchone()
+    if not vehiculo:
+        return "Error: No se encontró el vehículo con el VIN especificado."
+    if vehiculo[0] > 0:
+        return msj_multas
+    return msj_otro or "Error: No se pudo completar el trámite."
+
 
 class GestorVehiculos:
     
     @staticmethod
+    @requiere_capacidad(REGISTRAR_VEHICULOS)
+    @reintentar_si_ocupada
     def registrar_vehiculo(vehiculo):
         """Recibe un objeto Vehiculo, verifica sus reglas de negocio y lo guarda."""
         
         # 1. Validaciones estructurales, de formato y de catálogos
         # Estas validaciones evitan viajes innecesarios a la base de datos.
-        
-        valido, msj = Validador.validar_vin(vehiculo.vin)
-        if not valido: return False, msj
-        
-        valido, msj = Validador.validar_placa(vehiculo.placa)
+        valido, msj = Validador.validar_vehiculo(vehiculo)
         if not valido: return False, msj
 
-        valido, msj = Validador.validar_anio_vehiculo(vehiculo.anio)
-        if not valido: return False, msj
-
-        valido, msj = Validador.validar_estado_vehiculo(vehiculo.estado_legal)
-        if not valido: return False, msj
-        
-        valido, msj = Validador.validar_procedencia_vehiculo(vehiculo.procedencia)
-        if not valido: return False, msj
-
-        valido, msj = Validador.validar_marca_modelo_clase(vehiculo.marca, vehiculo.modelo, vehiculo.clase)
-        if not valido: return False, msj
-
-        valido, msj = Validador.validar_color_vehiculo(vehiculo.color)
-        if not valido: return False, msj
-
-        valido, msj = Validador.validar_id_propietario(vehiculo.id_propietario)
-        if not valido: return False, msj
-        
-        
         # 2. Guardar en la base de datos
         conexion = obtener_conexion()
         cursor = conexion.cursor()
@@ -65,26 +67,138 @@ class GestorVehiculos:
             else:
                 return False, "Error de integridad en la base de datos."
         except Exception as e:
+            propagar_si_ocupada(e)
             return False, f"Error inesperado al registrar vehículo: {str(e)}"
         finally:
             conexion.close()
 
+    @staticmethod
+    @requiere_capacidad(REGISTRAR_VEHICULOS, al_denegar=lambda msj, vehiculos: [(False, msj) for _ in vehiculos])
+    def registrar_vehiculos_lote(vehiculos):
+        """
+        Registra muchos vehículos con una sola conexión y una sola transacción.
+        Recibe un iterable de objetos Vehiculo y retorna una lista de (exito, mensaje)
+        en el mismo orden, con los mismos mensajes que registrar_vehiculo.
+        Para archivos muy grandes conviene enviarlo en bloques (ej. de 5,000).
+        """
+        vehiculos = list(vehiculos)
+        resultados = [None] * len(vehiculos)
+
+        # 1. Validaciones de formato y catálogos, más duplicados dentro del mismo lote
+        vins_vistos = set()
+        placas_vistas = set()
+        candidatos = []
+        errores_por_vehiculo = REGLAS_VEHICULO.validar_lote(vehiculos)
+        for posicion, (vehiculo, errores) in enumerate(zip(vehiculos, errores_por_vehiculo)):
+            if errores:
+                # Mismo mensaje que registrar_vehiculo: el primer error en el orden de las reglas
+                resultados[posicion] = (False, next(iter(errores.values())))
+            elif vehiculo.vin in vins_vistos:
+                resultados[posicion] = (False, "Error: El VIN ingresado ya está registrado. Es único e inmutable.")
+            elif vehiculo.placa in placas_vistas:
+                resultados[posicion] = (False, "Error: La placa ingresada ya está asignada a otro vehículo activo.")
+            else:
+                vins_vistos.add(vehiculo.vin)
+                placas_vistas.add(vehiculo.placa)
+                candidatos.append(posicion)
+
+        # 2. Reglas contra la base de datos e inserción
+        if candidatos:
+            exito, respuesta = GestorVehiculos._guardar_lote(vehiculos, candidatos)
+            if exito:
+                resultados_bd = respuesta
+            else:
+                resultados_bd = {posicion: (False, respuesta) for posicion in candidatos}
+            for posicion, resultado in resultados_bd.items():
+                resultados[posicion] = resultado
+
+        return resultados
+
+    @staticmethod
+    @reintentar_si_ocupada
+    def _guardar_lote(vehiculos, candidatos):
+        """
+        Verifica propietarios, VIN y placas existentes con una consulta por conjunto
+        (no una por vehículo) e inserta los válidos con executemany.
+        Retorna (True, {posicion: (exito, mensaje)}) o (False, mensaje_error).
+        """
+        conexion = obtener_conexion()
+        cursor = conexion.cursor()
+
+        try:
+            # BEGIN IMMEDIATE: nadie más puede escribir entre la verificación y el INSERT
+            cursor.execute("BEGIN IMMEDIATE")
+
+            def existentes(consulta, valores):
+                cursor.execute(consulta, (json.dumps(list(valores)),))
+                return {fila[0] for fila in cursor.fetchall()}
+
+            propietarios = existentes(
+                "SELECT id_propietario FROM propietarios WHERE id_propietario IN (SELECT value FROM json_each(?))",
+                {vehiculos[p].id_propietario for p in candidatos})
+            vins_registrados = existentes(
+                "SELECT vin FROM vehiculos WHERE vin IN (SELECT value FROM json_each(?))",
+                (vehiculos[p].vin for p in candidatos))
+            placas_registradas = existentes(
+                "SELECT placa FROM vehiculos WHERE placa IN (SELECT value FROM json_each(?))",
+                (vehiculos[p].placa for p in candidatos))
+
+            resultados = {}
+            filas = []
+            for posicion in candidatos:
+                vehiculo = vehiculos[posicion]
+                if vehiculo.id_propietario not in propietarios:
+                    resultados[posicion] = (False, "Error: El ID del propietario no existe en el sistema.")
+                elif vehiculo.vin in vins_registrados:
+                    resultados[posicion] = (False, "Error: El VIN ingresado ya está registrado. Es único e inmutable.")
+                elif vehiculo.placa in placas_registradas:
+                    resultados[posicion] = (False, "Error: La placa ingresada ya está asignada a otro vehículo activo.")
+                else:
+                    resultados[posicion] = (True, "Vehículo registrado correctamente.")
+                    filas.append((vehiculo.vin, vehiculo.placa, vehiculo.marca, vehiculo.modelo, vehiculo.anio,
+                                vehiculo.color, vehiculo.clase, vehiculo.estado_legal, vehiculo.procedencia,
+                                vehiculo.id_propietario))
+
+            cursor.executemany('''
+                INSERT INTO vehiculos (vin, placa, marca, modelo, anio, color, clase, estado_legal, procedencia, id_propietario)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', filas)
+
+            conexion.commit()
+            return True, resultados
+
+        except Exception as e:
+            propagar_si_ocupada(e)
+            return False, f"Error inesperado al registrar el lote de vehículos: {str(e)}"
+        finally:
+            conexion.close()
+
     @staticmethod
     def buscar_vehiculo_universal(criterio: str) -> tuple[bool, str | dict]:
         """
         Busca un vehículo ya sea por su VIN (17 caracteres) o por su Placa.
         Retorna todos sus datos, incluyendo el VIN real.
+        Por el formato se sabe cuál de los dos es, así que se consulta una sola
+        columna (un solo índice único) y primero se revisa la caché de vehículos.
         """
+        es_vin = len(criterio) == 17   # Ninguna placa válida tiene 17 caracteres
+        if es_vin:
+            guardado = cache_vehiculos.vehiculos.obtener(vin=criterio)
+        else:
+            guardado = cache_vehiculos.vehiculos.obtener(placa=criterio)
+        if guardado is not None:
+            return True, guardado
+
+        generacion = cache_vehiculos.vehiculos.generacion()
         try:
             conexion = obtener_conexion()
             cursor = conexion.cursor()
             
-            # Buscamos en ambas columnas al mismo tiempo usando OR
-            cursor.execute('''
+            cursor.execute(f'''
                 SELECT vin, placa, marca, modelo, anio, color, clase, estado_legal, procedencia, id_propietario 
                 FROM vehiculos 
-                WHERE vin = ? OR placa = ?
-            ''', (criterio, criterio))
+                WHERE {"vin" if es_vin else "placa"} = ?
+            ''', (criterio,))
             
             resultado = cursor.fetchone()
             
@@ -102,6 +216,7 @@ class GestorVehiculos:
                     "procedencia": resultado[8],
                     "id_propietario": resultado[9]
                 }
+                cache_vehiculos.vehiculos.guardar(datos_vehiculo, generacion)
                 return True, datos_vehiculo
             else:
                 return False, "No se encontró ningún vehículo con ese VIN o Placa."
@@ -114,6 +229,8 @@ class GestorVehiculos:
 
 
     @staticmethod
+    @requiere_capacidad(MODIFICAR_VEHICULOS)
+    @reintentar_si_ocupada
     def actualizar_vehiculo(vin: str, color: str, estado_legal: str) -> tuple[bool, str]:
         """
         Actualiza únicamente los campos permitidos (color y estado_legal) de un vehículo existente.
@@ -140,13 +257,18 @@ class GestorVehiculos:
             return True, "Datos del vehículo actualizados correctamente."
             
         except Exception as e:
+            propagar_si_ocupada(e)
             return False, f"Error al actualizar en la base de datos: {str(e)}"
         finally:
             if 'conexion' in locals():
                 conexion.close()
+            # El vehículo pudo cambiar: la próxima búsqueda lo vuelve a leer de la base de datos
+            cache_vehiculos.vehiculos.invalidar(vin)
     
     
     @staticmethod
+    @requiere_capacidad(MODIFICAR_VEHICULOS)
+    @reintentar_si_ocupada
     def modificar_vehiculo(vin, nueva_placa, nuevo_color, nuevo_estado_legal):
         """
         Modifica los datos permitidos de un vehículo (Placa, Color, Estado legal).
@@ -165,12 +287,10 @@ class GestorVehiculos:
 
         try:
             # 2. Regla de negocio: Bloquear trámite administrativo si hay infracciones pendientes [cite: 180, 236]
-            cursor.execute('''
-                SELECT COUNT(*) FROM infracciones 
-                WHERE vin_infractor = ? AND estado = 'Pendiente'
-            ''', (vin,))
-            
-            if cursor.fetchone()[0] > 0:
+            cursor.execute("SELECT multas_pendientes FROM vehiculos WHERE vin = ?", (vin,))
+            pendientes = cursor.fetchone()
+
+            if pendientes and pendientes[0] > 0:
                 return False, "Error: El vehículo tiene infracciones pendientes. Trámite bloqueado."
 
             # 3. Regla de negocio: Garantizar que la nueva placa sea única [cite: 178]
@@ -200,55 +320,91 @@ class GestorVehiculos:
             # Respaldo por si la base de datos lanza error de unicidad (UNIQUE constraint)
             return False, "Error de integridad: La placa ingresada ya existe en el sistema."
         except Exception as e:
+            propagar_si_ocupada(e)
             return False, f"Error inesperado al modificar vehículo: {str(e)}"
         finally:
             conexion.close()
+            cache_vehiculos.vehiculos.invalidar(vin)
             
     @staticmethod
     def tiene_multas_pendientes(vin):
         """Verifica si el vehículo tiene deudas. Regla de negocio [4.2.vii]"""
         conexion = obtener_conexion()
-        cursor = conexion.cursor()
-        cursor.execute("SELECT COUNT(*) FROM infracciones WHERE vin_infractor = ? AND estado = 'Pendiente'", (vin,))
-        resultado = cursor.fetchone()[0]
-        conexion.close()
-        return resultado > 0
+        try:
+            cursor = conexion.cursor()
+            cursor.execute("SELECT multas_pendientes FROM vehiculos WHERE vin = ?", (vin,))
+            resultado = cursor.fetchone()
+        finally:
+            conexion.close()
+        return resultado is not None and resultado[0] > 0
 
     @staticmethod
+    @requiere_capacidad(MODIFICAR_VEHICULOS)
+    @reintentar_si_ocupada
     def realizar_reemplacamiento(vin, nueva_placa):
-        """Actualiza la placa validando unicidad y multas."""
-        if GestorVehiculos.tiene_multas_pendientes(vin):
-            return False, "Trámite Bloqueado: El vehículo tiene infracciones pendientes de pago."
-        
+        """
+        Actualiza la placa validando unicidad y multas.
+        Una sola transacción: el UPDATE solo aplica si no hay multas pendientes en
+        ese momento, así que una multa registrada a la par no se cuela.
+        """
         conexion = obtener_conexion()
         cursor = conexion.cursor()
         try:
-            cursor.execute("UPDATE vehiculos SET placa = ? WHERE vin = ?", (nueva_placa, vin))
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute(f"UPDATE vehiculos SET placa = ? WHERE vin = ? AND {_SIN_MULTAS_PENDIENTES}",
+                           (nueva_placa, vin))
+            if cursor.rowcount == 0:
+                msj = _motivo_tramite_rechazado(
+                    cursor, vin, "Trámite Bloqueado: El vehículo tiene infracciones pendientes de pago.")
+                conexion.rollback()
+                return False, msj
+
             conexion.commit()
             return True, "Reemplacamiento exitoso."
         except sqlite3.IntegrityError:
+            conexion.rollback()
             return False, "Error: La placa ya está registrada en otro vehículo activo."
+        except Exception as e:
+            conexion.rollback()
+            propagar_si_ocupada(e)
+            return False, f"Error inesperado en el reemplacamiento: {str(e)}"
         finally:
             conexion.close()
+            cache_vehiculos.vehiculos.invalidar(vin)
 
     @staticmethod
+    @requiere_capacidad(MODIFICAR_VEHICULOS)
+    @reintentar_si_ocupada
     def transferir_propiedad(vin, id_nuevo_propietario):
-        """Cambia el dueño validando existencia, estado y multas."""
-        if GestorVehiculos.tiene_multas_pendientes(vin):
-            return False, "Trámite Bloqueado: No se puede transferir un vehículo con multas pendientes."
-        
+        """
+        Cambia el dueño validando existencia, estado y multas, en una sola
+        transacción: el UPDATE solo aplica si el propietario destino está activo [4.3.vi]
+        y el vehículo no tiene multas pendientes en ese momento.
+        """
         conexion = obtener_conexion()
         cursor = conexion.cursor()
         try:
-            # Validar que el nuevo propietario existe y está activo [4.3.vi]
-            cursor.execute("SELECT estado FROM propietarios WHERE id_propietario = ?", (id_nuevo_propietario,))
-            propietario = cursor.fetchone()
-            
-            if not propietario or propietario[0] != "Activo":
-                return False, "Error: El propietario destino no existe o está inactivo."
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute(f'''
+                UPDATE vehiculos SET id_propietario = ?
+                WHERE vin = ?
+                  AND {_SIN_MULTAS_PENDIENTES}
+                  AND EXISTS (SELECT 1 FROM propietarios WHERE id_propietario = ? AND estado = 'Activo')
+            ''', (id_nuevo_propietario, vin, id_nuevo_propietario))
+            if cursor.rowcount == 0:
+                msj = _motivo_tramite_rechazado(
+                    cursor, vin, "Trámite Bloqueado: No se puede transferir un vehículo con multas pendientes.",
+                    "Error: El propietario destino no existe o está inactivo.")
+                conexion.rollback()
+                return False, msj
 
-            cursor.execute("UPDATE vehiculos SET id_propietario = ? WHERE vin = ?", (id_nuevo_propietario, vin))
             conexion.commit()
             return True, "Transferencia de propiedad realizada correctamente."
+        except Exception as e:
+            conexion.rollback()
+            propagar_si_ocupada(e)
+            return False, f"Error inesperado en la transferencia: {str(e)}"
         finally:
-            conexion.close()
\ No newline at end of file
+            conexion.close()
+            cache_vehiculos.vehiculos.invalidar(vin)
+
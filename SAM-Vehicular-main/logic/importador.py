@@ -0,0 +1,393 @@
+"""
+Importación masiva de propietarios, vehículos e infracciones desde CSV o JSONL.
+
+Pensado para los volcados nocturnos del padrón estatal:
+- Lee el archivo fila por fila (nunca lo carga completo en memoria).
+- Los valores de catálogo se aceptan sin importar mayúsculas ni acentos
+  ("sedan" -> "Sedán") y se guardan con su forma oficial.
+- Valida cada registro con las reglas del Validador y reporta todos sus errores,
+  no solo el primero.
+- Escribe en bloques: una transacción por cada 'tamano_bloque' registros.
+- Los registros rechazados se escriben en <archivo>.rechazos.csv con su motivo.
+- Cada bloque guarda su punto de control en la tabla progreso_importacion
+  (migración 011) dentro de la misma transacción; si el proceso se interrumpe,
+  la siguiente ejecución continúa después del último bloque confirmado, sin
+  volver a insertarlo.
+"""
+
+import csv
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+from database.conexion import obtener_conexion
+from database.reintentos import es_error_de_bloqueo
+from logic.validador import Validador, REGLAS_PROPIETARIO, REGLAS_VEHICULO, REGLAS_INFRACCION
+import logic.indice_catalogos as idx
+from logic.almacen_catalogos import catalogos
+from logic.gestor_infracciones import GestorInfracciones
+from models.propietario import Propietario
+from models.vehiculo import Vehiculo
+from models.infraccion import Infraccion
+
+TAMANO_BLOQUE = 5000
+
+
+class ErrorDeConversion(ValueError):
+    """Un campo del archivo no tiene el tipo esperado (ej. texto en el año)."""
+
+
+def _texto(fila, columna, por_defecto=None):
+    valor = fila.get(columna)
+    if valor is None or (isinstance(valor, str) and valor.strip() == ""):
+        return por_defecto
+    return str(valor).strip()
+
+
+def _entero(fila, columna):
+    valor = _texto(fila, columna)
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        raise ErrorDeConversion(f"La columna '{columna}' debe ser un número entero (se recibió '{valor}').")
+
+
+def _decimal(fila, columna):
+    valor = _texto(fila, columna)
+    try:
+        return float(valor)
+    except (TypeError, ValueError):
+        raise ErrorDeConversion(f"La columna '{columna}' debe ser numérica (se recibió '{valor}').")
+
+
+def _rechazo(errores):
+    """Motivo de rechazo con todos los errores de validación del registro."""
+    return False, " | ".join(errores.values())
+
+
+def _catalogo(fila, columna, catalogo, por_defecto=None):
+    """Valor de catálogo en su forma oficial; si no coincide se deja igual para que el Validador lo rechace."""
+    valor = _texto(fila, columna, por_defecto)
+    return catalogo.canonico(valor) or valor
+
+
+# ==========================================
+# DEFINICIÓN DE CADA TIPO DE REGISTRO
+# ==========================================
+# En la importación el estado de la infracción viene en el archivo, así que también se valida
+_REGLAS_INFRACCION_IMPORTADA = REGLAS_INFRACCION.extender(
+    ("estado", Validador.validar_estado_infraccion, ("estado",)))
+
+
+def _preparar_propietario(fila):
+    propietario = Propietario(
+        nombre_completo=_texto(fila, "nombre_completo", ""), curp=_texto(fila, "curp", "").upper(),
+        direccion=_texto(fila, "direccion", ""), telefono=_texto(fila, "telefono", ""),
+        correo_electronico=_texto(fila, "correo_electronico", ""),
+        estado_licencia=_catalogo(fila, "estado_licencia", idx.ESTADOS_LICENCIA),
+        estado=_catalogo(fila, "estado", idx.ESTADOS_PROPIETARIO, "Activo"),
+    )
+    errores = REGLAS_PROPIETARIO.errores(propietario)
+    if errores:
+        return _rechazo(errores)
+    return True, (propietario.nombre_completo, propietario.curp, propietario.direccion, propietario.telefono,
+                  propietario.correo_electronico, propietario.estado_licencia, propietario.estado)
+
+
+def _preparar_vehiculo(fila):
+    marca, modelo, clase = _texto(fila, "marca"), _texto(fila, "modelo"), _texto(fila, "clase")
+    vigentes = catalogos()
+    marca, modelo, clase = vigentes.combinacion_canonica(marca, modelo, clase) or (marca, modelo, clase)
+    vehiculo = Vehiculo(
+        vin=_texto(fila, "vin", "").upper(), placa=_texto(fila, "placa", "").upper(),
+        marca=marca, modelo=modelo, anio=_entero(fila, "anio"),
+        color=_catalogo(fila, "color", vigentes.colores), clase=clase,
+        procedencia=_catalogo(fila, "procedencia", idx.PROCEDENCIAS_VEHICULO),
+        id_propietario=_entero(fila, "id_propietario"),
+        estado_legal=_catalogo(fila, "estado_legal", idx.ESTADOS_VEHICULO, "Activo"),
+    )
+    errores = REGLAS_VEHICULO.errores(vehiculo)
+    if errores:
+        return _rechazo(errores)
+    return True, (vehiculo.vin, vehiculo.placa, vehiculo.marca, vehiculo.modelo, vehiculo.anio, vehiculo.color,
+                  vehiculo.clase, vehiculo.estado_legal, vehiculo.procedencia, vehiculo.id_propietario)
+
+
+def _preparar_infraccion(fila):
+    infraccion = Infraccion(
+        vin_infractor=_texto(fila, "vin_infractor", "").upper(), id_agente=_entero(fila, "id_agente"),
+        fecha=_texto(fila, "fecha", ""), hora=_texto(fila, "hora", ""), lugar=_texto(fila, "lugar", ""),
+        tipo_infraccion=_catalogo(fila, "tipo_infraccion", catalogos().tipos_infraccion),
+        motivo=_texto(fila, "motivo", ""),
+        monto=_decimal(fila, "monto"), licencia_conductor=_texto(fila, "licencia_conductor"),
+        estado=_catalogo(fila, "estado", idx.ESTADOS_INFRACCION, "Pendiente"), folio=_texto(fila, "folio"),
+    )
+    tipo_captura = _catalogo(fila, "tipo_captura", idx.TIPOS_CAPTURA_INFRACCION, "Fotomulta")
+    errores = _REGLAS_INFRACCION_IMPORTADA.errores(infraccion, tipo_captura=tipo_captura)
+    if errores:
+        return _rechazo(errores)
+    folio = infraccion.folio or GestorInfracciones.generar_folio()
+    return True, (folio, infraccion.vin_infractor, infraccion.id_agente, infraccion.fecha, infraccion.hora,
+                  infraccion.lugar, infraccion.tipo_infraccion, infraccion.motivo, infraccion.monto,
+                  infraccion.licencia_conductor, infraccion.estado)
+
+
+ENTIDADES = {
+    "propietarios": {
+        "preparar": _preparar_propietario,
+        "insertar": '''INSERT INTO propietarios (nombre_completo, curp, direccion, telefono,
+                       correo_electronico, estado_licencia, estado) VALUES (?, ?, ?, ?, ?, ?, ?)''',
+        "errores": {
+            "curp": "Error: La CURP ingresada ya se encuentra registrada en el sistema.",
+        },
+    },
+    "vehiculos": {
+        "preparar": _preparar_vehiculo,
+        "insertar": '''INSERT INTO vehiculos (vin, placa, marca, modelo, anio, color, clase, estado_legal,
+                       procedencia, id_propietario) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+        "errores": {
+            "vehiculos.vin": "Error: El VIN ingresado ya está registrado. Es único e inmutable.",
+            "placa": "Error: La placa ingresada ya está asignada a otro vehículo activo.",
+            "foreign key": "Error: El ID del propietario no existe en el sistema.",
+        },
+    },
+    "infracciones": {
+        "preparar": _preparar_infraccion,
+        "insertar": '''INSERT INTO infracciones (folio, vin_infractor, id_agente, fecha, hora, lugar,
+                       tipo_infraccion, motivo, monto, licencia_conductor, estado)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+        "errores": {
+            "folio": "Error: El folio ya existe en el sistema.",
+            "foreign key": "Error: El vehículo (VIN) o el agente emisor no existen en el sistema.",
+        },
+    },
+}
+
+
+# ==========================================
+# LECTURA EN STREAMING
+# ==========================================
+def leer_registros(ruta):
+    """
+    Genera (numero_registro, diccionario) leyendo el archivo de forma incremental.
+    Formato según la extensión: .csv (con encabezados) o .jsonl / .ndjson (un objeto por línea).
+    """
+    extension = os.path.splitext(ruta)[1].lower()
+    with open(ruta, newline="", encoding="utf-8-sig") as archivo:
+        if extension == ".csv":
+            for numero, fila in enumerate(csv.DictReader(archivo), start=1):
+                yield numero, fila
+        elif extension in (".jsonl", ".ndjson"):
+            numero = 0
+            for linea in archivo:
+                if not linea.strip():
+                    continue
+                numero += 1
+                try:
+                    yield numero, json.loads(linea)
+                except json.JSONDecodeError as e:
+                    yield numero, {"__error__": f"Línea JSON inválida: {e.msg}"}
+        else:
+            raise ValueError(f"Formato no soportado: '{extension}'. Use .csv, .jsonl o .ndjson.")
+
+
+# ==========================================
+# PUNTO DE CONTROL Y RECHAZOS
+# ==========================================
+_CAMPOS_PROGRESO = ("ultimo_registro", "aceptados", "rechazados", "bytes_rechazos")
+
+
+def _leer_progreso(archivo):
+    conexion = obtener_conexion()
+    try:
+        fila = conexion.execute(f'''
+            SELECT entidad, {", ".join(_CAMPOS_PROGRESO)} FROM progreso_importacion WHERE archivo = ?
+        ''', (archivo,)).fetchone()
+    finally:
+        conexion.close()
+    return dict(zip(("entidad",) + _CAMPOS_PROGRESO, fila)) if fila else None
+
+
+def _borrar_progreso(archivo):
+    conexion = obtener_conexion()
+    try:
+        conexion.execute("DELETE FROM progreso_importacion WHERE archivo = ?", (archivo,))
+        conexion.commit()
+    finally:
+        conexion.close()
+
+
+def _guardar_progreso(cursor, archivo, resumen):
+    """Se ejecuta dentro de la transacción del bloque."""
+    cursor.execute(f'''
+        INSERT INTO progreso_importacion (archivo, entidad, {", ".join(_CAMPOS_PROGRESO)}, actualizado_en)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (archivo) DO UPDATE SET
+            entidad = excluded.entidad, ultimo_registro = excluded.ultimo_registro,
+            aceptados = excluded.aceptados, rechazados = excluded.rechazados,
+            bytes_rechazos = excluded.bytes_rechazos, actualizado_en = excluded.actualizado_en
+    ''', (archivo, resumen["entidad"]) + tuple(resumen[campo] for campo in _CAMPOS_PROGRESO)
+         + (datetime.now().isoformat(timespec="seconds"),))
+
+
+class Importador:
+    """
+    Importa un archivo de una entidad ('propietarios', 'vehiculos' o 'infracciones').
+
+        resumen = Importador("vehiculos", "padron.csv").ejecutar()
+    """
+
+    def __init__(self, entidad, ruta, tamano_bloque=TAMANO_BLOQUE, reanudar=True, al_avanzar=None):
+        if entidad not in ENTIDADES:
+            raise ValueError(f"Entidad desconocida '{entidad}'. Opciones: {', '.join(ENTIDADES)}.")
+        self.entidad = entidad
+        self.definicion = ENTIDADES[entidad]
+        self.ruta = ruta
+        self.tamano_bloque = tamano_bloque
+        self.reanudar = reanudar
+        self.al_avanzar = al_avanzar  # función opcional que recibe el resumen parcial
+
+        self.clave_progreso = os.path.abspath(ruta)     # Llave en progreso_importacion
+        self.ruta_rechazos = ruta + ".rechazos.csv"
+
+    def _traducir_error(self, error):
+        texto = str(error).lower()
+        for fragmento, mensaje in self.definicion["errores"].items():
+            if fragmento in texto:
+                return mensaje
+        return f"Error de integridad en la base de datos: {error}"
+
+    def _abrir_rechazos(self, checkpoint):
+        if checkpoint:
+            # Descartamos lo escrito después del último bloque confirmado
+            archivo = open(self.ruta_rechazos, "a+", newline="", encoding="utf-8")
+            archivo.truncate(checkpoint["bytes_rechazos"])
+            archivo.seek(checkpoint["bytes_rechazos"])
+            return archivo
+        archivo = open(self.ruta_rechazos, "w", newline="", encoding="utf-8")
+        csv.writer(archivo).writerow(["registro", "motivo", "datos"])
+        return archivo
+
+    def _escribir_bloque(self, filas_validas, antes_de_confirmar):
+        """
+        Inserta un bloque en una transacción. Antes de confirmar llama a
+        antes_de_confirmar(cursor, rechazos) para guardar el punto de control en
+        la misma transacción. Retorna [(numero, motivo)] de los que fallaron.
+        """
+        rechazos = []
+        conexion = obtener_conexion()
+        cursor = conexion.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            for numero, valores in filas_validas:
+                try:
+                    cursor.execute(self.definicion["insertar"], valores)
+                except sqlite3.IntegrityError as e:
+                    # Solo se revierte esta sentencia; el resto del bloque sigue en la transacción
+                    rechazos.append((numero, self._traducir_error(e)))
+            antes_de_confirmar(cursor, rechazos)
+            conexion.commit()
+        except Exception:
+            conexion.rollback()
+            raise
+        finally:
+            conexion.close()
+        return rechazos
+
+    def ejecutar(self):
+        """
+        Procesa el archivo completo. Retorna un diccionario con: ultimo_registro,
+        aceptados, rechazados, omitidos (ya importados antes de reanudar).
+        """
+        checkpoint = _leer_progreso(self.clave_progreso) if self.reanudar else None
+        if checkpoint and checkpoint["entidad"] != self.entidad:
+            raise ValueError("El punto de control pertenece a otra entidad; use reanudar=False.")
+
+        resumen = {
+            "entidad": self.entidad,
+            "ultimo_registro": 0, "aceptados": 0, "rechazados": 0,
+            "bytes_rechazos": 0, "omitidos": 0,
+        }
+        if checkpoint:
+            resumen.update({clave: checkpoint[clave] for clave in
+                            ("ultimo_registro", "aceptados", "rechazados", "bytes_rechazos")})
+
+        archivo_rechazos = self._abrir_rechazos(checkpoint)
+        escritor_rechazos = csv.writer(archivo_rechazos)
+        try:
+            bloque = []
+            originales = {}
+
+            def cerrar_bloque(ultimo_numero):
+                inicio_rechazos = archivo_rechazos.tell()
+                avance = {}
+
+                def antes_de_confirmar(cursor, rechazos_bd):
+                    # Si el bloque se reintenta, se descartan los rechazos del intento anterior
+                    archivo_rechazos.seek(inicio_rechazos)
+                    archivo_rechazos.truncate()
+                    for numero, motivo in rechazos_bd:
+                        escritor_rechazos.writerow([numero, motivo,
+                                                    json.dumps(originales[numero], ensure_ascii=False)])
+                    # Los rechazos quedan en disco antes de que el punto de control los cuente
+                    archivo_rechazos.flush()
+                    os.fsync(archivo_rechazos.fileno())
+                    avance.update(resumen, ultimo_registro=ultimo_numero,
+                                  aceptados=resumen["aceptados"] + len(bloque) - len(rechazos_bd),
+                                  rechazados=resumen["rechazados"] + len(rechazos_bd),
+                                  bytes_rechazos=archivo_rechazos.tell())
+                    _guardar_progreso(cursor, self.clave_progreso, avance)
+
+                self._intentar_escribir(bloque, antes_de_confirmar)
+                resumen.update(avance)
+                bloque.clear()
+                originales.clear()
+                if self.al_avanzar:
+                    self.al_avanzar(dict(resumen))
+
+            numero = resumen["ultimo_registro"]
+            for numero, fila in leer_registros(self.ruta):
+                if numero <= resumen["ultimo_registro"]:
+                    resumen["omitidos"] += 1
+                    continue
+
+                if "__error__" in fila:
+                    valido, resultado = False, fila["__error__"]
+                else:
+                    try:
+                        valido, resultado = self.definicion["preparar"](fila)
+                    except ErrorDeConversion as e:
+                        valido, resultado = False, str(e)
+
+                if valido:
+                    bloque.append((numero, resultado))
+                    originales[numero] = fila
+                else:
+                    escritor_rechazos.writerow([numero, resultado, json.dumps(fila, ensure_ascii=False)])
+                    resumen["rechazados"] += 1
+
+                if len(bloque) >= self.tamano_bloque:
+                    cerrar_bloque(numero)
+
+            cerrar_bloque(numero)
+        finally:
+            archivo_rechazos.close()
+
+        # Importación terminada: el punto de control ya no hace falta
+        _borrar_progreso(self.clave_progreso)
+        return resumen
+
+    def _intentar_escribir(self, bloque, antes_de_confirmar, intentos=4):
+        """
+        Escribe el bloque reintentando si la base de datos está ocupada. Un bloque
+        vacío (todo rechazado por validación) también guarda su punto de control.
+        """
+        for intento in range(1, intentos + 1):
+            try:
+                return self._escribir_bloque(bloque, antes_de_confirmar)
+            except sqlite3.OperationalError as e:
+                if not es_error_de_bloqueo(e) or intento == intentos:
+                    raise
+                time.sleep(0.1 * 2 ** intento)
@@ -0,0 +1,129 @@
+"""
+Índices en memoria de los catálogos.
+
+Buscar en una lista recorre todos sus elementos en cada llamada; aquí los
+catálogos se compilan una sola vez:
+
+- Cada catálogo cerrado queda como un CatalogoIndexado (frozenset + búsqueda normalizada).
+- La cascada marca -> modelo -> clase queda aplanada en un frozenset de tuplas
+  (marca, modelo, clase), así que validar una combinación es una sola búsqueda.
+- La búsqueda normalizada ignora mayúsculas, acentos y espacios de más:
+  colores.canonico(" marron ") -> "Marrón". Sirve para limpiar datos de
+  importaciones masivas antes de validarlos.
+
+Los catálogos fijos (estados, procedencias, roles...) son constantes de este
+módulo, tomadas de logic/catalogos.py; si se modifican en tiempo de ejecución
+hay que llamar a reconstruir(). Los que se administran en la base de datos
+(marcas, modelos, clases, colores, tipos de infracción) se compilan en un
+CatalogosEditables, que entrega logic/almacen_catalogos.py.
+"""
+
+import unicodedata
+from functools import lru_cache
+
+import logic.catalogos as cat
+
+
+@lru_cache(maxsize=4096)
+def normalizar(texto):
+    """
+    Forma de comparación: sin acentos, en minúsculas y con los espacios colapsados.
+    Se memoriza porque en una importación se repiten pocas variantes de cada valor.
+    """
+    if not isinstance(texto, str):
+        return None
+    descompuesto = unicodedata.normalize("NFKD", texto)
+    sin_acentos = "".join(caracter for caracter in descompuesto if not unicodedata.combining(caracter))
+    return " ".join(sin_acentos.casefold().split())
+
+
+class CatalogoIndexado(frozenset):
+    """
+    Catálogo cerrado de valores de texto.
+        valor in catalogo      -> búsqueda exacta O(1) (la del frozenset, sin pasar por Python)
+        catalogo.canonico(x)   -> valor oficial que coincide con x sin importar
+                                  mayúsculas/acentos, o None si no existe
+    Se recorre en el orden original del catálogo.
+    """
+    __slots__ = ("valores", "_normalizados")
+
+    def __new__(cls, valores):
+        valores = tuple(valores)
+        catalogo = super().__new__(cls, valores)
+        catalogo.valores = valores
+        catalogo._normalizados = {normalizar(valor): valor for valor in valores}
+        return catalogo
+
+    def __iter__(self):
+        return iter(self.valores)
+
+    def canonico(self, valor):
+        if valor in self:
+            return valor
+        return self._normalizados.get(normalizar(valor))
+
+
+class CatalogosEditables:
+    """
+    Marcas, modelos, clases, colores y tipos de infracción ya compilados.
+    No se modifica: cuando cambian los catálogos se construye uno nuevo.
+
+        marcas_modelos      {marca: {modelo: [clases]}} en el orden del catálogo (para los combos)
+        marcas, clases, colores, tipos_infraccion    CatalogoIndexado
+        modelos_por_marca   {marca: frozenset(modelos)}
+        marca_modelo_clase  frozenset de tuplas (marca, modelo, clase)
+    """
+
+    def __init__(self, marcas_modelos, clases, colores, tipos_infraccion, version=None):
+        self.version = version
+        self.marcas_modelos = {marca: {modelo: list(clases_del_modelo) for modelo, clases_del_modelo in modelos.items()}
+                               for marca, modelos in marcas_modelos.items()}
+        self.marcas = CatalogoIndexado(self.marcas_modelos)
+        self.clases = CatalogoIndexado(clases)
+        self.colores = CatalogoIndexado(colores)
+        self.tipos_infraccion = CatalogoIndexado(tipos_infraccion)
+
+        # Cascada marca -> modelo -> clase
+        self.modelos_por_marca = {marca: frozenset(modelos) for marca, modelos in self.marcas_modelos.items()}
+        self.marca_modelo_clase = frozenset(
+            (marca, modelo, clase)
+            for marca, modelos in self.marcas_modelos.items()
+            for modelo, clases_del_modelo in modelos.items()
+            for clase in clases_del_modelo
+        )
+        self._marca_modelo_clase_normalizado = {
+            tuple(normalizar(parte) for parte in combinacion): combinacion for combinacion in self.marca_modelo_clase
+        }
+
+    @classmethod
+    def desde_catalogos(cls):
+        """Los valores de logic/catalogos.py (la carga inicial de las tablas)."""
+        return cls(cat.MARCAS_MODELOS_VEHICULO, cat.CLASES_VEHICULO, cat.COLORES_VEHICULO, cat.TIPOS_INFRACCION)
+
+    def combinacion_canonica(self, marca, modelo, clase):
+        """
+        (marca, modelo, clase) oficiales que coinciden sin importar mayúsculas/acentos,
+        o None si la combinación no existe. Ej. ("nissan", "versa", "sedan") -> ("Nissan", "Versa", "Sedán").
+        """
+        if (marca, modelo, clase) in self.marca_modelo_clase:
+            return marca, modelo, clase
+        return self._marca_modelo_clase_normalizado.get((normalizar(marca), normalizar(modelo), normalizar(clase)))
+
+
+def reconstruir():
+    """(Re)compila los catálogos fijos a partir de logic/catalogos.py."""
+    global ESTADOS_VEHICULO, PROCEDENCIAS_VEHICULO
+    global ESTADOS_LICENCIA, ESTADOS_PROPIETARIO, ESTADOS_INFRACCION
+    global TIPOS_CAPTURA_INFRACCION, ESTADOS_AGENTE, ROLES_USUARIO
+
+    ESTADOS_VEHICULO = CatalogoIndexado(cat.ESTADOS_VEHICULO)
+    PROCEDENCIAS_VEHICULO = CatalogoIndexado(cat.PROCEDENCIAS_VEHICULO)
+    ESTADOS_LICENCIA = CatalogoIndexado(cat.ESTADOS_LICENCIA)
+    ESTADOS_PROPIETARIO = CatalogoIndexado(cat.ESTADOS_PROPIETARIO)
+    ESTADOS_INFRACCION = CatalogoIndexado(cat.ESTADOS_INFRACCION)
+    TIPOS_CAPTURA_INFRACCION = CatalogoIndexado(cat.TIPOS_CAPTURA_INFRACCION)
+    ESTADOS_AGENTE = CatalogoIndexado(cat.ESTADOS_AGENTE)
+    ROLES_USUARIO = CatalogoIndexado(cat.ROLES_USUARIO)
+
+
+reconstruir()
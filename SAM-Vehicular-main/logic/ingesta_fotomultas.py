@@ -0,0 +1,350 @@
+"""
+Ingesta por lotes de fotomultas (eventos de cámara).
+
+registrar_infraccion valida, consulta el vehículo y el agente e inserta una
+multa por transacción; con una cámara que envía miles de eventos por minuto el
+costo se va en commits y consultas repetidas. Este servicio los agrupa:
+
+    ingesta = IngestaFotomultas(al_procesar=mostrar_resultados)
+    ingesta.iniciar()
+    ingesta.enviar("CAM07-000123", infraccion)    # desde el hilo que recibe la cámara
+    ...
+    ingesta.detener()                              # espera a que se vacíe la cola
+    ingesta.estadisticas()
+
+- Cola acotada (capacidad_cola): si el escritor no alcanza, enviar() espera o,
+  con bloquear=False, rechaza el evento y lo cuenta en 'cola_llena'.
+- Un hilo escritor junta hasta 'tamano_lote' eventos, o los que lleguen en
+  'espera_maxima' segundos desde el primero, y los escribe en una transacción.
+- Validación con REGLAS_INFRACCION (mismos mensajes que registrar_infraccion).
+  El estado de los agentes se lee completo cada TTL_AGENTES segundos; los VIN
+  encontrados se recuerdan (hasta MAXIMO_VINS) y solo los nuevos se consultan,
+  con un SELECT ... IN por lote. La llave foránea de infracciones sigue siendo
+  la última palabra si un vehículo se borró mientras tanto.
+- Idempotente: el id de evento de la cámara se guarda en eventos_camara en la
+  misma transacción que la multa; un evento repetido se responde con el folio
+  ya generado y no se registra dos veces.
+- estadisticas(): eventos por segundo y latencia (de enviar() al commit) p50/p95/máxima.
+- Si al_procesar lanza una excepción, el escritor sigue: se cuenta en
+  'errores_al_procesar' y el mensaje queda en 'ultimo_error_al_procesar'. Si el
+  escritor muere de todos modos, enviar() y detener() no se quedan esperando
+  en la cola llena.
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from database.conexion import obtener_conexion
+from database.reintentos import es_error_de_bloqueo, INTENTOS_MAXIMOS, ESPERA_INICIAL, MENSAJE_BD_OCUPADA
+from logic.folios import reservar_folios
+from logic.validador import REGLAS_INFRACCION
+
+TIPO_CAPTURA = "Fotomulta"
+TAMANO_LOTE = 500
+ESPERA_MAXIMA = 0.2             # Segundos que un evento puede esperar a que se llene su lote
+CAPACIDAD_COLA = 20000
+TTL_AGENTES = 60                # Segundos antes de volver a leer el estado de los agentes
+MAXIMO_VINS = 200_000           # VIN existentes recordados (~20 MB); al llenarse se olvidan todos
+MUESTRAS_LATENCIA = 10_000      # Latencias recientes guardadas para los percentiles
+
+_FIN = object()                 # Marca en la cola para que el escritor termine
+_REVISION_ESCRITOR = 0.5        # Segundos entre revisiones de que el escritor siga vivo al esperar la cola
+
+# Resultado de cada evento
+REGISTRADA = "registrada"
+DUPLICADA = "duplicada"
+RECHAZADA = "rechazada"
+_CONTADOR_POR_RESULTADO = {REGISTRADA: "registrados", DUPLICADA: "duplicados", RECHAZADA: "rechazados"}
+
+
+def _percentil(ordenados, p):
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))] if ordenados else 0.0
+
+
+class IngestaFotomultas:
+
+    def __init__(self, tamano_lote=TAMANO_LOTE, espera_maxima=ESPERA_MAXIMA, capacidad_cola=CAPACIDAD_COLA,
+                 al_procesar=None):
+        """
+        al_procesar(resultados): opcional, se llama desde el hilo escritor después de
+        cada lote con [(id_evento, resultado, detalle)]: resultado es REGISTRADA (detalle =
+        folio), DUPLICADA (detalle = folio de la primera vez) o RECHAZADA (detalle = motivo).
+        """
+        self.tamano_lote = tamano_lote
+        self.espera_maxima = espera_maxima
+        self.al_procesar = al_procesar
+        self._cola = queue.Queue(maxsize=capacidad_cola)
+        self._hilo = None
+
+        self._agentes = {}                  # id_agente -> estado
+        self._agentes_leidos_en = None
+        self._vins = set()
+
+        self._candado = threading.Lock()
+        self._latencias = deque(maxlen=MUESTRAS_LATENCIA)
+        self._contadores = dict.fromkeys(
+            ("recibidos", "registrados", "duplicados", "rechazados", "cola_llena", "lotes", "errores_al_procesar"), 0)
+        self._ultimo_error_al_procesar = None
+        self._iniciado_en = None
+
+    # ==========================================
+    # CICLO DE VIDA
+    # ==========================================
+    def iniciar(self):
+        if self._hilo is not None and self._hilo.is_alive():
+            return
+        self._iniciado_en = time.monotonic()
+        self._hilo = threading.Thread(target=self._escribir, name="ingesta-fotomultas", daemon=True)
+        self._hilo.start()
+
+    def detener(self, tiempo_maximo=None):
+        """
+        Procesa lo que quede en la cola y termina el hilo escritor. Si el escritor
+        ya no está vivo, lo que quedó en la cola se descarta.
+        """
+        if self._hilo is None:
+            return
+        limite = None if tiempo_maximo is None else time.monotonic() + tiempo_maximo
+        if self._poner_si_escritor_vivo(_FIN, limite):
+            restante = None if limite is None else max(0.0, limite - time.monotonic())
+            self._hilo.join(restante)
+        self._hilo = None
+
+    def _poner_si_escritor_vivo(self, elemento, limite=None):
+        """
+        Pone 'elemento' en la cola esperando lo necesario, hasta 'limite' (monotonic)
+        si se da. Retorna False si se agota el límite o si el escritor se inició y
+        ya no está vivo: nadie va a vaciar la cola.
+        """
+        while True:
+            if self._hilo is not None and not self._hilo.is_alive():
+                return False
+            espera = _REVISION_ESCRITOR if limite is None else min(_REVISION_ESCRITOR, limite - time.monotonic())
+            try:
+                self._cola.put(elemento, timeout=max(0.0, espera))
+                return True
+            except queue.Full:
+                if limite is not None and time.monotonic() >= limite:
+                    return False
+
+    def enviar(self, id_evento, infraccion, bloquear=True, tiempo_espera=None):
+        """
+        Encola el evento de la cámara. Retorna False si la cola está llena (con
+        bloquear=False o al agotarse tiempo_espera) o si el escritor ya no está
+        vivo; se cuenta en 'cola_llena' y la cámara debe reenviarlo.
+        """
+        with self._candado:
+            self._contadores["recibidos"] += 1
+        evento = (str(id_evento), infraccion, time.perf_counter())
+        if not bloquear:
+            try:
+                self._cola.put_nowait(evento)
+                return True
+            except queue.Full:
+                aceptado = False
+        else:
+            limite = None if tiempo_espera is None else time.monotonic() + tiempo_espera
+            aceptado = self._poner_si_escritor_vivo(evento, limite)
+        if not aceptado:
+            with self._candado:
+                self._contadores["cola_llena"] += 1
+        return aceptado
+
+    # ==========================================
+    # HILO ESCRITOR
+    # ==========================================
+    def _siguiente_lote(self):
+        """Retorna (eventos, terminar). Espera el primero; los demás, hasta espera_maxima."""
+        primero = self._cola.get()
+        if primero is _FIN:
+            return [], True
+        lote = [primero]
+        limite = time.monotonic() + self.espera_maxima
+        while len(lote) < self.tamano_lote:
+            restante = limite - time.monotonic()
+            try:
+                evento = self._cola.get(timeout=restante) if restante > 0 else self._cola.get_nowait()
+            except queue.Empty:
+                break
+            if evento is _FIN:
+                return lote, True
+            lote.append(evento)
+        return lote, False
+
+    def _escribir(self):
+        terminar = False
+        while not terminar:
+            lote, terminar = self._siguiente_lote()
+            if not lote:
+                continue
+            try:
+                resultados = self._procesar_lote(lote)
+            except Exception as e:
+                # El hilo no debe morir: el lote completo se reporta como rechazado
+                mensaje = MENSAJE_BD_OCUPADA if es_error_de_bloqueo(e) else f"Error al registrar el lote: {e}"
+                resultados = [(id_evento, RECHAZADA, mensaje) for id_evento, _, _ in lote]
+            self._registrar_metricas(lote, resultados)
+            if self.al_procesar is not None:
+                try:
+                    self.al_procesar(resultados)
+                except Exception as e:
+                    # Las multas ya están guardadas; un error del llamador no debe detener la ingesta
+                    with self._candado:
+                        self._contadores["errores_al_procesar"] += 1
+                        self._ultimo_error_al_procesar = f"{type(e).__name__}: {e}"
+
+    def _registrar_metricas(self, lote, resultados):
+        terminado = time.perf_counter()
+        with self._candado:
+            self._contadores["lotes"] += 1
+            for (_, _, enviado_en), (_, resultado, _) in zip(lote, resultados):
+                self._latencias.append(terminado - enviado_en)
+                self._contadores[_CONTADOR_POR_RESULTADO[resultado]] += 1
+
+    # ==========================================
+    # VALIDACIÓN CON DATOS EN CACHÉ
+    # ==========================================
+    def _estado_agentes(self, cursor):
+        ahora = time.monotonic()
+        if self._agentes_leidos_en is None or ahora - self._agentes_leidos_en >= TTL_AGENTES:
+            self._agentes = dict(cursor.execute("SELECT id_agente, estado FROM agentes").fetchall())
+            self._agentes_leidos_en = ahora
+        return self._agentes
+
+    def _vins_existentes(self, cursor, vins):
+        """Subconjunto de 'vins' que existe; solo consulta los que no se han visto."""
+        unicos = set(vins)
+        nuevos = [vin for vin in unicos if vin not in self._vins]
+        if nuevos:
+            if len(self._vins) + len(nuevos) > MAXIMO_VINS:
+                # Al olvidar todos, los VIN del lote que ya se conocían también se vuelven a consultar
+                self._vins.clear()
+                nuevos = list(unicos)
+            for inicio in range(0, len(nuevos), 500):
+                parte = nuevos[inicio:inicio + 500]
+                self._vins.update(fila[0] for fila in cursor.execute(
+                    f"SELECT vin FROM vehiculos WHERE vin IN ({', '.join('?' * len(parte))})", parte))
+        return self._vins
+
+    def _validar(self, infraccion, agentes, vins):
+        valido, msj = REGLAS_INFRACCION.primer_error(infraccion, tipo_captura=TIPO_CAPTURA)
+        if not valido:
+            return msj
+        if infraccion.vin_infractor not in vins:
+            return "Error: El vehículo asociado (VIN) no existe en el sistema."
+        estado_agente = agentes.get(infraccion.id_agente)
+        if estado_agente is None:
+            return "Error: El agente emisor no existe en el sistema."
+        if estado_agente != "Activo":
+            return "Error: Solo los agentes con estado 'Activo' pueden registrar nuevas infracciones."
+        return None
+
+    # ==========================================
+    # ESCRITURA DEL LOTE
+    # ==========================================
+    def _procesar_lote(self, lote):
+        """
+        Escribe el lote en una transacción, reintentando si la base de datos está
+        ocupada. Retorna [(id_evento, resultado, detalle)] (ver __init__).
+        """
+        espera = ESPERA_INICIAL
+        for intento in range(1, INTENTOS_MAXIMOS + 1):
+            try:
+                return self._escribir_lote(lote)
+            except sqlite3.OperationalError as e:
+                if not es_error_de_bloqueo(e) or intento == INTENTOS_MAXIMOS:
+                    raise
+                time.sleep(espera)
+                espera *= 2
+
+    def _escribir_lote(self, lote):
+        conexion = obtener_conexion()
+        cursor = conexion.cursor()
+        try:
+            ids = list({id_evento for id_evento, _, _ in lote})
+            # Los folios se apartan con esta misma conexión antes de abrir la transacción (ver
+            # logic/folios.py), uno por evento que todavía no está registrado; dentro de ella solo
+            # pueden aparecer menos
+            folios = iter(reservar_folios(len(ids) - len(self._eventos_registrados(cursor, ids)), conexion))
+            cursor.execute("BEGIN IMMEDIATE")
+            ya_registrados = self._eventos_registrados(cursor, ids)
+
+            agentes = self._estado_agentes(cursor)
+            vins = self._vins_existentes(cursor, [infraccion.vin_infractor for _, infraccion, _ in lote
+                                                  if isinstance(infraccion.vin_infractor, str)])
+            registrado_en = datetime.now().isoformat(timespec="seconds")
+            resultados = []
+            for id_evento, infraccion, _ in lote:
+                if id_evento in ya_registrados:
+                    resultados.append((id_evento, DUPLICADA, ya_registrados[id_evento]))
+                    continue
+                error = self._validar(infraccion, agentes, vins)
+                if error:
+                    resultados.append((id_evento, RECHAZADA, error))
+                    continue
+                folio = next(folios)
+                try:
+                    cursor.execute('''
+                        INSERT INTO infracciones (folio, fecha, hora, lugar, tipo_infraccion, motivo, monto, estado,
+                                                  vin_infractor, id_agente, licencia_conductor)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, 'Pendiente', ?, ?, ?)
+                    ''', (folio, infraccion.fecha, infraccion.hora, infraccion.lugar, infraccion.tipo_infraccion,
+                          infraccion.motivo, infraccion.monto, infraccion.vin_infractor, infraccion.id_agente,
+                          infraccion.licencia_conductor))
+                except sqlite3.IntegrityError as e:
+                    # Solo se revierte esta sentencia; el resto del lote sigue en la transacción
+                    resultados.append((id_evento, RECHAZADA, f"Error de integridad en la base de datos: {e}"))
+                    continue
+                cursor.execute("INSERT INTO eventos_camara (id_evento, folio, registrado_en) VALUES (?, ?, ?)",
+                               (id_evento, folio, registrado_en))
+                ya_registrados[id_evento] = folio
+                resultados.append((id_evento, REGISTRADA, folio))
+            conexion.commit()
+            return resultados
+        except Exception:
+            conexion.rollback()
+            raise
+        finally:
+            conexion.close()
+
+    @staticmethod
+    def _eventos_registrados(cursor, ids):
+        """id_evento -> folio de los que ya están en eventos_camara."""
+        registrados = {}
+        for inicio in range(0, len(ids), 500):
+            parte = ids[inicio:inicio + 500]
+            registrados.update(cursor.execute(
+                f"SELECT id_evento, folio FROM eventos_camara WHERE id_evento IN ({', '.join('?' * len(parte))})",
+                parte).fetchall())
+        return registrados
+
+    # ==========================================
+    # MÉTRICAS
+    # ==========================================
+    def estadisticas(self):
+        """
+        Contadores (recibidos, registrados, duplicados, rechazados, cola_llena, lotes,
+        errores_al_procesar), ultimo_error_al_procesar, escritor_vivo, en_cola,
+        eventos_por_segundo desde iniciar() y latencia_ms_p50/p95/max de los últimos
+        MUESTRAS_LATENCIA eventos.
+        """
+        with self._candado:
+            datos = dict(self._contadores)
+            datos["ultimo_error_al_procesar"] = self._ultimo_error_al_procesar
+            latencias = sorted(self._latencias)
+        segundos = time.monotonic() - self._iniciado_en if self._iniciado_en else 0
+        procesados = datos["registrados"] + datos["duplicados"] + datos["rechazados"]
+        datos.update({
+            "escritor_vivo": self._hilo is not None and self._hilo.is_alive(),
+            "en_cola": self._cola.qsize(),
+            "eventos_por_segundo": procesados / segundos if segundos else 0.0,
+            "eventos_por_lote": procesados / datos["lotes"] if datos["lotes"] else 0.0,
+            "latencia_ms_p50": _percentil(latencias, 0.50) * 1000,
+            "latencia_ms_p95": _percentil(latencias, 0.95) * 1000,
+            "latencia_ms_max": (latencias[-1] if latencias else 0.0) * 1000,
+        })
+        return datos
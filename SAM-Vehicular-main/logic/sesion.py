@@ -0,0 +1,208 @@
+"""
+Sesión del usuario y permisos por rol (RBAC).
+
+La matriz PERMISOS_POR_ROL (rol -> capacidades) se compila una sola vez en
+conjuntos inmutables; revisar un permiso es buscar en un frozenset, sin comparar
+nombres de rol en cada pantalla ni consultar la base de datos:
+
+    sesion.iniciar_sesion(usuario)          # al terminar el login
+    if sesion.puede(sesion.REGISTRAR_VEHICULOS): ...
+
+    class GestorVehiculos:
+        @staticmethod
+        @requiere_capacidad(MODIFICAR_VEHICULOS)
+        @reintentar_si_ocupada
+        def transferir_propiedad(vin, id_nuevo_propietario): ...
+
+- La sesión expira tras MINUTOS_INACTIVIDAD sin usarse; cada revisión de permiso
+  la renueva, y la ventana principal la renueva con cada tecla o clic (renovar()).
+  Al expirar, la ventana principal pide la contraseña del mismo usuario sin
+  cerrarse, así que no se pierde lo capturado en los formularios abiertos.
+- @requiere_capacidad responde (False, mensaje), como cualquier error de los
+  gestores. Solo se aplica a partir del primer iniciar_sesion: los procesos sin
+  interfaz (administrar, importador, benchmarks) no inician sesión y corren con
+  los permisos de quien tiene acceso a la terminal y al archivo de la base de datos.
+"""
+
+import functools
+import secrets
+import threading
+import time
+
+import logic.catalogos as cat
+
+MINUTOS_INACTIVIDAD = 30
+
+# ==========================================
+# CAPACIDADES
+# ==========================================
+VER_VEHICULOS = "vehiculos.ver"
+REGISTRAR_VEHICULOS = "vehiculos.registrar"
+MODIFICAR_VEHICULOS = "vehiculos.modificar"         # color, estado legal, placa y propietario
+VER_PROPIETARIOS = "propietarios.ver"
+REGISTRAR_PROPIETARIOS = "propietarios.registrar"
+MODIFICAR_PROPIETARIOS = "propietarios.modificar"
+REGISTRAR_INFRACCIONES = "infracciones.registrar"
+VER_INFRACCIONES = "infracciones.ver"
+COBRAR_INFRACCIONES = "infracciones.cobrar"         # cambiar a Pagada o Cancelada
+REPORTES_PADRON = "reportes.padron"                 # reportes 1, 4 y 5
+REPORTES_INFRACCIONES = "reportes.infracciones"     # reportes 2, 3 y 6
+ADMINISTRAR_USUARIOS = "usuarios.administrar"
+ADMINISTRAR_AGENTES = "agentes.administrar"
+
+TODAS = frozenset({
+    VER_VEHICULOS, REGISTRAR_VEHICULOS, MODIFICAR_VEHICULOS,
+    VER_PROPIETARIOS, REGISTRAR_PROPIETARIOS, MODIFICAR_PROPIETARIOS,
+    REGISTRAR_INFRACCIONES, VER_INFRACCIONES, COBRAR_INFRACCIONES,
+    REPORTES_PADRON, REPORTES_INFRACCIONES,
+    ADMINISTRAR_USUARIOS, ADMINISTRAR_AGENTES,
+})
+
+# Reportes que habilita cada capacidad (número de reporte de GestorReportes)
+REPORTES_POR_CAPACIDAD = {
+    REPORTES_PADRON: (1, 4, 5),
+    REPORTES_INFRACCIONES: (2, 3, 6),
+}
+
+PERMISOS_POR_ROL = {
+    # Acceso a todos los módulos y reportes completos [cite: 47-51]
+    "Administrador": TODAS,
+    # Registra vehículos y actualiza datos permitidos, sin configuraciones críticas [cite: 52-57]
+    "Operador Administrativo": {
+        VER_VEHICULOS, REGISTRAR_VEHICULOS, MODIFICAR_VEHICULOS,
+        VER_PROPIETARIOS, REGISTRAR_PROPIETARIOS, MODIFICAR_PROPIETARIOS,
+        REPORTES_PADRON,
+    },
+    # Registra infracciones y consulta información básica [cite: 58-61]
+    "Agente de Tránsito": {VER_VEHICULOS, REGISTRAR_INFRACCIONES},
+    # Consulta reportes y supervisa infracciones, sin modificar información [cite: 62-65]
+    "Supervisor": {VER_INFRACCIONES, REPORTES_PADRON, REPORTES_INFRACCIONES},
+}
+
+
+def _compilar_permisos():
+    """rol -> frozenset de capacidades. Falla al importar si la matriz no cubre los roles del catálogo."""
+    faltantes = set(cat.ROLES_USUARIO) - set(PERMISOS_POR_ROL)
+    if faltantes:
+        raise ValueError(f"Roles sin permisos definidos: {', '.join(sorted(faltantes))}")
+    desconocidas = set().union(*PERMISOS_POR_ROL.values()) - TODAS
+    if desconocidas:
+        raise ValueError(f"Capacidades desconocidas: {', '.join(sorted(desconocidas))}")
+    return {rol: frozenset(capacidades) for rol, capacidades in PERMISOS_POR_ROL.items()}
+
+
+_PERMISOS = _compilar_permisos()
+
+
+def capacidades_de(rol):
+    return _PERMISOS.get(rol, frozenset())
+
+
+# ==========================================
+# SESIÓN
+# ==========================================
+class Sesion:
+    """Usuario autenticado, sus capacidades (ya compiladas) y su vencimiento por inactividad."""
+
+    def __init__(self, usuario, minutos_inactividad=MINUTOS_INACTIVIDAD, reloj=time.monotonic):
+        self.usuario = usuario
+        self.capacidades = capacidades_de(usuario.rol)
+        self.token = secrets.token_hex(16)
+        self.inactividad_maxima = minutos_inactividad * 60
+        self._reloj = reloj
+        self._ultimo_uso = reloj()
+
+    @property
+    def vigente(self):
+        return self._reloj() - self._ultimo_uso <= self.inactividad_maxima
+
+    def renovar(self):
+        """Cuenta la inactividad desde ahora. Una sesión ya expirada no se renueva; retorna si sigue vigente."""
+        if not self.vigente:
+            return False
+        self._ultimo_uso = self._reloj()
+        return True
+
+    def puede(self, capacidad):
+        """True si la sesión sigue vigente y el rol tiene la capacidad (renueva la sesión)."""
+        return self.renovar() and capacidad in self.capacidades
+
+    def reportes_permitidos(self):
+        """Números de reporte que el rol puede generar, en orden."""
+        return sorted(numero for capacidad, numeros in REPORTES_POR_CAPACIDAD.items()
+                      if self.puede(capacidad) for numero in numeros)
+
+    def __repr__(self):
+        return f"<Sesion: {self.usuario.nombre_usuario} - Rol: {self.usuario.rol} ({'vigente' if self.vigente else 'expirada'})>"
+
+
+_sesion = None
+_exigir_permisos = False
+_candado = threading.Lock()
+
+
+def iniciar_sesion(usuario, minutos_inactividad=MINUTOS_INACTIVIDAD):
+    """Abre la sesión del usuario autenticado y, desde ahora, exige permisos en los gestores."""
+    global _sesion, _exigir_permisos
+    with _candado:
+        _sesion = Sesion(usuario, minutos_inactividad)
+        _exigir_permisos = True
+        return _sesion
+
+
+def cerrar_sesion():
+    """Cierra la sesión; los gestores siguen exigiendo permisos (nadie puede operar hasta otro login)."""
+    global _sesion
+    with _candado:
+        _sesion = None
+
+
+def sesion_actual():
+    return _sesion
+
+
+def renovar():
+    """Atajo para las vistas: renueva la sesión actual si sigue vigente. Retorna si sigue vigente."""
+    sesion = _sesion
+    return sesion is not None and sesion.renovar()
+
+
+def puede(capacidad):
+    """Atajo para las vistas: la sesión actual tiene la capacidad."""
+    sesion = _sesion
+    return sesion is not None and sesion.puede(capacidad)
+
+
+def verificar(capacidad):
+    """Retorna (True, "") si la operación está permitida, o (False, mensaje)."""
+    if not _exigir_permisos:
+        return True, ""
+    sesion = _sesion
+    if sesion is None or not sesion.vigente:
+        return False, "Sesión expirada: vuelva a iniciar sesión."
+    if not sesion.puede(capacidad):
+        return False, f"Acceso denegado: el rol {sesion.usuario.rol} no tiene permiso para esta operación."
+    return True, ""
+
+
+def requiere_capacidad(capacidad, al_denegar=None):
+    """
+    Decorador para los métodos de los gestores que retornan (exito, mensaje).
+    Va debajo de @staticmethod y encima de @reintentar_si_ocupada, para revisar
+    el permiso una sola vez y no en cada reintento.
+    Los métodos que retornan otra forma pasan al_denegar(mensaje, *args, **kwargs),
+    que arma el resultado cuando la sesión no tiene el permiso.
+    """
+    if capacidad not in TODAS:
+        raise ValueError(f"Capacidad desconocida: {capacidad}")
+
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            permitido, msj = verificar(capacidad)
+            if not permitido:
+                return al_denegar(msj, *args, **kwargs) if al_denegar else (False, msj)
+            return funcion(*args, **kwargs)
+        return envoltura
+
+    return decorador
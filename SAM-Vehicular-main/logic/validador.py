@@ -1,13 +1,34 @@
 import re
 from datetime import datetime
-import logic.catalogos as cat
-import re
+from operator import attrgetter
+import logic.indice_catalogos as idx
+from logic.almacen_catalogos import catalogos
+
+# Patrones compilados una sola vez al importar el módulo (no en cada llamada)
+# Placas oficiales (autos privados en México/Yucatán). Acepta: YAA-123-A | YAB-12-34 | YYZ-1234
+PATRON_PLACA = re.compile(r"^[A-Z]{3}-\d{3}-[A-Z]$|^[A-Z]{3}-\d{2}-\d{2}$|^[A-Z]{3}-\d{4}$")
+# Patrón oficial de la CURP en México
+PATRON_CURP = re.compile(r"^[A-Z]{4}\d{6}[HMX][A-Z]{2}[A-Z]{3}[A-Z0-9]\d$")
+PATRON_CORREO = re.compile(r'^[\w\.-]+@[\w\.-]+\.\w+$')
+# Letras mayúsculas, minúsculas, acentos, ñ, ü y espacios
+PATRON_NOMBRE = re.compile(r'^[a-zA-ZáéíóúÁÉÍÓÚñÑüÜ\s]+$')
 
 class Validador:
     """
     Clase centralizada para validaciones de formato, longitud y catálogos.
-    No interactúa con la base de datos.
+    Las de formato y longitud no tocan la base de datos; las de catálogos
+    administrables sí pueden hacerlo (ver abajo).
     Retorna siempre una tupla: (es_valido: bool, mensaje_error: str)
+
+    Los catálogos se consultan ya compilados en conjuntos, para que cada validación
+    sea una sola búsqueda: los fijos en logic.indice_catalogos y los administrables
+    (marcas, modelos, clases, colores, tipos de infracción) en logic.almacen_catalogos.
+    Estos últimos salen de almacen_catalogos.catalogos(): cada TTL_SEGUNDOS lee
+    catalogo_version con una conexión del pool y, si cambió, vuelve a cargar las
+    tablas de catálogo. Cualquier validación de catálogo (también desde el hilo
+    de la interfaz) puede pagar esa consulta y, con la base ocupada, esperar el
+    busy_timeout o una conexión libre del pool; si esa lectura falla, la
+    excepción se propaga en lugar de retornar la tupla.
     """
 
     # =========================
@@ -27,11 +48,7 @@ class Validador:
             
         placa_limpia = placa.strip().upper()
         
-        # Patrón Regex para placas oficiales (autos privados en México/Yucatán)
-        # Acepta: YAA-123-A | YAB-12-34 | YYZ-1234
-        patron_placa = r"^[A-Z]{3}-\d{3}-[A-Z]$|^[A-Z]{3}-\d{2}-\d{2}$|^[A-Z]{3}-\d{4}$"
-        
-        if not re.match(patron_placa, placa_limpia):
+        if not PATRON_PLACA.match(placa_limpia):
             return False, "Formato inválido. Use guiones (Ej. YAA-123-A, YAB-12-34 o ABC-1234)."
             
         return True, ""
@@ -47,19 +64,19 @@ class Validador:
 
     @staticmethod
     def validar_clase_vehiculo(clase: str) -> tuple[bool, str]:
-        if clase not in cat.CLASES_VEHICULO:
+        if clase not in catalogos().clases:
             return False, "La clase de vehículo seleccionada no es válida."
         return True, ""
 
     @staticmethod
     def validar_procedencia_vehiculo(clase: str) -> tuple[bool, str]:
-        if clase not in cat.PROCEDENCIAS_VEHICULO:
+        if clase not in idx.PROCEDENCIAS_VEHICULO:
             return False, "La procedencia de vehículo seleccionada no es válida."
         return True, ""
 
     @staticmethod
     def validar_estado_vehiculo(estado: str) -> tuple[bool, str]:
-        if estado not in cat.ESTADOS_VEHICULO:
+        if estado not in idx.ESTADOS_VEHICULO:
             return False, "El estado legal del vehículo seleccionado no es válido."
         return True, ""
 
@@ -71,28 +88,30 @@ class Validador:
         2. Que el modelo pertenezca a la marca.
         3. Que la clase esté permitida para ese modelo específico.
         """
+        # Camino rápido: la combinación completa existe (una sola búsqueda en el índice aplanado)
+        vigentes = catalogos()
+        if (marca, modelo, clase) in vigentes.marca_modelo_clase:
+            return True, ""
+
+        # Si no existe, se averigua qué nivel falló para dar el mensaje adecuado
         # 1. Validar Marca
-        if marca not in cat.MARCAS_MODELOS_VEHICULO:
+        if marca not in vigentes.marcas:
             return False, f"La marca '{marca}' no está registrada en el sistema."
         
         # 2. Validar Modelo
-        modelos_de_la_marca = cat.MARCAS_MODELOS_VEHICULO[marca]
-        if modelo not in modelos_de_la_marca:
+        if modelo not in vigentes.modelos_por_marca[marca]:
             return False, f"El modelo '{modelo}' no es válido para la marca '{marca}'."
             
         # 3. Validar Clase (La nueva capa de seguridad)
-        clases_permitidas_del_modelo = modelos_de_la_marca[modelo]
-        if clase not in clases_permitidas_del_modelo:
-            return False, f"Un '{modelo}' no puede ser clasificado como '{clase}'. Opciones válidas: {', '.join(clases_permitidas_del_modelo)}."
-            
-        return True, ""
+        clases_permitidas_del_modelo = vigentes.marcas_modelos[marca][modelo]
+        return False, f"Un '{modelo}' no puede ser clasificado como '{clase}'. Opciones válidas: {', '.join(clases_permitidas_del_modelo)}."
 
     @staticmethod
     def validar_color_vehiculo(color: str) -> tuple[bool, str]:
         """
         Valida que el color se encuentre dentro del catálogo cerrado.
         """
-        if color not in cat.COLORES_VEHICULO:
+        if color not in catalogos().colores:
             return False, "El color ingresado no es válido. Seleccione uno de la lista."
         return True, ""
     
@@ -109,6 +128,15 @@ class Validador:
             
         return True, ""
 
+    @staticmethod
+    def validar_vehiculo(vehiculo) -> tuple[bool, str]:
+        """
+        Aplica, en orden, todas las validaciones de formato y catálogo de un vehículo nuevo.
+        Retorna el primer error encontrado (REGLAS_VEHICULO.errores los da todos).
+        No verifica la existencia del propietario.
+        """
+        return REGLAS_VEHICULO.primer_error(vehiculo)
+
     # =========================
     # VALIDACIONES DE PROPIETARIOS
     # =========================
@@ -120,17 +148,14 @@ class Validador:
 
         curp_limpia = curp.strip().upper()
 
-        # Patrón oficial de la CURP en México
-        patron_curp = r"^[A-Z]{4}\d{6}[HMX][A-Z]{2}[A-Z]{3}[A-Z0-9]\d$"
-        if not re.match(patron_curp, curp_limpia):
+        if not PATRON_CURP.match(curp_limpia):
             return False, "Formato de CURP inválido. Verifique las letras, fecha de nacimiento y homoclave."
             
         return True, ""
 
     @staticmethod
     def validar_correo(correo: str) -> tuple[bool, str]:
-        patron_correo = r'^[\w\.-]+@[\w\.-]+\.\w+$'
-        if not re.match(patron_correo, correo):
+        if not PATRON_CORREO.match(correo):
             return False, "El correo electrónico no cumple con el formato estándar."
         return True, ""
 
@@ -153,9 +178,7 @@ class Validador:
         if not nombre or len(nombre.strip()) < 5:
             return False, "El nombre completo debe tener al menos 5 caracteres."
         
-        # Expresión regular que permite letras mayúsculas, minúsculas, acentos, ñ, ü y espacios
-        patron_nombre = r'^[a-zA-ZáéíóúÁÉÍÓÚñÑüÜ\s]+$'
-        if not re.match(patron_nombre, nombre.strip()):
+        if not PATRON_NOMBRE.match(nombre.strip()):
             return False, "El nombre solo debe contener letras y espacios (sin números ni símbolos especiales)."
         
         return True, ""
@@ -176,7 +199,7 @@ class Validador:
         """
         Valida que el estado de la licencia de conducir se restrinja a valores predefinidos[cite: 302, 373].
         """
-        if estado not in cat.ESTADOS_LICENCIA:
+        if estado not in idx.ESTADOS_LICENCIA:
             return False, "El estado de la licencia seleccionado no es válido."
         
         return True, ""
@@ -186,11 +209,19 @@ class Validador:
         """
         Valida que el estado del propietario cambie estrictamente según su situación administrativa.
         """
-        if estado not in cat.ESTADOS_PROPIETARIO:
+        if estado not in idx.ESTADOS_PROPIETARIO:
             return False, "El estado del propietario seleccionado no es válido."
         
         return True, ""
 
+    @staticmethod
+    def validar_propietario(propietario) -> tuple[bool, str]:
+        """
+        Aplica, en orden, todas las validaciones de formato y catálogo de un propietario nuevo.
+        Retorna el primer error encontrado (REGLAS_PROPIETARIO.errores los da todos).
+        """
+        return REGLAS_PROPIETARIO.primer_error(propietario)
+
 # =========================
     # VALIDACIONES DE INFRACCIONES Y AGENTES
     # =========================
@@ -211,7 +242,7 @@ class Validador:
         """
         Valida que el tipo de infracción pertenezca al catálogo oficial[cite: 302, 371].
         """
-        if tipo not in cat.TIPOS_INFRACCION:
+        if tipo not in catalogos().tipos_infraccion:
             return False, "El tipo de infracción seleccionado no es válido."
         return True, ""
 
@@ -220,7 +251,7 @@ class Validador:
         """
         Valida el estado de la infracción contra el catálogo cerrado[cite: 374].
         """
-        if estado not in cat.ESTADOS_INFRACCION:
+        if estado not in idx.ESTADOS_INFRACCION:
             return False, "El estado de la infracción seleccionado no es válido."
         return True, ""
 
@@ -230,7 +261,7 @@ class Validador:
         Valida la selección del tipo de captura (ej. Fotomulta o En sitio) para 
         determinar la obligatoriedad de los datos del conductor más adelante[cite: 259].
         """
-        if tipo_captura not in cat.TIPOS_CAPTURA_INFRACCION:
+        if tipo_captura not in idx.TIPOS_CAPTURA_INFRACCION:
             return False, "El tipo de captura seleccionado no es válido."
         return True, ""
 
@@ -290,4 +321,118 @@ class Validador:
         if id_agente <= 0:
             return False, "El ID del agente debe ser mayor a cero."
             
-        return True, ""
\ No newline at end of file
+        return True, ""
+
+    @staticmethod
+    def validar_infraccion(infraccion, tipo_captura: str) -> tuple[bool, str]:
+        """
+        Aplica, en orden, todas las validaciones de formato y catálogo de una infracción nueva.
+        Retorna el primer error encontrado (REGLAS_INFRACCION.errores los da todos).
+        Las reglas contra la base de datos (vehículo y agente existentes) se verifican en el Gestor.
+        """
+        return REGLAS_INFRACCION.primer_error(infraccion, tipo_captura=tipo_captura)
+
+
+# =========================
+# MOTOR DE VALIDACIÓN POR REGISTRO Y POR LOTE
+# =========================
+
+def _tipo_invalido(campo):
+    # Ej. None o un número donde se esperaba texto: es un error del dato, no del programa
+    return f"El campo '{campo}' tiene un tipo de dato inválido."
+
+
+class ReglasValidacion:
+    """
+    Validaciones de un tipo de registro, en orden. Cada regla es
+    (campo, validación, atributos): la validación es una función del Validador y
+    recibe los atributos indicados del registro (o del contexto, ej. tipo_captura).
+
+        reglas.primer_error(registro)   -> (bool, mensaje), se detiene en el primer error
+        reglas.errores(registro)        -> {campo: mensaje} con TODOS los errores ({} si es válido)
+        reglas.validar_lote(registros)  -> [{campo: mensaje}, ...] en el mismo orden que los registros
+
+    Los lectores de atributos se preparan una sola vez al crear las reglas.
+    """
+
+    def __init__(self, *reglas, contexto=()):
+        self.reglas = reglas
+        self.contexto = tuple(contexto)
+        self._compiladas = tuple((campo, validacion, self._lector(atributos))
+                                 for campo, validacion, atributos in reglas)
+
+    def _lector(self, atributos):
+        """Función (registro, contexto) -> tupla de argumentos para la validación."""
+        if any(nombre in self.contexto for nombre in atributos):
+            return lambda registro, contexto: tuple(
+                contexto[nombre] if nombre in self.contexto else getattr(registro, nombre) for nombre in atributos)
+        obtener = attrgetter(*atributos)
+        if len(atributos) == 1:
+            return lambda registro, contexto: (obtener(registro),)
+        return lambda registro, contexto: obtener(registro)
+
+    def extender(self, *reglas, contexto=()):
+        """Nuevas reglas con estas más las indicadas al final."""
+        return ReglasValidacion(*self.reglas, *reglas, contexto=self.contexto + tuple(contexto))
+
+    def primer_error(self, registro, **contexto) -> tuple[bool, str]:
+        for campo, validacion, leer in self._compiladas:
+            try:
+                valido, msj = validacion(*leer(registro, contexto))
+            except (TypeError, AttributeError):
+                valido, msj = False, _tipo_invalido(campo)
+            if not valido:
+                return False, msj
+        return True, ""
+
+    def errores(self, registro, **contexto) -> dict[str, str]:
+        errores = {}
+        for campo, validacion, leer in self._compiladas:
+            try:
+                valido, msj = validacion(*leer(registro, contexto))
+            except (TypeError, AttributeError):
+                valido, msj = False, _tipo_invalido(campo)
+            if not valido:
+                errores[campo] = msj
+        return errores
+
+    def validar_lote(self, registros, **contexto) -> list[dict[str, str]]:
+        """
+        Valida todos los registros en una sola pasada. 'contexto' se aplica igual
+        a todos (ej. tipo_captura="Fotomulta").
+        """
+        errores = self.errores
+        return [errores(registro, **contexto) for registro in registros]
+
+
+REGLAS_VEHICULO = ReglasValidacion(
+    ("vin", Validador.validar_vin, ("vin",)),
+    ("placa", Validador.validar_placa, ("placa",)),
+    ("anio", Validador.validar_anio_vehiculo, ("anio",)),
+    ("estado_legal", Validador.validar_estado_vehiculo, ("estado_legal",)),
+    ("procedencia", Validador.validar_procedencia_vehiculo, ("procedencia",)),
+    ("marca_modelo_clase", Validador.validar_marca_modelo_clase, ("marca", "modelo", "clase")),
+    ("color", Validador.validar_color_vehiculo, ("color",)),
+    ("id_propietario", Validador.validar_id_propietario, ("id_propietario",)),
+)
+
+REGLAS_PROPIETARIO = ReglasValidacion(
+    ("nombre_completo", Validador.validar_nombre_completo, ("nombre_completo",)),
+    ("direccion", Validador.validar_direccion, ("direccion",)),
+    ("curp", Validador.validar_curp, ("curp",)),
+    ("telefono", Validador.validar_telefono, ("telefono",)),
+    ("estado_licencia", Validador.validar_estado_licencia, ("estado_licencia",)),
+    ("correo_electronico", Validador.validar_correo, ("correo_electronico",)),
+    ("estado", Validador.validar_estado_propietario, ("estado",)),
+)
+
+REGLAS_INFRACCION = ReglasValidacion(
+    ("monto", Validador.validar_monto, ("monto",)),
+    ("tipo_infraccion", Validador.validar_tipo_infraccion, ("tipo_infraccion",)),
+    ("tipo_captura", Validador.validar_tipo_captura, ("tipo_captura",)),
+    ("fecha_hora", Validador.validar_fecha_hora_pasada, ("fecha", "hora")),
+    ("lugar_motivo", Validador.validar_lugar_motivo, ("lugar", "motivo")),
+    ("id_agente", Validador.validar_id_agente, ("id_agente",)),
+    ("licencia_conductor", Validador.validar_licencia_conductor, ("licencia_conductor",)),
+    contexto=("tipo_captura",),
+)
@@ -8,7 +8,10 @@ sys.path.append(ruta_raiz)
 
 # 2. Importaciones de tu proyecto
 from database.inicializar_db import crear_tablas
+from database.conexion import cerrar_pool
 from views.login import VentanaLogin
+from views.tareas import terminar_tareas
+from logic.sesion import cerrar_sesion
 
 def verificar_entorno():
     """Verifica que la base de datos exista. Si no, la crea."""
@@ -27,6 +30,11 @@ def main():
     # Aplicamos un estilo visual
     app.setStyleSheet(estilos.TEMA_OSCURO)
 
+    # Al salir, esperamos las consultas en segundo plano y cerramos las conexiones del pool
+    app.aboutToQuit.connect(terminar_tareas)
+    app.aboutToQuit.connect(cerrar_pool)
+    app.aboutToQuit.connect(cerrar_sesion)
+
     # Verificamos si la base de datos está lista
     if not verificar_entorno():
         QMessageBox.critical(None, "Error de Sistema", 
@@ -2,17 +2,29 @@ from PySide6.QtWidgets import (QWidget, QVBoxLayout, QLabel,
 QLineEdit, QPushButton, QMessageBox, QInputDialog)
 from PySide6.QtCore import Qt
 from logic.auth import Auth
+from logic import sesion
+from views.tareas import ejecutar_en_segundo_plano
 
 # Importamos la ventana principal para poder abrirla después del login
 from views.principal import VentanaPrincipal
 
 class VentanaLogin(QWidget):
-    def __init__(self): 
+    def __init__(self, usuario_expirado=None, al_reautenticar=None):
+        """
+        Sin argumentos es el login de inicio. Con usuario_expirado (el objeto
+        Usuario de una sesión que expiró) pide de nuevo la contraseña de ese
+        usuario y, al validarla, renueva la sesión y llama a al_reautenticar()
+        en lugar de abrir otra ventana principal.
+        """
         super().__init__()
+        self.usuario_expirado = usuario_expirado
+        self.al_reautenticar = al_reautenticar
         self.setWindowTitle("Sistema de Registro Vehicular - Login")
         self.resize(350, 450)
         
         self.configurar_ui()
+        if usuario_expirado is not None:
+            self.configurar_reautenticacion()
 
     def configurar_ui(self):
         layout = QVBoxLayout()
@@ -32,10 +44,11 @@ class VentanaLogin(QWidget):
         self.input_password.setEchoMode(QLineEdit.Password) 
         self.input_password.setMinimumHeight(35)
 
-        btn_ingresar = QPushButton("Ingresar")
-        btn_ingresar.setMinimumHeight(40)
-        btn_ingresar.setStyleSheet("background-color: #0055ff; color: white; font-weight: bold;")
-        btn_ingresar.clicked.connect(self.verificar_credenciales)
+        self.btn_ingresar = QPushButton("Ingresar")
+        self.btn_ingresar.setMinimumHeight(40)
+        self.btn_ingresar.setStyleSheet("background-color: #0055ff; color: white; font-weight: bold;")
+        self.btn_ingresar.clicked.connect(self.verificar_credenciales)
+        self.input_password.returnPressed.connect(self.verificar_credenciales)
 
         self.label_error = QLabel("")
         self.label_error.setStyleSheet("color: red; font-size: 12px;")
@@ -46,49 +59,103 @@ class VentanaLogin(QWidget):
         layout.addWidget(self.input_usuario)
         layout.addWidget(self.input_password)
         layout.addWidget(self.label_error)
-        layout.addWidget(btn_ingresar)
+        layout.addWidget(self.btn_ingresar)
 
         self.setLayout(layout)
 
+    def configurar_reautenticacion(self):
+        """El usuario queda fijo: solo quien abrió la sesión puede retomarla."""
+        self.setWindowTitle("Sistema de Registro Vehicular - Sesión expirada")
+        self.setWindowModality(Qt.ApplicationModal)
+        self.input_usuario.setText(self.usuario_expirado.nombre_usuario)
+        self.input_usuario.setReadOnly(True)
+        self.label_error.setText("Sesión expirada por inactividad: ingrese su contraseña para continuar.")
+        self.label_error.show()
+        self.input_password.setFocus()
+
     def verificar_credenciales(self):
+        if not self.btn_ingresar.isEnabled():
+            return      # Ya hay una verificación en curso (ej. Enter dos veces)
         usuario = self.input_usuario.text().strip()
         password = self.input_password.text().strip()
 
         self.label_error.hide()
 
+        # La verificación (scrypt, ~0.1 s) corre en segundo plano para no congelar la ventana
+        self.btn_ingresar.setEnabled(False)
+        self.btn_ingresar.setText("Verificando...")
+        ejecutar_en_segundo_plano(
+            Auth.autenticar_usuario, usuario, password,
+            al_terminar=self.credenciales_verificadas,
+            al_fallar=lambda msj: self.credenciales_verificadas((False, None, msj, False)),
+            dueno=self,
+        )
+
+    def reactivar_ingreso(self):
+        self.btn_ingresar.setEnabled(True)
+        self.btn_ingresar.setText("Ingresar")
+
+    def credenciales_verificadas(self, resultado):
         # === CAMBIO CLAVE: Ahora Auth devuelve 4 valores ===
-        es_valido, usuario_obj, msj, debe_cambiar = Auth.autenticar_usuario(usuario, password)
-
-        if es_valido:
-            # === MECANISMO DE SEGURIDAD (PASSWORD TEMPORAL) ===
-            if debe_cambiar:
-                nueva_pass, ok = QInputDialog.getText(
-                    self, "Seguridad Requerida", 
-                    f"Bienvenido {usuario}.\nSu contraseña es temporal. Por favor ingrese una nueva:", 
-                    QLineEdit.Password
-                )
-                
-                if ok and nueva_pass:
-                    # Intentamos guardar la nueva contraseña encriptada
-                    cambio_ok, msj_cambio = Auth.cambiar_password_obligatorio(usuario_obj.id_usuario, nueva_pass)
-                    if not cambio_ok:
-                        QMessageBox.warning(self, "Error de Validación", msj_cambio)
-                        return # Detenemos el acceso porque la nueva contraseña no cumplió reglas
-                else:
-                    # Si el usuario cancela el diálogo, no lo dejamos entrar
-                    QMessageBox.warning(self, "Acceso Denegado", "Es obligatorio cambiar la contraseña temporal.")
-                    return
-
-            # Si todo está bien (o no debía cambiarla), pasamos al sistema
-            self.abrir_pantalla_principal(usuario_obj)
-        else:
+        es_valido, usuario_obj, msj, debe_cambiar = resultado
+
+        if not es_valido:
+            self.reactivar_ingreso()
             self.label_error.setText(msj)
             self.label_error.show()
+            return
+
+        # === MECANISMO DE SEGURIDAD (PASSWORD TEMPORAL) ===
+        if not debe_cambiar:
+            self.abrir_pantalla_principal(usuario_obj)
+            return
+
+        nueva_pass, ok = QInputDialog.getText(
+            self, "Seguridad Requerida", 
+            f"Bienvenido {usuario_obj.nombre_usuario}.\nSu contraseña es temporal. Por favor ingrese una nueva:", 
+            QLineEdit.Password
+        )
+        if not (ok and nueva_pass):
+            # Si el usuario cancela el diálogo, no lo dejamos entrar
+            self.reactivar_ingreso()
+            QMessageBox.warning(self, "Acceso Denegado", "Es obligatorio cambiar la contraseña temporal.")
+            return
+
+        # Guardamos la nueva contraseña encriptada, también en segundo plano
+        ejecutar_en_segundo_plano(
+            Auth.cambiar_password_obligatorio, usuario_obj.id_usuario, nueva_pass,
+            al_terminar=lambda cambio: self.password_cambiada(cambio, usuario_obj),
+            al_fallar=lambda msj: self.password_cambiada((False, msj), usuario_obj),
+            dueno=self,
+        )
+
+    def password_cambiada(self, resultado, usuario_obj):
+        cambio_ok, msj_cambio = resultado
+        if not cambio_ok:
+            self.reactivar_ingreso()
+            QMessageBox.warning(self, "Error de Validación", msj_cambio)
+            return # Detenemos el acceso porque la nueva contraseña no cumplió reglas
+        # Si todo está bien, pasamos al sistema
+        self.abrir_pantalla_principal(usuario_obj)
 
     def abrir_pantalla_principal(self, usuario_obj):
         """
         Cierra el login y levanta el menú principal inyectando el usuario.
+        Los permisos del rol se compilan una vez en la sesión (logic/sesion.py).
+        Si es una reautenticación, la ventana principal ya existe y solo se renueva la sesión.
         """
+        if self.usuario_expirado is not None:
+            if usuario_obj.id_usuario != self.usuario_expirado.id_usuario:
+                self.reactivar_ingreso()
+                self.label_error.setText("Error: Solo el usuario de la sesión expirada puede retomarla.")
+                self.label_error.show()
+                return
+            sesion.iniciar_sesion(usuario_obj)
+            self.close()
+            if self.al_reautenticar is not None:
+                self.al_reautenticar()
+            return
+        sesion.iniciar_sesion(usuario_obj)
         self.ventana_principal = VentanaPrincipal(usuario_obj)
         self.ventana_principal.show()
         self.close()
\ No newline at end of file
@@ -0,0 +1,250 @@
+from collections import OrderedDict
+
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, Signal
+
+from views.tareas import ejecutar_en_segundo_plano
+
+TAMANO_PAGINA = 200
+PAGINAS_EN_MEMORIA = 20     # Máximo de páginas guardadas a la vez (≈4,000 filas)
+
+
+class ModeloTablaPaginada(QAbstractTableModel):
+    """
+    Modelo virtual para QTableView respaldado por una consulta paginada.
+
+    En lugar de crear un QTableWidgetItem por celda, la vista le pide al modelo
+    solo las celdas visibles:
+    - Las filas se traen por páginas (canFetchMore/fetchMore) conforme el usuario baja.
+    - Solo se guardan PAGINAS_EN_MEMORIA páginas (LRU). Una página descartada se
+      vuelve a pedir con el cursor con el que empieza, que sí se conserva.
+    - El texto de cada celda se arma en data() al momento de dibujarla.
+    - Al ordenar por una columna, el orden se hace en SQL y se recarga desde la primera página.
+    - Las consultas corren en segundo plano (views.tareas); mientras llega una página
+      sus celdas se muestran vacías.
+
+    La fuente es una función obtener_pagina(despues_de, orden, tamano) que retorna
+    (exito, encabezados, filas, siguiente_cursor), como GestorReportes.obtener_pagina.
+    """
+
+    cargado = Signal(bool, str)     # Llegó la primera página: (exito, mensaje de error)
+    error_carga = Signal(str)       # Mensaje cuando una página posterior no se pudo obtener
+    filas_cambiaron = Signal()      # Se cargaron más filas o se recargó el modelo
+
+    def __init__(self, formatear=None, encabezados=None, tamano_pagina=TAMANO_PAGINA,
+                 paginas_en_memoria=PAGINAS_EN_MEMORIA, parent=None):
+        super().__init__(parent)
+        self.formatear = formatear or (lambda encabezado, valor: "" if valor is None else str(valor))
+        self.encabezados_fijos = encabezados
+        self.tamano_pagina = tamano_pagina
+        self.paginas_en_memoria = paginas_en_memoria
+
+        self.obtener_pagina = None
+        self.contar = None
+        self.orden = None           # (columna, descendente) o None para el orden por defecto
+        self.total = 0
+        self.cargando = False       # True mientras se espera la primera página
+        self._columnas = []         # Nombres reales de las columnas (para ordenar en SQL)
+        self._generacion = 0        # Cambia en cada recarga; descarta respuestas de cargas anteriores
+        self._tareas = []
+        self._limpiar()
+
+    def _limpiar(self):
+        self.encabezados = list(self.encabezados_fijos or [])
+        self._inicios = []           # Cursor con el que empieza cada página conocida
+        self._paginas = OrderedDict()
+        self._pidiendo = set()       # Páginas descartadas que se están volviendo a pedir
+        self._pidiendo_siguiente = False
+        self._filas_visibles = 0
+        self._hay_mas = False
+
+    # ==========================================
+    # CARGA DE DATOS (en segundo plano)
+    # ==========================================
+    def configurar(self, obtener_pagina, contar=None):
+        """Cambia la fuente de datos (ej. otro reporte). Llame a cargar() después."""
+        self.obtener_pagina = obtener_pagina
+        self.contar = contar
+        self.orden = None
+        self._columnas = []
+
+    def _lanzar(self, consulta, al_terminar):
+        """Ejecuta 'consulta' en segundo plano y entrega su resultado solo si el modelo no se recargó mientras tanto."""
+        generacion = self._generacion
+        self._tareas = [tarea for tarea in self._tareas if not tarea.terminada]
+        self._tareas.append(ejecutar_en_segundo_plano(
+            consulta,
+            al_terminar=lambda resultado: generacion == self._generacion and al_terminar(resultado),
+            al_fallar=lambda mensaje: generacion == self._generacion and self._fallo(mensaje),
+            dueno=self,
+        ))
+
+    def _fallo(self, mensaje):
+        """Una consulta lanzó una excepción: se deja de pedir páginas y se avisa."""
+        self._pidiendo_siguiente = False
+        self._hay_mas = False
+        if self.cargando:
+            self.cargando = False
+            self.filas_cambiaron.emit()
+            self.cargado.emit(False, mensaje)
+        else:
+            self.error_carga.emit(mensaje)
+
+    def cargar(self):
+        """
+        Descarta lo cargado y pide la primera página (y el total) en segundo plano.
+        El resultado se avisa con la señal 'cargado'.
+        """
+        for tarea in self._tareas:
+            tarea.cancelar()
+        self._tareas = []
+        self._generacion += 1
+
+        self.beginResetModel()
+        self._limpiar()
+        self.total = 0
+        self.cargando = self.obtener_pagina is not None
+        self.endResetModel()
+        self.filas_cambiaron.emit()
+
+        if self.obtener_pagina is None:
+            return
+        obtener_pagina, contar, orden, tamano = self.obtener_pagina, self.contar, self.orden, self.tamano_pagina
+
+        def consultar():
+            pagina = obtener_pagina(None, orden, tamano)
+            total = contar()[1] if pagina[0] and contar else len(pagina[2])
+            return pagina, total
+
+        self._lanzar(consultar, self._primera_pagina)
+
+    def _primera_pagina(self, resultado):
+        (exito, encabezados, filas, siguiente), total = resultado
+        self.cargando = False
+        if not exito:
+            self.filas_cambiaron.emit()
+            self.cargado.emit(False, filas[0][0] if filas else "Error desconocido")
+            return
+
+        self.beginResetModel()
+        if not self.encabezados_fijos:
+            self.encabezados = encabezados
+        if filas:
+            self._columnas = list(filas[0].keys())
+        self._inicios = [None]
+        self._guardar_pagina(0, filas, siguiente)
+        self._filas_visibles = len(filas)
+        self.total = total
+        self.endResetModel()
+        self.filas_cambiaron.emit()
+        self.cargado.emit(True, "")
+
+    def _guardar_pagina(self, numero, filas, siguiente):
+        self._paginas[numero] = filas
+        self._paginas.move_to_end(numero)
+        while len(self._paginas) > self.paginas_en_memoria:
+            self._paginas.popitem(last=False)
+
+        # Si es la última página conocida, registramos dónde empieza la siguiente
+        if numero == len(self._inicios) - 1:
+            self._hay_mas = siguiente is not None
+            if siguiente is not None:
+                self._inicios.append(siguiente)
+
+    def _pagina(self, numero):
+        """Filas de la página 'numero' si está en memoria; si no, la pide y retorna None."""
+        if numero in self._paginas:
+            self._paginas.move_to_end(numero)
+            return self._paginas[numero]
+        if numero not in self._pidiendo and numero < len(self._inicios):
+            self._pidiendo.add(numero)
+            obtener_pagina, cursor, orden, tamano = self.obtener_pagina, self._inicios[numero], self.orden, self.tamano_pagina
+            self._lanzar(lambda: obtener_pagina(cursor, orden, tamano),
+                         lambda resultado: self._pagina_recuperada(numero, resultado))
+        return None
+
+    def _pagina_recuperada(self, numero, resultado):
+        self._pidiendo.discard(numero)
+        exito, _, filas, siguiente = resultado
+        if not exito:
+            self.error_carga.emit(filas[0][0] if filas else "Error desconocido")
+            return
+        self._guardar_pagina(numero, filas, siguiente)
+        primera = numero * self.tamano_pagina
+        ultima = min(primera + len(filas), self._filas_visibles) - 1
+        if ultima >= primera:
+            self.dataChanged.emit(self.index(primera, 0), self.index(ultima, self.columnCount() - 1))
+
+    def fila(self, numero_fila):
+        """
+        Valores originales (sin formato) de una fila, o None si no existe o si su
+        página no está en memoria (en ese caso ya se pidió y llegará con dataChanged).
+        """
+        pagina = self._pagina(numero_fila // self.tamano_pagina)
+        posicion = numero_fila % self.tamano_pagina
+        return pagina[posicion] if pagina is not None and posicion < len(pagina) else None
+
+    # ==========================================
+    # INTERFAZ QAbstractTableModel
+    # ==========================================
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._filas_visibles
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.encabezados)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            fila = self.fila(index.row())
+            if fila is None:
+                return None
+            return self.formatear(self.encabezados[index.column()], fila[index.column()])
+        if role == Qt.TextAlignmentRole:
+            return int(Qt.AlignCenter)
+        return None
+
+    def headerData(self, seccion, orientacion, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientacion == Qt.Horizontal and seccion < len(self.encabezados):
+            return self.encabezados[seccion]
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._hay_mas and not self._pidiendo_siguiente
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        self._pidiendo_siguiente = True
+        numero = len(self._inicios) - 1
+        obtener_pagina, cursor, orden, tamano = self.obtener_pagina, self._inicios[numero], self.orden, self.tamano_pagina
+        self._lanzar(lambda: obtener_pagina(cursor, orden, tamano),
+                     lambda resultado: self._agregar_pagina(numero, resultado))
+
+    def _agregar_pagina(self, numero, resultado):
+        self._pidiendo_siguiente = False
+        exito, _, filas, siguiente = resultado
+        if not exito:
+            self._hay_mas = False
+            self.error_carga.emit(filas[0][0] if filas else "Error desconocido")
+            return
+        if not filas:
+            self._hay_mas = False
+            return
+
+        self.beginInsertRows(QModelIndex(), self._filas_visibles, self._filas_visibles + len(filas) - 1)
+        self._guardar_pagina(numero, filas, siguiente)
+        self._filas_visibles += len(filas)
+        self.endInsertRows()
+        self.filas_cambiaron.emit()
+
+    def sort(self, columna, orden=Qt.AscendingOrder):
+        """Ordena en la base de datos; columna < 0 vuelve al orden original del reporte."""
+        if columna < 0 or columna >= len(self._columnas):
+            nuevo_orden = None
+        else:
+            nuevo_orden = (self._columnas[columna], orden == Qt.DescendingOrder)
+        if nuevo_orden == self.orden:
+            return
+        self.orden = nuevo_orden
+        self.cargar()
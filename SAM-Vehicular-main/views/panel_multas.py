@@ -3,10 +3,13 @@ QLineEdit, QPushButton, QComboBox, QTabWidget,
 QFormLayout, QDoubleSpinBox, QDateEdit, QTimeEdit, QMessageBox)
 from PySide6.QtCore import Qt, QDate, QTime
 import logic.catalogos as cat
+from logic import sesion
+from logic.almacen_catalogos import catalogos
 #Importaciones backend
 from models.infraccion import Infraccion
 from logic.gestor_infracciones import GestorInfracciones
 from logic.gestor_agentes import GestorAgentes
+from views.tareas import ejecutar_en_segundo_plano
 class PanelMultas(QWidget):
     def __init__(self, usuario_actual):
         super().__init__()
@@ -39,17 +42,12 @@ class PanelMultas(QWidget):
         self.construir_tab_gestionar()
 
         # --- APLICACIÓN DE ROLES (RBAC) ---
-        rol = self.usuario_actual.rol
-        
-        if rol == cat.ROLES_USUARIO[0]: # Administrador
+        if sesion.puede(sesion.REGISTRAR_INFRACCIONES): # Administrador y Agente de Tránsito
             self.pestanas.addTab(self.tab_registrar, "Registrar Infracción")
+
+        if sesion.puede(sesion.COBRAR_INFRACCIONES): # Administrador
             self.pestanas.addTab(self.tab_gestionar, "Cobro y Cancelación")
-            
-        elif rol == cat.ROLES_USUARIO[2]: # Agente de Tránsito
-            # Solo ve la pestaña de registro
-            self.pestanas.addTab(self.tab_registrar, "Registrar Infracción")
-            
-        elif rol == cat.ROLES_USUARIO[3]: # Supervisor
+        elif sesion.puede(sesion.VER_INFRACCIONES): # Supervisor
             # Solo ve la pestaña de gestión, pero en modo "Consulta"
             self.pestanas.addTab(self.tab_gestionar, "Consultar Infracción")
 
@@ -73,12 +71,9 @@ class PanelMultas(QWidget):
         self.combo_agentes = QComboBox()
         self.combo_agentes.addItem("Seleccione al agente que levantó la multa...", None)
         
-        # Llamamos al backend para llenar el menú
-        exito, lista_agentes = GestorAgentes.obtener_agentes_para_combo()
-        if exito:
-            for id_agente, placa, nombre in lista_agentes:
-                # El usuario lee "AG-101 - Ricardo", pero el sistema guarda el ID (1)
-                self.combo_agentes.addItem(f"{placa} - {nombre}", id_agente)
+        # Llamamos al backend para llenar el menú (en segundo plano, ver cargar_agentes)
+        ejecutar_en_segundo_plano(GestorAgentes.obtener_agentes_para_combo,
+                                  al_terminar=self.cargar_agentes, dueno=self)
                 
         formulario.addRow("Agente de Tránsito:", self.combo_agentes)
         # 2. Datos de Tiempo (QDateEdit y QTimeEdit)
@@ -97,7 +92,7 @@ class PanelMultas(QWidget):
         self.input_motivo.setPlaceholderText("Artículos violados o descripción")
 
         self.combo_tipo = QComboBox()
-        self.combo_tipo.addItems(cat.TIPOS_INFRACCION)
+        self.combo_tipo.addItems(catalogos().tipos_infraccion)
 
         # 4. Datos Económicos (QDoubleSpinBox)
         # Restringe la entrada exclusivamente a números con decimales.
@@ -135,6 +130,14 @@ class PanelMultas(QWidget):
         
         layout.addWidget(self.btn_registrar, alignment=Qt.AlignRight)
 
+    def cargar_agentes(self, resultado):
+        """Llena el menú de agentes cuando llega la respuesta del backend."""
+        exito, lista_agentes = resultado
+        if exito:
+            for id_agente, placa, nombre in lista_agentes:
+                # El usuario lee "AG-101 - Ricardo", pero el sistema guarda el ID (1)
+                self.combo_agentes.addItem(f"{placa} - {nombre}", id_agente)
+
     # ==========================================
     # PESTAÑA 2: GESTIONAR ESTADO (COBROS)
     # ==========================================
@@ -148,7 +151,7 @@ class PanelMultas(QWidget):
         # 1. Zona superior: Búsqueda
         layout_busqueda = QHBoxLayout()
         self.input_buscar_folio = QLineEdit()
-        self.input_buscar_folio.setPlaceholderText("Ej: INF-20260223-A1B2C3")
+        self.input_buscar_folio.setPlaceholderText("Ej: INF-20260223-000012347")
         btn_buscar = QPushButton("Buscar Folio")
         
         layout_busqueda.addWidget(QLabel("Folio de la Multa:"))
@@ -182,9 +185,7 @@ class PanelMultas(QWidget):
     # ==========================================
     def aplicar_permisos(self):
         """Bloquea elementos visuales según el rol del usuario."""
-        rol = self.usuario_actual.rol
-        
-        if rol == cat.ROLES_USUARIO[3]: # Supervisor
+        if not sesion.puede(sesion.COBRAR_INFRACCIONES):
             # El supervisor solo audita, no puede cobrar ni cancelar 
             self.btn_actualizar_estado.setVisible(False)
             self.combo_nuevo_estado.setEnabled(False)
@@ -228,10 +229,19 @@ class PanelMultas(QWidget):
             monto=monto, licencia_conductor=licencia
         )
 
-        # 4. Enviamos al Gestor
-        exito, msj = GestorInfracciones.registrar_infraccion(nueva_infraccion, tipo_captura)
+        # 4. Enviamos al Gestor en segundo plano; el botón se bloquea para no emitir dos veces
+        self.btn_registrar.setEnabled(False)
+        ejecutar_en_segundo_plano(
+            GestorInfracciones.registrar_infraccion, nueva_infraccion, tipo_captura,
+            al_terminar=self.registro_terminado,
+            al_fallar=lambda msj: self.registro_terminado((False, msj)),
+            dueno=self,
+        )
 
+    def registro_terminado(self, resultado):
         # 5. Retroalimentación visual
+        exito, msj = resultado
+        self.btn_registrar.setEnabled(True)
         if exito:
             QMessageBox.information(self, "Éxito", msj)
             self.limpiar_formulario_registro()
@@ -249,8 +259,17 @@ class PanelMultas(QWidget):
             QMessageBox.warning(self, "Falta Folio", "Por favor ingrese el folio de la infracción.")
             return
             
-        exito, msj = GestorInfracciones.cambiar_estado_infraccion(folio, nuevo_estado)
-        
+        self.btn_actualizar_estado.setEnabled(False)
+        ejecutar_en_segundo_plano(
+            GestorInfracciones.cambiar_estado_infraccion, folio, nuevo_estado,
+            al_terminar=self.cambio_estado_terminado,
+            al_fallar=lambda msj: self.cambio_estado_terminado((False, msj)),
+            dueno=self,
+        )
+
+    def cambio_estado_terminado(self, resultado):
+        exito, msj = resultado
+        self.btn_actualizar_estado.setEnabled(True)
         if exito:
             QMessageBox.information(self, "Actualización Exitosa", msj)
             self.input_buscar_folio.clear()
@@ -260,7 +279,6 @@ class PanelMultas(QWidget):
     def limpiar_formulario_registro(self):
         """Limpia el formulario después de un registro exitoso."""
         self.input_vin.clear()
-        self.input_id_agente.clear()
         self.input_lugar.clear()
         self.input_motivo.clear()
         self.input_licencia.clear()
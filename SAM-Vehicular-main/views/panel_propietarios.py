@@ -5,7 +5,7 @@ from PySide6.QtCore import Qt
 from views.tabs.registrar_propietario import TabRegistrarPropietario
 from views.tabs.modificar_propietario import TabModificarPropietario
 
-import logic.catalogos as cat
+from logic import sesion
 
 class PanelPropietarios(QWidget):
     def __init__(self, usuario_actual):
@@ -33,13 +33,11 @@ class PanelPropietarios(QWidget):
         self.tab_modificar = TabModificarPropietario(self.usuario_actual)
 
         # --- APLICACIÓN DE ROLES ---
-        rol = self.usuario_actual.rol
-        
-        if rol in [cat.ROLES_USUARIO[0], cat.ROLES_USUARIO[1]]: # Admin u Operador
+        if sesion.puede(sesion.REGISTRAR_PROPIETARIOS): # Admin u Operador
             self.pestanas.addTab(self.tab_registrar, "Registrar Nuevo Propietario")
             self.pestanas.addTab(self.tab_modificar, "Modificar Propietario")
             
-        elif rol in [cat.ROLES_USUARIO[2], cat.ROLES_USUARIO[3]]: # Agente o Supervisor
+        elif sesion.puede(sesion.VER_PROPIETARIOS):
             # Solo lectura
             self.pestanas.addTab(self.tab_modificar, "Consultar Propietario")
 
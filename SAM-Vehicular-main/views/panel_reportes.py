@@ -1,11 +1,30 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-QComboBox, QDateEdit, QPushButton, QTableWidget, 
-QTableWidgetItem, QHeaderView, QMessageBox, QFileDialog)
+QComboBox, QDateEdit, QPushButton, QTableView, 
+QHeaderView, QMessageBox, QFileDialog, QProgressDialog)
 from PySide6.QtCore import Qt, QDate
-import csv
 
-import logic.catalogos as cat
+from logic import sesion
 from logic.gestor_reportes import GestorReportes
+from logic.exportador import Exportador, formatear_celda, formatos_disponibles
+from views.modelo_tabla import ModeloTablaPaginada
+from views.tareas import ejecutar_en_segundo_plano
+
+# Filtro del cuadro "Guardar como" y extensión de cada formato de exportación
+FILTROS_EXPORTACION = {
+    "csv": ("Archivos CSV (*.csv)", ".csv"),
+    "csv.gz": ("CSV comprimido (*.csv.gz)", ".csv.gz"),
+    "parquet": ("Parquet (*.parquet)", ".parquet"),
+    "xlsx": ("Libro de Excel (*.xlsx)", ".xlsx"),
+}
+
+NOMBRES_REPORTES = {
+    1: "1. Vehículos con infracciones pendientes",
+    2: "2. Infracciones por rango de fechas",
+    3: "3. Infracciones emitidas por agente",
+    4: "4. Vehículos por estado legal",
+    5: "5. Propietarios con múltiples vehículos",
+    6: "6. Resumen general de infracciones",
+}
 
 
 class PanelReportes(QWidget):
@@ -35,24 +54,13 @@ class PanelReportes(QWidget):
         self.combo_reportes.addItem("Seleccione un reporte...", None)
 
         # === APLICACIÓN DE ROLES (RBAC) ===
-        rol = self.usuario_actual.rol
-        
-        if rol in ["Administrador", "Supervisor"]:
-            # Tienen acceso a todos los reportes
-            self.combo_reportes.addItem("1. Vehículos con infracciones pendientes", 1)
-            self.combo_reportes.addItem("2. Infracciones por rango de fechas", 2)
-            self.combo_reportes.addItem("3. Infracciones emitidas por agente", 3)
-            self.combo_reportes.addItem("4. Vehículos por estado legal", 4)
-            self.combo_reportes.addItem("5. Propietarios con múltiples vehículos", 5)
-            self.combo_reportes.addItem("6. Resumen general de infracciones", 6)
-            
-        elif rol == "Operador Administrativo":
-            # Solo reportes básicos enfocados a padrón vehicular
-            self.combo_reportes.addItem("1. Vehículos con infracciones pendientes", 1)
-            self.combo_reportes.addItem("4. Vehículos por estado legal", 4)
-            self.combo_reportes.addItem("5. Propietarios con múltiples vehículos", 5)
-            
-        elif rol == "Agente de Tránsito":
+        # Administrador y Supervisor ven los 6; el Operador solo los del padrón vehicular (1, 4 y 5)
+        actual = sesion.sesion_actual()
+        self.reportes_permitidos = actual.reportes_permitidos() if actual else []
+        for numero in self.reportes_permitidos:
+            self.combo_reportes.addItem(NOMBRES_REPORTES[numero], numero)
+
+        if not self.reportes_permitidos:
             # Bloqueo total
             self.combo_reportes.setItemText(0, "Sin acceso a reportes")
             self.combo_reportes.setEnabled(False)
@@ -83,20 +91,24 @@ class PanelReportes(QWidget):
         layout_controles.addWidget(self.btn_generar)
         
         # Botón Exportar
-        self.btn_exportar = QPushButton("Exportar a CSV")
+        self.btn_exportar = QPushButton("Exportar")
         self.btn_exportar.setStyleSheet("background-color: #2980b9; color: white; font-weight: bold; padding: 8px;")
-        self.btn_exportar.clicked.connect(self.exportar_csv)
+        self.btn_exportar.clicked.connect(self.exportar)
         self.btn_exportar.setVisible(False) # Oculto por defecto
         layout_controles.addWidget(self.btn_exportar)
 
         layout_principal.addLayout(layout_controles)
 
         # 3. Zona de Visualización
-        self.tabla_resultados = QTableWidget()
+        # La tabla es una vista sobre un modelo paginado: solo se piden a la base de
+        # datos las páginas que el usuario alcanza a ver, sin importar el tamaño del reporte
+        self.modelo_resultados = ModeloTablaPaginada(formatear=formatear_celda)
+        self.tabla_resultados = QTableView()
+        self.tabla_resultados.setModel(self.modelo_resultados)
         self.tabla_resultados.setAlternatingRowColors(True)
         
         # 1. Bloquear la selección de celdas
-        self.tabla_resultados.setSelectionMode(QTableWidget.NoSelection)
+        self.tabla_resultados.setSelectionMode(QTableView.NoSelection)
         
         # 2. Ocultar los números de fila (esto elimina el cuadro superior izquierdo)
         self.tabla_resultados.verticalHeader().setVisible(False)
@@ -106,7 +118,7 @@ class PanelReportes(QWidget):
         
         # 4. CSS para Modo Oscuro
         self.tabla_resultados.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 background-color: #2b2b2b;
                 alternate-background-color: #353535;
                 color: #ffffff;
@@ -121,27 +133,44 @@ class PanelReportes(QWidget):
                 padding: 6px;
                 border: 1px solid #444444;
             }
-            QTableWidget::corner {
+            QTableView::corner {
                 background-color: #1e1e1e;
                 border: none;
             }
         """)
-        self.tabla_resultados.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.tabla_resultados.setEditTriggers(QTableView.NoEditTriggers)
         self.tabla_resultados.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+
+        # 5. Clic en un encabezado = ordenar por esa columna (el orden se hace en SQL).
+        # Sin indicador inicial para que el reporte abra con su orden original.
+        self.tabla_resultados.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.tabla_resultados.setSortingEnabled(True)
         layout_principal.addWidget(self.tabla_resultados)
 
+        # Contador de filas: la tabla se llena por páginas conforme el usuario baja
+        self.lbl_conteo = QLabel("")
+        self.lbl_conteo.setAlignment(Qt.AlignRight)
+        layout_principal.addWidget(self.lbl_conteo)
+
+        # Estado del reporte mostrado (para exportar)
+        self.reporte_actual = None
+        self.parametros_actuales = ()
+
         # ==========================================
         # CONEXIÓN DE SEÑALES (Eventos)
         # ==========================================
         self.combo_reportes.currentIndexChanged.connect(self.ajustar_filtros)
         self.btn_generar.clicked.connect(self.procesar_reporte)
+        self.modelo_resultados.cargado.connect(self.reporte_cargado)
+        self.modelo_resultados.filas_cambiaron.connect(self.actualizar_conteo)
+        self.modelo_resultados.error_carga.connect(self.mostrar_error)
         
         # Ocultamos las fechas al arrancar
         self.ocultar_fechas()
 
     def aplicar_permisos(self):
         """Seguridad extra: Si un agente llega aquí, bloqueamos la generación."""
-        if self.usuario_actual.rol == "Agente de Tránsito":
+        if not self.reportes_permitidos:
             self.combo_reportes.setEnabled(False)
             self.btn_generar.setEnabled(False)
 
@@ -169,7 +198,7 @@ class PanelReportes(QWidget):
             self.ocultar_fechas()
 
     def procesar_reporte(self):
-        """Ejecuta la consulta correspondiente en el backend y dibuja la tabla."""
+        """Ejecuta la consulta correspondiente en el backend y dibuja la primera página."""
         # Extraemos el ID numérico oculto (1, 2, 3...) sin importar su posición en la lista
         reporte_id = self.combo_reportes.currentData()
         
@@ -177,92 +206,117 @@ class PanelReportes(QWidget):
             QMessageBox.warning(self, "Atención", "Por favor seleccione un reporte de la lista.")
             return
 
-        # 1. Limpiamos la tabla por si había un reporte anterior
-        self.tabla_resultados.clearContents()
-        self.tabla_resultados.setRowCount(0)
-
-        exito = False
-        encabezados = []
-        filas = []
-
-        # 2. Llamamos al backend según el ID del reporte
-        if reporte_id == 1:
-            exito, encabezados, filas = GestorReportes.reporte_vehiculos_infracciones_pendientes()
-        elif reporte_id == 2:
+        # 1. Parámetros del reporte (solo el 2 usa el rango de fechas)
+        parametros = ()
+        if reporte_id == 2:
             fecha_ini = self.fecha_inicio.date().toString("yyyy-MM-dd")
             fecha_fin = self.fecha_fin.date().toString("yyyy-MM-dd")
-            exito, encabezados, filas = GestorReportes.reporte_infracciones_por_fecha(fecha_ini, fecha_fin)
-        elif reporte_id == 3:
-            exito, encabezados, filas = GestorReportes.reporte_infracciones_por_agente()
-        elif reporte_id == 4:
-            exito, encabezados, filas = GestorReportes.reporte_vehiculos_estado_legal()
-        elif reporte_id == 5:
-            exito, encabezados, filas = GestorReportes.reporte_propietarios_multiples_vehiculos()
-        elif reporte_id == 6:
-            exito, encabezados, filas = GestorReportes.reporte_resumen_infracciones()
-
-        # 3. Dibujamos los resultados en la interfaz
-        if exito:
-            self.btn_exportar.setVisible(True)
-            if not filas:
-                QMessageBox.information(self, "Sin Resultados", "El reporte se generó correctamente pero no hay datos para mostrar en este momento.")
-                return
-            
-            # Configuramos cuántas columnas y filas necesitamos
-            self.tabla_resultados.setColumnCount(len(encabezados))
-            self.tabla_resultados.setHorizontalHeaderLabels(encabezados)
-            self.tabla_resultados.setRowCount(len(filas))
-
-            # Rellenamos celda por celda
-            for fila_idx, datos_fila in enumerate(filas):
-                for col_idx, dato in enumerate(datos_fila):
-                    
-                    # Detectar si la columna es de dinero por su encabezado
-                    nombre_columna = encabezados[col_idx].lower()
-                    if "monto" in nombre_columna or "dinero" in nombre_columna:
-                        if dato is not None:
-                            texto_celda = f"${float(dato):,.2f}"
-                        else:
-                            texto_celda = "$0.00"
-                    else:
-                        texto_celda = str(dato) if dato is not None else "N/A"
-
-                    item = QTableWidgetItem(texto_celda)
-                    item.setTextAlignment(Qt.AlignCenter)
-                    self.tabla_resultados.setItem(fila_idx, col_idx, item)
-                    
-        else:
-            # Si el Gestor reportó un error (ej. tabla no encontrada), lo mostramos
-            error_msg = filas[0][0] if filas else "Error desconocido"
-            QMessageBox.critical(self, "Error al Generar", f"Hubo un problema de base de datos:\n{error_msg}")
-            
-    def exportar_csv(self):
-        """Abre un cuadro de diálogo y guarda la tabla en un archivo .csv"""
-        if self.tabla_resultados.rowCount() == 0:
+            parametros = (fecha_ini, fecha_fin)
+
+        self.reporte_actual = reporte_id
+        self.parametros_actuales = parametros
+
+        # 2. El modelo pide la primera página en segundo plano (la ventana no se congela);
+        # las siguientes las pide la vista al llegar al final
+        self.modelo_resultados.configurar(
+            lambda despues_de, orden, tamano: GestorReportes.obtener_pagina(
+                reporte_id, parametros, despues_de, tamano, orden),
+            lambda: GestorReportes.contar_filas(reporte_id, parametros))
+        self.tabla_resultados.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.btn_generar.setEnabled(False)
+        self.btn_exportar.setVisible(False)
+        self.modelo_resultados.cargar()
+
+    def reporte_cargado(self, exito, mensaje):
+        """Llega la primera página del reporte (también al reordenar por una columna)."""
+        self.btn_generar.setEnabled(True)
+        if not exito:
+            self.lbl_conteo.setText("")
+            self.mostrar_error(mensaje)
+            return
+
+        self.btn_exportar.setVisible(True)
+        if self.modelo_resultados.rowCount() == 0:
+            QMessageBox.information(self, "Sin Resultados", "El reporte se generó correctamente pero no hay datos para mostrar en este momento.")
+
+    def actualizar_conteo(self):
+        modelo = self.modelo_resultados
+        if modelo.cargando:
+            self.lbl_conteo.setText("Generando reporte...")
+        elif modelo.obtener_pagina is not None:
+            self.lbl_conteo.setText(f"Mostrando {modelo.rowCount():,} de {modelo.total:,} registros")
+
+    def mostrar_error(self, error_msg):
+        # Si el Gestor reportó un error (ej. tabla no encontrada), lo mostramos
+        QMessageBox.critical(self, "Error al Generar", f"Hubo un problema de base de datos:\n{error_msg}")
+
+    def exportar(self):
+        """Pide dónde guardar y exporta el reporte completo en segundo plano, con barra de progreso."""
+        if self.reporte_actual is None or self.modelo_resultados.rowCount() == 0:
             QMessageBox.warning(self, "Sin datos", "Genere un reporte primero antes de exportar.")
             return
 
-        ruta_archivo, _ = QFileDialog.getSaveFileName(self, "Guardar Reporte", "reporte_transito.csv", "Archivos CSV (*.csv)")
+        filtros = [FILTROS_EXPORTACION[formato][0] for formato in formatos_disponibles()]
+        ruta_archivo, filtro = QFileDialog.getSaveFileName(self, "Guardar Reporte", "reporte_transito.csv", ";;".join(filtros))
 
         if not ruta_archivo:
             return # El usuario canceló
 
+        # Si el nombre no trae una extensión conocida, usamos la del filtro elegido
+        extension = next((ext for nombre, ext in FILTROS_EXPORTACION.values() if nombre == filtro), ".csv")
+        if not any(ruta_archivo.lower().endswith(ext) for _, ext in FILTROS_EXPORTACION.values()):
+            ruta_archivo += extension
+
         try:
-            with open(ruta_archivo, mode='w', newline='', encoding='utf-8') as archivo:
-                writer = csv.writer(archivo)
-
-                # Escribir los encabezados
-                encabezados = [self.tabla_resultados.horizontalHeaderItem(i).text() for i in range(self.tabla_resultados.columnCount())]
-                writer.writerow(encabezados)
-
-                # Escribir todas las filas
-                for fila in range(self.tabla_resultados.rowCount()):
-                    datos_fila = []
-                    for col in range(self.tabla_resultados.columnCount()):
-                        item = self.tabla_resultados.item(fila, col)
-                        datos_fila.append(item.text() if item else "")
-                    writer.writerow(datos_fila)
-
-            QMessageBox.information(self, "Éxito", "El reporte se ha guardado correctamente y puede abrirse en Excel.")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"No se pudo guardar el archivo:\n{str(e)}")
\ No newline at end of file
+            # La tabla solo tiene las páginas vistas; el exportador lee el reporte completo
+            # de la base de datos, en el mismo orden que el usuario eligió en la tabla
+            exportador = Exportador(self.reporte_actual, ruta_archivo, self.parametros_actuales,
+                                    orden=self.modelo_resultados.orden, formatear=formatear_celda)
+        except ValueError as e:
+            QMessageBox.warning(self, "Formato no disponible", str(e))
+            return
+
+        self.progreso_exportacion = QProgressDialog("Exportando reporte...", "Cancelar", 0, 0, self)
+        self.progreso_exportacion.setWindowTitle("Exportar")
+        self.progreso_exportacion.setWindowModality(Qt.WindowModal)
+        self.progreso_exportacion.setMinimumDuration(0)
+        self.btn_exportar.setEnabled(False)
+
+        tarea = ejecutar_en_segundo_plano(
+            self._exportar_en_hilo, exportador, con_tarea=True,
+            al_avanzar=self.avance_exportacion,
+            al_terminar=self.exportacion_terminada,
+            al_fallar=self.exportacion_fallida,
+            dueno=self,
+        )
+        self.progreso_exportacion.canceled.connect(tarea.cancelar)
+        self.progreso_exportacion.canceled.connect(self.exportacion_cancelada)
+
+    @staticmethod
+    def _exportar_en_hilo(tarea, exportador):
+        """Corre en el hilo de trabajo: conecta el avance y la cancelación de la tarea al exportador."""
+        exportador.al_avanzar = lambda resumen: tarea.reportar_progreso(resumen["filas"], resumen["total"])
+        exportador.cancelado = lambda: tarea.cancelada
+        return exportador.ejecutar()
+
+    def avance_exportacion(self, filas, total):
+        self.progreso_exportacion.setMaximum(total)
+        self.progreso_exportacion.setValue(filas)
+        self.progreso_exportacion.setLabelText(f"Exportando reporte... {filas:,} de {total:,} filas")
+
+    def _cerrar_progreso(self):
+        self.progreso_exportacion.canceled.disconnect()
+        self.progreso_exportacion.close()
+        self.btn_exportar.setEnabled(True)
+
+    def exportacion_terminada(self, resumen):
+        self._cerrar_progreso()
+        QMessageBox.information(self, "Éxito", f"Se exportaron {resumen['filas']:,} registros a:\n{resumen['ruta']}")
+
+    def exportacion_fallida(self, mensaje):
+        self._cerrar_progreso()
+        QMessageBox.critical(self, "Error", f"No se pudo guardar el archivo:\n{mensaje}")
+
+    def exportacion_cancelada(self):
+        # La tarea deja de entregar resultados; el exportador se detiene en el siguiente bloque y borra el archivo parcial
+        self.btn_exportar.setEnabled(True)
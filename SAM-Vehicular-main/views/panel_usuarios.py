@@ -1,14 +1,17 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
 QLineEdit, QPushButton, QComboBox, QTabWidget, 
-QFormLayout, QTableWidget, QTableWidgetItem, 
+QFormLayout, QTableView, 
 QHeaderView, QMessageBox)
 from PySide6.QtCore import Qt
 import logic.catalogos as cat
+from logic import sesion
 
 # Importamos el backend
 from logic.auth import Auth
 from models.usuario import Usuario
 from logic.gestor_usuarios import GestorUsuarios
+from views.modelo_tabla import ModeloTablaPaginada
+from views.tareas import ejecutar_en_segundo_plano
 
 class PanelUsuarios(QWidget):
     def __init__(self, usuario_actual):
@@ -66,21 +69,29 @@ class PanelUsuarios(QWidget):
     def construir_tab_gestionar(self):
         layout = QVBoxLayout(self.tab_gestionar)
 
-        # Tabla de usuarios
-        self.tabla_usuarios = QTableWidget()
-        self.tabla_usuarios.setColumnCount(4)
-        self.tabla_usuarios.setHorizontalHeaderLabels(["ID", "Usuario", "Rol", "Estado"])
-        self.tabla_usuarios.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.tabla_usuarios.setSelectionMode(QTableWidget.SingleSelection)
-        self.tabla_usuarios.setSelectionBehavior(QTableWidget.SelectRows)
+        # Tabla de usuarios (vista sobre un modelo paginado, ordenable por columna)
+        self.modelo_usuarios = ModeloTablaPaginada(encabezados=["ID", "Usuario", "Rol", "Estado"])
+        self.modelo_usuarios.configurar(
+            lambda despues_de, orden, tamano: GestorUsuarios.obtener_pagina_usuarios(despues_de, tamano, orden),
+            GestorUsuarios.contar_usuarios)
+        self.tabla_usuarios = QTableView()
+        self.tabla_usuarios.setModel(self.modelo_usuarios)
+        self.tabla_usuarios.setEditTriggers(QTableView.NoEditTriggers)
+        self.tabla_usuarios.setSelectionMode(QTableView.SingleSelection)
+        self.tabla_usuarios.setSelectionBehavior(QTableView.SelectRows)
+        self.tabla_usuarios.verticalHeader().setVisible(False)
         self.tabla_usuarios.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.tabla_usuarios.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.tabla_usuarios.setSortingEnabled(True)
         
         # Estilo oscuro para consistencia
         self.tabla_usuarios.setStyleSheet("""
-            QTableWidget { background-color: #2b2b2b; alternate-background-color: #353535; color: #ffffff; }
+            QTableView { background-color: #2b2b2b; alternate-background-color: #353535; color: #ffffff; }
             QHeaderView::section { background-color: #1e1e1e; color: #ffffff; font-weight: bold; }
         """)
-        self.tabla_usuarios.itemSelectionChanged.connect(self.seleccionar_usuario_tabla)
+        self.tabla_usuarios.selectionModel().selectionChanged.connect(self.seleccionar_usuario_tabla)
+        self.modelo_usuarios.cargado.connect(self.lista_usuarios_cargada)
+        self.modelo_usuarios.error_carga.connect(self.mostrar_error)
         layout.addWidget(self.tabla_usuarios)
 
         # Controles de edición
@@ -109,7 +120,7 @@ class PanelUsuarios(QWidget):
 
     def aplicar_permisos(self):
         """Si por algún motivo alguien que no es Admin llega aquí, bloqueamos todo."""
-        if self.usuario_actual.rol != "Administrador":
+        if not sesion.puede(sesion.ADMINISTRAR_USUARIOS):
             self.pestanas.setEnabled(False)
             
 
@@ -122,8 +133,19 @@ class PanelUsuarios(QWidget):
         rol = self.combo_rol.currentText()
 
         nuevo_usuario = Usuario(nombre_usuario=nombre, password=password, rol=rol)
-        exito, msj = Auth.registrar_usuario(nuevo_usuario)
 
+        # El registro (hash + INSERT) corre en segundo plano; el botón se bloquea mientras tanto
+        self.btn_registrar.setEnabled(False)
+        ejecutar_en_segundo_plano(
+            Auth.registrar_usuario, nuevo_usuario,
+            al_terminar=self.registro_terminado,
+            al_fallar=lambda msj: self.registro_terminado((False, msj)),
+            dueno=self,
+        )
+
+    def registro_terminado(self, resultado):
+        exito, msj = resultado
+        self.btn_registrar.setEnabled(True)
         if exito:
             QMessageBox.information(self, "Éxito", msj)
             self.input_nombre.clear()
@@ -133,24 +155,23 @@ class PanelUsuarios(QWidget):
             QMessageBox.critical(self, "Error", msj)
 
     def cargar_lista_usuarios(self):
-        self.tabla_usuarios.setRowCount(0)
-        exito, datos = GestorUsuarios.obtener_todos_los_usuarios()
-        
-        if exito and datos:
-            self.tabla_usuarios.setRowCount(len(datos))
-            for fila_idx, usuario in enumerate(datos):
-                for col_idx, valor in enumerate(usuario):
-                    item = QTableWidgetItem(str(valor))
-                    item.setTextAlignment(Qt.AlignCenter)
-                    self.tabla_usuarios.setItem(fila_idx, col_idx, item)
+        # El modelo vuelve a pedir la primera página en segundo plano; el resto se trae al desplazarse
+        self.modelo_usuarios.cargar()
+
+    def lista_usuarios_cargada(self, exito, msj):
+        if not exito:
+            self.mostrar_error(msj)
+
+    def mostrar_error(self, msj):
+        QMessageBox.critical(self, "Error", msj)
 
     def seleccionar_usuario_tabla(self):
-        filas_seleccionadas = self.tabla_usuarios.selectedItems()
+        filas_seleccionadas = self.tabla_usuarios.selectionModel().selectedRows()
         if filas_seleccionadas:
-            fila = filas_seleccionadas[0].row()
-            id_usuario = self.tabla_usuarios.item(fila, 0).text()
-            rol_actual = self.tabla_usuarios.item(fila, 2).text()
-            estado_actual = self.tabla_usuarios.item(fila, 3).text()
+            usuario = self.modelo_usuarios.fila(filas_seleccionadas[0].row())
+            if usuario is None:
+                return
+            id_usuario, _, rol_actual, estado_actual = usuario
 
             self.lbl_id_edit.setText(f"ID seleccionado: {id_usuario}")
             self.combo_edit_rol.setCurrentText(rol_actual)
@@ -166,12 +187,20 @@ class PanelUsuarios(QWidget):
         nuevo_rol = self.combo_edit_rol.currentText()
         nuevo_estado = self.combo_edit_estado.currentText()
 
-        exito, msj = GestorUsuarios.actualizar_usuario(id_usuario, nuevo_rol, nuevo_estado)
+        self.btn_actualizar.setEnabled(False)
+        ejecutar_en_segundo_plano(
+            GestorUsuarios.actualizar_usuario, id_usuario, nuevo_rol, nuevo_estado,
+            al_terminar=self.actualizacion_terminada,
+            al_fallar=lambda msj: self.actualizacion_terminada((False, msj)),
+            dueno=self,
+        )
 
+    def actualizacion_terminada(self, resultado):
+        exito, msj = resultado
         if exito:
             QMessageBox.information(self, "Actualizado", msj)
             self.cargar_lista_usuarios()
-            self.btn_actualizar.setEnabled(False)
             self.lbl_id_edit.setText("ID seleccionado: -")
         else:
+            self.btn_actualizar.setEnabled(True)
             QMessageBox.critical(self, "Error", msj)
\ No newline at end of file
@@ -1,6 +1,6 @@
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QTabWidget
 from PySide6.QtCore import Qt
-import logic.catalogos as cat
+from logic import sesion
 
 # Importamos nuestros nuevos componentes limpios y modulares
 from views.tabs.tab_registrar_vehiculo import TabRegistrarVehiculo
@@ -32,18 +32,14 @@ class PanelVehiculos(QWidget):
         self.tab_modificar = TabModificarVehiculo(self.usuario_actual)
 
         # --- APLICACIÓN DE ROLES ---
-        rol = self.usuario_actual.rol
-        
-        # cat.ROLES_USUARIO[0] -> "Administrador"
-        # cat.ROLES_USUARIO[1] -> "Operador Administrativo"
-        if rol in [cat.ROLES_USUARIO[0], cat.ROLES_USUARIO[1]]:
+        # Administrador y Operador Administrativo
+        if sesion.puede(sesion.REGISTRAR_VEHICULOS):
             # Tienen poder de escritura, ven todo
             self.pestanas.addTab(self.tab_registrar, "Registrar Nuevo Vehículo")
             self.pestanas.addTab(self.tab_modificar, "Modificar Vehículo")
         
-        # cat.ROLES_USUARIO[2] -> "Agente de Tránsito"
-        # cat.ROLES_USUARIO[3] -> "Supervisor"
-        elif rol in [cat.ROLES_USUARIO[2], cat.ROLES_USUARIO[3]]:
+        # Agente de Tránsito: solo consulta
+        elif sesion.puede(sesion.VER_VEHICULOS):
             self.pestanas.addTab(self.tab_modificar, "Consultar Vehículo")
             
         layout_principal.addWidget(self.pestanas)
\ No newline at end of file
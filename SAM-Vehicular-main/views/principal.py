@@ -1,6 +1,7 @@
 from PySide6.QtWidgets import (QMainWindow, QWidget, QHBoxLayout, QVBoxLayout,
-QPushButton, QStackedWidget, QLabel, QFrame)
-from PySide6.QtCore import Qt
+QPushButton, QStackedWidget, QLabel, QFrame, QApplication)
+from PySide6.QtCore import Qt, QEvent, QTimer
+from logic import sesion
 
 # Importación de paneles de viewas
 from views.panel_vehiculos import PanelVehiculos
@@ -9,6 +10,11 @@ from views.panel_propietarios import PanelPropietarios
 from views.panel_reportes import PanelReportes
 from views.panel_usuarios import PanelUsuarios
 
+REVISION_SESION_MS = 15_000    # Cada cuánto se revisa si la sesión expiró por inactividad
+
+# Lo que cuenta como actividad del usuario para la inactividad de la sesión
+_EVENTOS_ACTIVIDAD = (QEvent.KeyPress, QEvent.MouseButtonPress, QEvent.Wheel)
+
 class VentanaPrincipal(QMainWindow):
     def __init__(self, usuario_actual):
         super().__init__()
@@ -19,6 +25,7 @@ class VentanaPrincipal(QMainWindow):
 
         self.configurar_ui()
         self.aplicar_permisos_rol()
+        self.vigilar_sesion()
 
     def configurar_ui(self):
         # Widget central y layout principal horizontal
@@ -117,25 +124,50 @@ class VentanaPrincipal(QMainWindow):
         """
         Oculta módulos en el menú dependiendo del rol del usuario autenticado.
         """
-        rol = self.usuario.rol
-
-        if rol == "Administrador":
-            # Tiene acceso a todos los módulos y reportes completos [cite: 47-51].
-            pass 
-        
-        elif rol == "Operador Administrativo":
-            # Registra vehículos y actualiza datos permitidos, pero no gestiona configuraciones críticas [cite: 52-57].
-            self.btn_infracciones.hide()
-            self.btn_usuarios.hide()
-            
-        elif rol == "Agente de Tránsito":
-            # Registra infracciones y consulta información básica, pero no modifica datos estructurales [cite: 58-61].
-            self.btn_propietarios.hide()
-            self.btn_reportes.hide()
-            self.btn_usuarios.hide()
-            
-        elif rol == "Supervisor":
-            # Consulta reportes y supervisa infracciones, pero no modifica información estructural [cite: 62-65].
-            self.btn_vehiculos.hide()
-            self.btn_propietarios.hide()
-            self.btn_usuarios.hide()
\ No newline at end of file
+        # La matriz rol -> capacidades vive en logic/sesion.py [cite: 47-65]
+        self.btn_vehiculos.setVisible(sesion.puede(sesion.VER_VEHICULOS))
+        self.btn_propietarios.setVisible(sesion.puede(sesion.VER_PROPIETARIOS))
+        self.btn_infracciones.setVisible(sesion.puede(sesion.REGISTRAR_INFRACCIONES)
+                                         or sesion.puede(sesion.VER_INFRACCIONES))
+        self.btn_reportes.setVisible(sesion.puede(sesion.REPORTES_PADRON)
+                                     or sesion.puede(sesion.REPORTES_INFRACCIONES))
+        self.btn_usuarios.setVisible(sesion.puede(sesion.ADMINISTRAR_USUARIOS))
+
+    # ==========================
+    # EXPIRACIÓN DE LA SESIÓN
+    # ==========================
+    def vigilar_sesion(self):
+        """
+        Cada tecla o clic en la aplicación renueva la sesión (logic/sesion.py); si
+        aun así expira, se pide la contraseña sin cerrar esta ventana.
+        """
+        self.ventana_reautenticacion = None
+        QApplication.instance().installEventFilter(self)
+        self.timer_sesion = QTimer(self)
+        self.timer_sesion.timeout.connect(self.revisar_sesion)
+        self.timer_sesion.start(REVISION_SESION_MS)
+
+    def eventFilter(self, objeto, evento):
+        if evento.type() in _EVENTOS_ACTIVIDAD:
+            sesion.renovar()
+        return super().eventFilter(objeto, evento)
+
+    def revisar_sesion(self):
+        actual = sesion.sesion_actual()
+        if actual is not None and actual.vigente:
+            return
+        if self.ventana_reautenticacion is not None and self.ventana_reautenticacion.isVisible():
+            return
+        # Importación diferida: views.login importa este módulo
+        from views.login import VentanaLogin
+        self.ventana_reautenticacion = VentanaLogin(self.usuario, al_reautenticar=self.sesion_reanudada)
+        self.ventana_reautenticacion.show()
+
+    def sesion_reanudada(self):
+        self.ventana_reautenticacion = None
+
+    def closeEvent(self, evento):
+        QApplication.instance().removeEventFilter(self)
+        if self.ventana_reautenticacion is not None:
+            self.ventana_reautenticacion.close()
+        super().closeEvent(evento)
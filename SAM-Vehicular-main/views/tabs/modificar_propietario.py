@@ -1,10 +1,12 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-QLineEdit, QPushButton, QComboBox, QFormLayout, QMessageBox)
+QLineEdit, QPushButton, QComboBox, QFormLayout, QMessageBox, QInputDialog)
 from PySide6.QtCore import Qt, QRegularExpression
 from PySide6.QtGui import QRegularExpressionValidator
 
-import logic.catalogos as cat
+from logic import sesion
+from logic.gestor_busqueda import GestorBusqueda
 from logic.gestor_propietarios import GestorPropietarios
+from views.tareas import ejecutar_en_segundo_plano
 # Importaremos el Gestor más adelante
 # from logic.gestor_propietarios import GestorPropietarios
 
@@ -23,15 +25,16 @@ class TabModificarPropietario(QWidget):
         # ==========================================
         layout_busqueda = QHBoxLayout()
         self.input_buscar_curp = QLineEdit()
-        self.input_buscar_curp.setPlaceholderText("Ingrese la CURP a buscar...")
-        self.input_buscar_curp.setMaxLength(18)
+        # Con la CURP completa se carga directo; con parte de la CURP o del nombre se ofrecen sugerencias
+        self.input_buscar_curp.setPlaceholderText("Ingrese la CURP o el nombre a buscar...")
+        self.input_buscar_curp.setMaxLength(80)
         
-        btn_buscar = QPushButton("Buscar")
-        btn_buscar.clicked.connect(self.procesar_busqueda)
+        self.btn_buscar = QPushButton("Buscar")
+        self.btn_buscar.clicked.connect(self.procesar_busqueda)
 
         layout_busqueda.addWidget(QLabel("CURP del Propietario:"))
         layout_busqueda.addWidget(self.input_buscar_curp)
-        layout_busqueda.addWidget(btn_buscar)
+        layout_busqueda.addWidget(self.btn_buscar)
         
         layout.addLayout(layout_busqueda)
 
@@ -100,10 +103,8 @@ class TabModificarPropietario(QWidget):
     # ==========================================
     def aplicar_permisos(self):
         """Bloquea los elementos editables si el usuario es Agente o Supervisor."""
-        rol = self.usuario_actual.rol
-        
-        # Agente de Tránsito [2] o Supervisor [3]
-        if rol in [cat.ROLES_USUARIO[2], cat.ROLES_USUARIO[3]]:
+        # Agente de Tránsito o Supervisor: solo consulta
+        if not sesion.puede(sesion.MODIFICAR_PROPIETARIOS):
             self.btn_actualizar.setVisible(False)
             
             # Bloqueamos físicamente los campos para que sean de solo lectura
@@ -125,8 +126,18 @@ class TabModificarPropietario(QWidget):
             QMessageBox.warning(self, "Atención", "Por favor, ingrese una CURP para buscar.")
             return
             
-        exito, resultado = GestorPropietarios.buscar_propietario_por_curp(curp_buscada)
-        
+        self.btn_buscar.setEnabled(False)
+        ejecutar_en_segundo_plano(
+            GestorPropietarios.buscar_propietario_por_curp, curp_buscada,
+            al_terminar=self.busqueda_terminada,
+            al_fallar=lambda msj: self.busqueda_terminada((False, msj)),
+            dueno=self,
+        )
+
+    def busqueda_terminada(self, respuesta):
+        exito, resultado = respuesta
+        self.btn_buscar.setEnabled(True)
+
         if exito:
             id_real = resultado["id_propietario"]
             self.mod_id.setText(f"PRP-{id_real:05d}")
@@ -142,7 +153,31 @@ class TabModificarPropietario(QWidget):
             QMessageBox.information(self, "Propietario Encontrado", "Datos cargados correctamente.")
         else:
             self.limpiar_formulario()
-            QMessageBox.critical(self, "No encontrado", "No existe un propietario con esa CURP.")
+            self.btn_buscar.setEnabled(False)
+            ejecutar_en_segundo_plano(
+                GestorBusqueda.buscar_propietarios, self.input_buscar_curp.text().strip(),
+                al_terminar=self.sugerencias_terminadas,
+                al_fallar=lambda msj: self.sugerencias_terminadas((False, msj)),
+                dueno=self,
+            )
+
+    def sugerencias_terminadas(self, respuesta):
+        """Deja elegir entre los propietarios cuyo nombre o CURP se parece a lo buscado."""
+        exito, resultado = respuesta
+        self.btn_buscar.setEnabled(True)
+        if not exito or not resultado["resultados"]:
+            QMessageBox.critical(self, "No encontrado", "No existe un propietario con esa CURP o nombre.")
+            return
+
+        opciones = {f"{p['nombre_completo']}  |  {p['curp']}  |  {p['estado']}": p["curp"]
+                    for p in resultado["resultados"]}
+        titulo = "Propietarios encontrados"
+        if resultado["hay_mas"]:
+            titulo += " (hay más; escriba más del nombre)"
+        elegido, ok = QInputDialog.getItem(self, "Sugerencias", f"{titulo}:", list(opciones), 0, False)
+        if ok and elegido:
+            self.input_buscar_curp.setText(opciones[elegido])
+            self.procesar_busqueda()
 
     def limpiar_formulario(self):
         """Vacía las cajas de texto."""
@@ -177,11 +212,19 @@ class TabModificarPropietario(QWidget):
             QMessageBox.warning(self, "Campos Vacíos", "La dirección y el teléfono no pueden quedar vacíos.")
             return
 
-        exito, mensaje = GestorPropietarios.modificar_propietario(
-            id_objetivo, direccion, telefono, correo, licencia, estado
+        self.btn_actualizar.setEnabled(False)
+        ejecutar_en_segundo_plano(
+            GestorPropietarios.modificar_propietario,
+            id_objetivo, direccion, telefono, correo, licencia, estado,
+            al_terminar=self.actualizacion_terminada,
+            al_fallar=lambda msj: self.actualizacion_terminada((False, msj)),
+            dueno=self,
         )
-        
+
+    def actualizacion_terminada(self, resultado):
         # Retroalimentación visual según el resultado
+        exito, mensaje = resultado
+        self.btn_actualizar.setEnabled(True)
         if exito:
             QMessageBox.information(self, "Actualización Exitosa", mensaje)
             self.limpiar_formulario()
@@ -6,6 +6,7 @@ from PySide6.QtGui import QRegularExpressionValidator
 # Importamos el backend real
 from models.propietario import Propietario
 from logic.gestor_propietarios import GestorPropietarios
+from views.tareas import ejecutar_en_segundo_plano
 class TabRegistrarPropietario(QWidget):
     def __init__(self, usuario_actual):
         super().__init__()
@@ -107,9 +108,18 @@ class TabRegistrarPropietario(QWidget):
             estado="Activo"  # El propietario nace como Activo
         )
         
-        # Llamamos al gestor
-        exito, mensaje = GestorPropietarios.registrar_propietario(nuevo_propietario)
-        
+        # Llamamos al gestor en segundo plano
+        self.btn_guardar.setEnabled(False)
+        ejecutar_en_segundo_plano(
+            GestorPropietarios.registrar_propietario, nuevo_propietario,
+            al_terminar=self.registro_terminado,
+            al_fallar=lambda msj: self.registro_terminado((False, msj)),
+            dueno=self,
+        )
+
+    def registro_terminado(self, resultado):
+        exito, mensaje = resultado
+        self.btn_guardar.setEnabled(True)
         if exito:
             QMessageBox.information(self, "Éxito", mensaje)
             self.limpiar_formulario()
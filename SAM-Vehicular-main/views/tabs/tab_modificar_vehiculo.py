@@ -4,7 +4,11 @@ from PySide6.QtCore import Qt
 
 # Importaciones del backend
 import logic.catalogos as cat
+from logic import sesion
+from logic.almacen_catalogos import catalogos
+from logic.gestor_busqueda import GestorBusqueda
 from logic.gestor_vehiculos import GestorVehiculos
+from views.tareas import ejecutar_en_segundo_plano
 
 # [REFACTORIZACIÓN]: Nombramos la clase específicamente para su función.
 # Hereda de QWidget, lo que la convierte en una pestaña autosuficiente.
@@ -28,12 +32,12 @@ class TabModificarVehiculo(QWidget):
         # Cambia el placeholder para que el operador sepa que puede usar la placa
         self.input_buscar_vin.setPlaceholderText("Ingrese VIN o Placa a buscar...")
         
-        btn_buscar = QPushButton("Buscar")
-        btn_buscar.clicked.connect(self.procesar_busqueda_vehiculo)
+        self.btn_buscar = QPushButton("Buscar")
+        self.btn_buscar.clicked.connect(self.procesar_busqueda_vehiculo)
 
         layout_busqueda.addWidget(QLabel("VIN del Vehículo:"))
         layout_busqueda.addWidget(self.input_buscar_vin)
-        layout_busqueda.addWidget(btn_buscar)
+        layout_busqueda.addWidget(self.btn_buscar)
         
         layout.addLayout(layout_busqueda)
 
@@ -82,8 +86,7 @@ class TabModificarVehiculo(QWidget):
 
         # --- CAMPOS EDITABLES ---
         self.mod_color = QComboBox()
-        self.mod_color.addItems(cat.COLORES_VEHICULO)
-        self.mod_color.addItems(cat.COLORES_VEHICULO)
+        self.mod_color.addItems(catalogos().colores)
         self.mod_color.setCurrentIndex(-1) # Forzamos a que empiece en blanco
         
         self.mod_estado = QComboBox()
@@ -129,12 +132,23 @@ class TabModificarVehiculo(QWidget):
         )
         
         if ok and nueva_placa.strip():
-            exito, msj = GestorVehiculos.realizar_reemplacamiento(vin, nueva_placa.strip().upper())
-            if exito:
-                QMessageBox.information(self, "Éxito", msj)
-                self.mod_placa.setText(nueva_placa.strip().upper()) # Actualizamos la vista
-            else:
-                QMessageBox.warning(self, "Trámite Denegado", msj)
+            nueva_placa = nueva_placa.strip().upper()
+            self.btn_cambiar_placa.setEnabled(False)
+            ejecutar_en_segundo_plano(
+                GestorVehiculos.realizar_reemplacamiento, vin, nueva_placa,
+                al_terminar=lambda resultado: self.reemplacamiento_terminado(resultado, nueva_placa),
+                al_fallar=lambda msj: self.reemplacamiento_terminado((False, msj), nueva_placa),
+                dueno=self,
+            )
+
+    def reemplacamiento_terminado(self, resultado, nueva_placa):
+        exito, msj = resultado
+        self.btn_cambiar_placa.setEnabled(True)
+        if exito:
+            QMessageBox.information(self, "Éxito", msj)
+            self.mod_placa.setText(nueva_placa) # Actualizamos la vista
+        else:
+            QMessageBox.warning(self, "Trámite Denegado", msj)
 
     def abrir_ventana_cambio_propietario(self):
         """Ejecuta la transferencia de propiedad pidiendo el ID del nuevo dueño."""
@@ -146,13 +160,24 @@ class TabModificarVehiculo(QWidget):
         )
         
         if ok:
-            exito, msj = GestorVehiculos.transferir_propiedad(vin, id_nuevo)
-            if exito:
-                QMessageBox.information(self, "Éxito", msj)
-                # Actualizamos el campo visual con el formato PRP-00000
-                self.mod_id_propietario.setText(f"PRP-{id_nuevo:05d}")
-            else:
-                QMessageBox.warning(self, "Trámite Denegado", msj)
+            self.btn_cambiar_propietario.setEnabled(False)
+            ejecutar_en_segundo_plano(
+                GestorVehiculos.transferir_propiedad, vin, id_nuevo,
+                al_terminar=lambda resultado: self.cambio_propietario_terminado(resultado, id_nuevo),
+                al_fallar=lambda msj: self.cambio_propietario_terminado((False, msj), id_nuevo),
+                dueno=self,
+            )
+
+    def cambio_propietario_terminado(self, resultado, id_nuevo):
+        exito, msj = resultado
+        self.btn_cambiar_propietario.setEnabled(True)
+        if exito:
+            QMessageBox.information(self, "Éxito", msj)
+            # Actualizamos el campo visual con el formato PRP-00000
+            self.mod_id_propietario.setText(f"PRP-{id_nuevo:05d}")
+        else:
+            QMessageBox.warning(self, "Trámite Denegado", msj)
+
     # ==========================================
     # MÉTODOS LÓGICOS (Búsqueda)
     # ==========================================
@@ -164,9 +189,20 @@ class TabModificarVehiculo(QWidget):
             QMessageBox.warning(self, "Atención", "Por favor, ingrese un VIN o Placa para buscar.")
             return
             
-        # Llamamos a la nueva función universal
-        exito, resultado = GestorVehiculos.buscar_vehiculo_universal(criterio_buscado)
-        
+        # Llamamos a la nueva función universal en segundo plano; el botón se bloquea mientras busca
+        self.btn_buscar.setEnabled(False)
+        ejecutar_en_segundo_plano(
+            GestorVehiculos.buscar_vehiculo_universal, criterio_buscado,
+            al_terminar=self.busqueda_terminada,
+            al_fallar=lambda msj: self.busqueda_terminada((False, msj)),
+            dueno=self,
+        )
+
+    def busqueda_terminada(self, respuesta):
+        """Rellena el formulario con el vehículo encontrado."""
+        exito, resultado = respuesta
+        self.btn_buscar.setEnabled(True)
+
         if exito:
             # ¡EL TRUCO DE ORO! Si buscaron por placa, reemplazamos el texto de la caja 
             # de búsqueda por el VIN real para que el resto del código no se rompa.
@@ -187,7 +223,34 @@ class TabModificarVehiculo(QWidget):
             
         else:
             self.limpiar_formulario_modificar()
-            QMessageBox.critical(self, "No encontrado", resultado)
+            # Sin coincidencia exacta: se ofrecen los vehículos con placa o VIN parecidos
+            self.btn_buscar.setEnabled(False)
+            ejecutar_en_segundo_plano(
+                GestorBusqueda.buscar_vehiculos, self.input_buscar_vin.text().strip(),
+                al_terminar=lambda respuesta: self.sugerencias_terminadas(respuesta, resultado),
+                al_fallar=lambda msj: self.sugerencias_terminadas((False, msj), resultado),
+                dueno=self,
+            )
+
+    def sugerencias_terminadas(self, respuesta, msj_no_encontrado):
+        """Deja elegir entre los vehículos parecidos a lo buscado y carga el elegido."""
+        exito, resultado = respuesta
+        self.btn_buscar.setEnabled(True)
+        if not exito or not resultado["resultados"]:
+            QMessageBox.critical(self, "No encontrado", msj_no_encontrado)
+            return
+
+        opciones = {
+            f"{v['placa']}  |  {v['vin']}  |  {v['marca']} {v['modelo']} {v['anio']}  |  {v['propietario']}": v["vin"]
+            for v in resultado["resultados"]
+        }
+        titulo = "No encontrado. Vehículos parecidos"
+        if resultado["hay_mas"]:
+            titulo += " (hay más; escriba más caracteres)"
+        elegido, ok = QInputDialog.getItem(self, "Sugerencias", f"{titulo}:", list(opciones), 0, False)
+        if ok and elegido:
+            self.input_buscar_vin.setText(opciones[elegido])
+            self.procesar_busqueda_vehiculo()
 
     def limpiar_formulario_modificar(self):
         """Vacía las cajas de texto por si se busca un auto que no existe."""
@@ -215,10 +278,19 @@ class TabModificarVehiculo(QWidget):
         nuevo_color = self.mod_color.currentText()
         nuevo_estado = self.mod_estado.currentText()
         
-        # 3. Mandamos al Gestor a hacer el UPDATE
-        exito, mensaje = GestorVehiculos.actualizar_vehiculo(vin_objetivo, nuevo_color, nuevo_estado)
-        
+        # 3. Mandamos al Gestor a hacer el UPDATE (en segundo plano)
+        self.btn_actualizar.setEnabled(False)
+        ejecutar_en_segundo_plano(
+            GestorVehiculos.actualizar_vehiculo, vin_objetivo, nuevo_color, nuevo_estado,
+            al_terminar=self.actualizacion_terminada,
+            al_fallar=lambda msj: self.actualizacion_terminada((False, msj)),
+            dueno=self,
+        )
+
+    def actualizacion_terminada(self, resultado):
         # 4. Retroalimentación visual
+        exito, mensaje = resultado
+        self.btn_actualizar.setEnabled(True)
         if exito:
             QMessageBox.information(self, "Actualización Exitosa", mensaje)
             self.limpiar_formulario_modificar()
@@ -231,10 +303,8 @@ class TabModificarVehiculo(QWidget):
     # ==========================================
     def aplicar_permisos(self):
         """Bloquea o esconde elementos visuales según el rol del usuario."""
-        rol = self.usuario_actual.rol
-        
-        # Si es Agente de Tránsito [2] o Supervisor [3]
-        if rol in [cat.ROLES_USUARIO[2], cat.ROLES_USUARIO[3]]:
+        # Agente de Tránsito o Supervisor: solo consulta
+        if not sesion.puede(sesion.MODIFICAR_VEHICULOS):
             # 1. Escondemos por completo los botones de acción
             self.btn_actualizar.setVisible(False)
             self.btn_cambiar_propietario.setVisible(False)
@@ -5,8 +5,10 @@ from PySide6.QtCore import Qt
 
 # Importaciones del backend (Mantenemos las rutas absolutas asumiendo que ejecutas desde el main)
 import logic.catalogos as cat
+from logic.almacen_catalogos import catalogos
 from models.vehiculo import Vehiculo
 from logic.gestor_vehiculos import GestorVehiculos
+from views.tareas import ejecutar_en_segundo_plano
 
 # [REFACTORIZACIÓN]: Cambiamos el nombre de la clase. 
 # Ya no es "PanelVehiculos", ahora es un componente específico llamado "TabRegistrarVehiculo".
@@ -41,16 +43,17 @@ class TabRegistrarVehiculo(QWidget):
         self.input_anio.setValue(1899)
         self.input_anio.setButtonSymbols(QSpinBox.PlusMinus)
         
-        # 2. Listas Desplegables (QComboBox) conectadas a catalogos.py
+        # 2. Listas Desplegables (QComboBox): marcas, modelos, clases y colores vienen de
+        # los catálogos de la base de datos; estados y procedencias, de catalogos.py
         self.combo_marca = QComboBox()
-        self.combo_marca.addItems(cat.MARCAS_MODELOS_VEHICULO.keys())    
+        self.combo_marca.addItems(catalogos().marcas_modelos.keys())    
         self.combo_marca.setCurrentIndex(-1) 
         
         self.combo_modelo = QComboBox()
         self.combo_modelo.setCurrentIndex(-1) 
         
         self.combo_color = QComboBox()
-        self.combo_color.addItems(cat.COLORES_VEHICULO)
+        self.combo_color.addItems(catalogos().colores)
         self.combo_color.setCurrentIndex(-1) 
         
         self.combo_clase = QComboBox()
@@ -100,8 +103,9 @@ class TabRegistrarVehiculo(QWidget):
     def actualizar_modelos(self, marca_seleccionada):
         """Primera cascada: Llena los modelos basados en la marca."""
         self.combo_modelo.clear() 
-        if marca_seleccionada in cat.MARCAS_MODELOS_VEHICULO:
-            modelos_permitidos = list(cat.MARCAS_MODELOS_VEHICULO[marca_seleccionada].keys())
+        marcas_modelos = catalogos().marcas_modelos
+        if marca_seleccionada in marcas_modelos:
+            modelos_permitidos = list(marcas_modelos[marca_seleccionada].keys())
             self.combo_modelo.addItems(modelos_permitidos)
     
     def actualizar_clases(self, modelo_seleccionado):
@@ -109,8 +113,9 @@ class TabRegistrarVehiculo(QWidget):
         self.combo_clase.clear()
         marca_actual = self.combo_marca.currentText()
         
-        if marca_actual in cat.MARCAS_MODELOS_VEHICULO and modelo_seleccionado in cat.MARCAS_MODELOS_VEHICULO[marca_actual]:
-            clases_permitidas = cat.MARCAS_MODELOS_VEHICULO[marca_actual][modelo_seleccionado]
+        marcas_modelos = catalogos().marcas_modelos
+        if marca_actual in marcas_modelos and modelo_seleccionado in marcas_modelos[marca_actual]:
+            clases_permitidas = marcas_modelos[marca_actual][modelo_seleccionado]
             self.combo_clase.addItems(clases_permitidas)
             
             if len(clases_permitidas) == 1:
@@ -147,8 +152,17 @@ class TabRegistrarVehiculo(QWidget):
             procedencia=procedencia, id_propietario=id_propietario
         )
 
-        exito, mensaje = GestorVehiculos.registrar_vehiculo(nuevo_vehiculo)
+        self.btn_guardar.setEnabled(False)
+        ejecutar_en_segundo_plano(
+            GestorVehiculos.registrar_vehiculo, nuevo_vehiculo,
+            al_terminar=self.registro_terminado,
+            al_fallar=lambda msj: self.registro_terminado((False, msj)),
+            dueno=self,
+        )
 
+    def registro_terminado(self, resultado):
+        exito, mensaje = resultado
+        self.btn_guardar.setEnabled(True)
         if exito:
             QMessageBox.information(self, "Registro Exitoso", mensaje)
             self.limpiar_formulario() 
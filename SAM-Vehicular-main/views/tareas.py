@@ -0,0 +1,124 @@
+import threading
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+# Tareas en curso. QThreadPool no conserva el objeto de Python; sin esta referencia
+# el recolector de basura podría destruir la tarea (y sus señales) antes de que termine.
+_tareas_activas = set()
+_candado_tareas = threading.Lock()
+
+
+class SenalesTarea(QObject):
+    """
+    Señales de una Tarea. QRunnable no es QObject y no puede tener señales propias.
+    El objeto se crea en el hilo de la interfaz, así que lo conectado a estas señales
+    se ejecuta en ese hilo aunque la señal se emita desde el hilo de trabajo.
+    """
+    resultado = Signal(object)      # Lo que retornó la función
+    error = Signal(str)             # Mensaje de la excepción, si la función falló
+    progreso = Signal(int, int)     # (hechos, total); total = 0 si no se conoce
+    terminado = Signal()            # Siempre al final (con o sin éxito, o cancelada)
+
+
+class Tarea(QRunnable):
+    """
+    Ejecuta una llamada bloqueante (consultas a la base de datos) en un hilo del
+    QThreadPool global para que la ventana no se congele.
+
+    - El resultado y los errores llegan por señales al hilo de la interfaz.
+    - cancelar() es cooperativa: la función sigue hasta terminar o hasta que revise
+      'cancelada', pero su resultado/error ya no se entrega.
+    - Con con_tarea=True la función recibe la tarea como primer argumento, para
+      reportar avance con reportar_progreso() y revisar 'cancelada' entre bloques.
+    """
+
+    def __init__(self, funcion, *args, con_tarea=False, **kwargs):
+        super().__init__()
+        self.funcion = funcion
+        self.args = args
+        self.kwargs = kwargs
+        self.con_tarea = con_tarea
+        self.senales = SenalesTarea()
+        self.terminada = False
+        self._cancelada = threading.Event()
+
+    @property
+    def cancelada(self):
+        return self._cancelada.is_set()
+
+    def cancelar(self):
+        self._cancelada.set()
+
+    def reportar_progreso(self, hechos, total=0):
+        if not self.cancelada:
+            self.senales.progreso.emit(int(hechos), int(total))
+
+    def run(self):
+        try:
+            args = (self, *self.args) if self.con_tarea else self.args
+            resultado = self.funcion(*args, **self.kwargs)
+        except Exception as e:
+            if not self.cancelada:
+                self.senales.error.emit(str(e))
+        else:
+            if not self.cancelada:
+                self.senales.resultado.emit(resultado)
+        finally:
+            self.terminada = True
+            self.senales.terminado.emit()
+
+
+def ejecutar_en_segundo_plano(funcion, *args, al_terminar=None, al_fallar=None, al_avanzar=None,
+                              al_finalizar=None, dueno=None, con_tarea=False, **kwargs):
+    """
+    Lanza funcion(*args, **kwargs) en el QThreadPool global y retorna la Tarea.
+
+        al_terminar(resultado): recibe lo que retornó la función (ej. la tupla (exito, msj))
+        al_fallar(mensaje):     si la función lanzó una excepción
+        al_avanzar(hechos, total): progreso reportado con tarea.reportar_progreso()
+        al_finalizar():         al final con o sin éxito (no si se canceló), para reactivar botones, etc.
+        dueno: widget al que pertenece la tarea; si se destruye, la tarea se cancela
+               para no entregar resultados a una ventana que ya no existe.
+
+    Todos los callbacks corren en el hilo de la interfaz.
+    """
+    tarea = Tarea(funcion, *args, con_tarea=con_tarea, **kwargs)
+    tarea.setAutoDelete(False)
+
+    if al_terminar is not None:
+        tarea.senales.resultado.connect(al_terminar)
+    if al_fallar is not None:
+        tarea.senales.error.connect(al_fallar)
+    if al_avanzar is not None:
+        tarea.senales.progreso.connect(al_avanzar)
+    if al_finalizar is not None:
+        tarea.senales.terminado.connect(lambda: tarea.cancelada or al_finalizar())
+    if dueno is not None:
+        dueno.destroyed.connect(tarea.cancelar)
+    # Se suelta la referencia ya en el hilo de la interfaz, después de entregar las
+    # señales anteriores (si se soltara en el hilo de trabajo se podrían perder)
+    tarea.senales.terminado.connect(lambda: _soltar(tarea))
+
+    with _candado_tareas:
+        _tareas_activas.add(tarea)
+    QThreadPool.globalInstance().start(tarea)
+    return tarea
+
+
+def _soltar(tarea):
+    with _candado_tareas:
+        _tareas_activas.discard(tarea)
+
+
+def cancelar_todas():
+    """Cancela las tareas pendientes (al cerrar sesión o salir de la aplicación)."""
+    with _candado_tareas:
+        tareas = list(_tareas_activas)
+    for tarea in tareas:
+        tarea.cancelar()
+
+
+def terminar_tareas(tiempo_maximo_ms=5000):
+    """Cancela las tareas y espera a que los hilos suelten sus conexiones (al salir)."""
+    cancelar_todas()
+    QThreadPool.globalInstance().waitForDone(tiempo_maximo_ms)